@@ -0,0 +1,105 @@
+"""Add search_index table for single-query cross-type search
+
+Revision ID: add_search_index_table
+Revises: add_lr_med_proc_tables
+Create Date: 2026-10-16 12:00:00.000000
+
+This migration adds:
+- search_index: one denormalized search document per patient record
+- SQLite: search_index_fts, an FTS5 trigram index kept in sync by triggers
+- PostgreSQL: a pg_trgm GIN index on search_index.document (when the
+  extension can be enabled)
+
+The table is populated on first startup by run_startup_data_migrations
+(app.services.search_index.run_one_time_build), not here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_index_table'
+down_revision = 'add_lr_med_proc_tables'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index_fts USING fts5("
+    "title, body, tags, content='search_index', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ai AFTER INSERT ON search_index BEGIN "
+    "INSERT INTO search_index_fts(rowid, title, body, tags) "
+    "VALUES (new.id, new.title, new.body, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ad AFTER DELETE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, title, body, tags) "
+    "VALUES ('delete', old.id, old.title, old.body, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_au AFTER UPDATE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, title, body, tags) "
+    "VALUES ('delete', old.id, old.title, old.body, old.tags); "
+    "INSERT INTO search_index_fts(rowid, title, body, tags) "
+    "VALUES (new.id, new.title, new.body, new.tags); END",
+)
+
+
+def upgrade() -> None:
+    op.create_table('search_index',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('record_type', sa.String(length=30), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('tags', sa.Text(), nullable=False),
+        sa.Column('document', sa.Text(), nullable=False),
+        sa.Column('sort_date', sa.DateTime(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('record_type', 'record_id', name='uq_search_index_record')
+    )
+    op.create_index('idx_search_index_patient_type_date', 'search_index', ['patient_id', 'record_type', 'sort_date'], unique=False)
+
+    connection = op.get_bind()
+    if connection.dialect.name == 'sqlite':
+        try:
+            for statement in SQLITE_FTS_DDL:
+                connection.execute(sa.text(statement))
+        except Exception:
+            # SQLite < 3.34 has no trigram tokenizer; search falls back to
+            # substring matching on search_index.document
+            pass
+    elif connection.dialect.name == 'postgresql':
+        # Creating an extension needs elevated privileges on some hosts; search
+        # still works without the index, just with a sequential scan per patient
+        with connection.begin_nested() as savepoint:
+            try:
+                connection.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            except Exception:
+                savepoint.rollback()
+        has_trgm = connection.execute(
+            sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).first()
+        if has_trgm:
+            op.create_index(
+                'idx_search_index_document_trgm',
+                'search_index',
+                ['document'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={'document': 'gin_trgm_ops'},
+            )
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name == 'sqlite':
+        for trigger in ('search_index_ai', 'search_index_ad', 'search_index_au'):
+            connection.execute(sa.text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(sa.text("DROP TABLE IF EXISTS search_index_fts"))
+    elif connection.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_search_index_document_trgm")
+
+    op.drop_index('idx_search_index_patient_type_date', table_name='search_index')
+    op.drop_table('search_index')
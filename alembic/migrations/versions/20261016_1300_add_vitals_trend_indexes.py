@@ -0,0 +1,61 @@
+"""Add vitals trend indexes
+
+Revision ID: add_vitals_trend_indexes
+Revises: add_search_index_table
+Create Date: 2026-10-16 13:00:00.000000
+
+This migration:
+- Replaces idx_vitals_patient_id with a composite (patient_id, recorded_date)
+  index, which serves every query the old index did plus date-range scans
+- Adds one partial covering index per vital type,
+  (patient_id, recorded_date, <value columns>) WHERE the values are present,
+  so a chart reads only the rows carrying its reading
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_vitals_trend_indexes'
+down_revision = 'add_search_index_table'
+branch_labels = None
+depends_on = None
+
+
+# Mirrors VITAL_TYPE_COLUMNS in app/models/clinical.py
+VITAL_TYPE_COLUMNS = {
+    'blood_pressure': ('systolic_bp', 'diastolic_bp'),
+    'heart_rate': ('heart_rate',),
+    'temperature': ('temperature',),
+    'weight': ('weight',),
+    'oxygen_saturation': ('oxygen_saturation',),
+    'respiratory_rate': ('respiratory_rate',),
+    'blood_glucose': ('blood_glucose',),
+    'a1c': ('a1c',),
+    'bmi': ('bmi',),
+    'pain_scale': ('pain_scale',),
+}
+
+
+def upgrade() -> None:
+    op.create_index('idx_vitals_patient_recorded_date', 'vitals', ['patient_id', 'recorded_date'], unique=False)
+    op.drop_index('idx_vitals_patient_id', table_name='vitals')
+
+    for vital_type, value_columns in VITAL_TYPE_COLUMNS.items():
+        has_values = sa.text(' AND '.join(f'{name} IS NOT NULL' for name in value_columns))
+        op.create_index(
+            f'idx_vitals_{vital_type}_series',
+            'vitals',
+            ['patient_id', 'recorded_date', *value_columns],
+            unique=False,
+            postgresql_where=has_values,
+            sqlite_where=has_values,
+        )
+
+
+def downgrade() -> None:
+    for vital_type in VITAL_TYPE_COLUMNS:
+        op.drop_index(f'idx_vitals_{vital_type}_series', table_name='vitals')
+
+    op.create_index('idx_vitals_patient_id', 'vitals', ['patient_id'], unique=False)
+    op.drop_index('idx_vitals_patient_recorded_date', table_name='vitals')
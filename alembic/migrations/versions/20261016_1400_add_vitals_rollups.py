@@ -0,0 +1,50 @@
+"""Add vitals rollups table
+
+Revision ID: add_vitals_rollups
+Revises: add_vitals_trend_indexes
+Create Date: 2026-10-16 14:00:00.000000
+
+This migration:
+- Creates vitals_rollups, per-patient day and month aggregates (count, sum,
+  min, max, first/last reading) of each vitals value column, maintained by
+  app.services.vitals_rollup on every vitals write
+- Rollups for existing readings are built by the one-time startup build
+  (app/core/database/migrations.py), or on demand with
+  app/scripts/vitals_rollup_cli.py backfill
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_vitals_rollups'
+down_revision = 'add_vitals_trend_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vitals_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('series', sa.String(length=30), nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('period_start', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=False),
+        sa.Column('max_value', sa.Float(), nullable=False),
+        sa.Column('first_value', sa.Float(), nullable=False),
+        sa.Column('first_recorded_at', sa.DateTime(), nullable=False),
+        sa.Column('last_value', sa.Float(), nullable=False),
+        sa.Column('last_recorded_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('patient_id', 'granularity', 'series', 'period_start', name='uq_vitals_rollup_period'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('vitals_rollups')
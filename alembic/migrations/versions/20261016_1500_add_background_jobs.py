@@ -0,0 +1,67 @@
+"""Add background jobs table
+
+Revision ID: add_background_jobs
+Revises: add_vitals_rollups
+Create Date: 2026-10-16 15:00:00.000000
+
+This migration:
+- Creates background_jobs, the persistent queue behind /api/v1/jobs: one row
+  per submitted export, custom report or backup with its status, priority,
+  progress, result and downloadable artifact, run by app.services.job_engine
+- Adds the claim index (status, priority, id) used by workers and a
+  (user_id, created_at) index for listing a user's jobs
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_background_jobs'
+down_revision = 'add_vitals_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=30), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('progress_message', sa.String(length=255), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('artifact_path', sa.String(length=500), nullable=True),
+        sa.Column('artifact_filename', sa.String(length=255), nullable=True),
+        sa.Column('artifact_media_type', sa.String(length=100), nullable=True),
+        sa.Column('artifact_size', sa.Integer(), nullable=True),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'idx_background_jobs_claim',
+        'background_jobs',
+        ['status', 'priority', 'id'],
+    )
+    op.create_index(
+        'idx_background_jobs_user_created',
+        'background_jobs',
+        ['user_id', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_background_jobs_user_created', table_name='background_jobs')
+    op.drop_index('idx_background_jobs_claim', table_name='background_jobs')
+    op.drop_table('background_jobs')
@@ -0,0 +1,122 @@
+"""Add lab component trend keys
+
+Revision ID: add_lab_component_trend_keys
+Revises: add_background_jobs
+Create Date: 2026-10-17 10:00:00.000000
+
+This migration:
+- Adds patient_id, trend_key (normalized test name + unit) and
+  effective_date (lab result completed_date, else the day the component was
+  created) to lab_test_components, maintained on write by
+  app.services.lab_trend_keys
+- Backfills them for existing components
+- Adds idx_lab_test_components_trend (patient_id, trend_key, effective_date)
+  for trend lookups and the component catalog
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_lab_component_trend_keys'
+down_revision = 'add_background_jobs'
+branch_labels = None
+depends_on = None
+
+
+# Mirrors TREND_KEY_SEPARATOR and trend_key_for in app/services/lab_trend_keys.py
+TREND_KEY_SEPARATOR = '\x1f'
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _trend_key(test_name, canonical_test_name, unit):
+    if canonical_test_name and canonical_test_name.strip():
+        name = canonical_test_name.strip().lower()
+    else:
+        name = (test_name or '').strip().rstrip(',;: ').lower()
+    return f"{name}{TREND_KEY_SEPARATOR}{(unit or '').strip().lower()}"
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    op.add_column('lab_test_components', sa.Column('patient_id', sa.Integer(), nullable=True))
+    op.add_column('lab_test_components', sa.Column('trend_key', sa.String(), nullable=True))
+    op.add_column('lab_test_components', sa.Column('effective_date', sa.Date(), nullable=True))
+    if connection.dialect.name != 'sqlite':
+        op.create_foreign_key(
+            'fk_lab_test_components_patient_id',
+            'lab_test_components', 'patients',
+            ['patient_id'], ['id'],
+            ondelete='CASCADE',
+        )
+
+    op.execute(
+        """
+        UPDATE lab_test_components
+        SET patient_id = (
+                SELECT lab_results.patient_id FROM lab_results
+                WHERE lab_results.id = lab_test_components.lab_result_id
+            ),
+            effective_date = COALESCE(
+                (
+                    SELECT lab_results.completed_date FROM lab_results
+                    WHERE lab_results.id = lab_test_components.lab_result_id
+                ),
+                date(lab_test_components.created_at)
+            )
+        """
+    )
+
+    components = sa.table(
+        'lab_test_components',
+        sa.column('id', sa.Integer),
+        sa.column('test_name', sa.String),
+        sa.column('canonical_test_name', sa.String),
+        sa.column('unit', sa.String),
+        sa.column('trend_key', sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(
+                components.c.id,
+                components.c.test_name,
+                components.c.canonical_test_name,
+                components.c.unit,
+            )
+            .where(components.c.id > last_id)
+            .order_by(components.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            components.update()
+            .where(components.c.id == sa.bindparam('component_id'))
+            .values(trend_key=sa.bindparam('new_trend_key')),
+            [
+                {
+                    'component_id': row.id,
+                    'new_trend_key': _trend_key(row.test_name, row.canonical_test_name, row.unit),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    op.create_index(
+        'idx_lab_test_components_trend',
+        'lab_test_components',
+        ['patient_id', 'trend_key', 'effective_date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_lab_test_components_trend', table_name='lab_test_components')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('fk_lab_test_components_patient_id', 'lab_test_components', type_='foreignkey')
+    op.drop_column('lab_test_components', 'effective_date')
+    op.drop_column('lab_test_components', 'trend_key')
+    op.drop_column('lab_test_components', 'patient_id')
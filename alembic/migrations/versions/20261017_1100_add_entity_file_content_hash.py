@@ -0,0 +1,38 @@
+"""Add entity file content hash
+
+Revision ID: add_entity_file_content_hash
+Revises: add_lab_component_trend_keys
+Create Date: 2026-10-17 11:00:00.000000
+
+This migration:
+- Adds content_hash (SHA-256) to entity_files, set for local uploads stored
+  in the content-addressed blob store (app/services/blob_store.py)
+- Adds idx_entity_files_content_hash for blob reference counts
+
+Existing files keep their paths and a NULL hash until moved into the blob
+store with app/scripts/entity_file_dedup_cli.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_entity_file_content_hash'
+down_revision = 'add_lab_component_trend_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('entity_files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(
+        'idx_entity_files_content_hash',
+        'entity_files',
+        ['content_hash'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_entity_files_content_hash', table_name='entity_files')
+    op.drop_column('entity_files', 'content_hash')
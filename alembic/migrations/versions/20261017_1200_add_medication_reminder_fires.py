@@ -0,0 +1,55 @@
+"""Add medication reminder fires table
+
+Revision ID: add_medication_reminder_fires
+Revises: add_entity_file_content_hash
+Create Date: 2026-10-17 12:00:00.000000
+
+This migration:
+- Creates medication_reminder_fires, one row per medication reminder
+  published by app.services.medication_reminder_scheduler, replacing the
+  scan of the day's notification_history JSON for deduplication
+- Adds the unique (medication_id, scheduled_date, scheduled_time) index the
+  scheduler claims reminders through, and a scheduled_date index for pruning
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_medication_reminder_fires'
+down_revision = 'add_entity_file_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'medication_reminder_fires',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('medication_id', sa.Integer(), nullable=False),
+        sa.Column('scheduled_date', sa.Date(), nullable=False),
+        sa.Column('scheduled_time', sa.String(length=5), nullable=False),
+        sa.Column('fired_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['medication_id'], ['medications.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'medication_id',
+            'scheduled_date',
+            'scheduled_time',
+            name='uq_medication_reminder_fire',
+        ),
+    )
+    op.create_index(
+        'idx_medication_reminder_fires_date',
+        'medication_reminder_fires',
+        ['scheduled_date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'idx_medication_reminder_fires_date', table_name='medication_reminder_fires'
+    )
+    op.drop_table('medication_reminder_fires')
@@ -0,0 +1,69 @@
+"""Add shared state tables
+
+Revision ID: add_shared_state_tables
+Revises: add_medication_reminder_fires
+Create Date: 2026-10-17 13:00:00.000000
+
+This migration:
+- Creates shared_state_entries, short-lived keyed values (SSO state and
+  account-linking tokens) shared by all server workers
+- Creates rate_limit_windows, one sliding window per limiter and key
+- Creates scheduler_leases, naming the worker that runs scheduled jobs
+- All three are only written when STATE_BACKEND is "database"
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_shared_state_tables'
+down_revision = 'add_medication_reminder_fires'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'shared_state_entries',
+        sa.Column('namespace', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('value', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('namespace', 'key'),
+    )
+    op.create_index(
+        'idx_shared_state_entries_expires', 'shared_state_entries', ['expires_at']
+    )
+
+    op.create_table(
+        'rate_limit_windows',
+        sa.Column('scope', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('hits', sa.JSON(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'key'),
+    )
+    op.create_index(
+        'idx_rate_limit_windows_expires', 'rate_limit_windows', ['expires_at']
+    )
+
+    op.create_table(
+        'scheduler_leases',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduler_leases')
+    op.drop_index('idx_rate_limit_windows_expires', table_name='rate_limit_windows')
+    op.drop_table('rate_limit_windows')
+    op.drop_index(
+        'idx_shared_state_entries_expires', table_name='shared_state_entries'
+    )
+    op.drop_table('shared_state_entries')
@@ -0,0 +1,123 @@
+"""Add entity_tags table normalizing record tags
+
+Revision ID: add_entity_tags
+Revises: add_shared_state_tables
+Create Date: 2026-10-17 14:00:00.000000
+
+This migration:
+- Creates entity_tags, one row per (record type, record, tag), maintained on
+  write by app.services.entity_tags
+- Adds idx_entity_tags_tag_type (tag, entity_type) for tag lookups across
+  all patients, and idx_entity_tags_patient_type_tag (patient_id,
+  entity_type, tag) for per-patient and per-user lookups and usage counts
+- Backfills it from the JSON tags of existing records
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_entity_tags'
+down_revision = 'add_shared_state_tables'
+branch_labels = None
+depends_on = None
+
+
+# Mirrors TAGGED_MODELS, MAX_TAG_LENGTH and normalize_tags in
+# app/services/entity_tags.py
+TAGGED_TABLES = {
+    'lab_result': 'lab_results',
+    'medication': 'medications',
+    'condition': 'conditions',
+    'procedure': 'procedures',
+    'immunization': 'immunizations',
+    'treatment': 'treatments',
+    'encounter': 'encounters',
+    'allergy': 'allergies',
+    'injury': 'injuries',
+    'medical_equipment': 'medical_equipment',
+    'symptom': 'symptoms',
+}
+MAX_TAG_LENGTH = 100
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _normalize_tags(tags):
+    if not isinstance(tags, list):
+        return []
+    return list(dict.fromkeys(
+        tag for tag in tags
+        if isinstance(tag, str) and tag and len(tag) <= MAX_TAG_LENGTH
+    ))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'entity_tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('tag', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('entity_id', 'entity_type', 'tag', name='uq_entity_tag'),
+    )
+    op.create_index(
+        'idx_entity_tags_tag_type', 'entity_tags', ['tag', 'entity_type'], unique=False
+    )
+    op.create_index(
+        'idx_entity_tags_patient_type_tag',
+        'entity_tags',
+        ['patient_id', 'entity_type', 'tag'],
+        unique=False,
+    )
+
+    connection = op.get_bind()
+    entity_tags = sa.table(
+        'entity_tags',
+        sa.column('entity_type', sa.String),
+        sa.column('entity_id', sa.Integer),
+        sa.column('patient_id', sa.Integer),
+        sa.column('tag', sa.String),
+    )
+    for entity_type, table_name in TAGGED_TABLES.items():
+        records = sa.table(
+            table_name,
+            sa.column('id', sa.Integer),
+            sa.column('patient_id', sa.Integer),
+            sa.column('tags', sa.JSON),
+        )
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(records.c.id, records.c.patient_id, records.c.tags)
+                .where(
+                    records.c.id > last_id,
+                    records.c.tags.isnot(None),
+                    records.c.patient_id.isnot(None),
+                )
+                .order_by(records.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            values = [
+                {
+                    'entity_type': entity_type,
+                    'entity_id': row.id,
+                    'patient_id': row.patient_id,
+                    'tag': tag,
+                }
+                for row in rows
+                for tag in _normalize_tags(row.tags)
+            ]
+            if values:
+                connection.execute(entity_tags.insert(), values)
+            last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('idx_entity_tags_patient_type_tag', table_name='entity_tags')
+    op.drop_index('idx_entity_tags_tag_type', table_name='entity_tags')
+    op.drop_table('entity_tags')
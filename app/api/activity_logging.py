@@ -13,8 +13,10 @@ from sqlalchemy.orm import Session
 
 from app.core.logging.config import get_logger
 from app.core.logging.constants import sanitize_log_input
+from app.core.utils.datetime_utils import get_utc_now
 from app.crud.activity_log import activity_log
 from app.models.activity_log import ActionType, EntityType
+from app.services.activity_log_writer import ActivityLogWriter
 
 logger = get_logger(__name__, "activity_logging")
 
@@ -262,7 +264,25 @@ def log_crud_activity(
                 safe_value = _sanitize_entity_value(key, value)
                 safe_metadata[safe_key] = safe_value
 
-        # Log the activity using the CRUD method
+        # Hand the entry to the batched writer; it declines when it isn't
+        # running (tests, scripts, ACTIVITY_LOG_SYNC) or is backed up
+        if ActivityLogWriter.get_instance().enqueue(
+            {
+                "action": action,
+                "entity_type": entity_type,
+                "description": description,
+                "timestamp": get_utc_now(),
+                "user_id": user_id,
+                "patient_id": patient_id,
+                "entity_id": entity_id,
+                "event_metadata": safe_metadata,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            }
+        ):
+            return True
+
+        # Otherwise write it inline using the CRUD method
         activity_log.log_activity(
             db=db,
             action=action,
@@ -520,10 +520,12 @@ def get_current_user_patient_id(
     Raises:
         NotFoundException: If no patient records found or active patient not accessible
     """
-    from app.models.models import Patient
+    from app.services.patient_access import PatientAccessService
 
-    # Get user with active patient ID (multi-patient system)
-    user = db.query(User).filter(User.id == current_user_id).first()
+    # Get user with active patient ID (multi-patient system). get_current_user
+    # already loaded this row into the request's session, so Session.get is served
+    # from the identity map without another query.
+    user = db.get(User, current_user_id)
     if not user:
         raise NotFoundException(message="User not found", request=None)
 
@@ -552,28 +554,11 @@ def get_current_user_patient_id(
         # ensure_active_patient already verified ownership
         return resolved.id
 
-    # Verify the active patient exists and user has access (owned or shared)
-    patient_record = (
-        db.query(Patient)
-        .filter(
-            Patient.id == user.active_patient_id,
-        )
-        .first()
-    )
-
-    if not patient_record:
-        raise NotFoundException(message="Active patient record not found", request=None)
-
-    # Owner always has access
-    if patient_record.owner_user_id == current_user_id:
-        return patient_record.id
-
-    # Check shared access
-    from app.services.patient_access import PatientAccessService
-
+    # Verify the active patient exists and user has access (owned or shared).
+    # Served from the access cache after the first request.
     access_service = PatientAccessService(db)
-    if access_service.can_access_patient(user, patient_record, "view"):
-        return patient_record.id
+    if access_service.check_patient_access(user, user.active_patient_id, "view"):
+        return user.active_patient_id
 
     raise NotFoundException(message="Active patient record not found", request=None)
 
@@ -606,24 +591,15 @@ def verify_patient_record_access(
     """
     # If db and current_user are provided, use proper multi-patient access checking
     if db is not None and current_user is not None:
-        from app.models.models import Patient
         from app.services.patient_access import PatientAccessService
 
-        # Get the patient record
-        patient_record = (
-            db.query(Patient).filter(Patient.id == record_patient_id).first()
-        )
-        if not patient_record:
-            raise NotFoundException(
-                message=f"{record_type.title()} not found", request=None
-            )
-
-        # Check if user has access to this patient with required permission level
+        # Check if user has access to this patient with required permission level.
+        # A missing patient and a denial both return 404 to avoid leaking
+        # information about existence of records.
         access_service = PatientAccessService(db)
-        if not access_service.can_access_patient(
-            current_user, patient_record, permission
+        if not access_service.check_patient_access(
+            current_user, record_patient_id, permission
         ):
-            # Return 404 to avoid leaking information about existence of records
             raise NotFoundException(
                 message=f"{record_type.title()} not found", request=None
             )
@@ -662,19 +638,16 @@ def verify_patient_access(
         NotFoundException: If patient not found
         ForbiddenException: If access denied
     """
-    from app.models.models import Patient
     from app.services.patient_access import PatientAccessService
 
-    # Get the patient record
-    patient_record = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient_record:
-        raise NotFoundException(message="Patient not found", request=None)
-
     # Check access using the PatientAccessService
     access_service = PatientAccessService(db)
-    if not access_service.can_access_patient(
-        current_user, patient_record, required_permission
-    ):
+    allowed = access_service.check_patient_access(
+        current_user, patient_id, required_permission
+    )
+    if allowed is None:
+        raise NotFoundException(message="Patient not found", request=None)
+    if not allowed:
         raise ForbiddenException(
             message=f"Access denied to patient {patient_id}", request=None
         )
@@ -709,15 +682,13 @@ def get_accessible_patient_id(
     """
     if patient_id is not None:
         # Verify user has access to this patient
-        from app.models.models import Patient
         from app.services.patient_access import PatientAccessService
 
-        patient_record = db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient_record:
-            raise NotFoundException(message="Patient not found", request=None)
-
         access_service = PatientAccessService(db)
-        if not access_service.can_access_patient(current_user, patient_record, "view"):
+        allowed = access_service.check_patient_access(current_user, patient_id, "view")
+        if allowed is None:
+            raise NotFoundException(message="Patient not found", request=None)
+        if not allowed:
             raise ForbiddenException(message="Access denied to patient", request=None)
 
         return patient_id
@@ -20,6 +20,7 @@ from app.core.logging.config import get_logger
 from app.core.logging.helpers import log_endpoint_access, log_endpoint_error
 from app.models.activity_log import ActionType, ActivityLog, EntityType
 from app.models.models import User
+from app.services.activity_log_writer import ActivityLogWriter
 
 logger = get_logger(__name__, "app")
 
@@ -346,3 +347,15 @@ def get_activity_log_filters(
     except Exception as e:
         log_endpoint_error(logger, request, "Error fetching activity log filters", e)
         raise
+
+
+@router.get("/writer-stats")
+def get_activity_log_writer_stats(
+    request: Request,
+    current_user: User = Depends(deps.get_current_admin_user),
+):
+    """Get queue depth, throughput and flush latency of the activity log writer."""
+    log_endpoint_access(
+        logger, request, current_user.id, "activity_log_writer_stats_accessed"
+    )
+    return ActivityLogWriter.get_instance().stats()
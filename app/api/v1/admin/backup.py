@@ -216,6 +216,62 @@ async def create_files_backup(
         )
 
 
+@router.post("/create-incremental", response_model=BackupResponse)
+async def create_incremental_backup(
+    backup_request: BackupCreateRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Create an incremental files backup.
+
+    Only uploads that are new or changed since the previous incremental
+    backup are stored; unchanged content is shared with earlier snapshots.
+
+    Only admin users can create backups.
+    """
+    try:
+        backup_service = BackupService(db)
+        backup_result = await backup_service.create_incremental_backup(
+            description=backup_request.description
+        )
+
+        log_security_event(
+            logger,
+            "incremental_backup_created",
+            request,
+            f"Incremental files backup created: {backup_result['filename']}",
+            user_id=current_user.id,
+            backup_id=backup_result["id"],
+            backup_filename=backup_result["filename"],
+            size_bytes=backup_result["size_bytes"],
+        )
+
+        return BackupResponse(
+            id=backup_result["id"],
+            backup_type=backup_result["backup_type"],
+            filename=backup_result["filename"],
+            size_bytes=backup_result["size_bytes"],
+            status=backup_result["status"],
+            created_at=backup_result["created_at"],
+            description=backup_request.description,
+        )
+
+    except Exception as e:
+        log_endpoint_error(
+            logger,
+            request,
+            "Failed to create incremental backup",
+            e,
+            user_id=current_user.id,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create incremental backup: {str(e)}",
+        )
+
+
 @router.post("/create-full", response_model=BackupResponse)
 async def create_full_backup(
     backup_request: BackupCreateRequest,
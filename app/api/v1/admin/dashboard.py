@@ -24,20 +24,9 @@ from app.core.utils.datetime_utils import (
     get_application_uptime_string,
 )
 from app.models.activity_log import ActivityLog, get_utc_now
-from app.models.models import (
-    Allergy,
-    Condition,
-    Encounter,
-    Immunization,
-    LabResult,
-    Medication,
-    Patient,
-    Practitioner,
-    Procedure,
-    Treatment,
-    User,
-    Vitals,
-)
+from app.models.models import User
+from app.services.dashboard_summary import GLOBAL_COUNT_MODELS, get_global_summary
+from app.services.patient_access_cache import patient_access_cache
 
 logger = get_logger(__name__, "app")
 
@@ -96,51 +85,14 @@ def get_dashboard_stats(
     """Get dashboard statistics for admin overview"""
 
     try:
-        # Helper function to safely get count
-        def safe_count(query):
-            try:
-                result = query.count()
-                return result if result is not None else 0
-            except Exception:
-                return 0
-
-        # Get counts for all models with error handling
+        # All totals come from one statement, cached until a counted record
+        # is written (see app.services.dashboard_summary)
+        totals = get_global_summary(db)
         stats = DashboardStats(
-            total_users=safe_count(db.query(User)),
-            total_patients=safe_count(db.query(Patient)),
-            total_practitioners=safe_count(db.query(Practitioner)),
-            total_medications=safe_count(db.query(Medication)),
-            total_lab_results=safe_count(db.query(LabResult)),
-            total_vitals=safe_count(db.query(Vitals)),
-            total_conditions=safe_count(db.query(Condition)),
-            total_allergies=safe_count(db.query(Allergy)),
-            total_immunizations=safe_count(db.query(Immunization)),
-            total_procedures=safe_count(db.query(Procedure)),
-            total_treatments=safe_count(db.query(Treatment)),
-            total_encounters=safe_count(db.query(Encounter)),
-            recent_registrations=(
-                safe_count(
-                    db.query(User).filter(
-                        User.created_at >= datetime.utcnow() - timedelta(days=30)
-                    )
-                )
-                if hasattr(User, "created_at")
-                else safe_count(db.query(User).limit(5))
-            ),
-            active_medications=(
-                safe_count(
-                    db.query(Medication).filter(
-                        Medication.status.in_(["active", "current"])
-                    )
-                )
-                if hasattr(Medication, "status")
-                else safe_count(db.query(Medication))
-            ),
-            pending_lab_results=(
-                safe_count(db.query(LabResult).filter(LabResult.status == "pending"))
-                if hasattr(LabResult, "status")
-                else 0
-            ),
+            **{f"total_{name}": totals[name] for name in GLOBAL_COUNT_MODELS},
+            recent_registrations=totals["recent_registrations"],
+            active_medications=totals["active_medications"],
+            pending_lab_results=totals["pending_lab_results"],
         )
 
         return stats
@@ -265,14 +217,6 @@ def get_system_health(
     """Get comprehensive system health information"""
 
     try:
-        # Helper function to safely get count
-        def safe_count(query):
-            try:
-                result = query.count()
-                return result if result is not None else 0
-            except Exception:
-                return 0
-
         # Test database connection
         database_status = "healthy"
         database_connection_test = True
@@ -286,20 +230,14 @@ def get_system_health(
             database_connection_test = False
             logger.error(f"Database connection test failed: {str(e)}")
         # Calculate total records across all models with error handling
-        total_records = (
-            safe_count(db.query(User))
-            + safe_count(db.query(Patient))
-            + safe_count(db.query(Practitioner))
-            + safe_count(db.query(Medication))
-            + safe_count(db.query(LabResult))
-            + safe_count(db.query(Vitals))
-            + safe_count(db.query(Condition))
-            + safe_count(db.query(Allergy))
-            + safe_count(db.query(Immunization))
-            + safe_count(db.query(Procedure))
-            + safe_count(db.query(Treatment))
-            + safe_count(db.query(Encounter))
-        )  # Calculate application uptime using actual startup time
+        try:
+            totals = get_global_summary(db)
+            total_records = sum(totals[name] for name in GLOBAL_COUNT_MODELS)
+        except Exception as e:
+            logger.error(f"Error counting records: {str(e)}")
+            total_records = 0
+
+        # Calculate application uptime using actual startup time
         try:
             system_uptime = get_application_uptime_string()
         except Exception as e:
@@ -616,6 +554,9 @@ def get_system_metrics(
                 "authorization_status": authorization_status,
                 "session_status": session_status,
             },
+            "caches": {
+                "patient_access": patient_access_cache.stats(),
+            },
         }
 
         # Try to get actual database file size
@@ -4,24 +4,27 @@ Admin Maintenance API Endpoints
 Provides admin-only endpoints for system maintenance tasks.
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_admin_user, get_db
 from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
 from app.core.logging.helpers import (
     log_endpoint_access,
     log_endpoint_error,
     log_security_event,
 )
-from app.models.models import LabTestComponent, User
-from app.services.canonical_test_matching import canonical_test_matching
+from app.models.models import User
 from app.services.test_library_loader import (
     get_library_version,
     get_tests,
     reload_test_library,
 )
+from app.services.test_library_sync import test_library_sync
 
 logger = get_logger(__name__, "app")
 
@@ -43,6 +46,7 @@ class TestLibrarySyncResponse(BaseModel):
     components_processed: int
     canonical_names_updated: int
     categories_updated: int
+    distinct_test_names: int = 0
     message: str
 
 
@@ -131,39 +135,22 @@ async def reload_test_library_endpoint(
         )
 
 
-# Batch size for processing components to prevent memory issues and timeouts
-SYNC_BATCH_SIZE = 100
-
-
-def _sync_component(component, force_all: bool):
-    """
-    Match a single component against the test library and update its
-    canonical_test_name and category.
-
-    Returns a tuple of (canonical_updated, category_updated) counts
-    representing how many fields were actually changed on this component.
-    """
-    canonical_updated = 0
-    category_updated = 0
-
-    canonical_name = canonical_test_matching.find_canonical_match(component.test_name)
-
-    if canonical_name:
-        if component.canonical_test_name != canonical_name:
-            component.canonical_test_name = canonical_name
-            canonical_updated = 1
+def _run_test_library_sync(db: Session, force_all: bool) -> dict:
+    """Reload the library and sync components; blocking, run in a thread."""
+    reload_test_library()
 
-        test_info = canonical_test_matching.get_test_info(canonical_name)
-        if test_info and test_info.get("category"):
-            if component.category != test_info["category"]:
-                component.category = test_info["category"]
-                category_updated = 1
-    elif not force_all:
-        # Non-force mode: mark as processed with empty string to prevent
-        # re-querying on the next batch iteration
-        component.canonical_test_name = ""
+    def report(processed: int, total: int):
+        logger.info(
+            f"Test library sync: {processed}/{total} components processed",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "test_library_sync_progress",
+                "processed": processed,
+                LogFields.COUNT: total,
+            },
+        )
 
-    return canonical_updated, category_updated
+    return test_library_sync.sync_components(db, force_all=force_all, progress=report)
 
 
 @router.post("/test-library/sync", response_model=TestLibrarySyncResponse)
@@ -181,8 +168,8 @@ async def sync_test_library(
     2. Re-match all lab test components to canonical names
     3. Update categories based on the test library
 
-    Processing is done in batches to prevent memory issues and timeouts
-    on large datasets.
+    Each distinct test name is matched once, and components are updated in
+    bulk, a chunk at a time, in a worker thread.
 
     Args:
         force_all: If True, re-process all components. If False, only process
@@ -191,59 +178,13 @@ async def sync_test_library(
     Only admin users can access this endpoint.
     """
     try:
-        reload_test_library()
-
-        total_processed = 0
-        canonical_updated = 0
-        category_updated = 0
-
-        if sync_request.force_all:
-            # Force mode: process ALL components using offset-based pagination
-            # (since we're not filtering by NULL, offset is safe here)
-            total_count = db.query(LabTestComponent).count()
-            offset = 0
-
-            while offset < total_count:
-                batch = (
-                    db.query(LabTestComponent)
-                    .order_by(LabTestComponent.id)
-                    .offset(offset)
-                    .limit(SYNC_BATCH_SIZE)
-                    .all()
-                )
-
-                if not batch:
-                    break
-
-                for component in batch:
-                    c_upd, cat_upd = _sync_component(component, force_all=True)
-                    canonical_updated += c_upd
-                    category_updated += cat_upd
-                    total_processed += 1
-
-                db.commit()
-                offset += SYNC_BATCH_SIZE
-        else:
-            # Non-force mode: only process components without canonical names
-            # Re-query each batch since filter changes after commit
-            while True:
-                batch = (
-                    db.query(LabTestComponent)
-                    .filter(LabTestComponent.canonical_test_name.is_(None))
-                    .limit(SYNC_BATCH_SIZE)
-                    .all()
-                )
-
-                if not batch:
-                    break
-
-                for component in batch:
-                    c_upd, cat_upd = _sync_component(component, force_all=False)
-                    canonical_updated += c_upd
-                    category_updated += cat_upd
-                    total_processed += 1
-
-                db.commit()
+        # Matching and the bulk updates are blocking; keep them off the loop
+        result = await asyncio.to_thread(
+            _run_test_library_sync, db, sync_request.force_all
+        )
+        total_processed = result["processed"]
+        canonical_updated = result["canonical_updated"]
+        category_updated = result["category_updated"]
 
         log_security_event(
             logger,
@@ -258,6 +199,7 @@ async def sync_test_library(
             components_processed=total_processed,
             canonical_names_updated=canonical_updated,
             categories_updated=category_updated,
+            distinct_test_names=result["distinct_names"],
             message=f"Successfully synced {total_processed} components",
         )
 
@@ -112,6 +112,7 @@ from app.schemas.symptom import SymptomCreate, SymptomOccurrenceCreate
 from app.schemas.treatment import TreatmentCreate
 from app.schemas.user import UserCreate
 from app.schemas.vitals import VALID_GLUCOSE_CONTEXTS, VitalsCreate
+from app.services.patient_access_cache import patient_access_cache
 
 router = APIRouter()
 
@@ -1779,6 +1780,7 @@ def delete_model_record(
 
         # Delete the record
         crud_instance.delete(db, id=record_id)
+        _invalidate_patient_access(model_name, record)
 
         return {
             "message": f"{model_name} record {record_id} deleted successfully",
@@ -1794,6 +1796,20 @@ def delete_model_record(
         )
 
 
+def _invalidate_patient_access(model_name: str, record: Any) -> None:
+    """Drop cached access decisions that an admin edit to this record may change.
+
+    The generic model endpoints bypass the sharing and patient services, which
+    otherwise fire these invalidations themselves.
+    """
+    if model_name == "patient":
+        patient_access_cache.invalidate_patient(record.id)
+    elif model_name == "patient_share":
+        patient_access_cache.invalidate_patient(record.patient_id)
+    elif model_name == "user":
+        patient_access_cache.invalidate_user(record.id)
+
+
 def _block_user_update(
     *,
     request: Request,
@@ -1977,7 +1993,10 @@ def update_model_record(
         # Update the record using CRUD update method
         updated_record = crud_instance.update(
             db, db_obj=record, obj_in=update_data
-        )  # Log the update activity
+        )
+        _invalidate_patient_access(model_name, updated_record)
+
+        # Log the update activity
         current_user_id = getattr(current_user, "id", None)
         if current_user_id is not None:
             safe_log_activity(
@@ -2025,6 +2044,7 @@ def create_model_record(
             context={"operation": "admin_create", "model": model_name}
         ):
             created_record = crud_instance.create(db, obj_in=create_obj)
+        _invalidate_patient_access(model_name, created_record)
 
         current_user_id = getattr(current_user, "id", None)
         if current_user_id is not None:
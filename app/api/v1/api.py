@@ -18,6 +18,7 @@ from app.api.v1.endpoints import (
     injury_type,
     insurance,
     invitations,
+    jobs,
     lab_result,
     lab_result_file,
     lab_test_component,
@@ -161,6 +162,9 @@ api_router.include_router(
     custom_reports.router, prefix="/custom-reports", tags=["custom-reports"]
 )
 
+# Background job endpoints (exports, reports and backups run off-request)
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+
 # Utils endpoints
 api_router.include_router(utils.router)
 
@@ -3,6 +3,7 @@ Generic Entity File API endpoints for all entity types.
 Supports lab-results, insurance, visits, procedures, and future entity types.
 """
 
+import mimetypes
 import os
 from typing import Dict, List, Optional
 
@@ -12,11 +13,12 @@ from fastapi import (
     File,
     Form,
     HTTPException,
+    Query,
     Request,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -57,6 +59,7 @@ from app.schemas.entity_file import (
     FileBatchCountResponse,
     FileOperationResult,
 )
+from app.services.file_delivery import FileDownload, etag_matches
 from app.services.generic_entity_file_service import GenericEntityFileService
 from app.services.paperless_client import (
     PaperlessClientError,
@@ -186,6 +189,79 @@ def fix_filename_for_paperless_content(filename: str, content: bytes) -> str:
     return filename
 
 
+def _correct_remote_file_type(download: FileDownload, file_id: int) -> None:
+    """Fix a Paperless/Papra document's name and type from its content."""
+    download.filename = fix_filename_for_paperless_content(
+        download.filename, download.head
+    )
+
+    # Ensure proper content type - use corrected filename for guessing
+    if not download.content_type or download.content_type == "application/octet-stream":
+        guessed_type, _ = mimetypes.guess_type(download.filename)
+        if guessed_type:
+            download.content_type = guessed_type
+            log_debug(
+                logger,
+                "Guessed content type from filename",
+                file_name=download.filename,
+                content_type=guessed_type,
+                file_id=file_id,
+            )
+
+    # Override content type for PDF files to ensure proper handling
+    if download.filename.endswith(".pdf"):
+        download.content_type = "application/pdf"
+
+
+def _file_response(
+    request: Request,
+    download: FileDownload,
+    file_id: int,
+    disposition: str = "attachment",
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Send a file from disk or relay a remote document's stream.
+
+    Files on disk support Range requests; those with an ETag answer a
+    matching If-None-Match with 304 Not Modified.
+    """
+    if download.remote:
+        _correct_remote_file_type(download, file_id)
+
+    headers = dict(headers or {})
+    if download.etag:
+        # Browsers may keep the file but must revalidate before reusing it
+        headers["ETag"] = download.etag
+        headers["Cache-Control"] = "private, no-cache"
+        if etag_matches(request.headers.get("if-none-match"), download.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    else:
+        headers["Cache-Control"] = "no-cache"
+
+    if download.path:
+        return FileResponse(
+            path=download.path,
+            filename=download.filename,
+            media_type=download.content_type,
+            headers=headers,
+            content_disposition_type=disposition,
+        )
+
+    log_debug(
+        logger,
+        "Streaming remote document",
+        file_name=download.filename,
+        file_id=file_id,
+    )
+    headers["Content-Disposition"] = f"{disposition}; filename={download.filename}"
+    return StreamingResponse(
+        download.stream,
+        media_type=download.content_type or "application/octet-stream",
+        headers=headers,
+    )
+
+
 @router.get("/{entity_type}/{entity_id}/files", response_model=List[EntityFileResponse])
 def get_entity_files(
     *,
@@ -1111,67 +1187,10 @@ async def download_file(
         if entity_patient_id:
             deps.verify_patient_access(entity_patient_id, db, current_user)
 
-        # Get file information
-        file_info, filename, content_type = await file_service.get_file_download_info(
+        download = await file_service.get_file_download_info(
             db, file_id, current_user.id
         )
-
-        # Handle different return types (local path vs paperless content)
-        if isinstance(file_info, bytes):
-            # Paperless file - fix filename if content was converted
-            corrected_filename = fix_filename_for_paperless_content(filename, file_info)
-            log_debug(
-                logger,
-                "Processing Paperless download",
-                original_file_name=filename,
-                corrected_file_name=corrected_filename,
-                content_size=len(file_info),
-                file_id=file_id,
-            )
-
-            # Paperless file - return as StreamingResponse with proper binary handling
-            import mimetypes
-
-            from fastapi.responses import Response
-
-            # Ensure proper content type - use corrected filename for guessing
-            if not content_type or content_type == "application/octet-stream":
-                # Try to guess content type from corrected filename
-                guessed_type, _ = mimetypes.guess_type(corrected_filename)
-                if guessed_type:
-                    content_type = guessed_type
-                    log_debug(
-                        logger,
-                        "Guessed content type from filename",
-                        file_name=corrected_filename,
-                        content_type=content_type,
-                        file_id=file_id,
-                    )
-
-            # Override content type for PDF files to ensure proper handling
-            if corrected_filename.endswith(".pdf"):
-                content_type = "application/pdf"
-                log_debug(
-                    logger,
-                    "Forced content type for PDF file",
-                    file_id=file_id,
-                    file_name=corrected_filename,
-                )
-
-            # Set proper headers for binary content
-            headers = {
-                "Content-Disposition": f"attachment; filename={corrected_filename}",
-                "Content-Length": str(len(file_info)),
-                "Cache-Control": "no-cache",
-            }
-
-            return Response(
-                content=file_info,
-                media_type=content_type or "application/octet-stream",
-                headers=headers,
-            )
-        # Local file - return as FileResponse
-        return FileResponse(path=file_info, filename=filename, media_type=content_type)
+        return _file_response(request, download, file_id)
 
     except HTTPException:
         raise
@@ -1240,79 +1259,16 @@ async def view_file(
         if entity_patient_id:
             deps.verify_patient_access(entity_patient_id, db, current_user)
 
-        # Get file information
-        file_info, filename, content_type = await file_service.get_file_view_info(
-            db, file_id, current_user_id
-        )
-
-        # Handle different return types (local path vs paperless content)
-        if isinstance(file_info, bytes):
-            # Paperless file - fix filename if content was converted
-            corrected_filename = fix_filename_for_paperless_content(filename, file_info)
-            log_debug(
-                logger,
-                "Processing Paperless file view",
-                original_file_name=filename,
-                corrected_file_name=corrected_filename,
-                content_size=len(file_info),
-                file_id=file_id,
-            )
-
-            # Paperless file - return as StreamingResponse with proper binary handling
-            import mimetypes
-
-            from fastapi.responses import Response
-
-            # Ensure proper content type - use corrected filename for guessing
-            if not content_type or content_type == "application/octet-stream":
-                # Try to guess content type from corrected filename
-                guessed_type, _ = mimetypes.guess_type(corrected_filename)
-                if guessed_type:
-                    content_type = guessed_type
-                    log_debug(
-                        logger,
-                        "Guessed content type for view",
-                        file_name=corrected_filename,
-                        content_type=content_type,
-                        file_id=file_id,
-                    )
-
-            # Override content type for PDF files to ensure proper handling
-            if corrected_filename.endswith(".pdf"):
-                content_type = "application/pdf"
-                log_debug(
-                    logger,
-                    "Forced content type for PDF view",
-                    file_id=file_id,
-                    file_name=corrected_filename,
-                )
-
-            # Set secure headers for inline file viewing with proper binary handling
-            headers = {
-                "Content-Disposition": f"inline; filename={corrected_filename}",
-                "Content-Length": str(len(file_info)),
+        download = await file_service.get_file_view_info(db, file_id, current_user_id)
+        return _file_response(
+            request,
+            download,
+            file_id,
+            disposition="inline",
+            headers={
                 "X-Content-Type-Options": "nosniff",  # Prevent MIME sniffing
                 "X-Frame-Options": "SAMEORIGIN",  # Prevent embedding in frames from other domains
-                "Cache-Control": "no-cache",
-            }
-
-            return Response(
-                content=file_info,
-                media_type=content_type or "application/octet-stream",
-                headers=headers,
-            )
-        # Local file - return as FileResponse with inline disposition and security headers
-        headers = {
-            "Content-Disposition": f"inline; filename={filename}",
-            "X-Content-Type-Options": "nosniff",  # Prevent MIME sniffing
-            "X-Frame-Options": "SAMEORIGIN",  # Prevent embedding in frames from other domains
-        }
-
-        return FileResponse(
-            path=file_info,
-            filename=filename,
-            media_type=content_type,
-            headers=headers,
+            },
         )
 
     except HTTPException:
@@ -1645,6 +1601,9 @@ def get_file_details(
 async def check_paperless_sync_status(
     *,
     request: Request,
+    force: bool = Query(
+        False, description="Re-check every document, ignoring recent results"
+    ),
     db: Session = Depends(deps.get_db),
     current_user_id: int = Depends(deps.get_current_user_id),
     current_user_patient_id: int = Depends(deps.get_current_user_patient_id),
@@ -1664,7 +1623,7 @@ async def check_paperless_sync_status(
     )
     try:
         sync_status = await file_service.check_paperless_sync_status(
-            db, current_user_id
+            db, current_user_id, force=force
         )
 
         log_endpoint_access(
@@ -1696,6 +1655,9 @@ async def check_paperless_sync_status(
 async def check_papra_sync_status(
     *,
     request: Request,
+    force: bool = Query(
+        False, description="Re-check every document, ignoring recent results"
+    ),
     db: Session = Depends(deps.get_db),
     current_user_id: int = Depends(deps.get_current_user_id),
     current_user_patient_id: int = Depends(deps.get_current_user_patient_id),
@@ -1714,7 +1676,9 @@ async def check_papra_sync_status(
         message=f"Starting Papra sync check for user {current_user_id}",
     )
     try:
-        sync_status = await file_service.check_papra_sync_status(db, current_user_id)
+        sync_status = await file_service.check_papra_sync_status(
+            db, current_user_id, force=force
+        )
 
         log_endpoint_access(
             logger,
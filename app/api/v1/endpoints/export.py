@@ -13,6 +13,7 @@ from enum import Enum
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
 from sqlalchemy.orm import Session
 
@@ -22,7 +23,7 @@ from app.core.logging.constants import LogFields
 from app.core.logging.helpers import log_endpoint_access, log_endpoint_error
 from app.crud.user_preferences import user_preferences as user_preferences_crud
 from app.models.models import User
-from app.services.export_service import ExportService
+from app.services.export_service import STREAMED_EXPORT_SCOPES, ExportService
 from app.services.paperless_client import create_paperless_client
 from app.services.papra_client import create_papra_client
 
@@ -49,10 +50,21 @@ def json_serializer(obj):
 
 class ExportFormat(str, Enum):
     JSON = "json"
+    JSONL = "jsonl"
     CSV = "csv"
     PDF = "pdf"
 
 
+# Formats that can be written record by record
+STREAMABLE_FORMATS = {ExportFormat.JSON, ExportFormat.JSONL, ExportFormat.CSV}
+
+MEDIA_TYPES = {
+    ExportFormat.JSON: "application/json",
+    ExportFormat.JSONL: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
 class ExportScope(str, Enum):
     ALL = "all"
     ALLERGIES = "allergies"
@@ -118,13 +130,16 @@ async def export_patient_data(
     """
     Export patient medical data in the specified format.
 
-    - **format**: Output format (json, csv, pdf)
+    - **format**: Output format (json, jsonl, csv, pdf)
     - **scope**: What data to include (all, medications, lab_results, etc.)
     - **start_date**: Filter records from this date onwards
     - **end_date**: Filter records up to this date
     - **include_files**: Whether to include file attachments (PDF exports only)
     - **include_patient_info**: Whether to include patient information in export
-    - **unit_system**: Unit system for measurements (imperial or metric)"""
+    - **unit_system**: Unit system for measurements (imperial or metric)
+
+    JSON Lines exports, and JSON/CSV exports of unbounded scopes (all,
+    vitals), are streamed as they are read rather than built in memory."""
 
     try:
         log_endpoint_access(
@@ -143,6 +158,40 @@ async def export_patient_data(
         date_format_pref = (user_prefs and user_prefs.date_format) or "mdy"
 
         export_service = ExportService(db)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if format == ExportFormat.JSONL or (
+            format in STREAMABLE_FORMATS and scope.value in STREAMED_EXPORT_SCOPES
+        ):
+            # Validates the active patient before the response starts
+            chunks = export_service.stream_patient_data(
+                user_id=current_user_id,
+                format=format.value,
+                scope=scope.value,
+                start_date=start_date,
+                end_date=end_date,
+                include_patient_info=include_patient_info,
+                unit_system=unit_system,
+                language=language,
+                date_format=date_format_pref,
+            )
+            filename = f"medical_records_{scope.value}_{timestamp}.{format.value}"
+            log_endpoint_access(
+                logger,
+                request,
+                current_user_id,
+                "export_stream_started",
+                export_filename=filename,
+                format_type=format.value,
+                scope=scope.value,
+            )
+            # A sync iterator: Starlette pulls it from the threadpool, so the
+            # database reads don't block the event loop
+            return StreamingResponse(
+                (chunk.encode("utf-8") for chunk in chunks),
+                media_type=MEDIA_TYPES[format],
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
 
         # Generate the export
         export_data = await export_service.export_patient_data(
@@ -159,8 +208,6 @@ async def export_patient_data(
         )
 
         # Determine content type and filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
         if format == ExportFormat.JSON:
             media_type = "application/json"
             filename = f"medical_records_{scope.value}_{timestamp}.json"
@@ -504,6 +551,11 @@ async def get_supported_formats():
                 "label": "JSON",
                 "description": "Machine-readable structured data format",
             },
+            {
+                "value": "jsonl",
+                "label": "JSON Lines",
+                "description": "One JSON record per line, streamed for large exports",
+            },
             {
                 "value": "csv",
                 "label": "CSV",
@@ -642,6 +694,26 @@ async def create_bulk_export(
 
             for scope in request.scopes:
                 try:
+                    if request.format == ExportFormat.JSONL:
+                        # Written into the archive chunk by chunk
+                        chunks = export_service.stream_patient_data(
+                            user_id=current_user_id,
+                            format=request.format.value,
+                            scope=scope,
+                            start_date=request.start_date,
+                            end_date=request.end_date,
+                            include_patient_info=request.include_patient_info,
+                            unit_system=request.unit_system,
+                            language=language,
+                            date_format=date_format_pref,
+                        )
+                        filename = f"medical_records_{scope}_{timestamp}.jsonl"
+                        with zip_file.open(filename, "w") as entry:
+                            for chunk in chunks:
+                                entry.write(chunk.encode("utf-8"))
+                        exported_count += 1
+                        continue
+
                     # Export each scope
                     export_data = await export_service.export_patient_data(
                         user_id=current_user_id,
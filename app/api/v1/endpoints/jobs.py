@@ -0,0 +1,176 @@
+"""
+Background Job API Endpoints
+
+Submit exports, custom reports and backups to run in the background, poll
+their progress, cancel them, and download their results once finished.
+"""
+
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db
+from app.core.logging.config import get_logger
+from app.core.logging.helpers import log_endpoint_access, log_endpoint_error
+from app.models.jobs import BackgroundJob
+from app.models.models import User
+from app.schemas.jobs import JobCreate, JobListResponse, JobResponse
+from app.services.job_engine import STATUS_SUCCEEDED, JobEngine, JobQueueFull
+
+logger = get_logger(__name__, "app")
+
+router = APIRouter()
+
+
+def _get_owned_job(db: Session, job_id: int, user_id: int) -> BackgroundJob:
+    job = (
+        db.query(BackgroundJob)
+        .filter(BackgroundJob.id == job_id, BackgroundJob.user_id == user_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(
+    request: Request,
+    job_data: JobCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue an export, custom report or backup.
+
+    Returns immediately; poll GET /jobs/{id} for progress and download the
+    result from GET /jobs/{id}/download once the job has succeeded.
+    """
+    try:
+        job = JobEngine.get_instance().submit(
+            db, current_user, job_data.job_type.value, job_data.params
+        )
+        log_endpoint_access(
+            logger,
+            request,
+            current_user.id,
+            "background_job_submitted",
+            job_id=job.id,
+            job_type=job.job_type,
+        )
+        return JobResponse.model_validate(job)
+
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e)
+        )
+    except Exception as e:
+        log_endpoint_error(
+            logger,
+            request,
+            "Failed to submit background job",
+            e,
+            user_id=current_user.id,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to submit background job",
+        )
+
+
+@router.get("", response_model=JobListResponse)
+def list_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """List the current user's jobs, newest first."""
+    query = db.query(BackgroundJob).filter(BackgroundJob.user_id == current_user.id)
+    jobs = (
+        query.order_by(BackgroundJob.created_at.desc(), BackgroundJob.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return JobListResponse(
+        items=[JobResponse.model_validate(job) for job in jobs], total=query.count()
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a job's status and progress."""
+    return JobResponse.model_validate(_get_owned_job(db, job_id, current_user.id))
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(
+    request: Request,
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cancel a queued or running job. Finished jobs are returned unchanged."""
+    job = _get_owned_job(db, job_id, current_user.id)
+    job = JobEngine.get_instance().cancel(db, job)
+    log_endpoint_access(
+        logger,
+        request,
+        current_user.id,
+        "background_job_cancel_requested",
+        job_id=job.id,
+        job_status=job.status,
+    )
+    return JobResponse.model_validate(job)
+
+
+@router.get("/{job_id}/download")
+def download_job_result(
+    request: Request,
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Download the file a finished job produced."""
+    job = _get_owned_job(db, job_id, current_user.id)
+    if job.status != STATUS_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}; its result is not available",
+        )
+    if not job.artifact_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="This job did not produce a downloadable file",
+        )
+    if not Path(job.artifact_path).is_file():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE, detail="The job's result has expired"
+        )
+
+    log_endpoint_access(
+        logger,
+        request,
+        current_user.id,
+        "background_job_downloaded",
+        job_id=job.id,
+        job_type=job.job_type,
+    )
+    return FileResponse(
+        job.artifact_path,
+        media_type=job.artifact_media_type,
+        filename=job.artifact_filename,
+    )
@@ -88,6 +88,7 @@ from app.schemas.treatment import (
     TreatmentLabResultUpdate,
 )
 from app.services.generic_entity_file_service import GenericEntityFileService
+from app.services.upload_stream import UploadTooLargeError, spool_upload
 
 router = APIRouter()
 logger = get_logger(__name__, "app")
@@ -662,14 +663,6 @@ async def upload_lab_result_file(
             request=request,
         )
 
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise BusinessLogicException(
-            message=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB",
-            request=request,
-        )
-
     # Create upload directory if it doesn't exist with proper error handling
     ensure_directory_with_permissions(UPLOAD_DIRECTORY, "lab result file upload")
 
@@ -677,11 +670,18 @@ async def upload_lab_result_file(
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = UPLOAD_DIRECTORY / unique_filename
 
-    # Save file with proper error handling
+    # Stream the file to disk, checking its size as it arrives, then move it
+    # into place
+    upload = None
     with handle_database_errors(request=request):
         try:
-            with open(file_path, "wb") as buffer:
-                buffer.write(file_content)
+            upload = await spool_upload(file, MAX_FILE_SIZE, directory=UPLOAD_DIRECTORY)
+            await upload.commit(file_path)
+        except UploadTooLargeError:
+            raise BusinessLogicException(
+                message=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB",
+                request=request,
+            )
         except PermissionError as e:
             raise DatabaseException(
                 message=f"Permission denied writing file. This may be a Docker bind mount permission issue. Please ensure the container has write permissions to the upload directory: {str(e)}",
@@ -700,6 +700,9 @@ async def upload_lab_result_file(
                 request=request,
                 original_error=e,
             )
+        finally:
+            if upload is not None:
+                await upload.discard()
 
     # Create file entry in database
     file_create = LabResultFileCreate(
@@ -707,7 +710,7 @@ async def upload_lab_result_file(
         file_name=file.filename,
         file_path=str(file_path),
         file_type=file.content_type,
-        file_size=len(file_content),
+        file_size=upload.size,
         description=description,
         uploaded_at=datetime.utcnow(),
     )
@@ -1972,7 +1975,7 @@ async def parse_lab_pdf_with_ocr(
         # Hash filename to avoid logging PHI (filenames may contain patient names)
         import hashlib
 
-        from app.services.pdf_text_extraction_service import pdf_extraction_service
+        from app.services.pdf_extraction_engine import PDFExtractionEngine
 
         filename_hash = hashlib.sha256(file.filename.encode()).hexdigest()[:16]
 
@@ -1988,8 +1991,9 @@ async def parse_lab_pdf_with_ocr(
             file_size=len(file_bytes),
         )
 
-        result = pdf_extraction_service.extract_text(
-            pdf_bytes=file_bytes, filename=file.filename
+        # Extraction (and OCR) runs in the extraction pool, off the event loop
+        result = await PDFExtractionEngine.get_instance().extract(
+            file_bytes, filename=file.filename
         )
 
         # 5. Log activity for audit trail
@@ -2010,6 +2014,7 @@ async def parse_lab_pdf_with_ocr(
                 "char_count": result["char_count"],
                 "confidence": result["confidence"],
                 "success": result["error"] is None,
+                "cached": result.get("cached", False),
             },
             ip_address=request.client.host if request.client else None,
             user_agent=request.headers.get("user-agent"),
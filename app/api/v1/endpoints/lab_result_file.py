@@ -40,6 +40,7 @@ from app.schemas.lab_result_file import (
     LabResultFileResponse,
     LabResultFileUpdate,
 )
+from app.services.upload_stream import UploadTooLargeError, spool_upload
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -247,23 +248,6 @@ async def upload_file(
             detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        log_validation_error(
-            logger,
-            request,
-            f"File too large: {len(file_content)} bytes",
-            user_id=current_user_id,
-            lab_result_id=lab_result_id,
-            file_size=len(file_content),
-            max_size=MAX_FILE_SIZE,
-        )
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB",
-        )
-
     # Create upload directory if it doesn't exist
     upload_dir = get_upload_directory()
     os.makedirs(upload_dir, exist_ok=True)
@@ -272,10 +256,12 @@ async def upload_file(
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(upload_dir, unique_filename)
 
-    # Save file
+    # Stream the file to disk, checking its size as it arrives, then move it
+    # into place
+    upload = None
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
+        upload = await spool_upload(file, MAX_FILE_SIZE, directory=Path(upload_dir))
+        await upload.commit(Path(file_path))
 
         logger.info(
             f"File saved successfully: {unique_filename}",
@@ -285,10 +271,24 @@ async def upload_file(
                 LogFields.USER_ID: current_user_id,
                 LogFields.FILE: file_path,
                 "lab_result_id": lab_result_id,
-                "file_size": len(file_content),
+                "file_size": upload.size,
                 "file_name": file.filename,
+                "sha256": upload.sha256,
             },
         )
+    except UploadTooLargeError:
+        log_validation_error(
+            logger,
+            request,
+            f"File too large: over {MAX_FILE_SIZE} bytes",
+            user_id=current_user_id,
+            lab_result_id=lab_result_id,
+            max_size=MAX_FILE_SIZE,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB",
+        )
     except Exception as e:
         log_endpoint_error(
             logger,
@@ -303,6 +303,9 @@ async def upload_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error saving file: {str(e)}",
         )
+    finally:
+        if upload is not None:
+            await upload.discard()
 
     # Create file entry in database
     file_create = LabResultFileCreate(
@@ -310,7 +313,7 @@ async def upload_file(
         file_name=file.filename,
         file_path=file_path,
         file_type=file.content_type,
-        file_size=len(file_content),
+        file_size=upload.size,
         description=description,
         uploaded_at=datetime.utcnow(),
     )
@@ -333,7 +336,7 @@ async def upload_file(
         message=f"File uploaded successfully: {file.filename}",
         lab_result_id=lab_result_id,
         file_id=file_obj.id,
-        file_size=len(file_content),
+        file_size=upload.size,
     )
 
     return file_obj
@@ -37,7 +37,9 @@ logger = get_logger(__name__, "app")
 # generous enough for a real user onboarding multiple practitioners in one session.
 # Keyed on user_id rather than IP so users behind a shared NAT aren't limited
 # collectively.
-_create_limiter = SlidingWindowRateLimiter(max_requests=20, window_seconds=3600)
+_create_limiter = SlidingWindowRateLimiter(
+    max_requests=20, window_seconds=3600, scope="medical_specialty_create"
+)
 
 
 @router.get("/", response_model=List[MedicalSpecialtySummary])
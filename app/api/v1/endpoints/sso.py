@@ -41,6 +41,7 @@ sso_service = SSOService()
 _initiate_limiter = SlidingWindowRateLimiter(
     max_requests=settings.SSO_RATE_LIMIT_ATTEMPTS,
     window_seconds=settings.SSO_RATE_LIMIT_WINDOW_MINUTES * 60,
+    scope="sso_initiate",
 )
 
 
@@ -192,26 +192,20 @@ def batch_match_tests(
     NOTE: This endpoint is currently UNUSED by the frontend.
     The app uses testLibrary.ts static file for instant, synchronous matching.
     Keeping this endpoint for future use if we switch to database-based matching.
+
+    Names are resolved in memory by the standardized test index, with no
+    query per name.
     """
-    results = []
-
-    for test_name in request.test_names:
-        # Try exact match first
-        matched = standardized_test.get_test_by_name(db, test_name)
-
-        # If no exact match, try fuzzy search
-        if not matched:
-            search_results = standardized_test.search_tests(db, test_name, limit=1)
-            matched = search_results[0] if search_results else None
-
-        results.append(
-            BatchMatchResult(
-                test_name=test_name,
-                matched_test=(
-                    StandardizedTestResponse.from_orm(matched) if matched else None
-                ),
-            )
+    matches = standardized_test.match_tests(db, request.test_names)
+    results = [
+        BatchMatchResult(
+            test_name=test_name,
+            matched_test=(
+                StandardizedTestResponse.model_validate(matched) if matched else None
+            ),
         )
+        for test_name, matched in zip(request.test_names, matches)
+    ]
 
     log_data_access(
         logger,
@@ -38,7 +38,9 @@ security_logger = get_logger(__name__, "security")
 
 # Initialize rate limiter for log level endpoint
 # 60 requests per minute = 1 per second (reasonable for frontend usage)
-rate_limiter = SlidingWindowRateLimiter(max_requests=60, window_seconds=60)
+rate_limiter = SlidingWindowRateLimiter(
+    max_requests=60, window_seconds=60, scope="log_level"
+)
 
 
 @router.get("/log-level")
@@ -193,6 +193,12 @@ class Settings:  # App Info
     BACKUP_MAX_COUNT: int = int(
         os.getenv("BACKUP_MAX_COUNT", "50")
     )  # Warning threshold for too many backups
+    BACKUP_COMPRESSION: str = os.getenv(
+        "BACKUP_COMPRESSION", "auto"
+    )  # auto (store PDFs/images, deflate the rest) | deflate | store
+    BACKUP_COMPRESSION_LEVEL: int = int(
+        os.getenv("BACKUP_COMPRESSION_LEVEL", "6")
+    )  # zlib level 1 (fastest) - 9 (smallest) for deflated files
 
     # Trash directory settings
     _windows_uploads = _get_windows_path_helper("uploads")
@@ -205,6 +211,47 @@ class Settings:  # App Info
         os.getenv("TRASH_RETENTION_DAYS", "30")
     )  # Keep deleted files for 30 days
 
+    # Recently viewed Paperless/Papra documents (see app.services.file_delivery).
+    # Kept outside UPLOAD_DIR so backups don't include them. 0 disables.
+    REMOTE_DOCUMENT_CACHE_DIR: Path = Path(
+        os.getenv("REMOTE_DOCUMENT_CACHE_DIR", str(UPLOAD_DIR.parent / "cache"))
+    )
+    REMOTE_DOCUMENT_CACHE_MAX_MB: int = int(
+        os.getenv("REMOTE_DOCUMENT_CACHE_MAX_MB", "256")
+    )
+    # Lab PDF extraction results by PDF hash (see app.services.pdf_extraction_engine),
+    # also outside UPLOAD_DIR. 0 disables.
+    PDF_EXTRACTION_CACHE_DIR: Path = Path(
+        os.getenv(
+            "PDF_EXTRACTION_CACHE_DIR", str(UPLOAD_DIR.parent / "extraction_cache")
+        )
+    )
+    PDF_EXTRACTION_CACHE_MAX_MB: int = int(
+        os.getenv("PDF_EXTRACTION_CACHE_MAX_MB", "64")
+    )
+
+    # Patient access decision cache (see app.services.patient_access_cache).
+    # Per process; invalidated explicitly when shares or ownership change (in
+    # every worker under STATE_BACKEND=database), the TTL bounds staleness for
+    # anything that bypasses those hooks. 0 disables.
+    PATIENT_ACCESS_CACHE_TTL_SECONDS: int = int(
+        os.getenv("PATIENT_ACCESS_CACHE_TTL_SECONDS", "60")
+    )
+    PATIENT_ACCESS_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("PATIENT_ACCESS_CACHE_MAX_ENTRIES", "10000")
+    )
+
+    # Dashboard record-count cache (see app.services.dashboard_summary).
+    # Per process; invalidated when a counted record is written (in every worker
+    # under STATE_BACKEND=database), the TTL bounds staleness for bulk writes.
+    # 0 disables.
+    DASHBOARD_SUMMARY_CACHE_TTL_SECONDS: int = int(
+        os.getenv("DASHBOARD_SUMMARY_CACHE_TTL_SECONDS", "300")
+    )
+    DASHBOARD_SUMMARY_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("DASHBOARD_SUMMARY_CACHE_MAX_ENTRIES", "10000")
+    )
+
     # User Registration Control
     ALLOW_USER_REGISTRATION: bool = (
         os.getenv("ALLOW_USER_REGISTRATION", "True").lower() == "true"
@@ -281,6 +328,17 @@ class Settings:  # App Info
     )  # 100MB
     PAPRA_SALT: str = _derive_salt("papra")
 
+    # Paperless/Papra Sync Check Configuration
+    DOCUMENT_SYNC_TTL_SECONDS: int = int(
+        os.getenv("DOCUMENT_SYNC_TTL_SECONDS", "900")
+    )  # Documents confirmed this recently are not re-checked (0 = always check)
+    DOCUMENT_SYNC_CONCURRENCY: int = int(
+        os.getenv("DOCUMENT_SYNC_CONCURRENCY", "8")
+    )  # Parallel per-document existence requests
+    DOCUMENT_SYNC_PAGE_SIZE: int = int(
+        os.getenv("DOCUMENT_SYNC_PAGE_SIZE", "100")
+    )  # Paperless document IDs per bulk existence request
+
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_DIR: str = _get_windows_path_helper("logs") or os.getenv("LOG_DIR", "./logs")
@@ -326,6 +384,66 @@ class Settings:  # App Info
     )  # Minimum tests extracted to consider parsing successful
     OCR_FALLBACK_MAX_RETRIES: int = 1  # Prevent infinite loops (fixed at 1)
 
+    # PDF Extraction Configuration (lab result PDF parsing and OCR)
+    PDF_EXTRACTION_WORKERS: int = int(
+        os.getenv("PDF_EXTRACTION_WORKERS", str(min(2, os.cpu_count() or 1)))
+    )  # Worker processes extracting uploaded PDFs (0 = extract in a thread)
+    OCR_PAGE_WORKERS: int = int(
+        os.getenv("OCR_PAGE_WORKERS", "2")
+    )  # Pages of one PDF rasterized and OCR'd at once
+    OCR_MEMORY_LIMIT_MB: int = int(
+        os.getenv("OCR_MEMORY_LIMIT_MB", "256")
+    )  # Page images one document may hold at once; caps OCR_PAGE_WORKERS
+
+    # Shared State Configuration (SSO state, rate limits, scheduler leadership)
+    STATE_BACKEND: str = os.getenv(
+        "STATE_BACKEND", "memory"
+    ).lower()  # "memory" (one worker) or "database" (any number of workers)
+
+    # Background Job Configuration (exports, custom reports, backups)
+    JOB_WORKER_COUNT: int = int(
+        os.getenv("JOB_WORKER_COUNT", "2")
+    )  # Jobs run concurrently per process
+    JOB_POLL_INTERVAL_SECONDS: int = int(
+        os.getenv("JOB_POLL_INTERVAL_SECONDS", "5")
+    )  # Idle workers check for jobs queued by other processes
+    JOB_RETENTION_HOURS: int = int(
+        os.getenv("JOB_RETENTION_HOURS", "24")
+    )  # Finished jobs and their downloads are deleted after this
+    JOB_MAX_ACTIVE_PER_USER: int = int(
+        os.getenv("JOB_MAX_ACTIVE_PER_USER", "5")
+    )  # Queued + running jobs one user may have
+    # Finished jobs' downloads (exports hold PHI). Kept outside UPLOAD_DIR so
+    # backups don't include them and restores don't overwrite them.
+    JOB_ARTIFACT_DIR: Path = Path(
+        os.getenv("JOB_ARTIFACT_DIR", str(UPLOAD_DIR.parent / "job_artifacts"))
+    )
+
+    # Report Chart Rendering Configuration
+    CHART_RENDER_WORKERS: int = int(
+        os.getenv("CHART_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )  # Worker processes rendering trend charts (0 = render in a thread)
+    CHART_CACHE_MAX_MB: int = int(
+        os.getenv("CHART_CACHE_MAX_MB", "32")
+    )  # Rendered chart images kept for reuse by unchanged reports
+
+    # Activity Log Writer Configuration (batched audit-entry inserts)
+    ACTIVITY_LOG_SYNC: bool = (
+        os.getenv("ACTIVITY_LOG_SYNC", "false").lower() == "true"
+    )  # Write every entry inline in the request (no buffering)
+    ACTIVITY_LOG_BATCH_SIZE: int = int(
+        os.getenv("ACTIVITY_LOG_BATCH_SIZE", "200")
+    )  # Entries per multi-row INSERT
+    ACTIVITY_LOG_FLUSH_INTERVAL_MS: int = int(
+        os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL_MS", "500")
+    )  # Longest an entry waits for its batch to fill
+    ACTIVITY_LOG_MAX_QUEUE: int = int(
+        os.getenv("ACTIVITY_LOG_MAX_QUEUE", "10000")
+    )  # Buffered entries before requests wait for room
+    ACTIVITY_LOG_ENQUEUE_TIMEOUT_MS: int = int(
+        os.getenv("ACTIVITY_LOG_ENQUEUE_TIMEOUT_MS", "100")
+    )  # Wait for room in a full queue before writing inline
+
     # Notification Framework Configuration
     NOTIFICATIONS_ENABLED: bool = (
         os.getenv("NOTIFICATIONS_ENABLED", "True").lower() == "true"
@@ -336,6 +454,9 @@ class Settings:  # App Info
     NOTIFICATION_HISTORY_RETENTION_DAYS: int = int(
         os.getenv("NOTIFICATION_HISTORY_RETENTION_DAYS", "90")
     )  # How long to keep notification history (TODO: implement cleanup job)
+    NOTIFICATION_DELIVERY_WORKERS: int = int(
+        os.getenv("NOTIFICATION_DELIVERY_WORKERS", "8")
+    )  # Threads sending notifications (each send is a blocking network call)
     # NOTIFICATION_ENCRYPTION_SALT: Derived from SECRET_KEY by default, or set explicitly via env var.
     # Note: Rotating SECRET_KEY will invalidate existing channel configs (see property docstring).
 
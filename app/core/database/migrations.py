@@ -210,7 +210,71 @@ def run_startup_data_migrations():
             logger.error(f"Canonical test migration encountered an error: {str(e)}")
             # Non-fatal - continue with startup
 
-        # Ongoing sync (not one-time, unlike Migrations 1-2 above): keeps
+        # Migration 3: Build the search index for records that predate it (and
+        # rebuild it whenever its format version changes)
+        try:
+            from app.services import search_index
+
+            db = next(get_db())
+            try:
+                result = search_index.run_one_time_build(db)
+                if not result.get("skipped"):
+                    logger.info(
+                        "Search index build completed",
+                        extra={"indexed": result.get("indexed", 0)},
+                    )
+            finally:
+                db.close()
+
+        except Exception as e:
+            logger.error(f"Search index build encountered an error: {str(e)}")
+            # Non-fatal - search returns partial results until rebuilt
+
+        # Migration 4: Build the vitals rollups for readings that predate them
+        # (and rebuild them whenever their format version changes)
+        try:
+            from app.services import vitals_rollup
+
+            db = next(get_db())
+            try:
+                result = vitals_rollup.run_one_time_build(db)
+                if not result.get("skipped"):
+                    logger.info(
+                        "Vitals rollup build completed",
+                        extra={
+                            "patients": result.get("patients", 0),
+                            "rollups": result.get("rollups", 0),
+                        },
+                    )
+            finally:
+                db.close()
+
+        except Exception as e:
+            logger.error(f"Vitals rollup build encountered an error: {str(e)}")
+            # Non-fatal - stats and long-range charts are incomplete until rebuilt
+
+        # Migration 5: Fill entity_tags for records that predate it where the
+        # Alembic backfill didn't run (create_all databases), and verify it
+        # whenever its format version changes
+        try:
+            from app.services import entity_tags
+
+            db = next(get_db())
+            try:
+                result = entity_tags.run_one_time_build(db)
+                if not result.get("skipped"):
+                    logger.info(
+                        "Entity tags verification completed",
+                        extra={"repaired": result.get("repaired", 0)},
+                    )
+            finally:
+                db.close()
+
+        except Exception as e:
+            logger.error(f"Entity tags verification encountered an error: {str(e)}")
+            # Non-fatal - tag filters and stats miss unindexed records until repaired
+
+        # Ongoing sync (not one-time, unlike Migrations 1-5 above): keeps
         # standardized_vaccines in step with shared/data/vaccine_library.json
         # on every startup. sync_vaccine_library() logs its own structured
         # completion event, so nothing further to log here on success.
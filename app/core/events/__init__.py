@@ -14,6 +14,8 @@ from app.services.notification_templates import (
     backup_failed_template,
     invitation_accepted_template,
     invitation_received_template,
+    job_completed_template,
+    job_failed_template,
     medication_reminder_due_template,
     password_changed_template,
     share_revoked_template,
@@ -24,7 +26,7 @@ def register_all_events() -> None:
     """
     Register all notification event types with the event registry.
 
-    This function registers all 7 notification triggers with their metadata
+    This function registers all 9 notification triggers with their metadata
     and template functions. Should be called once during application startup.
     """
     registry = get_event_registry()
@@ -96,6 +98,25 @@ def register_all_events() -> None:
         is_implemented=True,
     )
 
+    # Background job events
+    registry.register(
+        event_type="job_completed",
+        label="Job Completed",
+        description="Notification when an export, report or backup job finishes",
+        category="system",
+        template_fn=job_completed_template,
+        is_implemented=True,
+    )
+
+    registry.register(
+        event_type="job_failed",
+        label="Job Failed",
+        description="Notification when an export, report or backup job fails",
+        category="system",
+        template_fn=job_failed_template,
+        is_implemented=True,
+    )
+
 
 def setup_event_system() -> EventBus:
     """
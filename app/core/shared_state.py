@@ -0,0 +1,408 @@
+"""
+Shared State Backend
+
+State that has to agree across server workers: SSO state tokens, rate-limit
+windows, the lease naming the worker that runs the schedulers, and the
+generations that broadcast invalidations of per-process caches (see
+SharedGeneration). STATE_BACKEND selects where it lives:
+
+- "memory" (default): process memory. SSO keeps its tokens in
+  ``sso_service._state_storage``, each SlidingWindowRateLimiter its own
+  deques, and every process leads its own schedulers. Correct for a single
+  worker only.
+- "database": the shared_state_entries, rate_limit_windows and
+  scheduler_leases tables in the application database. Every operation is a
+  short transaction of plain conditional statements, so SQLite and
+  PostgreSQL behave alike: an entry is consumed by the DELETE that removes
+  it, a rate-limit window is rewritten only if its version is unchanged
+  since it was read, and a lease is taken by an UPDATE that matches only
+  when the lease is ours or has lapsed. Cache generations are
+  shared_state_entries rows in the "cache_generation" namespace.
+
+docker/entrypoint.sh selects "database" whenever it starts more than one
+worker.
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.models.shared_state import RateLimitWindow, SchedulerLease, SharedStateEntry
+
+logger = get_logger(__name__, "app")
+
+GENERATION_NAMESPACE = "cache_generation"
+# Generations are never meant to expire; a swept one reads as changed
+GENERATION_TTL = timedelta(days=36500)
+
+# Optimistic rate-limit updates tried before a request is refused. Each lost
+# attempt means another worker's request was recorded, so this only runs out
+# under a flood on a single key.
+MAX_WINDOW_ATTEMPTS = 50
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, like the timestamps SSO stamps on its in-memory entries
+    return datetime.utcnow()
+
+
+def _live_hits(hits, now: float, window_seconds: int) -> List[float]:
+    cutoff = now - window_seconds
+    return sorted(hit for hit in hits or () if hit > cutoff)
+
+
+class MemoryStateBackend:
+    """
+    Process-local state for a single worker.
+
+    Entries and rate-limit windows stay in their owners' own structures (see
+    the module docstring); leases are always granted, since the only process
+    is the only candidate.
+    """
+
+    shared = False
+
+    def acquire_lease(self, name: str, holder: str, ttl_seconds: int) -> bool:
+        return True
+
+    def release_lease(self, name: str, holder: str) -> None:
+        return None
+
+
+class DatabaseStateBackend:
+    """State in database tables, shared by every worker on the database."""
+
+    shared = True
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        if session_factory is None:
+            from app.core.database.database import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self._last_window_sweep: Dict[str, float] = {}
+
+    # Entries
+
+    @staticmethod
+    def _entry(row: SharedStateEntry) -> Dict:
+        return {**row.value, "created_at": row.created_at, "expires_at": row.expires_at}
+
+    def put_entry(
+        self, namespace: str, key: str, payload: Dict, ttl: timedelta
+    ) -> Dict:
+        """Store ``payload`` under ``key`` for ``ttl``; returns the stamped entry."""
+        now = _utcnow()
+        # Round-trip through JSON so the stored value is exactly what is read back
+        value = json.loads(json.dumps(payload, default=str))
+        with self._session_factory() as db:
+            # Sweep on write, as the in-memory store does
+            db.query(SharedStateEntry).filter(
+                SharedStateEntry.expires_at <= now
+            ).delete(synchronize_session=False)
+            db.merge(
+                SharedStateEntry(
+                    namespace=namespace,
+                    key=key,
+                    value=value,
+                    created_at=now,
+                    expires_at=now + ttl,
+                )
+            )
+            db.commit()
+        return {**value, "created_at": now, "expires_at": now + ttl}
+
+    def get_entry(self, namespace: str, key: str) -> Optional[Dict]:
+        """The entry under ``key``, expired or not (callers check expires_at)."""
+        with self._session_factory() as db:
+            row = db.get(SharedStateEntry, (namespace, key))
+            return None if row is None else self._entry(row)
+
+    def take_entry(self, namespace: str, key: str) -> Optional[Dict]:
+        """
+        Remove and return the entry under ``key``. Of several workers taking
+        the same entry at once, exactly one gets it; the rest get None.
+        """
+        with self._session_factory() as db:
+            row = db.get(SharedStateEntry, (namespace, key))
+            if row is None:
+                return None
+            entry = self._entry(row)
+            taken = (
+                db.query(SharedStateEntry)
+                .filter(
+                    SharedStateEntry.namespace == namespace,
+                    SharedStateEntry.key == key,
+                )
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return entry if taken == 1 else None
+
+    def delete_entry(self, namespace: str, key: str) -> None:
+        with self._session_factory() as db:
+            db.query(SharedStateEntry).filter(
+                SharedStateEntry.namespace == namespace,
+                SharedStateEntry.key == key,
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    def clear_entries(self, namespace: str) -> None:
+        with self._session_factory() as db:
+            db.query(SharedStateEntry).filter(
+                SharedStateEntry.namespace == namespace
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    # Cache generations
+
+    def bump_generation(self, name: str) -> None:
+        """Record a new token for generation ``name``."""
+        payload = {"token": uuid.uuid4().hex}
+        try:
+            self.put_entry(GENERATION_NAMESPACE, name, payload, GENERATION_TTL)
+        except IntegrityError:
+            # Another worker created the row first; it exists to update now
+            self.put_entry(GENERATION_NAMESPACE, name, payload, GENERATION_TTL)
+
+    def generation(self, name: str) -> Optional[str]:
+        """The current token of generation ``name``, None if never bumped."""
+        entry = self.get_entry(GENERATION_NAMESPACE, name)
+        return None if entry is None else entry["token"]
+
+    # Rate limits
+
+    def _sweep_windows(self, scope: str, now: float, window_seconds: int) -> None:
+        """Drop a limiter's aged-out windows, at most once per window per process."""
+        if now - self._last_window_sweep.get(scope, 0.0) < window_seconds:
+            return
+        self._last_window_sweep[scope] = now
+        with self._session_factory() as db:
+            db.query(RateLimitWindow).filter(
+                RateLimitWindow.scope == scope, RateLimitWindow.expires_at <= now
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    def hit(self, scope: str, key: str, max_requests: int, window_seconds: int) -> bool:
+        """Record a request and return whether it is under the limit."""
+        self._sweep_windows(scope, time.time(), window_seconds)
+        for _ in range(MAX_WINDOW_ATTEMPTS):
+            with self._session_factory() as db:
+                now = time.time()
+                row = db.get(RateLimitWindow, (scope, key))
+                hits = _live_hits(row.hits if row else (), now, window_seconds)
+                if len(hits) >= max_requests:
+                    return False
+
+                hits.append(now)
+                values = {"hits": hits, "expires_at": now + window_seconds}
+                if row is None:
+                    db.add(RateLimitWindow(scope=scope, key=key, version=1, **values))
+                    try:
+                        db.commit()
+                        return True
+                    except IntegrityError:
+                        # Another worker recorded this key's first request
+                        db.rollback()
+                        continue
+
+                updated = (
+                    db.query(RateLimitWindow)
+                    .filter(
+                        RateLimitWindow.scope == scope,
+                        RateLimitWindow.key == key,
+                        RateLimitWindow.version == row.version,
+                    )
+                    .update(
+                        {**values, "version": row.version + 1},
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if updated == 1:
+                    return True
+                # Lost the race - another worker recorded a request; re-read
+
+        logger.warning(
+            "Rate limit window stayed contended, refusing request",
+            extra={
+                LogFields.CATEGORY: "security",
+                LogFields.EVENT: "rate_limit_window_contended",
+                "scope": scope,
+            },
+        )
+        return False
+
+    def window(self, scope: str, key: str, window_seconds: int) -> List[float]:
+        """Timestamps of ``key``'s requests still inside the window, oldest first."""
+        with self._session_factory() as db:
+            row = db.get(RateLimitWindow, (scope, key))
+            return _live_hits(row.hits if row else (), time.time(), window_seconds)
+
+    def clear_windows(self, scope: str) -> None:
+        with self._session_factory() as db:
+            db.query(RateLimitWindow).filter(RateLimitWindow.scope == scope).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        self._last_window_sweep.pop(scope, None)
+
+    # Leases
+
+    def acquire_lease(self, name: str, holder: str, ttl_seconds: int) -> bool:
+        """
+        Take or renew lease ``name`` for ``holder``. Returns whether
+        ``holder`` now holds it; False while another holder's lease is live.
+        """
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        with self._session_factory() as db:
+            taken = (
+                db.query(SchedulerLease)
+                .filter(
+                    SchedulerLease.name == name,
+                    or_(
+                        SchedulerLease.holder == holder,
+                        SchedulerLease.expires_at <= now,
+                    ),
+                )
+                .update(
+                    {
+                        "acquired_at": case(
+                            (
+                                SchedulerLease.holder == holder,
+                                SchedulerLease.acquired_at,
+                            ),
+                            else_=now,
+                        ),
+                        "holder": holder,
+                        "expires_at": expires_at,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if taken == 1:
+                return True
+            if db.get(SchedulerLease, name) is not None:
+                return False
+
+            db.add(
+                SchedulerLease(
+                    name=name, holder=holder, acquired_at=now, expires_at=expires_at
+                )
+            )
+            try:
+                db.commit()
+                return True
+            except IntegrityError:
+                # Another worker created the lease first
+                db.rollback()
+                return False
+
+    def release_lease(self, name: str, holder: str) -> None:
+        """Give up ``holder``'s lease so another worker can take it at once."""
+        with self._session_factory() as db:
+            db.query(SchedulerLease).filter(
+                SchedulerLease.name == name, SchedulerLease.holder == holder
+            ).delete(synchronize_session=False)
+            db.commit()
+
+
+class SharedGeneration:
+    """
+    Invalidation broadcast for a cache each worker keeps in its own memory.
+
+    A worker that invalidates its copy calls ``bump()``; before using its
+    copy, every worker calls ``changed()`` and drops the copy when it returns
+    True, i.e. when some worker bumped the generation since this one last
+    looked. Invalidations are coarse - any bump clears the whole cache in the
+    other workers - which suits caches that are invalidated far less often
+    than they are read.
+
+    With the memory backend there is one worker, which invalidates its own
+    cache directly, so both methods are no-ops.
+    """
+
+    _UNSEEN = object()
+
+    def __init__(self, name: str):
+        self.name = name
+        self._seen = self._UNSEEN
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        backend = get_state_backend()
+        if not backend.shared:
+            return
+        try:
+            backend.bump_generation(self.name)
+        except Exception as e:
+            logger.error(
+                "Could not broadcast cache invalidation",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "cache_generation_bump_failed",
+                    LogFields.ERROR: str(e),
+                    "generation": self.name,
+                },
+            )
+
+    def changed(self) -> bool:
+        """Whether the cache must be dropped. True on a worker's first check."""
+        backend = get_state_backend()
+        if not backend.shared:
+            return False
+        try:
+            current = backend.generation(self.name)
+        except Exception as e:
+            logger.warning(
+                "Could not read cache generation, dropping the cache",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "cache_generation_read_failed",
+                    LogFields.ERROR: str(e),
+                    "generation": self.name,
+                },
+            )
+            return True
+        with self._lock:
+            if current == self._seen:
+                return False
+            self._seen = current
+            return True
+
+
+_backend = None
+
+
+def get_state_backend():
+    """The process's state backend, chosen by STATE_BACKEND."""
+    global _backend
+    if _backend is None:
+        if settings.STATE_BACKEND == "database":
+            _backend = DatabaseStateBackend()
+        elif settings.STATE_BACKEND == "memory":
+            _backend = MemoryStateBackend()
+        else:
+            raise ValueError(
+                f"Invalid STATE_BACKEND {settings.STATE_BACKEND!r}: "
+                "use 'memory' or 'database'"
+            )
+    return _backend
+
+
+def set_state_backend(backend) -> None:
+    """Tests only — replace the backend (None re-reads STATE_BACKEND)."""
+    global _backend
+    _backend = backend
@@ -1,3 +1,4 @@
+import asyncio
 import os
 
 from app.core.config import settings
@@ -64,6 +65,16 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"Timezone configuration warning: {e}, using UTC fallback")
 
+    # Register report fonts and build the shared PDF styles now, so the first
+    # report after a restart doesn't pay for it
+    try:
+        from app.services.pdf_rendering_context import PDFRenderingContext
+
+        await asyncio.to_thread(PDFRenderingContext.get_instance().warmup)
+    except Exception as e:
+        logger.warning(f"Could not warm up PDF rendering resources: {e}")
+        # Non-fatal - resources are built on first report instead
+
     # Skip database operations if in test mode
     skip_migrations = os.getenv("SKIP_MIGRATIONS", "false").lower() == "true"
 
@@ -152,11 +163,44 @@ async def startup_event():
         logger.warning(f"Could not initialize standardized tests: {e}")
         # Non-fatal - app can still function without pre-loaded tests
 
+    # Build the standardized test search index
+    try:
+        from app.services.standardized_test_index import StandardizedTestIndex
+
+        db = SessionLocal()
+        try:
+            indexed = StandardizedTestIndex.get_instance().rebuild(db)
+            logger.info(f"Standardized test index built: {indexed} tests")
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"Could not build standardized test index: {e}")
+        # Non-fatal - the first search loads it
+
     # Initialize activity tracking
     # NOTE: Automatic activity tracking disabled to prevent double logging
     # Manual activity logging is used instead via app.api.activity_logging
     logger.info("Activity tracking initialization skipped (using manual logging)")
 
+    # Start the batched activity log writer
+    try:
+        from app.services.activity_log_writer import ActivityLogWriter
+
+        ActivityLogWriter.get_instance().start()
+    except Exception as e:
+        logger.warning(f"Could not start activity log writer: {e}")
+        # Non-fatal - activity entries are written inline instead
+
+    # Contend for scheduler leadership, so that with several workers only one
+    # runs the scheduled jobs below
+    try:
+        from app.services.scheduler_leadership import SchedulerLeadership
+
+        await SchedulerLeadership.get_instance().start()
+    except Exception as e:
+        logger.warning(f"Could not start scheduler leadership: {e}")
+        # Non-fatal - scheduled jobs check leadership each time they run
+
     # Initialize auto-backup scheduler
     try:
         from app.services.backup_scheduler_service import BackupSchedulerService
@@ -179,4 +223,13 @@ async def startup_event():
         logger.warning(f"Could not initialize medication reminder scheduler: {e}")
         # Non-fatal - app still functions without reminders
 
+    # Initialize background job workers
+    try:
+        from app.services.job_engine import JobEngine
+
+        await JobEngine.get_instance().start()
+    except Exception as e:
+        logger.warning(f"Could not initialize background job engine: {e}")
+        # Non-fatal - submitted jobs stay queued until the engine runs
+
     logger.info("Application startup completed")
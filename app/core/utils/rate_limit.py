@@ -5,8 +5,10 @@ in ``app.api.v1.endpoints.system`` (IP-keyed) and
 ``app.api.v1.endpoints.medical_specialty`` (user-keyed). The key is opaque to the
 limiter, so callers choose what they throttle on.
 
-Counters live in process memory: they are not shared between workers and do not
-survive a restart. That is adequate for abuse prevention, not for hard quotas.
+Counters live in process memory unless the limiter is given a ``scope`` and
+STATE_BACKEND is "database"; then they live in the rate_limit_windows table and
+are shared by every worker (see ``app.core.shared_state``). Either way they are
+for abuse prevention, not hard quotas.
 """
 
 import math
@@ -14,11 +16,12 @@ import threading
 import time
 from collections import deque
 from collections.abc import Hashable
-from typing import Deque, Dict, Optional
+from typing import Deque, Dict, List, Optional
 
 from fastapi import Request
 
 from app.core.logging.constants import sanitize_log_input
+from app.core.shared_state import get_state_backend
 
 
 class SlidingWindowRateLimiter:
@@ -35,6 +38,10 @@ class SlidingWindowRateLimiter:
     without the lock, two threads can pass the limit check before either records its
     request, and a sweep iterating the dict while another thread inserts raises
     ``RuntimeError: dictionary changed size during iteration``.
+
+    With a ``scope`` (the limiter's name in the shared table) and a shared state
+    backend, requests are recorded in the backend instead, so the limit holds
+    across workers. The in-memory fields below are then unused.
     """
 
     # Past this many tracked keys, a request sweeps stale keys rather than only its
@@ -44,15 +51,28 @@ class SlidingWindowRateLimiter:
     # never pays for the sweep.
     _SWEEP_THRESHOLD = 10000
 
-    def __init__(self, max_requests: int, window_seconds: int):
+    def __init__(
+        self, max_requests: int, window_seconds: int, scope: Optional[str] = None
+    ):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
+        self.scope = scope
         self._requests: Dict[Hashable, Deque[float]] = {}
         # Re-entrant so rate_limit_headers can call the public getters, which take
         # the lock themselves, without deadlocking.
         self._lock = threading.RLock()
         self._last_sweep = 0.0
 
+    def _shared_backend(self):
+        """The shared state backend, or None to count in this process."""
+        if self.scope is None:
+            return None
+        backend = get_state_backend()
+        return backend if backend.shared else None
+
+    def _shared_window(self, backend, key: Hashable) -> List[float]:
+        return backend.window(self.scope, str(key), self.window_seconds)
+
     def _prune(self, key: Hashable, now: float) -> Optional[Deque[float]]:
         """Drop timestamps outside the window; return the live deque or None.
 
@@ -96,6 +116,12 @@ class SlidingWindowRateLimiter:
 
     def is_allowed(self, key: Hashable) -> bool:
         """Record a request and return whether it is under the limit."""
+        backend = self._shared_backend()
+        if backend is not None:
+            return backend.hit(
+                self.scope, str(key), self.max_requests, self.window_seconds
+            )
+
         with self._lock:
             # Read the clock under the lock, not before it. A thread that stamps its
             # timestamp and then waits on the lock would append a value older than
@@ -118,6 +144,11 @@ class SlidingWindowRateLimiter:
 
     def get_remaining_requests(self, key: Hashable) -> int:
         """Requests still available to this key in the current window."""
+        backend = self._shared_backend()
+        if backend is not None:
+            used = len(self._shared_window(backend, key))
+            return max(0, self.max_requests - used)
+
         with self._lock:
             window = self._prune(key, time.time())
             used = len(window) if window else 0
@@ -128,6 +159,11 @@ class SlidingWindowRateLimiter:
 
         Returns now for a key with no live requests - there is nothing to wait for.
         """
+        backend = self._shared_backend()
+        if backend is not None:
+            window = self._shared_window(backend, key)
+            return window[0] + self.window_seconds if window else time.time()
+
         with self._lock:
             now = time.time()
             # Prune first: reading an unpruned window would report a reset time
@@ -144,6 +180,13 @@ class SlidingWindowRateLimiter:
         that would be rejected again. A key with no live requests returns 0, since
         there is no limit in force to wait out.
         """
+        backend = self._shared_backend()
+        if backend is not None:
+            window = self._shared_window(backend, key)
+            if not window:
+                return 0
+            return max(1, math.ceil(window[0] + self.window_seconds - time.time()))
+
         with self._lock:
             now = time.time()
             window = self._prune(key, now)
@@ -169,6 +212,10 @@ class SlidingWindowRateLimiter:
     def reset(self) -> None:
         """Discard all recorded requests. For tests - module-scope limiter state
         otherwise leaks between them."""
+        backend = self._shared_backend()
+        if backend is not None:
+            backend.clear_windows(self.scope)
+
         with self._lock:
             self._requests.clear()
             self._last_sweep = 0.0
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -409,6 +409,28 @@ class CRUDActivityLog(CRUDBase[ActivityLog, Dict[str, Any], Dict[str, Any]]):
         db.refresh(db_obj)
         return db_obj
 
+    def log_activities(self, db: Session, entries: List[Dict[str, Any]]) -> int:
+        """
+        Insert many activity entries in one multi-row INSERT and commit.
+
+        Unlike log_activity, no ORM objects are created or refreshed, so a
+        batch costs a single round trip regardless of its size.
+
+        Args:
+            db: Database session
+            entries: Column values per entry (action, entity_type, description,
+                timestamp, user_id, patient_id, entity_id, event_metadata,
+                ip_address, user_agent)
+
+        Returns:
+            Number of entries inserted
+        """
+        if not entries:
+            return 0
+        db.execute(insert(self.model), entries)
+        db.commit()
+        return len(entries)
+
 
 # Create the activity log CRUD instance
 activity_log = CRUDActivityLog(ActivityLog)
@@ -1,11 +1,27 @@
 from typing import List, Optional
 
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.services import entity_tags
+
 
 class TagFilterMixin:
-    """Mixin for CRUD classes that support tag filtering"""
+    """Mixin for CRUD classes that support tag filtering
+
+    Tag filters look records up in the normalized entity_tags index
+    (app.services.entity_tags) rather than scanning each record's JSON tags.
+    """
+
+    def _tag_filter(
+        self, tags: List[str], tag_match_all: bool, patient_id: Optional[int] = None
+    ):
+        """Criterion restricting self.model to records with the given tags"""
+        entity_type = entity_tags.entity_type_for(self.model)
+        return self.model.id.in_(
+            entity_tags.tagged_ids(
+                entity_type, tags, match_all=tag_match_all, patient_id=patient_id
+            )
+        )
 
     def get_by_tags(
         self,
@@ -20,16 +36,9 @@ class TagFilterMixin:
         if not tags:
             return []
 
-        query = db.query(self.model)
-
-        if tag_match_all:
-            # AND logic - result must have ALL specified tags
-            for tag in tags:
-                query = query.filter(self.model.tags.contains([tag]))
-        else:
-            # OR logic - result must have ANY of the specified tags
-            tag_conditions = [self.model.tags.contains([tag]) for tag in tags]
-            query = query.filter(or_(*tag_conditions))
+        # AND logic (tag_match_all) - result must have ALL specified tags;
+        # OR logic - result must have ANY of the specified tags
+        query = db.query(self.model).filter(self._tag_filter(tags, tag_match_all))
 
         return query.offset(skip).limit(limit).all()
 
@@ -53,13 +62,9 @@ class TagFilterMixin:
 
         # Tag filtering
         if tags:
-            if tag_match_all:
-                # AND logic - result must have ALL specified tags
-                for tag in tags:
-                    query = query.filter(self.model.tags.contains([tag]))
-            else:
-                # OR logic - result must have ANY of the specified tags
-                tag_conditions = [self.model.tags.contains([tag]) for tag in tags]
-                query = query.filter(or_(*tag_conditions))
+            # Narrow the index lookup to the patient when filtering by one
+            query = query.filter(
+                self._tag_filter(tags, tag_match_all, kwargs.get("patient_id"))
+            )
 
         return query.offset(skip).limit(limit).all()
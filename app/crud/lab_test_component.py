@@ -1,10 +1,15 @@
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.orm import Session, joinedload
 
 from app.crud.base import CRUDBase
 from app.models.models import LabTestComponent
+from app.services.lab_trend_keys import (
+    make_trend_key,
+    trend_key_prefix,
+    trend_name,
+)
 from app.schemas.lab_test_component import (
     LabTestComponentBulkCreate,
     LabTestComponentCreate,
@@ -26,6 +31,59 @@ def apply_unit_filter(query, unit_column, unit: Optional[str]):
     return query.filter(or_(unit_column.is_(None), func.trim(unit_column) == ""))
 
 
+def trend_series_criteria(
+    *,
+    patient_id: int,
+    test_name: str,
+    unit: Optional[str] = None,
+    date_from: Optional[Any] = None,
+    date_to: Optional[Any] = None,
+) -> List[Any]:
+    """Filter criteria selecting one patient's trend series.
+
+    Matches on the stored trend_key and effective_date, so the lookup is a
+    range scan of idx_lab_test_components_trend. Unit semantics are those of
+    apply_unit_filter.
+    """
+    criteria = [LabTestComponent.patient_id == patient_id]
+    if unit is None:
+        criteria.append(
+            LabTestComponent.trend_key.startswith(
+                trend_key_prefix(test_name), autoescape=True
+            )
+        )
+    else:
+        criteria.append(
+            LabTestComponent.trend_key == make_trend_key(trend_name(test_name), unit)
+        )
+    if date_from:
+        criteria.append(LabTestComponent.effective_date >= date_from)
+    if date_to:
+        criteria.append(LabTestComponent.effective_date <= date_to)
+    return criteria
+
+
+def trend_series_filter(
+    query,
+    *,
+    patient_id: int,
+    test_name: str,
+    unit: Optional[str] = None,
+    date_from: Optional[Any] = None,
+    date_to: Optional[Any] = None,
+):
+    """Scope a LabTestComponent query to one patient's trend series."""
+    return query.filter(
+        *trend_series_criteria(
+            patient_id=patient_id,
+            test_name=test_name,
+            unit=unit,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    )
+
+
 class CRUDLabTestComponent(
     CRUDBase[LabTestComponent, LabTestComponentCreate, LabTestComponentUpdate]
 ):
@@ -224,52 +282,17 @@ class CRUDLabTestComponent(
         - Non-empty string: case-insensitive, whitespace-trimmed match on unit.
         - Empty string: match rows where unit is NULL or empty after trimming.
 
-        Date filtering prefers lab_result.completed_date, falls back to created_at.
+        Date filtering prefers lab_result.completed_date, falls back to created_at
+        (the stored effective_date).
         """
-        from app.models.models import LabResult
-
-        query = (
-            db.query(self.model)
-            .join(self.model.lab_result)
-            .filter(
-                and_(
-                    self.model.lab_result.has(patient_id=patient_id),
-                    or_(
-                        and_(
-                            self.model.canonical_test_name.isnot(None),
-                            func.trim(self.model.canonical_test_name) != "",
-                            func.lower(func.trim(self.model.canonical_test_name))
-                            == func.lower(func.trim(test_name)),
-                        ),
-                        and_(
-                            or_(
-                                self.model.canonical_test_name.is_(None),
-                                func.trim(self.model.canonical_test_name) == "",
-                            ),
-                            func.lower(func.rtrim(self.model.test_name, ",;: "))
-                            == func.lower(test_name),
-                        ),
-                    ),
-                )
-            )
-        )
-
-        query = apply_unit_filter(query, self.model.unit, unit)
-
-        if date_from or date_to:
-            recorded_date_expr = func.coalesce(
-                LabResult.completed_date, func.date(self.model.created_at)
-            )
-            if date_from:
-                query = query.filter(recorded_date_expr >= date_from)
-            if date_to:
-                query = query.filter(recorded_date_expr <= date_to)
-
-        query = query.order_by(
-            func.coalesce(
-                LabResult.completed_date, func.date(self.model.created_at)
-            ).desc()
-        )
+        query = trend_series_filter(
+            db.query(self.model),
+            patient_id=patient_id,
+            test_name=test_name,
+            unit=unit,
+            date_from=date_from,
+            date_to=date_to,
+        ).order_by(self.model.effective_date.desc(), self.model.id.desc())
 
         if limit:
             query = query.limit(limit)
@@ -280,16 +303,11 @@ class CRUDLabTestComponent(
         self, db: Session, *, patient_id: int, limit: int = 2000
     ) -> List[LabTestComponent]:
         """Get all test components for a patient with parent lab result loaded."""
-        from app.models.labs import LabResult
-
         return (
             db.query(self.model)
-            .join(self.model.lab_result)
-            .filter(LabResult.patient_id == patient_id)
+            .filter(self.model.patient_id == patient_id)
             .options(joinedload(self.model.lab_result))
-            .order_by(
-                func.coalesce(LabResult.completed_date, func.date(self.model.created_at)).desc()
-            )
+            .order_by(self.model.effective_date.desc(), self.model.id.desc())
             .limit(limit)
             .all()
         )
@@ -384,51 +402,87 @@ class CRUDLabTestComponent(
         Build an aggregated catalog of unique test components across all lab results
         for a patient. Groups by normalized test name and returns the latest reading
         plus trend direction for each unique test.
-        """
-        from app.models.labs import LabResult
-        from app.utils.trend_statistics import compute_trend_direction
 
-        query = (
-            db.query(self.model)
-            .join(self.model.lab_result)
-            .filter(LabResult.patient_id == patient_id)
-            .options(joinedload(self.model.lab_result))
-        )
+        One statement: window functions rank each group's readings (by
+        effective_date) over the patient's trend index, a GROUP BY on
+        trend_key aggregates what the trend direction needs, and each group
+        is joined back to its latest component.
+        """
+        from app.schemas.lab_test_component import ComponentCatalogEntry
+        from app.utils.trend_statistics import trend_direction_from_sums
 
+        model = self.model
+        criteria = [model.patient_id == patient_id]
         if search:
             escaped_search = search.replace("%", r"\%").replace("_", r"\_")
-            query = query.filter(
+            criteria.append(
                 or_(
-                    self.model.test_name.ilike(f"%{escaped_search}%", escape="\\"),
-                    self.model.abbreviation.ilike(f"%{escaped_search}%", escape="\\"),
+                    model.test_name.ilike(f"%{escaped_search}%", escape="\\"),
+                    model.abbreviation.ilike(f"%{escaped_search}%", escape="\\"),
                 )
             )
-
         if category:
-            query = query.filter(self.model.category == category.lower())
-
-        # Order by completed_date desc so first item per group is the latest
-        query = query.order_by(
-            func.coalesce(
-                LabResult.completed_date,
-                func.date(self.model.created_at),
-            ).desc()
+            criteria.append(model.category == category.lower())
+
+        newest_first = (model.effective_date.desc(), model.id.desc())
+        readings = (
+            select(
+                model.id,
+                model.trend_key,
+                model.value,
+                model.status,
+                func.row_number()
+                .over(partition_by=model.trend_key, order_by=newest_first)
+                .label("recency"),
+                func.count().over(partition_by=model.trend_key).label("reading_count"),
+                # Chronological position among the group's numeric values,
+                # the regression's x
+                (
+                    func.count(model.value).over(
+                        partition_by=model.trend_key,
+                        order_by=(model.effective_date, model.id),
+                        rows=(None, 0),
+                    )
+                    - 1
+                ).label("position"),
+            )
+            .where(*criteria)
+            .subquery()
         )
 
-        components = query.all()
-
-        groups: Dict[tuple, list] = {}
-        for comp in components:
-            name_key = (
-                comp.canonical_test_name.lower()
-                if comp.canonical_test_name
-                else comp.test_name.strip().rstrip(",;: ").lower()
+        # Qualitative trend compares the abnormal rate of the newer half of
+        # the readings (recency <= count // 2) with the older half
+        not_normal = or_(readings.c.status.is_(None), readings.c.status != "normal")
+        newer_half = readings.c.recency * 2 <= readings.c.reading_count
+        groups = (
+            select(
+                func.max(case((readings.c.recency == 1, readings.c.id))).label(
+                    "latest_id"
+                ),
+                func.max(readings.c.reading_count).label("reading_count"),
+                func.count(readings.c.value).label("value_count"),
+                func.sum(readings.c.value).label("value_sum"),
+                func.sum(readings.c.position * readings.c.value).label(
+                    "position_value_sum"
+                ),
+                func.min(readings.c.value).label("value_min"),
+                func.max(readings.c.value).label("value_max"),
+                func.sum(case((and_(newer_half, not_normal), 1), else_=0)).label(
+                    "newer_abnormal"
+                ),
+                func.sum(case((and_(~newer_half, not_normal), 1), else_=0)).label(
+                    "older_abnormal"
+                ),
             )
-            unit_key = (comp.unit or "").strip().lower()
-            groups.setdefault((name_key, unit_key), []).append(comp)
+            .group_by(readings.c.trend_key)
+            .subquery()
+        )
 
-        # Build catalog entries
-        from app.schemas.lab_test_component import ComponentCatalogEntry
+        rows = db.execute(
+            select(model, groups)
+            .join(groups, model.id == groups.c.latest_id)
+            .options(joinedload(model.lab_result))
+        ).all()
 
         STATUS_SORT_ORDER = {
             "critical": 0,
@@ -440,31 +494,31 @@ class CRUDLabTestComponent(
         }
 
         entries: List[ComponentCatalogEntry] = []
-        for _key, group in groups.items():
-            latest = group[0]
+        for row in rows:
+            latest = row[0]
             latest_date = None
             if latest.lab_result and latest.lab_result.completed_date:
                 latest_date = str(latest.lab_result.completed_date)
             elif latest.created_at:
                 latest_date = str(latest.created_at.date())
 
-            # Compute trend from values (most-recent first -> reverse for chronological)
             result_type = latest.result_type or "quantitative"
             trend = "stable"
             if result_type == "quantitative":
-                values = [c.value for c in group if c.value is not None]
-                if len(values) >= 3:
-                    trend = compute_trend_direction(list(reversed(values)))
+                if row.value_count >= 3:
+                    trend = trend_direction_from_sums(
+                        row.value_count,
+                        row.value_sum,
+                        row.position_value_sum,
+                        row.value_min,
+                        row.value_max,
+                    )
             else:
                 # Qualitative trend based on abnormal rate shift
-                if len(group) >= 4:
-                    mid = len(group) // 2
-                    recent_abnormal = sum(
-                        1 for c in group[:mid] if c.status != "normal"
-                    )
-                    older_abnormal = sum(1 for c in group[mid:] if c.status != "normal")
-                    recent_rate = recent_abnormal / mid
-                    older_rate = older_abnormal / (len(group) - mid)
+                if row.reading_count >= 4:
+                    mid = row.reading_count // 2
+                    recent_rate = row.newer_abnormal / mid
+                    older_rate = row.older_abnormal / (row.reading_count - mid)
                     if recent_rate > older_rate + 0.15:
                         trend = "worsening"
                     elif recent_rate < older_rate - 0.15:
@@ -472,7 +526,7 @@ class CRUDLabTestComponent(
 
             # Use canonical_test_name for trend matching when available,
             # mirroring the exclusive matching logic in get_by_patient_and_test_name
-            trend_name = (
+            trend_test_name = (
                 latest.canonical_test_name
                 if latest.canonical_test_name
                 else latest.test_name.strip().rstrip(",;: ")
@@ -480,7 +534,7 @@ class CRUDLabTestComponent(
 
             entry = ComponentCatalogEntry(
                 test_name=latest.test_name.strip(),
-                trend_test_name=trend_name,
+                trend_test_name=trend_test_name,
                 abbreviation=latest.abbreviation,
                 latest_value=latest.value,
                 latest_qualitative_value=latest.qualitative_value,
@@ -488,7 +542,7 @@ class CRUDLabTestComponent(
                 status=latest.status,
                 category=latest.category,
                 result_type=result_type,
-                reading_count=len(group),
+                reading_count=row.reading_count,
                 trend_direction=trend,
                 latest_date=latest_date,
                 ref_range_min=latest.ref_range_min,
@@ -6,6 +6,7 @@ from app.crud.base import CRUDBase
 from app.crud.base_tags import TagFilterMixin
 from app.models.models import Medication
 from app.schemas.medication import MedicationCreate, MedicationUpdate
+from app.services import medication_reminder_index  # noqa: F401 — index listeners
 
 
 class CRUDMedication(
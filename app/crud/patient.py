@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.models import Patient
 from app.schemas.patient import PatientCreate, PatientUpdate
+from app.services import dashboard_summary  # noqa: F401 — summary invalidation
 
 
 class CRUDPatient(CRUDBase[Patient, PatientCreate, PatientUpdate]):
@@ -4,13 +4,13 @@ CRUD operations for standardized tests
 
 from typing import List, Optional
 
-from sqlalchemy import and_, case, func, or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.logging.config import get_logger
 from app.core.logging.constants import LogFields
-from app.crud._search_helpers import json_array_text_contains
 from app.models.models import StandardizedTest
+from app.services.standardized_test_index import IndexedTest, StandardizedTestIndex
 
 logger = get_logger(__name__, "app")
 
@@ -40,136 +40,30 @@ def get_test_by_name(db: Session, test_name: str) -> Optional[StandardizedTest]:
 
 def search_tests(
     db: Session, query: str, category: Optional[str] = None, limit: int = 200
-) -> List[StandardizedTest]:
+) -> List[IndexedTest]:
     """
-    Search for standardized tests using full-text search and fuzzy matching.
+    Search for standardized tests by name, short name, LOINC code and common
+    names, served from the in-memory StandardizedTestIndex.
 
     Args:
-        db: Database session
+        db: Database session (used to load the index when it is stale)
         query: Search query
         category: Optional category filter
         limit: Maximum number of results
 
     Returns:
-        List of matching tests, ordered by relevance
+        List of matching tests, ordered by relevance; the common tests in
+        display order when the query is empty
     """
-    if not query or not query.strip():
-        # Return common tests if no query
-        q = db.query(StandardizedTest).filter(StandardizedTest.is_common.is_(True))
-        if category:
-            q = q.filter(StandardizedTest.category == category)
-        return q.order_by(StandardizedTest.display_order).limit(limit).all()
-
-    search_term = query.strip().lower()
-
-    # Build query with multiple search strategies
-    q = db.query(StandardizedTest)
-
-    # Filter by category if specified
-    if category:
-        q = q.filter(StandardizedTest.category == category)
-
-    # Search conditions (ordered by relevance)
-    conditions = []
-
-    # 1. Exact match on test name, short name, or LOINC code (highest priority)
-    conditions.append(func.lower(StandardizedTest.test_name) == search_term)
-    conditions.append(func.lower(StandardizedTest.short_name) == search_term)
-    conditions.append(func.lower(StandardizedTest.loinc_code) == search_term)
-
-    # 2. Search in common_names JSON array (cross-database compatible)
-    conditions.append(
-        json_array_text_contains(StandardizedTest.common_names, search_term)
-    )
-
-    # 3. Starts with query (with LIKE escaping)
-    conditions.append(
-        func.lower(StandardizedTest.test_name).startswith(search_term, autoescape=True)
-    )
-    conditions.append(
-        func.lower(StandardizedTest.short_name).startswith(search_term, autoescape=True)
-    )
-    conditions.append(
-        func.lower(StandardizedTest.loinc_code).startswith(search_term, autoescape=True)
-    )
-
-    # 4. Contains query (with LIKE escaping for literal matching)
-    conditions.append(
-        func.lower(StandardizedTest.test_name).contains(search_term, autoescape=True)
-    )
-    conditions.append(
-        func.lower(StandardizedTest.short_name).contains(search_term, autoescape=True)
-    )
-    conditions.append(
-        func.lower(StandardizedTest.loinc_code).contains(search_term, autoescape=True)
-    )
-
-    # 5. Word-based matching for multi-word queries (cross-database compatible)
-    # Split search term and check if all words are present (with LIKE escaping)
-    if " " in search_term:
-        words = search_term.split()
-        word_conditions = []
-        for word in words:
-            word_conditions.append(
-                or_(
-                    func.lower(StandardizedTest.test_name).contains(
-                        word, autoescape=True
-                    ),
-                    func.lower(StandardizedTest.short_name).contains(
-                        word, autoescape=True
-                    ),
-                )
-            )
-        if word_conditions:
-            conditions.append(and_(*word_conditions))
-
-    # Combine conditions with OR
-    q = q.filter(or_(*conditions))
-
-    # Order by relevance: exact matches first, then partial matches
-    # Using CASE to create a relevance score (dialect-aware)
-    relevance_score = case(
-        # Highest priority: exact match on test_name, short_name, or loinc_code
-        (func.lower(StandardizedTest.test_name) == search_term, 1),
-        (func.lower(StandardizedTest.short_name) == search_term, 1),
-        (func.lower(StandardizedTest.loinc_code) == search_term, 1),
-        # High priority: exact match in common_names JSON array (dialect-aware)
-        (
-            json_array_text_contains(
-                StandardizedTest.common_names, search_term
-            ),
-            2,
-        ),
-        # Medium priority: starts with query
-        (
-            func.lower(StandardizedTest.test_name).startswith(
-                search_term, autoescape=True
-            ),
-            3,
-        ),
-        (
-            func.lower(StandardizedTest.short_name).startswith(
-                search_term, autoescape=True
-            ),
-            3,
-        ),
-        (
-            func.lower(StandardizedTest.loinc_code).startswith(
-                search_term, autoescape=True
-            ),
-            3,
-        ),
-        # Low priority: contains query or word-based match
-        else_=4,
-    )
+    return StandardizedTestIndex.get_instance().search(db, query, category, limit)
 
-    q = q.order_by(
-        relevance_score.asc(),  # Lower score = higher relevance
-        StandardizedTest.is_common.desc(),
-        StandardizedTest.test_name,
-    )
 
-    return q.limit(limit).all()
+def match_tests(db: Session, test_names: List[str]) -> List[Optional[IndexedTest]]:
+    """
+    Best match for each name (exact test name first, then the top search
+    result), resolved in memory without a query per name.
+    """
+    return StandardizedTestIndex.get_instance().match(db, test_names)
 
 
 def get_autocomplete_options(
@@ -249,6 +143,8 @@ def bulk_create_tests(db: Session, tests_data: List[dict]) -> int:
     tests = [StandardizedTest(**data) for data in tests_data]
     db.bulk_save_objects(tests)
     db.commit()
+    # bulk_save_objects skips the mapper events that keep the index current
+    StandardizedTestIndex.get_instance().invalidate()
 
     logger.info(
         f"Bulk created {len(tests)} standardized tests",
@@ -322,6 +218,7 @@ def clear_all_tests(db: Session) -> int:
     count = db.query(StandardizedTest).count()
     db.query(StandardizedTest).delete()
     db.commit()
+    StandardizedTestIndex.get_instance().invalidate()
     logger.warning(
         f"Cleared all {count} standardized tests from database",
         extra={
@@ -1,12 +1,14 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Set, Tuple
 
-from sqlalchemy import asc, desc, func
+from sqlalchemy import asc, desc, func, select
 from sqlalchemy.orm import Query, Session, joinedload
 
 from app.crud.base import CRUDBase
+from app.models import clinical
 from app.models.models import Vitals
 from app.schemas.vitals import VitalsCreate, VitalsUpdate
+from app.services import search_index, vitals_rollup
 
 # Valid vital types for filtering
 VALID_VITAL_TYPES = {
@@ -19,15 +21,13 @@ VALID_VITAL_TYPES = {
     "a1c",
 }
 
-# Mapping of vital type to the column(s) that must be non-null
+# Mapping of vital type to the column(s) that must be non-null; the same
+# columns bound each type's partial index (app.models.clinical)
 VITAL_TYPE_COLUMNS = {
-    "blood_pressure": [Vitals.systolic_bp, Vitals.diastolic_bp],
-    "heart_rate": [Vitals.heart_rate],
-    "temperature": [Vitals.temperature],
-    "weight": [Vitals.weight],
-    "oxygen_saturation": [Vitals.oxygen_saturation],
-    "blood_glucose": [Vitals.blood_glucose],
-    "a1c": [Vitals.a1c],
+    vital_type: [
+        getattr(Vitals, name) for name in clinical.VITAL_TYPE_COLUMNS[vital_type]
+    ]
+    for vital_type in VALID_VITAL_TYPES
 }
 
 
@@ -189,13 +189,19 @@ class CRUDVitals(CRUDBase[Vitals, VitalsCreate, VitalsUpdate]):
         )
 
     def get_vitals_stats(self, db: Session, *, patient_id: int) -> dict:
-        """Get statistics for a patient's vitals"""
-        # Get basic count and date info
-        total_readings = (
-            db.query(Vitals).filter(Vitals.patient_id == patient_id).count() or 0
+        """Get statistics for a patient's vitals.
+
+        Count and latest date come from one aggregate over the
+        (patient_id, recorded_date) index; everything else is read from the
+        monthly vitals rollups rather than the raw readings.
+        """
+        total_readings, latest_date = (
+            db.query(func.count(Vitals.id), func.max(Vitals.recorded_date))
+            .filter(Vitals.patient_id == patient_id)
+            .one()
         )
 
-        if total_readings == 0:
+        if not total_readings:
             return {
                 "total_readings": 0,
                 "latest_reading_date": None,
@@ -211,127 +217,44 @@ class CRUDVitals(CRUDBase[Vitals, VitalsCreate, VitalsUpdate]):
                 "current_a1c": None,
             }
 
-        # Get latest reading date
-        latest_date = (
-            db.query(func.max(Vitals.recorded_date))
-            .filter(Vitals.patient_id == patient_id)
-            .scalar()
-        )
+        summaries = vitals_rollup.summarize(db, patient_id=patient_id)
 
-        # Get current weight and BMI (from latest reading with weight data)
-        latest_weight_reading = (
-            db.query(self.model)
-            .filter(Vitals.patient_id == patient_id, Vitals.weight.isnot(None))
-            .order_by(desc(Vitals.recorded_date))
-            .first()
-        )
-        current_weight = latest_weight_reading.weight if latest_weight_reading else None
+        def latest(series: str):
+            summary = summaries.get(series)
+            return summary.last_value if summary else None
 
-        # Get latest BMI (from latest reading with BMI data, or calculate from weight/height)
-        latest_bmi_reading = (
-            db.query(self.model)
-            .filter(Vitals.patient_id == patient_id, Vitals.bmi.isnot(None))
-            .order_by(desc(Vitals.recorded_date))
-            .first()
-        )
-        current_bmi = latest_bmi_reading.bmi if latest_bmi_reading else None
+        def average(series: str):
+            summary = summaries.get(series)
+            return summary.mean if summary else None
+
+        current_weight = latest("weight")
+        current_bmi = latest("bmi")
 
         # If no stored BMI, try to calculate from latest weight and height
-        if (
-            current_bmi is None
-            and latest_weight_reading
-            and latest_weight_reading.weight
-        ):
-            latest_height_reading = (
-                db.query(self.model)
-                .filter(Vitals.patient_id == patient_id, Vitals.height.isnot(None))
-                .order_by(desc(Vitals.recorded_date))
-                .first()
-            )
-            if latest_height_reading and latest_height_reading.height:
+        if current_bmi is None and current_weight:
+            height = latest("height")
+            if height:
                 try:
-                    # Validate reasonable medical ranges before calculation
-                    weight = latest_weight_reading.weight
-                    height = latest_height_reading.height
-
                     # Reasonable medical ranges: weight 50-1000 lbs, height 24-96 inches
-                    if 50 <= weight <= 1000 and 24 <= height <= 96:
-                        current_bmi = self.calculate_bmi(weight, height)
-                    else:
-                        current_bmi = None
+                    if 50 <= current_weight <= 1000 and 24 <= height <= 96:
+                        current_bmi = self.calculate_bmi(current_weight, height)
                 except (ValueError, TypeError, ZeroDivisionError):
                     current_bmi = None
 
-        # Get latest temperature (from latest reading with temperature data)
-        latest_temperature_reading = (
-            db.query(self.model)
-            .filter(Vitals.patient_id == patient_id, Vitals.temperature.isnot(None))
-            .order_by(desc(Vitals.recorded_date))
-            .first()
-        )
-        current_temperature = (
-            latest_temperature_reading.temperature
-            if latest_temperature_reading
-            else None
-        )
-
-        # Calculate averages
-        systolic_avg = (
-            db.query(func.avg(Vitals.systolic_bp))
-            .filter(Vitals.patient_id == patient_id, Vitals.systolic_bp.isnot(None))
-            .scalar()
-        )
+        current_temperature = latest("temperature")
 
-        diastolic_avg = (
-            db.query(func.avg(Vitals.diastolic_bp))
-            .filter(Vitals.patient_id == patient_id, Vitals.diastolic_bp.isnot(None))
-            .scalar()
-        )
-
-        heart_rate_avg = (
-            db.query(func.avg(Vitals.heart_rate))
-            .filter(Vitals.patient_id == patient_id, Vitals.heart_rate.isnot(None))
-            .scalar()
-        )
-        temperature_avg = (
-            db.query(func.avg(Vitals.temperature))
-            .filter(Vitals.patient_id == patient_id, Vitals.temperature.isnot(None))
-            .scalar()
-        )
+        systolic_avg = average("systolic_bp")
+        diastolic_avg = average("diastolic_bp")
+        heart_rate_avg = average("heart_rate")
+        temperature_avg = average("temperature")
 
         # Calculate weight change (latest weight vs first weight)
         weight_change = None
         if current_weight is not None:
-            first_weight_reading = (
-                db.query(self.model)
-                .filter(Vitals.patient_id == patient_id, Vitals.weight.isnot(None))
-                .order_by(asc(Vitals.recorded_date))
-                .first()
-            )
-            if first_weight_reading and first_weight_reading.weight is not None:
-                weight_change = current_weight - first_weight_reading.weight
+            weight_change = current_weight - summaries["weight"].first_value
 
-        # Get latest blood glucose (from latest reading with blood_glucose data)
-        latest_blood_glucose_reading = (
-            db.query(self.model)
-            .filter(Vitals.patient_id == patient_id, Vitals.blood_glucose.isnot(None))
-            .order_by(desc(Vitals.recorded_date))
-            .first()
-        )
-        current_blood_glucose = (
-            latest_blood_glucose_reading.blood_glucose
-            if latest_blood_glucose_reading
-            else None
-        )
-
-        # Get latest A1C (from latest reading with a1c data)
-        latest_a1c_reading = (
-            db.query(self.model)
-            .filter(Vitals.patient_id == patient_id, Vitals.a1c.isnot(None))
-            .order_by(desc(Vitals.recorded_date))
-            .first()
-        )
-        current_a1c = latest_a1c_reading.a1c if latest_a1c_reading else None
+        current_blood_glucose = latest("blood_glucose")
+        current_a1c = latest("a1c")
 
         # Helper function to safely round values
         def safe_round(value, digits=1):
@@ -479,10 +402,17 @@ class CRUDVitals(CRUDBase[Vitals, VitalsCreate, VitalsUpdate]):
         inserted = 0
         for i in range(0, len(objects), batch_size):
             batch = objects[i : i + batch_size]
-            db.bulk_save_objects(batch)
+            # bulk_save_objects skips mapper events, so index the batch here;
+            # return_defaults populates the IDs the index rows key on
+            db.bulk_save_objects(batch, return_defaults=True)
+            search_index.index_records(db, batch)
             db.flush()
             inserted += len(batch)
 
+        # Same for rollups: one recompute per imported day, after all batches
+        vitals_rollup.refresh_days(
+            db, patient_id, (obj.recorded_date for obj in objects)
+        )
         db.commit()
         return inserted
 
@@ -506,17 +436,18 @@ class CRUDVitals(CRUDBase[Vitals, VitalsCreate, VitalsUpdate]):
         """
         date_start = datetime.strptime(date_str, "%Y-%m-%d")
         date_end = date_start + timedelta(days=1)
-
-        count = (
-            db.query(Vitals)
-            .filter(
-                Vitals.patient_id == patient_id,
-                Vitals.import_source == import_source,
-                Vitals.recorded_date >= date_start,
-                Vitals.recorded_date < date_end,
-            )
-            .delete(synchronize_session="fetch")
+        criteria = (
+            Vitals.patient_id == patient_id,
+            Vitals.import_source == import_source,
+            Vitals.recorded_date >= date_start,
+            Vitals.recorded_date < date_end,
         )
+
+        # Query.delete bypasses mapper events; update the index and rollups
+        # explicitly
+        search_index.remove_records(db, "vitals", select(Vitals.id).where(*criteria))
+        count = db.query(Vitals).filter(*criteria).delete(synchronize_session="fetch")
+        vitals_rollup.refresh_days(db, patient_id, [date_start])
         db.commit()
         return count
 
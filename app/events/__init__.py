@@ -10,6 +10,7 @@ Event Categories:
     - Collaboration Events: Invitation and sharing events
     - Security Events: Password changes and security-related events
     - Medical Events: Medication reminders and other clinical triggers
+    - Job Events: Background job completion and failure events
 
 All events inherit from DomainEvent and include:
     - event_id: Unique identifier for the event
@@ -23,6 +24,7 @@ from app.events.collaboration_events import (
     InvitationReceivedEvent,
     ShareRevokedEvent,
 )
+from app.events.job_events import JobCompletedEvent, JobFailedEvent
 from app.events.medication_events import MedicationReminderDueEvent
 from app.events.security_events import PasswordChangedEvent
 
@@ -38,4 +40,7 @@ __all__ = [
     "PasswordChangedEvent",
     # Medical Events
     "MedicationReminderDueEvent",
+    # Job Events
+    "JobCompletedEvent",
+    "JobFailedEvent",
 ]
@@ -0,0 +1,45 @@
+"""
+Background job domain events.
+
+Events triggered by the job engine when a submitted export, report or backup
+job finishes, so the submitter can be notified instead of polling.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.events.base import DomainEvent
+
+
+@dataclass(frozen=True)
+class JobCompletedEvent(DomainEvent):
+    """
+    Event triggered when a background job finishes successfully.
+
+    ``user_id`` (inherited from DomainEvent) is the user who submitted the job.
+
+    Attributes:
+        job_id: ID of the finished job
+        job_type: Kind of job (e.g. "export", "custom_report", "backup")
+        artifact_filename: Name of the downloadable result, if the job made one
+    """
+
+    job_id: int = 0
+    job_type: str = ""
+    artifact_filename: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class JobFailedEvent(DomainEvent):
+    """
+    Event triggered when a background job fails.
+
+    Attributes:
+        job_id: ID of the failed job
+        job_type: Kind of job that was attempted
+        error: Error message describing the failure
+    """
+
+    job_id: int = 0
+    job_type: str = ""
+    error: str = ""
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -49,6 +50,52 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Error shutting down medication reminder scheduler: {e}")
 
+        try:
+            from app.services.scheduler_leadership import SchedulerLeadership
+
+            # After the schedulers stop, so another worker can take over now
+            await SchedulerLeadership.get_instance().stop()
+        except Exception as e:
+            logger.warning(f"Error releasing scheduler leadership: {e}")
+
+        try:
+            from app.services.job_engine import JobEngine
+
+            await JobEngine.get_instance().shutdown()
+        except Exception as e:
+            logger.warning(f"Error shutting down background job engine: {e}")
+
+        try:
+            from app.services.chart_render_pool import ChartRenderPool
+
+            await asyncio.to_thread(ChartRenderPool.get_instance().shutdown)
+        except Exception as e:
+            logger.warning(f"Error shutting down chart render pool: {e}")
+
+        try:
+            from app.services.pdf_extraction_engine import PDFExtractionEngine
+
+            await asyncio.to_thread(PDFExtractionEngine.get_instance().shutdown)
+        except Exception as e:
+            logger.warning(f"Error shutting down PDF extraction pool: {e}")
+
+        try:
+            from app.services.notification_transport import (
+                NotificationTransportPool,
+            )
+
+            await asyncio.to_thread(NotificationTransportPool.get_instance().shutdown)
+        except Exception as e:
+            logger.warning(f"Error shutting down notification delivery pool: {e}")
+
+        try:
+            from app.services.activity_log_writer import ActivityLogWriter
+
+            # Last, so entries logged by the shutdowns above are written too
+            await asyncio.to_thread(ActivityLogWriter.get_instance().stop)
+        except Exception as e:
+            logger.warning(f"Error flushing activity log writer: {e}")
+
 
 # Create FastAPI app
 app = FastAPI(
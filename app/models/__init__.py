@@ -29,6 +29,7 @@ from .clinical import (
     SymptomOccurrence,
     Vitals,
 )
+from .entity_tags import EntityTag
 from .family import (
     FamilyCondition,
     FamilyMember,
@@ -41,6 +42,7 @@ from .injuries import (
     Injury,
     InjuryType,
 )
+from .jobs import BackgroundJob
 from .labs import (
     LabResult,
     LabResultFile,
@@ -48,6 +50,7 @@ from .labs import (
     StandardizedTest,
 )
 from .notifications import (
+    MedicationReminderFire,
     NotificationChannel,
     NotificationHistory,
     NotificationPreference,
@@ -73,6 +76,12 @@ from .reporting import (
     ReportGenerationAudit,
     ReportTemplate,
 )
+from .search import SearchIndexEntry
+from .shared_state import (
+    RateLimitWindow,
+    SchedulerLease,
+    SharedStateEntry,
+)
 from .sharing import (
     FamilyHistoryShare,
     Invitation,
@@ -84,6 +93,7 @@ from .user import (
     UserPreferences,
     UserTag,
 )
+from .vitals_rollup import VitalsRollup
 
 __all__ = [
     "Base",
@@ -128,9 +138,17 @@ __all__ = [
     "BackupRecord",
     "ReportTemplate",
     "ReportGenerationAudit",
+    "SearchIndexEntry",
+    "EntityTag",
+    "VitalsRollup",
+    "BackgroundJob",
     "NotificationChannel",
     "NotificationPreference",
     "NotificationHistory",
+    "MedicationReminderFire",
+    "SharedStateEntry",
+    "RateLimitWindow",
+    "SchedulerLease",
     "LabResultCondition",
     "LabResultMedication",
     "LabResultProcedure",
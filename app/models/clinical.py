@@ -11,6 +11,8 @@ from sqlalchemy import (
     String,
     Text,
     Time,
+    and_,
+    column,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship as orm_relationship
@@ -395,6 +397,36 @@ class Allergy(Base):
     __table_args__ = (Index("idx_allergies_patient_id", "patient_id"),)
 
 
+# Vitals columns behind each vital type; blood pressure needs both readings.
+# Type filters in queries and the per-type partial indexes both come from here,
+# so a query filtering on a type's columns matches that type's index predicate.
+VITAL_TYPE_COLUMNS = {
+    "blood_pressure": ("systolic_bp", "diastolic_bp"),
+    "heart_rate": ("heart_rate",),
+    "temperature": ("temperature",),
+    "weight": ("weight",),
+    "oxygen_saturation": ("oxygen_saturation",),
+    "respiratory_rate": ("respiratory_rate",),
+    "blood_glucose": ("blood_glucose",),
+    "a1c": ("a1c",),
+    "bmi": ("bmi",),
+    "pain_scale": ("pain_scale",),
+}
+
+
+def _vital_series_index(name: str, *value_columns: str) -> Index:
+    """Partial covering index (patient_id, recorded_date, values) for one type."""
+    has_values = and_(*(column(value).isnot(None) for value in value_columns))
+    return Index(
+        name,
+        "patient_id",
+        "recorded_date",
+        *value_columns,
+        postgresql_where=has_values,
+        sqlite_where=has_values,
+    )
+
+
 class Vitals(Base):
     """Represents a set of vital sign measurements recorded for a patient."""
 
@@ -445,8 +477,16 @@ class Vitals(Base):
     patient = orm_relationship("Patient", back_populates="vitals")
     practitioner = orm_relationship("Practitioner", back_populates="vitals")
 
-    # Indexes for performance
-    __table_args__ = (Index("idx_vitals_patient_id", "patient_id"),)
+    # Indexes for performance. Trend charts read one series at a time over a
+    # date range, and CGM imports make glucose rows dominate the table, so
+    # each series gets a partial index holding only the rows that carry it.
+    __table_args__ = (
+        Index("idx_vitals_patient_recorded_date", "patient_id", "recorded_date"),
+        *(
+            _vital_series_index(f"idx_vitals_{vital_type}_series", *value_columns)
+            for vital_type, value_columns in VITAL_TYPE_COLUMNS.items()
+        ),
+    )
 
 
 class Symptom(Base):
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, UniqueConstraint
+
+from .base import Base
+
+
+class EntityTag(Base):
+    """
+    One tag on one tagged record, normalized out of the records' JSON ``tags``.
+
+    Derived data maintained by app.services.entity_tags: one row per
+    (entity_type, entity_id, tag), where entity_type is the tag API's record
+    type (e.g. "lab_result"). Tag statistics, tag filters and tag renames
+    look records up here with indexed set operations instead of expanding
+    every record's JSON array.
+    """
+
+    __tablename__ = "entity_tags"
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(30), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    patient_id = Column(
+        Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False
+    )
+    tag = Column(String(100), nullable=False)
+
+    # entity_id leads the unique key so it serves per-record maintenance
+    # without looking like a fit for the type-wide tag lookups below
+    __table_args__ = (
+        UniqueConstraint("entity_id", "entity_type", "tag", name="uq_entity_tag"),
+        Index("idx_entity_tags_tag_type", "tag", "entity_type"),
+        Index("idx_entity_tags_patient_type_tag", "patient_id", "entity_type", "tag"),
+    )
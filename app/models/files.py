@@ -28,6 +28,9 @@ class EntityFile(Base):
     file_path = Column(String(500), nullable=False)  # Path to file on server
     file_type = Column(String(100), nullable=False)  # MIME type or extension
     file_size = Column(Integer, nullable=True)  # Size in bytes
+    content_hash = Column(
+        String(64), nullable=True
+    )  # SHA-256 of a local file's content; its blob in the blob store
     description = Column(Text, nullable=True)  # Optional description
     category = Column(
         String(100), nullable=True
@@ -71,6 +74,7 @@ class EntityFile(Base):
         Index("idx_paperless_document_id", "paperless_document_id"),
         Index("idx_papra_document_id", "papra_document_id"),
         Index("idx_sync_status", "sync_status"),
+        Index("idx_entity_files_content_hash", "content_hash"),
     )
 
 
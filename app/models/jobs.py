@@ -0,0 +1,61 @@
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+
+from .base import Base, get_utc_now
+
+
+class BackgroundJob(Base):
+    """
+    A unit of long-running work (export, custom report, backup) executed by
+    app.services.job_engine outside the HTTP request that submitted it.
+
+    Lifecycle: queued -> running -> succeeded | failed | cancelled. Workers
+    claim queued rows by priority, report progress and heartbeat on the row,
+    and record the produced file (if any) as the job's artifact. Finished
+    jobs and their artifacts are purged after expires_at.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    job_type = Column(String(30), nullable=False)  # export, custom_report, backup
+    status = Column(String(20), nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    params = Column(JSON, nullable=True)
+
+    progress = Column(Integer, nullable=False, default=0)  # percent, 0-100
+    progress_message = Column(String(255), nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    result = Column(JSON, nullable=True)  # small handler-specific summary
+    error = Column(Text, nullable=True)
+    artifact_path = Column(String(500), nullable=True)
+    artifact_filename = Column(String(255), nullable=True)
+    artifact_media_type = Column(String(100), nullable=True)
+    artifact_size = Column(Integer, nullable=True)
+
+    worker_id = Column(String(100), nullable=True)  # host:pid of the claimer
+    created_at = Column(DateTime, default=get_utc_now, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claim order: WHERE status = 'queued' ORDER BY priority DESC, id
+        Index("idx_background_jobs_claim", "status", "priority", "id"),
+        Index("idx_background_jobs_user_created", "user_id", "created_at"),
+    )
@@ -177,6 +177,14 @@ class LabTestComponent(Base):
     # Canonical test name for trend matching
     canonical_test_name = Column(String, nullable=True)
 
+    # Trend lookup fields, derived from the columns above and the lab result;
+    # maintained by app.services.lab_trend_keys
+    patient_id = Column(
+        Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=True
+    )
+    trend_key = Column(String, nullable=True)  # normalized name + unit
+    effective_date = Column(Date, nullable=True)  # completed_date or created day
+
     # Notes
     notes = Column(Text, nullable=True)
 
@@ -203,6 +211,13 @@ class LabTestComponent(Base):
         ),
         Index("idx_lab_test_components_test_name_text", "test_name"),
         Index("idx_lab_test_components_abbreviation_text", "abbreviation"),
+        # Trend series and component catalog lookups
+        Index(
+            "idx_lab_test_components_trend",
+            "patient_id",
+            "trend_key",
+            "effective_date",
+        ),
     )
 
 
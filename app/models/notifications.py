@@ -2,6 +2,7 @@ from sqlalchemy import (
     JSON,
     Boolean,
     Column,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -145,3 +146,35 @@ class NotificationHistory(Base):
         Index("idx_notification_history_created_at", "created_at"),
         Index("idx_notification_history_event_type", "event_type"),
     )
+
+
+class MedicationReminderFire(Base):
+    """
+    Records each scheduled medication reminder that has been published.
+
+    The unique (medication_id, scheduled_date, scheduled_time) index makes
+    claiming a reminder atomic, so it is published once per scheduled minute
+    even across APScheduler misfires, restarts during a tick, and concurrent
+    instances. The claim is taken before publishing and deleted if the
+    publish fails.
+    """
+
+    __tablename__ = "medication_reminder_fires"
+
+    id = Column(Integer, primary_key=True)
+    medication_id = Column(
+        Integer, ForeignKey("medications.id", ondelete="CASCADE"), nullable=False
+    )
+    scheduled_date = Column(Date, nullable=False)  # Facility-local date
+    scheduled_time = Column(String(5), nullable=False)  # Facility-local HH:MM
+    fired_at = Column(DateTime, default=get_utc_now, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "medication_id",
+            "scheduled_date",
+            "scheduled_time",
+            name="uq_medication_reminder_fire",
+        ),
+        Index("idx_medication_reminder_fires_date", "scheduled_date"),
+    )
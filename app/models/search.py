@@ -0,0 +1,98 @@
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+    text,
+)
+
+from .base import Base, get_utc_now
+
+# SQLite full-text index over search_index. External-content FTS5 table, so the
+# text lives once in search_index and the triggers below keep the token index in
+# step with every insert/update/delete on it. The trigram tokenizer gives
+# substring matching ("lisin" finds "Lisinopril") with bm25 ranking.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index_fts USING fts5("
+    "title, body, tags, content='search_index', content_rowid='id', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ai AFTER INSERT ON search_index BEGIN "
+    "INSERT INTO search_index_fts(rowid, title, body, tags) "
+    "VALUES (new.id, new.title, new.body, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ad AFTER DELETE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, title, body, tags) "
+    "VALUES ('delete', old.id, old.title, old.body, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_au AFTER UPDATE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, title, body, tags) "
+    "VALUES ('delete', old.id, old.title, old.body, old.tags); "
+    "INSERT INTO search_index_fts(rowid, title, body, tags) "
+    "VALUES (new.id, new.title, new.body, new.tags); END",
+)
+
+
+class SearchIndexEntry(Base):
+    """
+    Denormalized search document for one patient record.
+
+    One row per searchable record (medication, condition, lab result, ...),
+    maintained by app.services.search_index so /api/v1/search can answer a
+    cross-type query with a single indexed statement. ``payload`` holds the
+    fields the search response renders, so results need no per-type fetch.
+    """
+
+    __tablename__ = "search_index"
+
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(
+        Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False
+    )
+    record_type = Column(String(30), nullable=False)  # e.g. "medications"
+    record_id = Column(Integer, nullable=False)
+
+    # Searchable text. title is kept as entered (it is also the title sort key);
+    # body and tags are lowercased, newline-joined field values.
+    title = Column(String, nullable=True)
+    body = Column(Text, nullable=False, default="")
+    tags = Column(Text, nullable=False, default="")
+    # Lowercased title + body + tags, for substring matching where no
+    # full-text index applies (short queries, PostgreSQL trigram index).
+    document = Column(Text, nullable=False, default="")
+
+    sort_date = Column(DateTime, nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+
+    updated_at = Column(
+        DateTime, default=get_utc_now, onupdate=get_utc_now, nullable=False
+    )
+
+    __table_args__ = (
+        UniqueConstraint("record_type", "record_id", name="uq_search_index_record"),
+        Index(
+            "idx_search_index_patient_type_date",
+            "patient_id",
+            "record_type",
+            "sort_date",
+        ),
+    )
+
+
+@event.listens_for(SearchIndexEntry.__table__, "after_create")
+def _create_sqlite_fts(target, connection, **kw):
+    """Create the FTS5 shadow index alongside search_index on SQLite.
+
+    Builds without FTS5 or the trigram tokenizer (SQLite < 3.34) skip it; the
+    search service then falls back to substring matching on ``document``.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    try:
+        for statement in SQLITE_FTS_DDL:
+            connection.execute(text(statement))
+    except Exception:
+        pass
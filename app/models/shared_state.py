@@ -0,0 +1,59 @@
+from sqlalchemy import JSON, Column, DateTime, Float, Index, Integer, String
+
+from .base import Base
+
+
+class SharedStateEntry(Base):
+    """
+    A short-lived keyed value shared by every server worker, written through
+    app.core.shared_state when STATE_BACKEND is "database" (SSO state,
+    account-conflict and GitHub manual-link tokens).
+
+    Entries are consumed or deleted by their flow and swept once expired.
+    """
+
+    __tablename__ = "shared_state_entries"
+
+    namespace = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    value = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("idx_shared_state_entries_expires", "expires_at"),)
+
+
+class RateLimitWindow(Base):
+    """
+    One rate-limit key's sliding window, shared by every server worker.
+
+    ``hits`` holds the Unix timestamps of the requests still inside the
+    window. Writers update the row only if ``version`` is unchanged since they
+    read it, so concurrent requests from different workers can't both take
+    the last slot.
+    """
+
+    __tablename__ = "rate_limit_windows"
+
+    scope = Column(String(50), primary_key=True)  # which limiter
+    key = Column(String(255), primary_key=True)  # what it throttles (IP, user)
+    hits = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    expires_at = Column(Float, nullable=False)  # Unix time the last hit ages out
+
+    __table_args__ = (Index("idx_rate_limit_windows_expires", "expires_at"),)
+
+
+class SchedulerLease(Base):
+    """
+    A time-limited lease naming the one server worker that runs a set of
+    scheduled jobs. The holder renews it well before expires_at; once it
+    lapses, any worker may take it over.
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100), nullable=False)  # host:pid:token of the leader
+    acquired_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,59 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from .base import Base, get_utc_now
+
+
+class VitalsRollup(Base):
+    """
+    Pre-aggregated vitals readings for one patient, vital column and period.
+
+    Derived data maintained by app.services.vitals_rollup: one row per
+    (patient, series, granularity, period) that has readings, where series is
+    a Vitals value column (e.g. "blood_glucose") and granularity is "day" or
+    "month". Periods are UTC calendar days/months, matching how
+    recorded_date is stored. Stats and long-range trend charts read these
+    instead of every raw reading.
+    """
+
+    __tablename__ = "vitals_rollups"
+
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(
+        Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False
+    )
+    series = Column(String(30), nullable=False)  # Vitals column name
+    granularity = Column(String(10), nullable=False)  # "day" or "month"
+    period_start = Column(DateTime, nullable=False)  # midnight of day / 1st of month
+
+    count = Column(Integer, nullable=False)
+    # Running sum rather than mean so periods combine exactly (mean = sum / count)
+    value_sum = Column(Float, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    first_value = Column(Float, nullable=False)
+    first_recorded_at = Column(DateTime, nullable=False)
+    last_value = Column(Float, nullable=False)
+    last_recorded_at = Column(DateTime, nullable=False)
+
+    updated_at = Column(
+        DateTime, default=get_utc_now, onupdate=get_utc_now, nullable=False
+    )
+
+    __table_args__ = (
+        # Leading columns serve per-patient range reads for one granularity
+        UniqueConstraint(
+            "patient_id",
+            "granularity",
+            "series",
+            "period_start",
+            name="uq_vitals_rollup_period",
+        ),
+    )
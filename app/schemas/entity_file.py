@@ -155,6 +155,7 @@ class EntityFileCreate(EntityFileBase):
     paperless_task_uuid: Optional[str] = None  # Task UUID for Paperless processing
     papra_document_id: Optional[str] = None
     papra_organization_id: Optional[str] = None
+    content_hash: Optional[str] = None  # SHA-256 of locally stored content
 
     @field_validator("entity_id")
     @classmethod
@@ -0,0 +1,58 @@
+"""
+Pydantic schemas for background jobs (exports, custom reports, backups)
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobType(str, Enum):
+    """Job types that can be submitted"""
+
+    EXPORT = "export"
+    CUSTOM_REPORT = "custom_report"
+    BACKUP = "backup"
+
+
+class JobCreate(BaseModel):
+    """Schema for submitting a background job"""
+
+    job_type: JobType
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description=(
+            "Job parameters: export query options for export, a custom report "
+            "request for custom_report, backup_type/description for backup"
+        ),
+    )
+
+
+class JobResponse(BaseModel):
+    """Schema for a background job and its progress"""
+
+    id: int
+    job_type: str
+    status: str
+    progress: int
+    progress_message: Optional[str]
+    cancel_requested: bool
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    artifact_filename: Optional[str]
+    artifact_size: Optional[int]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    expires_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobListResponse(BaseModel):
+    """Schema for the current user's jobs"""
+
+    items: List[JobResponse]
+    total: int
@@ -49,6 +49,10 @@ class EventType(str, Enum):
     # Medical events
     MEDICATION_REMINDER_DUE = "medication_reminder_due"
 
+    # Background job events
+    JOB_COMPLETED = "job_completed"
+    JOB_FAILED = "job_failed"
+
 
 class NotificationStatus(str, Enum):
     """Notification delivery status"""
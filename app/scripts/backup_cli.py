@@ -14,6 +14,7 @@ Usage:
     # Or directly on the server:
     python app/scripts/backup_cli.py database
     python app/scripts/backup_cli.py files --description "Daily files backup"
+    python app/scripts/backup_cli.py incremental
     python app/scripts/backup_cli.py full
 
 Features:
@@ -71,7 +72,7 @@ async def create_backup(
     Create a backup of the specified type.
 
     Args:
-        backup_type: Type of backup ('database', 'files', 'full')
+        backup_type: Type of backup ('database', 'files', 'incremental', 'full')
         description: Optional description for the backup
         quiet: If True, suppress progress messages
         json_output: If True, output results as JSON
@@ -106,6 +107,8 @@ async def create_backup(
             result = await backup_service.create_database_backup(description)
         elif backup_type == "files":
             result = await backup_service.create_files_backup(description)
+        elif backup_type == "incremental":
+            result = await backup_service.create_incremental_backup(description)
         elif backup_type == "full":
             result = await backup_service.create_full_backup(description)
         else:
@@ -146,6 +149,7 @@ def main():
 Backup Types:
     database    Create database-only backup (SQL dump)
     files       Create files-only backup (uploads directory)
+    incremental Create files backup storing only new or changed uploads
     full        Create complete system backup (database + files)
 
 Examples:
@@ -164,7 +168,9 @@ Examples:
     )
 
     parser.add_argument(
-        "type", choices=["database", "files", "full"], help="Type of backup to create"
+        "type",
+        choices=["database", "files", "incremental", "full"],
+        help="Type of backup to create",
     )
 
     parser.add_argument(
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Entity File Dedup CLI Script for Medical Records System
+
+Moves locally stored entity files uploaded before the content-addressed
+blob store into it, in place: each file is hashed, the first copy of each
+content is kept as its blob and duplicate copies are removed once their
+records point at the blob. New uploads are deduplicated automatically; run
+this once after upgrading, then take a fresh backup to benefit from the
+smaller uploads directory.
+
+Usage:
+    # Via docker exec:
+    docker exec <container_name> python app/scripts/entity_file_dedup_cli.py
+
+    # Or directly on the server:
+    python app/scripts/entity_file_dedup_cli.py --dry-run
+    python app/scripts/entity_file_dedup_cli.py --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path so we can import our app modules
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from app.core.config import settings
+    from app.core.database.database import SessionLocal
+    from app.services.blob_store import BlobStore, dedupe_local_files
+except ImportError as e:
+    print(f"Error importing app modules: {e}", file=sys.stderr)
+    print(
+        "Make sure you're running this script from the project root directory",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def _fail(message: str, json_output: bool) -> None:
+    if json_output:
+        print(json.dumps({"success": False, "error": message}))
+    else:
+        print(f"ERROR: {message}", file=sys.stderr)
+
+
+def _format_bytes(size: float) -> str:
+    if size < 1024:
+        return f"{size:,} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:,.1f} {unit}"
+
+
+def dedupe_files(dry_run: bool = False, quiet: bool = False, json_output: bool = False):
+    """
+    Deduplicate the local entity files into the blob store.
+
+    Returns:
+        dict: Files scanned, duplicates removed and bytes reclaimed, or None
+        on failure
+    """
+    if not quiet and not json_output:
+        action = "Scanning" if dry_run else "Deduplicating"
+        print(f"{action} local entity files in {settings.UPLOAD_DIR}...")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stats = dedupe_local_files(
+            db, BlobStore(Path(settings.UPLOAD_DIR)), dry_run=dry_run
+        )
+        elapsed = time.perf_counter() - started
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "dry_run": dry_run,
+                        **stats,
+                        "seconds": round(elapsed, 2),
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            if stats["missing_files"]:
+                print(
+                    f"   - {stats['missing_files']:,} files referenced by records "
+                    "are missing and were skipped"
+                )
+            verb = "would remove" if dry_run else "removed"
+            print(
+                f"Scanned {stats['files_scanned']:,} files: {verb} "
+                f"{stats['duplicates_removed']:,} duplicates, reclaiming "
+                f"{_format_bytes(stats['bytes_reclaimed'])} in {elapsed:.1f}s"
+            )
+
+        return stats
+
+    except Exception as e:
+        _fail(f"Entity file dedup failed: {str(e)}", json_output)
+        return None
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicate locally stored Medical Records System files",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would be reclaimed without changing any files",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress progress messages (only show errors)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON (useful for automation)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        result = dedupe_files(
+            dry_run=args.dry_run, quiet=args.quiet, json_output=args.json
+        )
+        sys.exit(0 if result is not None else 1)
+    except KeyboardInterrupt:
+        if not args.quiet and not args.json:
+            print("\nDedup cancelled by user", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
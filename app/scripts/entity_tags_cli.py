@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Entity Tags CLI Script for Medical Records System
+
+Rebuilds and verifies entity_tags, the normalized tag index behind tag
+filters, tag usage counts and tag renames. The index is maintained
+automatically on every record write and backfilled when the table is created;
+run this after restoring a database from outside the app, after bulk SQL
+edits to record tags, or if tag filters or counts look wrong.
+
+Usage:
+    # Via docker exec:
+    docker exec <container_name> python app/scripts/entity_tags_cli.py check
+
+    # Or directly on the server:
+    python app/scripts/entity_tags_cli.py check --json
+    python app/scripts/entity_tags_cli.py check --repair
+    python app/scripts/entity_tags_cli.py rebuild --patient-id 12
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add the project root to Python path so we can import our app modules
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from app.core.database.database import SessionLocal
+    from app.services import entity_tags
+except ImportError as e:
+    print(f"Error importing app modules: {e}", file=sys.stderr)
+    print(
+        "Make sure you're running this script from the project root directory",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def _fail(message: str, json_output: bool) -> None:
+    if json_output:
+        print(json.dumps({"success": False, "error": message}))
+    else:
+        print(f"ERROR: {message}", file=sys.stderr)
+
+
+def rebuild_tags(
+    patient_id: Optional[int] = None, quiet: bool = False, json_output: bool = False
+):
+    """
+    Rebuild entity_tags for all patients or a single patient.
+
+    Returns:
+        dict: Rows written per record type, or None on failure
+    """
+    if not quiet and not json_output:
+        scope = f"patient {patient_id}" if patient_id else "all patients"
+        print(f"Rebuilding entity tags for {scope}...")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = entity_tags.rebuild(db, patient_id=patient_id)
+        elapsed = time.perf_counter() - started
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "patient_id": patient_id,
+                        "indexed": counts,
+                        "total": sum(counts.values()),
+                        "seconds": round(elapsed, 2),
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            for entity_type, count in counts.items():
+                print(f"   - {entity_type}: {count:,}")
+            print(
+                f"Entity tags rebuilt: {sum(counts.values()):,} tags in {elapsed:.1f}s"
+            )
+
+        return counts
+
+    except Exception as e:
+        _fail(f"Entity tags rebuild failed: {str(e)}", json_output)
+        return None
+    finally:
+        db.close()
+
+
+def check_tags(repair: bool = False, quiet: bool = False, json_output: bool = False):
+    """
+    Compare entity_tags with the records' tags, optionally repairing it.
+
+    Returns:
+        dict: Missing and extra rows per record type, or None on failure
+    """
+    db = SessionLocal()
+    try:
+        report = entity_tags.check(db, repair=repair)
+        drift = {key: counts for key, counts in report.items() if any(counts.values())}
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "consistent": not drift,
+                        "by_type": report,
+                        "repaired": repair and bool(drift),
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            for entity_type, counts in drift.items():
+                print(
+                    f"   - {entity_type}: {counts['missing']:,} missing, "
+                    f"{counts['extra']:,} extra"
+                )
+            if not drift:
+                print("Entity tags are consistent with the records")
+            elif repair:
+                print(f"Repaired entity tags for {len(drift):,} record types")
+            else:
+                print(
+                    f"Found drift in {len(drift):,} record types; "
+                    "run with --repair to fix it"
+                )
+
+        return drift
+
+    except Exception as e:
+        _fail(f"Entity tags check failed: {str(e)}", json_output)
+        return None
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the Medical Records System entity tags index",
+    )
+    parser.add_argument(
+        "command", choices=["rebuild", "check"], help="Operation to run"
+    )
+    parser.add_argument(
+        "--patient-id", type=int, help="With rebuild: only this patient's records"
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="With check: insert missing rows and delete extra ones",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress progress messages (only show errors)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON (useful for automation)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "rebuild":
+            result = rebuild_tags(
+                patient_id=args.patient_id, quiet=args.quiet, json_output=args.json
+            )
+            sys.exit(0 if result is not None else 1)
+
+        drift = check_tags(repair=args.repair, quiet=args.quiet, json_output=args.json)
+        # Unrepaired drift fails the run so monitoring can alert on it
+        sys.exit(0 if drift is not None and (args.repair or not drift) else 1)
+    except KeyboardInterrupt:
+        if not args.quiet and not args.json:
+            print(f"\n{args.command.capitalize()} cancelled by user", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Search Index CLI Script for Medical Records System
+
+Rebuilds the cross-type search index used by /api/v1/search. The index is
+maintained automatically on every write and built once on startup; run this
+after restoring a database from outside the app, after bulk SQL edits, or if
+search results look stale.
+
+Usage:
+    # Via docker exec:
+    docker exec <container_name> python app/scripts/search_index_cli.py rebuild
+
+    # Or directly on the server:
+    python app/scripts/search_index_cli.py rebuild
+    python app/scripts/search_index_cli.py rebuild --patient-id 12 --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add the project root to Python path so we can import our app modules
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from app.core.database.database import SessionLocal
+    from app.services import search_index
+except ImportError as e:
+    print(f"Error importing app modules: {e}", file=sys.stderr)
+    print(
+        "Make sure you're running this script from the project root directory",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def rebuild_index(
+    patient_id: Optional[int] = None, quiet: bool = False, json_output: bool = False
+):
+    """
+    Rebuild the search index for all patients or a single patient.
+
+    Returns:
+        dict: Rows indexed per record type, or None on failure
+    """
+    if not quiet and not json_output:
+        scope = f"patient {patient_id}" if patient_id else "all patients"
+        print(f"Rebuilding search index for {scope}...")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = search_index.rebuild(db, patient_id=patient_id)
+        elapsed = time.perf_counter() - started
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "patient_id": patient_id,
+                        "indexed": counts,
+                        "total": sum(counts.values()),
+                        "seconds": round(elapsed, 2),
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            for record_type, count in counts.items():
+                print(f"   - {record_type}: {count:,}")
+            print(
+                f"Search index rebuilt: {sum(counts.values()):,} records in {elapsed:.1f}s"
+            )
+
+        return counts
+
+    except Exception as e:
+        error_msg = f"Search index rebuild failed: {str(e)}"
+        if json_output:
+            print(json.dumps({"success": False, "error": error_msg}))
+        else:
+            print(f"ERROR: {error_msg}", file=sys.stderr)
+        return None
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the Medical Records System search index",
+    )
+    parser.add_argument("command", choices=["rebuild"], help="Operation to run")
+    parser.add_argument(
+        "--patient-id", type=int, help="Only rebuild this patient's records"
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress progress messages (only show errors)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON (useful for automation)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        result = rebuild_index(
+            patient_id=args.patient_id, quiet=args.quiet, json_output=args.json
+        )
+        sys.exit(0 if result is not None else 1)
+    except KeyboardInterrupt:
+        if not args.quiet and not args.json:
+            print("\nRebuild cancelled by user", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Vitals Rollup CLI Script for Medical Records System
+
+Backfills and verifies the daily/monthly vitals rollups used by vitals stats
+and long-range trend charts. Rollups are maintained automatically on every
+vitals write and built once on startup; run this after restoring a database
+from outside the app, after bulk SQL edits to vitals, or if stats look wrong.
+
+Usage:
+    # Via docker exec:
+    docker exec <container_name> python app/scripts/vitals_rollup_cli.py backfill
+
+    # Or directly on the server:
+    python app/scripts/vitals_rollup_cli.py backfill --patient-id 12
+    python app/scripts/vitals_rollup_cli.py check --json
+    python app/scripts/vitals_rollup_cli.py check --repair
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add the project root to Python path so we can import our app modules
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from app.core.database.database import SessionLocal
+    from app.services import vitals_rollup
+except ImportError as e:
+    print(f"Error importing app modules: {e}", file=sys.stderr)
+    print(
+        "Make sure you're running this script from the project root directory",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def _fail(message: str, json_output: bool) -> None:
+    if json_output:
+        print(json.dumps({"success": False, "error": message}))
+    else:
+        print(f"ERROR: {message}", file=sys.stderr)
+
+
+def backfill_rollups(
+    patient_id: Optional[int] = None, quiet: bool = False, json_output: bool = False
+):
+    """
+    Recompute the vitals rollups for all patients or a single patient.
+
+    Returns:
+        dict: Patients and rollup rows written, or None on failure
+    """
+    if not quiet and not json_output:
+        scope = f"patient {patient_id}" if patient_id else "all patients"
+        print(f"Rebuilding vitals rollups for {scope}...")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = vitals_rollup.rebuild(db, patient_id=patient_id)
+        elapsed = time.perf_counter() - started
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "patient_id": patient_id,
+                        **counts,
+                        "seconds": round(elapsed, 2),
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            print(
+                f"Vitals rollups rebuilt: {counts['rollups']:,} rollups for "
+                f"{counts['patients']:,} patients in {elapsed:.1f}s"
+            )
+
+        return counts
+
+    except Exception as e:
+        _fail(f"Vitals rollup backfill failed: {str(e)}", json_output)
+        return None
+    finally:
+        db.close()
+
+
+def check_rollups(
+    patient_id: Optional[int] = None,
+    repair: bool = False,
+    quiet: bool = False,
+    json_output: bool = False,
+):
+    """
+    Compare stored rollups with the raw readings, optionally repairing them.
+
+    Returns:
+        list: Problems found (empty when consistent), or None on failure
+    """
+    db = SessionLocal()
+    try:
+        problems = vitals_rollup.check(db, patient_id=patient_id)
+
+        repaired_patients = sorted({problem["patient_id"] for problem in problems})
+        if repair:
+            for pid in repaired_patients:
+                vitals_rollup.rebuild(db, patient_id=pid)
+
+        if json_output:
+            print(
+                json.dumps(
+                    {
+                        "success": True,
+                        "patient_id": patient_id,
+                        "consistent": not problems,
+                        "problems": problems,
+                        "repaired_patients": repaired_patients if repair else [],
+                    },
+                    indent=2,
+                )
+            )
+        elif not quiet:
+            for problem in problems:
+                print(
+                    f"   - patient {problem['patient_id']} {problem['granularity']} "
+                    f"{problem['series']} {problem['period_start']}: {problem['problem']}"
+                )
+            if not problems:
+                print("Vitals rollups are consistent with the raw readings")
+            elif repair:
+                print(
+                    f"Repaired {len(problems):,} rollups for "
+                    f"{len(repaired_patients):,} patients"
+                )
+            else:
+                print(
+                    f"Found {len(problems):,} inconsistent rollups; "
+                    "run with --repair to rebuild them"
+                )
+
+        return problems
+
+    except Exception as e:
+        _fail(f"Vitals rollup check failed: {str(e)}", json_output)
+        return None
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the Medical Records System vitals rollups",
+    )
+    parser.add_argument(
+        "command", choices=["backfill", "check"], help="Operation to run"
+    )
+    parser.add_argument(
+        "--patient-id", type=int, help="Only process this patient's readings"
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="With check: rebuild the rollups of patients with problems",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress progress messages (only show errors)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output results as JSON (useful for automation)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "backfill":
+            result = backfill_rollups(
+                patient_id=args.patient_id, quiet=args.quiet, json_output=args.json
+            )
+            sys.exit(0 if result is not None else 1)
+
+        problems = check_rollups(
+            patient_id=args.patient_id,
+            repair=args.repair,
+            quiet=args.quiet,
+            json_output=args.json,
+        )
+        # Unrepaired problems fail the run so monitoring can alert on it
+        sys.exit(0 if problems is not None and (args.repair or not problems) else 1)
+    except KeyboardInterrupt:
+        if not args.quiet and not args.json:
+            print(f"\n{args.command.capitalize()} cancelled by user", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
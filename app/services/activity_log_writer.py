@@ -0,0 +1,313 @@
+"""
+Batched Activity Log Writer
+
+Every create, update and delete endpoint records an audit entry after its
+own commit. Written inline, that entry costs the request a second
+transaction plus a re-select of the new row. The writer instead takes
+entries into a bounded in-process queue and a background thread inserts
+them in batches, one multi-row INSERT per batch, whenever BATCH_SIZE
+entries are waiting or FLUSH_INTERVAL has passed since the first of them
+arrived.
+
+Backpressure: when the queue is full, enqueue() waits up to
+ACTIVITY_LOG_ENQUEUE_TIMEOUT_MS for room and otherwise returns False, and
+the caller writes the entry itself. Requests slow down to the database's
+pace instead of the queue growing without bound or dropping audit entries.
+
+The writer only buffers while it is running. Before start(), after stop(),
+and whenever ACTIVITY_LOG_SYNC is enabled, callers write inline as before,
+so tests and scripts see their entries committed immediately. The queue is
+drained on shutdown (FastAPI lifespan, and the desktop build's shutdown
+manager), so entries accepted before shutdown are written.
+
+Only counts and timings are logged, never entry contents.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+
+logger = get_logger(__name__, "app")
+
+# Seconds stop() waits for the flusher thread to drain the queue
+STOP_TIMEOUT_SECONDS = 10
+
+
+class ActivityLogWriter:
+    """
+    Buffers activity log entries and inserts them in batches.
+
+    Entries are dicts of ActivityLog column values, as accepted by
+    CRUDActivityLog.log_activities().
+    """
+
+    _instance: Optional["ActivityLogWriter"] = None
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        enqueue_timeout_ms: Optional[int] = None,
+    ) -> None:
+        if session_factory is None:
+            from app.core.database.database import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self.batch_size = max(1, batch_size or settings.ACTIVITY_LOG_BATCH_SIZE)
+        self.flush_interval = (
+            flush_interval_ms
+            if flush_interval_ms is not None
+            else settings.ACTIVITY_LOG_FLUSH_INTERVAL_MS
+        ) / 1000
+        self.enqueue_timeout = (
+            enqueue_timeout_ms
+            if enqueue_timeout_ms is not None
+            else settings.ACTIVITY_LOG_ENQUEUE_TIMEOUT_MS
+        ) / 1000
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(
+            maxsize=max_queue or settings.ACTIVITY_LOG_MAX_QUEUE
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._shutdown_handler_registered = False
+        self._reset_stats()
+
+    @classmethod
+    def get_instance(cls) -> "ActivityLogWriter":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — stop and tear down the singleton."""
+        if cls._instance is not None:
+            cls._instance.stop()
+            cls._instance = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stopping.is_set()
+
+    def _reset_stats(self) -> None:
+        self._enqueued = 0
+        self._written = 0
+        self._failed = 0
+        self._inline_fallbacks = 0
+        self._batches = 0
+        self._last_batch_size = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Start the flusher thread; a no-op in ACTIVITY_LOG_SYNC mode."""
+        if self._thread is not None or settings.ACTIVITY_LOG_SYNC:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="activity-log-writer", daemon=True
+        )
+        self._thread.start()
+
+        # The desktop build exits through the shutdown manager, which may
+        # never reach the FastAPI lifespan shutdown
+        if not self._shutdown_handler_registered:
+            from app.core.utils.shutdown_manager import register_shutdown_handler
+
+            register_shutdown_handler(self.stop, "Activity Log Writer")
+            self._shutdown_handler_registered = True
+
+        logger.info(
+            "Activity log writer started",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "activity_log_writer_started",
+                "batch_size": self.batch_size,
+                "flush_interval_ms": int(self.flush_interval * 1000),
+                "max_queue": self._queue.maxsize,
+            },
+        )
+
+    def stop(self, timeout: float = STOP_TIMEOUT_SECONDS) -> None:
+        """Stop accepting entries and write everything already queued."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        self._thread = None
+        if thread.is_alive():
+            logger.warning(
+                "Activity log writer did not drain before shutdown",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "activity_log_writer_stop_timeout",
+                    "queue_depth": self._queue.qsize(),
+                },
+            )
+            return
+        # Entries enqueued while the thread was exiting
+        self._drain()
+        logger.info(
+            "Activity log writer stopped",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "activity_log_writer_stopped",
+                "written": self._written,
+                "failed": self._failed,
+            },
+        )
+
+    def enqueue(self, entry: Dict[str, Any]) -> bool:
+        """
+        Queue an entry for the next batch.
+
+        Returns:
+            True if queued; False if the writer is not running or the queue
+            stayed full for the enqueue timeout, in which case the caller
+            must write the entry itself
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put(entry, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._inline_fallbacks += 1
+            return False
+        with self._stats_lock:
+            self._enqueued += 1
+        return True
+
+    def flush(self) -> None:
+        """Block until every entry queued so far has been written."""
+        if self._thread is None:
+            self._drain()
+            return
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and flush latency since start."""
+        with self._stats_lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "batch_size": self.batch_size,
+                "flush_interval_ms": int(self.flush_interval * 1000),
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "failed": self._failed,
+                "inline_fallbacks": self._inline_fallbacks,
+                "batches": self._batches,
+                "last_batch_size": self._last_batch_size,
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "max_flush_ms": round(self._max_flush_ms, 2),
+                "avg_flush_ms": (
+                    round(self._total_flush_ms / self._batches, 2)
+                    if self._batches
+                    else 0.0
+                ),
+            }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping.is_set():
+                    # Past the deadline, or draining: take only what's waiting
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                    continue
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _drain(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(batch), self.batch_size):
+            self._write(batch[start : start + self.batch_size])
+        for _ in batch:
+            self._queue.task_done()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        from app.crud.activity_log import activity_log
+
+        started = time.perf_counter()
+        written = 0
+        db = self._session_factory()
+        try:
+            try:
+                written = activity_log.log_activities(db, batch)
+            except Exception as e:
+                # One bad entry (e.g. its patient was deleted in the meantime)
+                # must not lose the rest of the batch
+                db.rollback()
+                logger.warning(
+                    "Activity log batch insert failed, retrying entries singly",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "activity_log_batch_failed",
+                        LogFields.ERROR: type(e).__name__,
+                        "batch_size": len(batch),
+                    },
+                )
+                for entry in batch:
+                    try:
+                        written += activity_log.log_activities(db, [entry])
+                    except Exception:
+                        db.rollback()
+        finally:
+            db.close()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._written += written
+            self._failed += len(batch) - written
+            self._batches += 1
+            self._last_batch_size = len(batch)
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+        if written < len(batch):
+            logger.error(
+                "Activity log entries could not be written",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "activity_log_entries_lost",
+                    "count": len(batch) - written,
+                },
+            )
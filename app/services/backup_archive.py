@@ -0,0 +1,226 @@
+"""
+Backup Archive Builder
+
+Synchronous ZIP building for BackupService. Everything here does blocking
+file I/O and compression, so BackupService runs it in a worker thread
+(asyncio.to_thread) rather than on the event loop; zlib and file reads
+release the GIL, so the API keeps serving requests while an archive is
+written.
+
+The archive's SHA-256 is computed from the bytes as they are written instead
+of re-reading the finished file. Files that are already compressed (PDFs,
+images, Office documents, archives) are stored as-is; deflating them again
+costs CPU for little or no size reduction.
+"""
+
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Formats that are already compressed internally
+STORED_EXTENSIONS = frozenset(
+    {
+        ".pdf",
+        ".jpg",
+        ".jpeg",
+        ".png",
+        ".gif",
+        ".webp",
+        ".heic",
+        ".heif",
+        ".avif",
+        ".tif",
+        ".tiff",
+        ".docx",
+        ".xlsx",
+        ".pptx",
+        ".odt",
+        ".ods",
+        ".zip",
+        ".gz",
+        ".tgz",
+        ".bz2",
+        ".xz",
+        ".7z",
+        ".mp3",
+        ".mp4",
+        ".m4a",
+        ".mov",
+        ".webm",
+    }
+)
+
+COMPRESSION_MODES = ("auto", "deflate", "store")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """A file to add to an archive and the name it gets inside it."""
+
+    source: Path
+    arcname: str
+
+
+def collect_upload_entries(uploads_dir: Path) -> List[ArchiveEntry]:
+    """List the files under uploads_dir as ``uploads/...`` entries, skipping trash."""
+    entries = []
+    for root, dirs, files in os.walk(uploads_dir):
+        # Skip trash directory
+        if "trash" in Path(root).parts:
+            continue
+        for file in files:
+            file_path = Path(root) / file
+            arcname = Path("uploads") / file_path.relative_to(uploads_dir)
+            entries.append(ArchiveEntry(file_path, arcname.as_posix()))
+    return entries
+
+
+def compression_for(path: Path, mode: str) -> int:
+    """ZIP compression method for a file under the given compression mode."""
+    if mode == "store":
+        return zipfile.ZIP_STORED
+    if mode == "auto" and path.suffix.lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def file_checksum(file_path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB chunks."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+class _HashingWriter:
+    """
+    Write-only file wrapper that hashes bytes on their way to disk.
+
+    It deliberately cannot seek: ZipFile then writes each member's sizes and
+    CRC in a trailing data descriptor instead of seeking back to patch the
+    local header, so the hashed stream is exactly the file's content.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._raw.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def seek(self, *args):
+        raise OSError("backup archive stream is not seekable")
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class BackupArchive:
+    """
+    A ZIP archive written incrementally from worker threads.
+
+    Members can be added in several add() calls (e.g. uploads while the
+    database dump is still running, then the dump), but calls must not
+    overlap. close() returns the archive's size and SHA-256.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        compression: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+    ):
+        self.output_path = Path(output_path)
+        self.compression = compression or settings.BACKUP_COMPRESSION
+        if self.compression not in COMPRESSION_MODES:
+            raise ValueError(
+                f"Unsupported backup compression '{self.compression}'; "
+                f"expected one of {', '.join(COMPRESSION_MODES)}"
+            )
+        self.compresslevel = (
+            compresslevel
+            if compresslevel is not None
+            else settings.BACKUP_COMPRESSION_LEVEL
+        )
+        self._raw = open(self.output_path, "wb")
+        self._writer = _HashingWriter(self._raw)
+        self._zip = zipfile.ZipFile(self._writer, "w", allowZip64=True)
+
+    def add(
+        self,
+        entries: Iterable[ArchiveEntry],
+        progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Add files to the archive.
+
+        Args:
+            entries: Files to add
+            progress: Called as progress(bytes_done, bytes_total) after each
+                file; may raise to abort the archive
+        """
+        entries = list(entries)
+        sizes = [entry.source.stat().st_size for entry in entries]
+        total = sum(sizes)
+        done = 0
+        for entry, size in zip(entries, sizes):
+            self._zip.write(
+                entry.source,
+                entry.arcname,
+                compress_type=compression_for(entry.source, self.compression),
+                compresslevel=self.compresslevel,
+            )
+            done += size
+            if progress:
+                progress(done, total)
+
+    def close(self) -> Tuple[int, str]:
+        """Finish the archive; returns (size in bytes, SHA-256 hex digest)."""
+        self._zip.close()
+        self._raw.close()
+        return self._writer.size, self._writer.hexdigest()
+
+    def abort(self) -> None:
+        """Close and delete a partially written archive."""
+        try:
+            self._zip.close()
+        except Exception:
+            pass
+        self._raw.close()
+        self.output_path.unlink(missing_ok=True)
+
+
+def build_archive(
+    output_path: Path,
+    entries: Iterable[ArchiveEntry],
+    compression: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[int, str]:
+    """Write entries to a new archive; returns (size in bytes, SHA-256 hex digest)."""
+    archive = BackupArchive(output_path, compression, compresslevel)
+    try:
+        archive.add(entries, progress)
+        return archive.close()
+    except BaseException:
+        archive.abort()
+        raise
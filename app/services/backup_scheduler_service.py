@@ -182,6 +182,11 @@ class BackupSchedulerService:
         """Execute a scheduled backup. Creates its own DB session."""
         from app.core.database.database import SessionLocal
         from app.services.backup_service import BackupService
+        from app.services.scheduler_leadership import SchedulerLeadership
+
+        # Every worker schedules the backup; only the leader takes it
+        if not SchedulerLeadership.get_instance().is_leader:
+            return
 
         db = SessionLocal()
         try:
@@ -5,12 +5,11 @@ This service handles the creation of database and file backups.
 Simplified version using centralized security validation.
 """
 
-import hashlib
+import asyncio
 import json
 import os
 import subprocess
 import tempfile
-import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -23,6 +22,15 @@ from app.core.logging.config import get_logger
 from app.core.utils.security import SecurityValidator
 from app.events.backup_events import BackupCompletedEvent, BackupFailedEvent
 from app.models.models import BackupRecord
+from app.services.backup_archive import (
+    ArchiveEntry,
+    BackupArchive,
+    ProgressCallback,
+    build_archive,
+    collect_upload_entries,
+    file_checksum,
+)
+from app.services.incremental_backup import SnapshotStore
 from app.services.file_management_service import file_management_service
 
 logger = get_logger(__name__, "app")
@@ -35,6 +43,11 @@ class BackupService:
         self.db = db
         self.backup_dir = settings.BACKUP_DIR
 
+    @property
+    def snapshot_store(self) -> SnapshotStore:
+        """Content-addressed store behind incremental files backups."""
+        return SnapshotStore(self.backup_dir / "incremental")
+
     def _get_postgres_version(self) -> str:
         """Get PostgreSQL major version from the database."""
         try:
@@ -91,7 +104,7 @@ class BackupService:
 
             # Calculate checksum and create backup record
             file_size = backup_path.stat().st_size
-            checksum = self._calculate_file_checksum(backup_path)
+            checksum = await asyncio.to_thread(file_checksum, backup_path)
 
             backup_record = BackupRecord(
                 backup_type="database",
@@ -180,7 +193,8 @@ class BackupService:
 
         logger.debug("Executing native pg_dump command")
         try:
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 env=env,
                 check=True,
@@ -245,7 +259,8 @@ class BackupService:
 
         logger.debug("Executing Docker pg_dump command")
         try:
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 check=True,
                 stderr=subprocess.PIPE,
@@ -293,13 +308,20 @@ class BackupService:
             logger.error(f"Failed to record backup failure: {str(e)}")
 
     async def create_files_backup(
-        self, description: Optional[str] = None
+        self,
+        description: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> Dict[str, Any]:
         """
-        Create a backup of the uploads directory using tar.
+        Create a ZIP backup of the uploads directory.
+
+        The archive is built in a worker thread so the event loop keeps
+        serving requests during large backups.
 
         Args:
             description: Optional description for the backup
+            progress: Optional progress(bytes_done, bytes_total) callback,
+                called from the worker thread after each file
 
         Returns:
             Dictionary containing backup information
@@ -320,30 +342,11 @@ class BackupService:
 
             logger.info(f"Starting files backup: {backup_filename}")
 
-            # Create ZIP archive
-            with zipfile.ZipFile(backup_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                # Walk through the uploads directory and add all files
-                for root, dirs, files in os.walk(uploads_dir):
-                    # Skip trash directory
-                    root_path = Path(root)
-                    if "trash" in root_path.parts:
-                        continue
-
-                    for file in files:
-                        file_path = Path(root) / file
-                        # Create archive path relative to uploads directory
-                        arcname = Path("uploads") / file_path.relative_to(uploads_dir)
-                        zipf.write(file_path, arcname)
-
-            # Verify backup file was created
-            if not backup_path.exists():
-                raise Exception("Backup file was not created")
-
-            # Get file size
-            file_size = backup_path.stat().st_size
-
-            # Calculate checksum for integrity verification
-            checksum = self._calculate_file_checksum(backup_path)
+            # Create ZIP archive; size and checksum come from the write itself
+            entries = await asyncio.to_thread(collect_upload_entries, uploads_dir)
+            file_size, checksum = await asyncio.to_thread(
+                build_archive, backup_path, entries, progress=progress
+            )
 
             # Create backup record in database
             backup_record = BackupRecord(
@@ -352,7 +355,7 @@ class BackupService:
                 file_path=str(backup_path),
                 size_bytes=file_size,
                 description=description or f"Files backup created on {datetime.now()}",
-                compression_used=True,
+                compression_used=settings.BACKUP_COMPRESSION != "store",
                 checksum=checksum,
             )
 
@@ -402,6 +405,140 @@ class BackupService:
 
             raise Exception(error_msg)
 
+    async def create_incremental_backup(
+        self,
+        description: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create an incremental files backup.
+
+        Only uploads that are new or changed since the previous incremental
+        backup are hashed, and only content the blob store doesn't already
+        hold is copied. The backup record points at the snapshot manifest;
+        its size is what this run added to the store.
+
+        Args:
+            description: Optional description for the backup
+            progress: Optional progress(files_done, files_total) callback,
+                called from the worker thread
+
+        Returns:
+            Dictionary containing backup information
+        """
+        try:
+            # Cheap enough to run often, so runs can share a second
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            backup_filename = f"files_incremental_{timestamp}.json"
+
+            uploads_dir = settings.UPLOAD_DIR
+            if not uploads_dir.exists():
+                logger.warning(f"Uploads directory does not exist: {uploads_dir}")
+                uploads_dir.mkdir(parents=True, exist_ok=True)
+
+            parent = (
+                self.db.query(BackupRecord)
+                .filter(
+                    BackupRecord.backup_type == "incremental",
+                    BackupRecord.status != "failed",
+                )
+                .order_by(BackupRecord.created_at.desc(), BackupRecord.id.desc())
+                .first()
+            )
+            parent_manifest = Path(parent.file_path) if parent else None
+
+            logger.info(
+                f"Starting incremental files backup: {backup_filename} "
+                f"(parent: {parent_manifest.name if parent_manifest else 'none'})"
+            )
+
+            snapshot = await asyncio.to_thread(
+                self.snapshot_store.create_snapshot,
+                uploads_dir,
+                backup_filename,
+                parent_manifest,
+                progress,
+            )
+            manifest_path = snapshot["manifest_path"]
+            size_bytes = snapshot["stored_bytes"] + snapshot["manifest_bytes"]
+
+            backup_record = BackupRecord(
+                backup_type="incremental",
+                status="created",
+                file_path=str(manifest_path),
+                size_bytes=size_bytes,
+                description=description
+                or f"Incremental files backup created on {datetime.now()}",
+                compression_used=False,
+                checksum=snapshot["checksum"],
+            )
+
+            self.db.add(backup_record)
+            self.db.commit()
+
+            logger.info(
+                f"Incremental files backup completed: {backup_filename} "
+                f"({snapshot['files']} files, {snapshot['new_blobs']} new blobs, "
+                f"{snapshot['stored_bytes']} bytes stored)"
+            )
+
+            event = BackupCompletedEvent(
+                filename=backup_filename,
+                size_mb=round(size_bytes / 1024 / 1024, 2),
+                backup_type="incremental",
+                checksum=snapshot["checksum"],
+            )
+            await get_event_bus().publish(event)
+
+            return {
+                "id": backup_record.id,
+                "backup_type": "incremental",
+                "filename": backup_filename,
+                "file_path": str(manifest_path),
+                "size_bytes": size_bytes,
+                "status": "created",
+                "created_at": backup_record.created_at.isoformat(),
+                "checksum": snapshot["checksum"],
+                "files": snapshot["files"],
+                "total_bytes": snapshot["total_bytes"],
+                "hashed_files": snapshot["hashed_files"],
+                "new_blobs": snapshot["new_blobs"],
+                "stored_bytes": snapshot["stored_bytes"],
+            }
+
+        except Exception as e:
+            error_msg = f"Incremental files backup failed: {str(e)}"
+            logger.error(error_msg)
+            await self._record_failed_backup("incremental", "", error_msg)
+
+            event = BackupFailedEvent(
+                error=str(e),
+                backup_type="incremental",
+                partial_file=None,
+            )
+            await get_event_bus().publish(event)
+
+            raise Exception(error_msg)
+
+    async def _collect_snapshot_garbage(self) -> Dict[str, int]:
+        """Delete blobs no remaining incremental backup references."""
+        live_manifests = [
+            Path(record.file_path)
+            for record in self.db.query(BackupRecord).filter(
+                BackupRecord.backup_type == "incremental",
+                BackupRecord.file_path != "",
+            )
+        ]
+        result = await asyncio.to_thread(
+            self.snapshot_store.collect_garbage, live_manifests
+        )
+        if result["blobs_removed"]:
+            logger.info(
+                f"Removed {result['blobs_removed']} unreferenced backup blobs "
+                f"({result['bytes_freed']} bytes)"
+            )
+        return result
+
     async def list_backups(self) -> List[Dict[str, Any]]:
         """
         List all backup records.
@@ -477,18 +614,30 @@ class BackupService:
                     "status_updated": "missing",
                 }
 
-            # Check file size
+            # Check file size. An incremental backup's size is what it added to
+            # the blob store, not the manifest's size; its checksum covers the
+            # manifest instead.
             current_size = backup_path.stat().st_size
-            size_matches = current_size == backup_record.size_bytes
+            size_matches = (
+                backup_record.backup_type == "incremental"
+                or current_size == backup_record.size_bytes
+            )
 
             # Check checksum if available
             checksum_matches = True
             if backup_record.checksum:  # type: ignore
-                current_checksum = self._calculate_file_checksum(backup_path)
+                current_checksum = await asyncio.to_thread(file_checksum, backup_path)
                 checksum_matches = current_checksum == backup_record.checksum
 
+            # Incremental backups also need every blob their manifest lists
+            missing_blobs = []
+            if backup_record.backup_type == "incremental":
+                missing_blobs = await asyncio.to_thread(
+                    self.snapshot_store.missing_blobs, backup_path
+                )
+
             # Overall verification result
-            verified = size_matches and checksum_matches
+            verified = size_matches and checksum_matches and not missing_blobs
 
             # Update status based on verification result
             new_status = None
@@ -499,6 +648,8 @@ class BackupService:
                     new_status = "size_mismatch"
                 elif not checksum_matches:
                     new_status = "checksum_failed"
+                elif missing_blobs:
+                    new_status = "corrupted"
                 else:
                     new_status = "failed"
 
@@ -513,6 +664,7 @@ class BackupService:
                 "checksum_matches": checksum_matches,
                 "current_size": current_size,
                 "expected_size": backup_record.size_bytes,
+                "missing_blobs": len(missing_blobs),
                 "status_updated": new_status,
             }
 
@@ -548,31 +700,28 @@ class BackupService:
                 logger.info(f"Deleted backup file: {backup_path}")
 
             # Delete database record
+            is_incremental = backup_record.backup_type == "incremental"
             self.db.delete(backup_record)
             self.db.commit()
 
             logger.info(f"Deleted backup record: {backup_id} ({filename})")
 
-            return {
+            result = {
                 "backup_id": backup_id,
                 "filename": filename,
                 "file_deleted": file_deleted,
                 "record_deleted": True,
                 "message": f"Backup '{filename}' deleted successfully",
             }
+            if is_incremental:
+                # Blobs are shared with other snapshots; drop only unreferenced ones
+                result.update(await self._collect_snapshot_garbage())
+            return result
 
         except Exception as e:
             logger.error(f"Failed to delete backup {backup_id}: {str(e)}")
             raise Exception(f"Failed to delete backup: {str(e)}")
 
-    def _calculate_file_checksum(self, file_path: Path) -> str:
-        """Calculate SHA256 checksum of a file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
-
     async def cleanup_old_backups(self) -> Dict[str, Any]:
         """
         Clean up old backups based on enhanced retention policy.
@@ -617,6 +766,7 @@ class BackupService:
 
             deleted_count = 0
             orphaned_deleted = 0
+            incremental_deleted = False
             errors = []
 
             # Delete old backup records and their files
@@ -627,6 +777,7 @@ class BackupService:
                         Path(backup.file_path).unlink()  # type: ignore
 
                     # Delete database record
+                    incremental_deleted |= backup.backup_type == "incremental"
                     self.db.delete(backup)
                     deleted_count += 1
 
@@ -678,6 +829,14 @@ class BackupService:
                 except Exception as e:
                     errors.append(f"Error scanning for orphaned files: {str(e)}")
 
+            # Snapshot blobs are shared, so they go only once nothing references them
+            blob_cleanup = {"blobs_removed": 0, "bytes_freed": 0}
+            if incremental_deleted:
+                try:
+                    blob_cleanup = await self._collect_snapshot_garbage()
+                except Exception as e:
+                    errors.append(f"Error collecting unreferenced blobs: {str(e)}")
+
             logger.info(
                 f"Enhanced cleanup completed: deleted {deleted_count} tracked backups and {orphaned_deleted} orphaned files. "
                 f"Retention: {len(protected_backups)} protected by count, {len(all_backups) - deleted_count} remaining"
@@ -687,6 +846,8 @@ class BackupService:
                 "deleted_count": deleted_count,
                 "orphaned_deleted": orphaned_deleted,
                 "total_deleted": deleted_count + orphaned_deleted,
+                "blobs_removed": blob_cleanup["blobs_removed"],
+                "blob_bytes_freed": blob_cleanup["bytes_freed"],
                 "errors": errors,
                 "cutoff_date": cutoff_date.isoformat(),
                 "retention_stats": {
@@ -834,13 +995,20 @@ class BackupService:
             raise Exception(f"Failed to cleanup orphaned files: {str(e)}")
 
     async def create_full_backup(
-        self, description: Optional[str] = None
+        self,
+        description: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> Dict[str, Any]:
         """
         Create a full system backup (database + files) in a single archive.
 
+        The database dump runs while the uploads are archived in a worker
+        thread; the dump and manifest are appended once pg_dump finishes.
+
         Args:
             description: Optional description for the backup
+            progress: Optional progress(bytes_done, bytes_total) callback over
+                the uploads, called from the worker thread after each file
 
         Returns:
             Dictionary containing backup information
@@ -859,59 +1027,52 @@ class BackupService:
             # Create temporary directory for staging
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
-
-                # Create database backup
                 db_backup_path = temp_path / "database.sql"
-                await self._create_database_dump(db_backup_path)
-
-                # Create manifest file
-                manifest = {
-                    "backup_type": "full",
-                    "created_at": datetime.now().isoformat(),
-                    "description": description
-                    or f"Full system backup created on {datetime.now()}",
-                    "components": {"database": "database.sql", "files": "uploads/"},
-                    "version": "1.0",
-                }
-
-                manifest_path = temp_path / "backup_manifest.json"
-                with open(manifest_path, "w") as f:
-                    json.dump(manifest, f, indent=2)
-
-                # Create ZIP archive with all components
-                with zipfile.ZipFile(backup_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    # Add database dump
-                    zipf.write(db_backup_path, "database.sql")
-
-                    # Add manifest
-                    zipf.write(manifest_path, "backup_manifest.json")
-
-                    # Add files from uploads directory
+                archive = await asyncio.to_thread(BackupArchive, backup_path)
+                dump_task = asyncio.create_task(
+                    self._create_database_dump(db_backup_path)
+                )
+                try:
+                    # Add files from uploads directory while pg_dump runs
                     uploads_dir = settings.UPLOAD_DIR
                     if uploads_dir.exists():
-                        for root, dirs, files in os.walk(uploads_dir):
-                            # Skip trash directory
-                            root_path = Path(root)
-                            if "trash" in root_path.parts:
-                                continue
-
-                            for file in files:
-                                file_path = Path(root) / file
-                                # Create archive path relative to uploads directory
-                                arcname = Path("uploads") / file_path.relative_to(
-                                    uploads_dir
-                                )
-                                zipf.write(file_path, arcname)
-
-            # Verify backup file was created
-            if not backup_path.exists():
-                raise Exception("Backup file was not created")
-
-            # Get file size
-            file_size = backup_path.stat().st_size
+                        entries = await asyncio.to_thread(
+                            collect_upload_entries, uploads_dir
+                        )
+                        await asyncio.to_thread(archive.add, entries, progress)
+
+                    await dump_task
+
+                    # Create manifest file
+                    manifest = {
+                        "backup_type": "full",
+                        "created_at": datetime.now().isoformat(),
+                        "description": description
+                        or f"Full system backup created on {datetime.now()}",
+                        "components": {
+                            "database": "database.sql",
+                            "files": "uploads/",
+                        },
+                        "version": "1.0",
+                    }
 
-            # Calculate checksum for integrity verification
-            checksum = self._calculate_file_checksum(backup_path)
+                    manifest_path = temp_path / "backup_manifest.json"
+                    with open(manifest_path, "w") as f:
+                        json.dump(manifest, f, indent=2)
+
+                    await asyncio.to_thread(
+                        archive.add,
+                        [
+                            ArchiveEntry(db_backup_path, "database.sql"),
+                            ArchiveEntry(manifest_path, "backup_manifest.json"),
+                        ],
+                    )
+                    file_size, checksum = await asyncio.to_thread(archive.close)
+                except BaseException:
+                    dump_task.cancel()
+                    await asyncio.gather(dump_task, return_exceptions=True)
+                    await asyncio.to_thread(archive.abort)
+                    raise
 
             # Create backup record in database
             backup_record = BackupRecord(
@@ -921,7 +1082,7 @@ class BackupService:
                 size_bytes=file_size,
                 description=description
                 or f"Full system backup created on {datetime.now()}",
-                compression_used=True,
+                compression_used=settings.BACKUP_COMPRESSION != "store",
                 checksum=checksum,
             )
 
@@ -0,0 +1,176 @@
+"""
+Blob Store
+
+Content-addressed storage for locally stored entity files. Each distinct
+file content is kept once, under UPLOAD_DIR/files/blobs/<2 hex>/<sha256>,
+however many lab results, encounters or procedures it is attached to.
+
+There is no separate reference counter: a blob's references are the local
+EntityFile rows carrying its content_hash, so the count cannot drift from
+the records. Deleting a record only releases the blob (moves it to trash)
+when no other record references it.
+
+dedupe_local_files() moves files uploaded before the blob store into it,
+removing duplicate copies; see app/scripts/entity_file_dedup_cli.py.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logging.config import get_logger
+from app.models.models import EntityFile
+from app.services.upload_stream import UPLOAD_CHUNK_SIZE, SpooledUpload
+
+logger = get_logger(__name__, "app")
+
+BLOB_DIR_NAME = "blobs"
+
+
+def hash_file(path: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_references(
+    db: Session, content_hash: Optional[str], exclude_ids: Iterable[int] = ()
+) -> int:
+    """Local EntityFile rows referencing a blob, other than ``exclude_ids``."""
+    if not content_hash:
+        # Files stored before the blob store have a path of their own
+        return 0
+    query = db.query(EntityFile).filter(
+        EntityFile.storage_backend == "local",
+        EntityFile.content_hash == content_hash,
+    )
+    exclude_ids = list(exclude_ids)
+    if exclude_ids:
+        query = query.filter(EntityFile.id.notin_(exclude_ids))
+    return query.count()
+
+
+class BlobStore:
+    """Blobs of one uploads directory, keyed by SHA-256."""
+
+    def __init__(self, uploads_dir: Path):
+        self.root = Path(uploads_dir) / "files" / BLOB_DIR_NAME
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / content_hash
+
+    def staging_dir(self) -> Path:
+        """Where uploads are spooled, on the same filesystem as the blobs."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root
+
+    async def store(self, upload: SpooledUpload) -> Tuple[Path, bool]:
+        """
+        Keep a spooled upload as a blob.
+
+        Returns the blob path and whether it was created; when identical
+        content is already stored the spooled copy is left for the caller to
+        discard.
+        """
+        path = self.path_for(upload.sha256)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        if await asyncio.to_thread(path.exists):
+            return path, False
+        await upload.commit(path)
+        return path, True
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Make ``destination`` a copy of ``source`` without touching the source."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        # No hard links here (e.g. across filesystems); copy, then move into
+        # place so a partial copy never looks like a complete blob
+        partial = destination.with_name(destination.name + ".part")
+        shutil.copy2(source, partial)
+        os.replace(partial, destination)
+
+
+def dedupe_local_files(
+    db: Session, store: BlobStore, dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Move local files stored before the blob store into it, in place.
+
+    Each file is hashed; the first copy of a content becomes its blob and
+    later copies are removed once their records point at the blob. Records
+    are committed before the old file is removed, so an interrupted run
+    leaves every record pointing at an existing file.
+
+    Returns counts of files scanned, blobs created, duplicates removed,
+    missing files and bytes reclaimed.
+    """
+    rows = (
+        db.query(EntityFile)
+        .filter(
+            EntityFile.storage_backend == "local",
+            EntityFile.content_hash.is_(None),
+        )
+        .order_by(EntityFile.id)
+        .all()
+    )
+    by_path = defaultdict(list)
+    for row in rows:
+        by_path[row.file_path].append(row)
+
+    stats = {
+        "records": len(rows),
+        "files_scanned": 0,
+        "blobs_created": 0,
+        "duplicates_removed": 0,
+        "missing_files": 0,
+        "bytes_reclaimed": 0,
+    }
+    seen = set()
+    for file_path, records in by_path.items():
+        source = Path(file_path) if file_path else None
+        if source is None or not source.is_file():
+            stats["missing_files"] += 1
+            logger.warning(f"Skipping dedup of missing file: {file_path}")
+            continue
+
+        stats["files_scanned"] += 1
+        content_hash = hash_file(source)
+        blob = store.path_for(content_hash)
+        duplicate = content_hash in seen or blob.exists()
+        seen.add(content_hash)
+        if duplicate:
+            stats["duplicates_removed"] += 1
+            stats["bytes_reclaimed"] += source.stat().st_size
+        else:
+            stats["blobs_created"] += 1
+        if dry_run:
+            continue
+
+        if not duplicate:
+            _link_or_copy(source, blob)
+        for record in records:
+            record.file_path = str(blob)
+            record.content_hash = content_hash
+        db.commit()
+        source.unlink()
+
+    logger.info(
+        "Entity file dedup %s: %d files, %d duplicates, %d bytes reclaimed",
+        "dry run" if dry_run else "completed",
+        stats["files_scanned"],
+        stats["duplicates_removed"],
+        stats["bytes_reclaimed"],
+    )
+    return stats
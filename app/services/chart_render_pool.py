@@ -0,0 +1,252 @@
+"""
+Chart Render Pool
+
+Renders report trend charts off the request thread. Matplotlib's Agg
+rasterization is CPU-bound and holds the GIL, so charts are rendered in a
+bounded pool of worker processes (CHART_RENDER_WORKERS, 0 renders in a
+thread instead), several charts of one report at a time. A chart whose
+worker dies fails and is left out of the report.
+
+Rendered PNGs are kept in an in-memory LRU cache bounded by
+CHART_CACHE_MAX_MB. The key is a content hash of the chart's series and
+labels, the chart style and size, and the report language, so regenerating
+an unchanged report reuses its images, while any new reading, unit
+conversion or translation produces a new key.
+
+Each render reports its timing (time waiting for a worker and render time
+in the worker, or a cache hit) for the caller to log per chart.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.services.trend_chart_generator import (
+    CHART_DPI,
+    CHART_HEIGHT_INCHES,
+    CHART_WIDTH_INCHES,
+    TrendChartGenerator,
+)
+
+logger = get_logger(__name__, "app")
+
+# Bump when the charts' appearance changes, so cached images are not reused
+CHART_STYLE_VERSION = 2
+
+# Chart data keys that affect the image; statistics are shown in the PDF, not
+# drawn on the chart
+_RENDERED_KEYS = (
+    "dates",
+    "values",
+    "statuses",
+    "systolic_values",
+    "diastolic_values",
+    "display_name",
+    "chart_title",
+    "unit",
+    "reference_range",
+    "ref_range_min",
+    "ref_range_max",
+    "date_from",
+    "date_to",
+)
+
+
+@dataclass(frozen=True)
+class ChartJob:
+    """One chart to render: "vital" (with its vital type) or "lab_test"."""
+
+    chart_type: str
+    data: Dict[str, Any]
+    vital_type: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ChartRender:
+    """A rendered chart and how long it took."""
+
+    png_bytes: Optional[bytes]
+    cached: bool
+    wait_ms: float
+    render_ms: float
+
+
+def render_chart(job: ChartJob) -> Tuple[Optional[bytes], float]:
+    """Render one chart; returns (PNG bytes or None, render seconds).
+
+    Runs in the worker processes, so it only takes picklable arguments.
+    """
+    started = time.perf_counter()
+    generator = TrendChartGenerator()
+    if job.chart_type == "vital":
+        png_bytes = generator.generate_vital_chart(job.data, job.vital_type)
+    else:
+        png_bytes = generator.generate_lab_test_chart(job.data)
+    return png_bytes, time.perf_counter() - started
+
+
+def chart_cache_key(job: ChartJob, language: str) -> str:
+    """Content hash of everything that determines a chart's image."""
+    series = {key: job.data.get(key) for key in _RENDERED_KEYS}
+    series_digest = hashlib.sha256(
+        json.dumps(series, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    key = (
+        series_digest,
+        job.chart_type,
+        job.vital_type,
+        CHART_STYLE_VERSION,
+        (CHART_WIDTH_INCHES, CHART_HEIGHT_INCHES, CHART_DPI),
+        language,
+    )
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+
+class ChartRenderPool:
+    """Process pool and PNG cache for report trend charts."""
+
+    _instance: Optional["ChartRenderPool"] = None
+
+    def __init__(
+        self, workers: Optional[int] = None, cache_max_bytes: Optional[int] = None
+    ):
+        self.workers = max(
+            0, settings.CHART_RENDER_WORKERS if workers is None else workers
+        )
+        self.cache_max_bytes = (
+            settings.CHART_CACHE_MAX_MB * 1024 * 1024
+            if cache_max_bytes is None
+            else cache_max_bytes
+        )
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+    @classmethod
+    def get_instance(cls) -> "ChartRenderPool":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — shut down the pool and drop the cache."""
+        if cls._instance is not None:
+            cls._instance.shutdown()
+            cls._instance = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """The worker pool, started on first use; None renders in threads."""
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers don't inherit the server's threads, locks or
+                # database connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(
+                    "Chart render pool started",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "chart_render_pool_started",
+                        "workers": self.workers,
+                    },
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _cached(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png_bytes = self._cache.get(key)
+            if png_bytes is not None:
+                self._cache.move_to_end(key)
+            return png_bytes
+
+    def _store(self, key: str, png_bytes: bytes) -> None:
+        if len(png_bytes) > self.cache_max_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = png_bytes
+            self._cache_bytes += len(png_bytes)
+            while self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    async def _render(self, job: ChartJob) -> Tuple[Optional[bytes], float]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(render_chart, job)
+        try:
+            return await loop.run_in_executor(executor, render_chart, job)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory). The chart fails rather
+            # than rendering in the server process; later reports get a
+            # fresh pool.
+            logger.warning(
+                "Chart render worker died",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "chart_render_pool_broken",
+                    "chart_type": job.chart_type,
+                },
+            )
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    async def render(self, job: ChartJob, language: str = "en") -> ChartRender:
+        """Render one chart, from the cache when an identical one was rendered."""
+        key = chart_cache_key(job, language)
+        png_bytes = self._cached(key)
+        if png_bytes is not None:
+            return ChartRender(png_bytes, cached=True, wait_ms=0.0, render_ms=0.0)
+
+        submitted = time.perf_counter()
+        png_bytes, render_seconds = await self._render(job)
+        elapsed = time.perf_counter() - submitted
+        if png_bytes:
+            self._store(key, png_bytes)
+        return ChartRender(
+            png_bytes,
+            cached=False,
+            wait_ms=max(0.0, elapsed - render_seconds) * 1000,
+            render_ms=render_seconds * 1000,
+        )
+
+    async def render_all(
+        self, jobs: Sequence[ChartJob], language: str = "en"
+    ) -> List[Union[ChartRender, BaseException]]:
+        """
+        Render charts concurrently; the pool bounds how many run at once.
+
+        Returns a ChartRender, or the exception that prevented rendering, per
+        job in order.
+        """
+        return await asyncio.gather(
+            *(self.render(job, language) for job in jobs), return_exceptions=True
+        )
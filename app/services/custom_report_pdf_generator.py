@@ -12,12 +12,9 @@ from typing import Any, Dict, List, Optional
 
 from PIL import Image as PILImage
 from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import (
     Image,
     KeepTogether,
@@ -31,7 +28,7 @@ from reportlab.platypus import (
 
 from app.core.logging.config import get_logger
 from app.services.export_service import UnitConverter
-from app.services.report_translations import get_translator
+from app.services.pdf_rendering_context import CJK_LANGUAGES, PDFRenderingContext
 
 logger = get_logger(__name__, "app")
 
@@ -42,290 +39,24 @@ class CustomReportPDFGenerator:
     # Constants for photo handling
     PATIENT_PHOTO_PATTERN = "patient_{patient_id}_*.jpg"
 
-    # CJK languages that require dedicated CJK fonts for PDF rendering.
-    # Latin-based fonts (DejaVu, Arial) lack glyphs for these scripts.
-    CJK_LANGUAGES = frozenset({"zh", "ja", "ko"})
-
-    def __init__(self):
-        self._register_fonts()
-        self.styles = self._create_styles()
+    # Languages rendered with the CJK fonts
+    CJK_LANGUAGES = CJK_LANGUAGES
+
+    def __init__(self, rendering: Optional[PDFRenderingContext] = None):
+        # Fonts, stylesheets and translators are shared process-wide; only the
+        # per-report selection below belongs to this generator
+        self.rendering = rendering or PDFRenderingContext.get_instance()
+        fonts = self.rendering.fonts
+        self.font_normal = fonts.normal
+        self.font_bold = fonts.bold
+        self.font_cjk_normal = fonts.cjk_normal
+        self.font_cjk_bold = fonts.cjk_bold
+        self._has_cjk_font = fonts.has_cjk
+        self.styles = self.rendering.styles(self.font_normal, self.font_bold)
         # Default translator and preferences (overridden per-report in generate_pdf)
-        self.translator = get_translator("en", "mdy")
+        self.translator = self.rendering.translator("en", "mdy")
         self.unit_system = "imperial"
 
-    def _try_register_font(self, font_name: str, font_paths: List[str]) -> bool:
-        """
-        Helper method to register a font from a list of potential paths.
-
-        Args:
-            font_name: Name to register the font as
-            font_paths: List of potential font file paths to try
-
-        Returns:
-            bool: True if font was successfully registered, False otherwise
-        """
-        for font_path in font_paths:
-            if Path(font_path).exists():
-                try:
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                    logger.info(f"Registered font '{font_name}': {font_path}")
-                    return True
-                except Exception as e:
-                    logger.debug(f"Failed to register font from {font_path}: {e}")
-                    continue
-        return False
-
-    def _register_fonts(self):
-        """
-        Register Unicode-compatible fonts for international character support.
-
-        Registers two font families:
-        1. Latin/Cyrillic fonts (UnicodeFont / UnicodeFont-Bold) for most languages
-        2. CJK fonts (CJKFont / CJKFont-Bold) for Chinese, Japanese, and Korean
-
-        Latin Font Priority:
-            1. DejaVu Sans - Best Unicode coverage for Latin/Cyrillic/Greek
-            2. Arial - Common on Windows, supports Cyrillic and basic Unicode
-            3. Helvetica - Fallback, limited to Latin characters only
-
-        CJK Font Priority:
-            1. Microsoft YaHei - Ships with modern Windows
-            2. Noto Sans CJK SC - Common on Linux
-            3. PingFang SC - Ships with macOS
-
-        The method searches common font directories across Windows, Linux, and macOS.
-        """
-        try:
-            # --- Latin/Cyrillic fonts ---
-            font_paths = [
-                # DejaVu Sans (best Unicode support)
-                "C:/Windows/Fonts/DejaVuSans.ttf",  # Windows
-                "C:/Windows/Fonts/dejavu-sans/DejaVuSans.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
-                "/usr/share/fonts/dejavu/DejaVuSans.ttf",
-                "/Library/Fonts/DejaVuSans.ttf",  # macOS
-                "/System/Library/Fonts/Supplemental/DejaVuSans.ttf",
-                # Arial (fallback, available on most Windows systems, supports Cyrillic)
-                "C:/Windows/Fonts/arial.ttf",
-                "C:/Windows/Fonts/Arial.ttf",
-                "/usr/share/fonts/truetype/msttcorefonts/arial.ttf",
-                "/System/Library/Fonts/Supplemental/Arial.ttf",
-            ]
-
-            bold_paths = [
-                # DejaVu Sans Bold
-                "C:/Windows/Fonts/DejaVuSans-Bold.ttf",
-                "C:/Windows/Fonts/dejavu-sans/DejaVuSans-Bold.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
-                "/Library/Fonts/DejaVuSans-Bold.ttf",
-                "/System/Library/Fonts/Supplemental/DejaVuSans-Bold.ttf",
-                # Arial Bold (fallback)
-                "C:/Windows/Fonts/arialbd.ttf",
-                "C:/Windows/Fonts/Arial Bold.ttf",
-                "/usr/share/fonts/truetype/msttcorefonts/arialbd.ttf",
-                "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
-            ]
-
-            font_registered = self._try_register_font("UnicodeFont", font_paths)
-            bold_registered = self._try_register_font("UnicodeFont-Bold", bold_paths)
-
-            if not font_registered:
-                logger.warning(
-                    "No Unicode font found (DejaVu Sans or Arial). "
-                    "Falling back to Helvetica (limited Unicode support). "
-                    "International characters like Cyrillic may not render correctly."
-                )
-
-            self.font_normal = "UnicodeFont" if font_registered else "Helvetica"
-            self.font_bold = "UnicodeFont-Bold" if bold_registered else "Helvetica-Bold"
-
-            # --- CJK fonts (Chinese, Japanese, Korean) ---
-            cjk_normal_paths = [
-                # Microsoft YaHei (Windows - ships with all modern versions)
-                "C:/Windows/Fonts/msyh.ttc",
-                # Noto Sans CJK SC (Linux)
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-                "/usr/share/fonts/noto-cjk/NotoSansCJKsc-Regular.otf",
-                "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
-                # PingFang SC (macOS)
-                "/System/Library/Fonts/PingFang.ttc",
-                "/Library/Fonts/PingFang.ttc",
-            ]
-            cjk_bold_paths = [
-                "C:/Windows/Fonts/msyhbd.ttc",
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
-                "/usr/share/fonts/noto-cjk/NotoSansCJKsc-Bold.otf",
-                "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
-                "/System/Library/Fonts/PingFang.ttc",
-                "/Library/Fonts/PingFang.ttc",
-            ]
-
-            cjk_registered = self._try_register_font("CJKFont", cjk_normal_paths)
-            cjk_bold_registered = self._try_register_font(
-                "CJKFont-Bold", cjk_bold_paths
-            )
-
-            # Store CJK font names (fall back to Latin fonts if unavailable)
-            self.font_cjk_normal = "CJKFont" if cjk_registered else self.font_normal
-            self.font_cjk_bold = (
-                "CJKFont-Bold" if cjk_bold_registered else self.font_cjk_normal
-            )
-            self._has_cjk_font = cjk_registered
-
-        except Exception as e:
-            logger.error(f"Error registering fonts: {e}")
-            self.font_normal = "Helvetica"
-            self.font_bold = "Helvetica-Bold"
-            self.font_cjk_normal = "Helvetica"
-            self.font_cjk_bold = "Helvetica-Bold"
-            self._has_cjk_font = False
-
-    def _create_styles(
-        self,
-        font_normal: Optional[str] = None,
-        font_bold: Optional[str] = None,
-    ) -> Dict[str, ParagraphStyle]:
-        """Create paragraph styles for the PDF using the given fonts."""
-        font_normal = font_normal or self.font_normal
-        font_bold = font_bold or self.font_bold
-        styles = getSampleStyleSheet()
-
-        # Medical document colors (from UI/UX recommendations)
-        critical_red = colors.HexColor("#D32F2F")
-        warning_orange = colors.HexColor("#F57C00")
-        info_blue = colors.HexColor("#1976D2")
-        neutral_gray = colors.HexColor("#616161")
-        dark_text = colors.HexColor("#212121")
-
-        # Title style
-        styles.add(
-            ParagraphStyle(
-                name="CustomTitle",
-                parent=styles["Title"],
-                fontSize=20,
-                textColor=dark_text,
-                spaceAfter=20,
-                alignment=TA_CENTER,
-                fontName=font_bold,
-            )
-        )
-
-        # Patient header style
-        styles.add(
-            ParagraphStyle(
-                name="PatientHeader",
-                parent=styles["Heading1"],
-                fontSize=16,
-                textColor=dark_text,
-                spaceAfter=10,
-                fontName=font_bold,
-                alignment=TA_LEFT,
-            )
-        )
-
-        # Emergency alert style
-        styles.add(
-            ParagraphStyle(
-                name="EmergencyAlert",
-                parent=styles["BodyText"],
-                fontSize=12,
-                textColor=colors.white,
-                fontName=font_bold,
-                alignment=TA_LEFT,
-                leftIndent=10,
-                rightIndent=10,
-                spaceBefore=5,
-                spaceAfter=5,
-            )
-        )
-
-        # Section header style with icon space
-        styles.add(
-            ParagraphStyle(
-                name="SectionHeader",
-                parent=styles["Heading1"],
-                fontSize=14,
-                textColor=info_blue,
-                spaceAfter=8,
-                spaceBefore=16,
-                fontName=font_bold,
-                leftIndent=0,
-            )
-        )
-
-        # Subsection header style
-        styles.add(
-            ParagraphStyle(
-                name="SubsectionHeader",
-                parent=styles["Heading2"],
-                fontSize=12,
-                textColor=dark_text,
-                spaceAfter=4,
-                spaceBefore=8,
-                fontName=font_bold,
-            )
-        )
-
-        # Body text style
-        styles.add(
-            ParagraphStyle(
-                name="CustomBody",
-                parent=styles["BodyText"],
-                fontSize=10,
-                leading=12,
-                textColor=dark_text,
-                fontName=font_normal,
-            )
-        )
-
-        # Critical info style
-        styles.add(
-            ParagraphStyle(
-                name="CriticalInfo",
-                parent=styles["BodyText"],
-                fontSize=10,
-                textColor=critical_red,
-                fontName=font_bold,
-            )
-        )
-
-        # Warning style
-        styles.add(
-            ParagraphStyle(
-                name="WarningInfo",
-                parent=styles["BodyText"],
-                fontSize=10,
-                textColor=warning_orange,
-                fontName=font_bold,
-            )
-        )
-
-        # Info text style (for metadata)
-        styles.add(
-            ParagraphStyle(
-                name="InfoText",
-                parent=styles["BodyText"],
-                fontSize=9,
-                textColor=neutral_gray,
-                alignment=TA_RIGHT,
-                fontName=font_normal,
-            )
-        )
-
-        # Small text for references
-        styles.add(
-            ParagraphStyle(
-                name="SmallText",
-                parent=styles["BodyText"],
-                fontSize=8,
-                textColor=neutral_gray,
-                fontName=font_normal,
-            )
-        )
-
-        return styles
-
     async def generate_pdf(
         self, report_data: Dict[str, Any], output_buffer: Optional[io.BytesIO] = None
     ) -> bytes:
@@ -352,21 +83,16 @@ class CustomReportPDFGenerator:
         language = report_data.get("language", "en")
         date_format = report_data.get("date_format", "mdy")
         self.unit_system = report_data.get("unit_system", "imperial")
-        self.translator = get_translator(language, date_format)
+        self.translator = self.rendering.translator(language, date_format)
 
-        # Rebuild styles per request so font selection is always correct
-        if language in self.CJK_LANGUAGES:
-            if not self._has_cjk_font:
-                logger.warning(
-                    "No CJK font available for language '%s'. "
-                    "Characters may not render correctly in the PDF.",
-                    language,
-                )
-            self.styles = self._create_styles(
-                font_normal=self.font_cjk_normal, font_bold=self.font_cjk_bold
+        # Select the stylesheet per report so font selection is always correct
+        if language in self.CJK_LANGUAGES and not self._has_cjk_font:
+            logger.warning(
+                "No CJK font available for language '%s'. "
+                "Characters may not render correctly in the PDF.",
+                language,
             )
-        else:
-            self.styles = self._create_styles()
+        self.styles = self.rendering.styles_for_language(language)
 
         # Create document
         doc = SimpleDocTemplate(
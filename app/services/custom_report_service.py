@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
 from app.crud.user_preferences import user_preferences as user_preferences_crud
 from app.models.models import (
     Allergy,
@@ -945,7 +946,7 @@ class CustomReportService:
             # Generate trend charts if requested
             trend_chart_data = []
             if request.trend_charts:
-                trend_chart_data = self._generate_trend_charts(
+                trend_chart_data = await self._generate_trend_charts(
                     patient.id,
                     request.trend_charts,
                     unit_system=unit_system,
@@ -1038,7 +1039,7 @@ class CustomReportService:
                 }
         return converted
 
-    def _generate_trend_charts(
+    async def _generate_trend_charts(
         self,
         patient_id: int,
         trend_charts: "TrendChartSelection",
@@ -1046,86 +1047,166 @@ class CustomReportService:
         language: str = "en",
         date_format: str = "mdy",
     ) -> List[Dict[str, Any]]:
-        """Generate trend chart images and collect their data for PDF inclusion."""
+        """
+        Generate trend chart images and collect their data for PDF inclusion.
+
+        All series are fetched up front, then rendered concurrently by the
+        shared ChartRenderPool (worker processes, with a cache of rendered
+        images).
+        """
+        from app.services.chart_render_pool import ChartJob, ChartRenderPool
         from app.services.report_translations import get_translator
-        from app.services.trend_chart_generator import TrendChartGenerator
         from app.services.trend_data_fetcher import TrendDataFetcher
 
         fetcher = TrendDataFetcher(self.db)
-        generator = TrendChartGenerator()
         translator = get_translator(language, date_format)
-        chart_results = []
+        fetch_started = time.perf_counter()
 
-        # Build a unified list of (label, fetch_fn, render_fn, chart_type) tasks
-        chart_tasks = []
-        for vc in trend_charts.vital_charts:
-            chart_tasks.append(
-                (
-                    vc.vital_type,
-                    lambda v=vc: fetcher.fetch_vital_trend(
-                        patient_id, v.vital_type, v.date_from, v.date_to
-                    ),
-                    lambda data, v=vc: generator.generate_vital_chart(
-                        data, v.vital_type
-                    ),
-                    "vital",
-                )
+        # Read every requested series in one query per kind; if a batched
+        # fetch fails, each chart falls back to its own fetch so one bad
+        # series cannot take the others down with it
+        vital_charts = trend_charts.vital_charts
+        try:
+            vital_trends = fetcher.fetch_vital_trends(
+                patient_id,
+                [(vc.vital_type, vc.date_from, vc.date_to) for vc in vital_charts],
             )
-        for lc in trend_charts.lab_test_charts:
-            label = f"{lc.test_name} ({lc.unit})" if lc.unit else lc.test_name
-            chart_tasks.append(
-                (
-                    label,
-                    lambda chart=lc: fetcher.fetch_lab_test_trend(
-                        patient_id,
-                        chart.test_name,
-                        chart.date_from,
-                        chart.date_to,
-                        unit=chart.unit,
-                    ),
-                    lambda data, chart=lc: generator.generate_lab_test_chart(data),
-                    "lab_test",
-                )
+        except Exception as e:
+            logger.warning(
+                "Batched vital trend fetch failed, fetching per chart",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "report_vital_trend_batch_failed",
+                    LogFields.PATIENT_ID: patient_id,
+                    LogFields.ERROR: str(e),
+                },
             )
+            vital_trends = [None] * len(vital_charts)
 
-        for label, fetch_fn, render_fn, chart_type in chart_tasks:
+        lab_charts = trend_charts.lab_test_charts
+        try:
+            lab_trends = fetcher.fetch_lab_test_trends(
+                patient_id,
+                [
+                    (lc.test_name, lc.date_from, lc.date_to, lc.unit)
+                    for lc in lab_charts
+                ],
+            )
+        except Exception as e:
+            logger.warning(
+                "Batched lab trend fetch failed, fetching per chart",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "report_lab_trend_batch_failed",
+                    LogFields.PATIENT_ID: patient_id,
+                    LogFields.ERROR: str(e),
+                },
+            )
+            lab_trends = [None] * len(lab_charts)
+
+        # (label, chart job) per chart whose data could be read
+        charts = []
+        for vc, data in zip(vital_charts, vital_trends):
+            label = vc.vital_type
             try:
-                data = fetch_fn()
+                if data is None:
+                    data = fetcher.fetch_vital_trend(
+                        patient_id, vc.vital_type, vc.date_from, vc.date_to
+                    )
 
                 # Convert units for vital charts if user prefers metric
-                if chart_type == "vital":
-                    data = self._convert_trend_data_units(data, label, unit_system)
-                    # Use translated display name for vital fields
-                    field_key = label.replace("-", "_")
-                    translated_name = translator.field(field_key)
-                    if (
-                        translated_name != field_key.replace("_", " ").title()
-                        or language == "en"
-                    ):
-                        data["display_name"] = translated_name
+                data = self._convert_trend_data_units(data, label, unit_system)
+                # Use translated display name for vital fields
+                field_key = label.replace("-", "_")
+                translated_name = translator.field(field_key)
+                if (
+                    translated_name != field_key.replace("_", " ").title()
+                    or language == "en"
+                ):
+                    data["display_name"] = translated_name
 
                 # Use the display name directly as the chart title
                 data["chart_title"] = data.get("display_name", label)
+                charts.append((label, ChartJob("vital", data, vc.vital_type)))
+            except Exception as e:
+                logger.error("Failed to generate vital chart %s: %s", label, e)
 
-                png_bytes = render_fn(data)
-                if png_bytes:
-                    chart_results.append(
-                        {
-                            "title": data.get("display_name", label),
-                            "png_bytes": png_bytes,
-                            "statistics": data.get("statistics", {}),
-                            "unit": data.get("unit", ""),
-                            "chart_type": chart_type,
-                            "date_from": data.get("date_from"),
-                            "date_to": data.get("date_to"),
-                        }
+        for lc, data in zip(lab_charts, lab_trends):
+            label = f"{lc.test_name} ({lc.unit})" if lc.unit else lc.test_name
+            try:
+                if data is None:
+                    data = fetcher.fetch_lab_test_trend(
+                        patient_id,
+                        lc.test_name,
+                        lc.date_from,
+                        lc.date_to,
+                        unit=lc.unit,
                     )
-                else:
-                    logger.warning("No data for %s chart: %s", chart_type, label)
+                data["chart_title"] = data.get("display_name", label)
+                charts.append((label, ChartJob("lab_test", data)))
             except Exception as e:
-                logger.error("Failed to generate %s chart %s: %s", chart_type, label, e)
+                logger.error("Failed to generate lab_test chart %s: %s", label, e)
 
-        logger.info("Generated %d trend charts for report", len(chart_results))
+        fetch_ms = (time.perf_counter() - fetch_started) * 1000
+        renders = await ChartRenderPool.get_instance().render_all(
+            [job for _, job in charts], language
+        )
+
+        chart_results = []
+        for (label, job), rendered in zip(charts, renders):
+            if isinstance(rendered, BaseException):
+                logger.error(
+                    "Failed to generate %s chart %s: %s",
+                    job.chart_type,
+                    label,
+                    rendered,
+                )
+                continue
+            logger.info(
+                "Rendered %s chart %s",
+                job.chart_type,
+                label,
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "report_chart_rendered",
+                    LogFields.DURATION: round(rendered.render_ms, 1),
+                    "chart_type": job.chart_type,
+                    "cached": rendered.cached,
+                    "wait_ms": round(rendered.wait_ms, 1),
+                    "png_bytes": len(rendered.png_bytes or b""),
+                },
+            )
+            if not rendered.png_bytes:
+                logger.warning("No data for %s chart: %s", job.chart_type, label)
+                continue
+            data = job.data
+            chart_results.append(
+                {
+                    "title": data.get("display_name", label),
+                    "png_bytes": rendered.png_bytes,
+                    "statistics": data.get("statistics", {}),
+                    "unit": data.get("unit", ""),
+                    "chart_type": job.chart_type,
+                    "date_from": data.get("date_from"),
+                    "date_to": data.get("date_to"),
+                }
+            )
+
+        logger.info(
+            "Generated %d trend charts for report",
+            len(chart_results),
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "report_charts_generated",
+                LogFields.COUNT: len(chart_results),
+                "fetch_ms": round(fetch_ms, 1),
+                "cached": sum(
+                    1
+                    for rendered in renders
+                    if not isinstance(rendered, BaseException) and rendered.cached
+                ),
+            },
+        )
         return chart_results
 
     async def _get_selected_records(
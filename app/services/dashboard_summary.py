@@ -0,0 +1,353 @@
+"""
+Dashboard Summary
+
+Record counts behind the dashboards: per patient for
+``/patients/me/dashboard-stats`` and the export summary, and system-wide for
+the admin dashboard. Each summary is one statement of scalar subqueries -
+one round trip, instead of a COUNT query per record type - and is cached in
+process memory.
+
+A cached summary is dropped when a record it counts is written: mapper
+events on the counted models collect the affected patients while flushing,
+and their entries (and the system-wide summary) are invalidated once the
+transaction commits, so a rolled-back write never evicts anything. Under the
+database state backend the invalidation also bumps a shared generation, and
+the other workers drop their cached summaries on their next lookup. Writes
+the events can't see - bulk ``Query.update``/``delete``, a restore - are
+covered by DASHBOARD_SUMMARY_CACHE_TTL_SECONDS, which also bounds how stale
+the time-based admin figures (recent registrations) get.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import distinct, event, func, select, union
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.shared_state import SharedGeneration
+from app.models.models import (
+    Allergy,
+    Condition,
+    EmergencyContact,
+    Encounter,
+    FamilyMember,
+    Immunization,
+    Injury,
+    Insurance,
+    LabResult,
+    MedicalEquipment,
+    Medication,
+    Patient,
+    Practitioner,
+    Procedure,
+    Symptom,
+    Treatment,
+    User,
+    Vitals,
+)
+
+_PENDING_KEY = "dashboard_summary_pending"
+
+# Per-patient counts, in the order the export summary has always listed them.
+# "practitioners" and "pharmacies" are derived; see patient_summary_statement.
+PATIENT_COUNT_MODELS = {
+    "medications": Medication,
+    "lab_results": LabResult,
+    "allergies": Allergy,
+    "conditions": Condition,
+    "immunizations": Immunization,
+    "procedures": Procedure,
+    "treatments": Treatment,
+    "encounters": Encounter,
+    "vitals": Vitals,
+    "emergency_contacts": EmergencyContact,
+    "practitioners": None,
+    "pharmacies": None,
+    "symptoms": Symptom,
+    "injuries": Injury,
+    "family_history": FamilyMember,
+    "insurance": Insurance,
+    "medical_equipment": MedicalEquipment,
+}
+
+# System-wide totals for the admin dashboard
+GLOBAL_COUNT_MODELS = {
+    "users": User,
+    "patients": Patient,
+    "practitioners": Practitioner,
+    "medications": Medication,
+    "lab_results": LabResult,
+    "vitals": Vitals,
+    "conditions": Condition,
+    "allergies": Allergy,
+    "immunizations": Immunization,
+    "procedures": Procedure,
+    "treatments": Treatment,
+    "encounters": Encounter,
+}
+
+RECENT_REGISTRATION_DAYS = 30
+
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def patient_summary_statement(patient_id: int):
+    """One row: the patient's id (None if missing) and a column per count."""
+    columns = [
+        select(Patient.id)
+        .where(Patient.id == patient_id)
+        .scalar_subquery()
+        .label("patient_id")
+    ]
+    for name, model in PATIENT_COUNT_MODELS.items():
+        if model is not None:
+            columns.append(_count(model, model.patient_id == patient_id).label(name))
+
+    # Distinct practitioners across the primary care physician and the
+    # medications, encounters and lab results that name one
+    practitioner_ids = union(
+        select(Patient.physician_id.label("practitioner_id")).where(
+            Patient.id == patient_id
+        ),
+        select(Medication.practitioner_id).where(Medication.patient_id == patient_id),
+        select(Encounter.practitioner_id).where(Encounter.patient_id == patient_id),
+        select(LabResult.practitioner_id).where(LabResult.patient_id == patient_id),
+    ).subquery()
+    columns.append(
+        select(func.count())
+        .select_from(practitioner_ids)
+        .where(practitioner_ids.c.practitioner_id.isnot(None))
+        .scalar_subquery()
+        .label("practitioners")
+    )
+    columns.append(
+        select(func.count(distinct(Medication.pharmacy_id)))
+        .where(Medication.patient_id == patient_id)
+        .scalar_subquery()
+        .label("pharmacies")
+    )
+    return select(*columns)
+
+
+def global_summary_statement(now: datetime):
+    """One row with a column per system-wide total."""
+    columns = [
+        _count(model).label(name) for name, model in GLOBAL_COUNT_MODELS.items()
+    ]
+    columns += [
+        _count(
+            User, User.created_at >= now - timedelta(days=RECENT_REGISTRATION_DAYS)
+        ).label("recent_registrations"),
+        _count(Medication, Medication.status.in_(["active", "current"])).label(
+            "active_medications"
+        ),
+        _count(LabResult, LabResult.status == "pending").label("pending_lab_results"),
+    ]
+    return select(*columns)
+
+
+class DashboardSummaryCache:
+    """TTL cache of per-patient summaries plus the system-wide one.
+
+    Thread-safe. Every invalidation bumps ``version``; a summary computed
+    from a read that started before an invalidation is not stored, so a
+    write committed mid-computation can't be masked by the older result.
+    """
+
+    def __init__(
+        self, ttl_seconds: int, max_entries: int, generation: str = "dashboard_summary"
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._generation = SharedGeneration(generation)
+        self._patients: "OrderedDict[int, Tuple[Dict, float]]" = OrderedDict()
+        self._global: Optional[Tuple[Dict, float]] = None
+        self._lock = threading.Lock()
+        self.version = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _check_generation(self) -> None:
+        """Drop everything if another worker invalidated summaries."""
+        if self._generation.changed():
+            with self._lock:
+                self._drop_entries()
+
+    def _drop_entries(self) -> None:
+        """Caller must hold ``_lock``."""
+        self._patients.clear()
+        self._global = None
+        self.version += 1
+
+    def _fresh(self, entry: Optional[Tuple[Dict, float]]) -> Optional[Dict]:
+        """Caller must hold ``_lock``."""
+        if entry is not None and entry[1] > time.monotonic():
+            self._hits += 1
+            return entry[0]
+        self._misses += 1
+        return None
+
+    def get_patient(self, patient_id: int) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        self._check_generation()
+        with self._lock:
+            return self._fresh(self._patients.get(patient_id))
+
+    def put_patient(self, patient_id: int, summary: Dict, version: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._patients.pop(patient_id, None)
+            self._patients[patient_id] = (summary, time.monotonic() + self.ttl_seconds)
+            while len(self._patients) > self.max_entries:
+                # Oldest insertion first; every entry has the same TTL
+                self._patients.popitem(last=False)
+
+    def get_global(self) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        self._check_generation()
+        with self._lock:
+            return self._fresh(self._global)
+
+    def put_global(self, summary: Dict, version: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if version == self.version:
+                self._global = (summary, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, patient_ids: Set[int]) -> None:
+        """Drop these patients' summaries and the system-wide one."""
+        with self._lock:
+            for patient_id in patient_ids:
+                self._patients.pop(patient_id, None)
+            self._global = None
+            self.version += 1
+        if self.enabled:
+            self._generation.bump()
+
+    def clear(self) -> None:
+        """Drop everything and reset the counters. For tests and admin resets."""
+        with self._lock:
+            self._drop_entries()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._patients),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+dashboard_summary_cache = DashboardSummaryCache(
+    ttl_seconds=settings.DASHBOARD_SUMMARY_CACHE_TTL_SECONDS,
+    max_entries=settings.DASHBOARD_SUMMARY_CACHE_MAX_ENTRIES,
+)
+
+
+def get_patient_summary(db: Session, patient_id: int) -> Optional[Dict]:
+    """
+    ``{"patient_id": ..., "counts": {...}}`` for a patient, or None if the
+    patient doesn't exist.
+    """
+    cached = dashboard_summary_cache.get_patient(patient_id)
+    if cached is None:
+        version = dashboard_summary_cache.version
+        row = db.execute(patient_summary_statement(patient_id)).one()
+        if row.patient_id is None:
+            return None
+        cached = {
+            "patient_id": row.patient_id,
+            "counts": {name: row._mapping[name] for name in PATIENT_COUNT_MODELS},
+        }
+        dashboard_summary_cache.put_patient(patient_id, cached, version)
+    return {"patient_id": cached["patient_id"], "counts": dict(cached["counts"])}
+
+
+def get_global_summary(db: Session) -> Dict[str, int]:
+    """System-wide totals keyed as GLOBAL_COUNT_MODELS, plus the status counts."""
+    cached = dashboard_summary_cache.get_global()
+    if cached is None:
+        version = dashboard_summary_cache.version
+        row = db.execute(global_summary_statement(datetime.utcnow())).one()
+        cached = dict(row._mapping)
+        dashboard_summary_cache.put_global(cached, version)
+    return dict(cached)
+
+
+def _pending(target) -> Optional[Set[int]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+def _after_record_write(_mapper, _connection, target) -> None:
+    pending = _pending(target)
+    if pending is not None and target.patient_id is not None:
+        pending.add(target.patient_id)
+
+
+def _after_patient_write(_mapper, _connection, target) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending.add(target.id)
+
+
+def _after_global_write(_mapper, _connection, target) -> None:
+    # Counted only system-wide; an empty pending set still invalidates that
+    _pending(target)
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        dashboard_summary_cache.invalidate(pending)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_dashboard_summary_listeners() -> None:
+    """Invalidate cached summaries on writes to counted models. Idempotent."""
+    if event.contains(Session, "after_commit", _after_commit):
+        return
+    listeners = [(Patient, _after_patient_write)]
+    listeners += [(User, _after_global_write), (Practitioner, _after_global_write)]
+    listeners += [
+        (model, _after_record_write)
+        for model in PATIENT_COUNT_MODELS.values()
+        if model is not None
+    ]
+    for model, listener in listeners:
+        for mapper_event in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, mapper_event, listener)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+# Attached at import: app.crud imports this module (see app.crud.patient), so any
+# process that writes through the CRUD layer keeps its cache current.
+register_dashboard_summary_listeners()
@@ -0,0 +1,166 @@
+"""
+Document Sync Checking
+
+Existence checks for documents stored in Paperless-ngx or Papra, used by
+GenericEntityFileService's sync checks.
+
+Paperless documents are checked in bulk: one documents-list request per
+page of IDs (``id__in`` filter) instead of one request per document. If the
+server rejects the filtered listing, that page falls back to per-document
+checks, as do the pages after it. Papra has no bulk lookup, so its documents
+are checked one request each. Per-document checks run concurrently, at most
+DOCUMENT_SYNC_CONCURRENCY at a time, so a large library neither takes
+minutes nor floods the document server.
+
+A record's last_sync_at is the result cache: a record that was found
+"synced" less than DOCUMENT_SYNC_TTL_SECONDS ago is not checked again.
+Missing, errored and never-checked records are always checked.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.services.paperless_service import PaperlessAuthenticationError
+
+logger = get_logger(__name__, "app")
+
+# Per document ID: True (exists), False (missing) or the error that prevented
+# an answer
+ExistenceResult = Union[bool, Exception]
+
+
+def is_recently_synced(
+    file_record: Any, now: datetime, ttl_seconds: Optional[int] = None
+) -> bool:
+    """Whether a record was confirmed present recently enough to skip."""
+    ttl = ttl_seconds if ttl_seconds is not None else settings.DOCUMENT_SYNC_TTL_SECONDS
+    last_sync_at = file_record.last_sync_at
+    if ttl <= 0 or file_record.sync_status != "synced" or last_sync_at is None:
+        return False
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if last_sync_at.tzinfo is None:
+        last_sync_at = last_sync_at.replace(tzinfo=timezone.utc)
+    return now - last_sync_at < timedelta(seconds=ttl)
+
+
+async def _check_each(
+    check: Callable[[str], Awaitable[bool]],
+    document_ids: Iterable[str],
+    concurrency: int,
+) -> Dict[str, ExistenceResult]:
+    """Run check(document_id) for each ID, at most ``concurrency`` at once."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(document_id: str) -> ExistenceResult:
+        async with semaphore:
+            try:
+                return await check(document_id)
+            except (PaperlessAuthenticationError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                return e
+
+    document_ids = list(document_ids)
+    results = await asyncio.gather(*(guarded(doc_id) for doc_id in document_ids))
+    return dict(zip(document_ids, results))
+
+
+async def check_paperless_documents(
+    paperless_service: Any,
+    document_ids: Iterable[str],
+    concurrency: Optional[int] = None,
+    page_size: Optional[int] = None,
+) -> Dict[str, ExistenceResult]:
+    """
+    Check which Paperless documents exist.
+
+    Args:
+        paperless_service: An entered Paperless service
+        document_ids: Document IDs as stored on EntityFile records
+        concurrency: Parallel per-document checks (fallback path)
+        page_size: Document IDs per bulk listing request
+
+    Returns:
+        Existence result per document ID, keyed by the stripped ID as given
+
+    Raises:
+        PaperlessAuthenticationError: Authentication failed; nothing can be
+            checked
+    """
+    concurrency = concurrency or settings.DOCUMENT_SYNC_CONCURRENCY
+    page_size = page_size or settings.DOCUMENT_SYNC_PAGE_SIZE
+
+    # Numeric ID -> the IDs as given ("7", "007"), so results are keyed the
+    # way the caller looks them up
+    numeric: Dict[int, List[str]] = {}
+    others: List[str] = []
+    for document_id in dict.fromkeys(str(doc_id).strip() for doc_id in document_ids):
+        if document_id.isdigit() and int(document_id) > 0:
+            numeric.setdefault(int(document_id), []).append(document_id)
+        else:
+            # Task UUIDs and malformed IDs; check_document_exists reports
+            # them missing without a request
+            others.append(document_id)
+
+    results: Dict[str, ExistenceResult] = {}
+    fallback: List[str] = list(others)
+    bulk_supported = True
+    numeric_ids = list(numeric)
+    for start in range(0, len(numeric_ids), page_size):
+        page = numeric_ids[start : start + page_size]
+        if not bulk_supported:
+            fallback.extend(doc_id for num in page for doc_id in numeric[num])
+            continue
+        try:
+            existing = await paperless_service.get_existing_document_ids(page)
+        except PaperlessAuthenticationError:
+            raise
+        except Exception as e:
+            logger.info(
+                f"Bulk document listing unavailable, checking {len(page)} "
+                f"documents individually: {e}"
+            )
+            fallback.extend(doc_id for num in page for doc_id in numeric[num])
+            bulk_supported = False
+            continue
+        for num in page:
+            for doc_id in numeric[num]:
+                results[doc_id] = num in existing
+
+    if fallback:
+        results.update(
+            await _check_each(
+                paperless_service.check_document_exists, fallback, concurrency
+            )
+        )
+    return results
+
+
+async def check_papra_documents(
+    papra_client: Any,
+    document_ids: Iterable[str],
+    concurrency: Optional[int] = None,
+) -> Dict[str, ExistenceResult]:
+    """
+    Check which Papra documents exist, one request per document.
+
+    Args:
+        papra_client: An entered PapraClient
+        document_ids: Papra document IDs
+        concurrency: Parallel requests
+
+    Returns:
+        Existence result per document ID
+    """
+
+    async def exists(document_id: str) -> bool:
+        return await papra_client.get_document_info(document_id) is not None
+
+    return await _check_each(
+        exists,
+        dict.fromkeys(document_ids),
+        concurrency or settings.DOCUMENT_SYNC_CONCURRENCY,
+    )
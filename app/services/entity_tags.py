@@ -0,0 +1,392 @@
+"""
+Entity Tags Service - maintains the normalized tag index over tagged records.
+
+Every tagged record type (lab results, medications, conditions, procedures,
+immunizations, treatments, encounters, allergies, injuries, medical equipment,
+symptoms) keeps its tags in a JSON ``tags`` array. ``entity_tags`` holds one
+row per (record, tag) so tag statistics, tag filters and tag renames can find
+records with indexed lookups and set operations (``tagged_ids``) instead of
+expanding every record's array.
+
+Rows are written from SQLAlchemy mapper events, so every ORM insert, update and
+delete on a tagged model keeps the index current in the same transaction; an
+update only rewrites the record's rows when its tags or patient changed. Write
+paths that bypass the ORM unit of work call ``index_records`` /
+``remove_records`` themselves. ``rebuild`` regenerates the rows from the source
+tables, and ``check`` compares them against the records (and
+optionally repairs the difference); both are available from
+``app/scripts/entity_tags_cli.py``. The Alembic migration that adds the table
+backfills it, and startup verifies it once for databases created without
+Alembic.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.crud.system_setting import system_setting
+from app.models.models import (
+    Allergy,
+    Condition,
+    Encounter,
+    EntityTag,
+    Immunization,
+    Injury,
+    LabResult,
+    MedicalEquipment,
+    Medication,
+    Procedure,
+    Symptom,
+    Treatment,
+)
+
+logger = get_logger(__name__, "app")
+
+# Bump when the row format changes; startup re-verifies the index once for
+# each new version.
+INDEX_VERSION = "1"
+INDEX_VERSION_KEY = "entity_tags_version"
+
+REBUILD_BATCH_SIZE = 500
+
+# Longer values can't be stored in entity_tags.tag; the tag schemas cap tags
+# at 50 characters, so only records written around the API have them.
+MAX_TAG_LENGTH = 100
+
+# Keyed by the record type names the tag API uses
+TAGGED_MODELS: Dict[str, type] = {
+    "lab_result": LabResult,
+    "medication": Medication,
+    "condition": Condition,
+    "procedure": Procedure,
+    "immunization": Immunization,
+    "treatment": Treatment,
+    "encounter": Encounter,
+    "allergy": Allergy,
+    "injury": Injury,
+    "medical_equipment": MedicalEquipment,
+    "symptom": Symptom,
+}
+
+_TYPE_BY_MODEL: Dict[type, str] = {
+    model: entity_type for entity_type, model in TAGGED_MODELS.items()
+}
+
+
+def entity_type_for(model: type) -> str:
+    """The entity_tags record type of a tagged model."""
+    try:
+        return _TYPE_BY_MODEL[model]
+    except KeyError:
+        raise ValueError(f"{model.__name__} is not a tagged model") from None
+
+
+def normalize_tags(tags: Any) -> List[str]:
+    """The distinct indexable tags of a ``tags`` value, in their stored order."""
+    if not isinstance(tags, list):
+        return []
+    return list(
+        dict.fromkeys(
+            tag
+            for tag in tags
+            if isinstance(tag, str) and tag and len(tag) <= MAX_TAG_LENGTH
+        )
+    )
+
+
+def build_rows(obj: Any) -> List[Dict[str, Any]]:
+    """Project a model instance into entity_tags column values.
+
+    Returns no rows for instances of untagged models or without a patient.
+    """
+    entity_type = _TYPE_BY_MODEL.get(type(obj))
+    if entity_type is None or obj.patient_id is None:
+        return []
+    return [
+        {
+            "entity_type": entity_type,
+            "entity_id": obj.id,
+            "patient_id": obj.patient_id,
+            "tag": tag,
+        }
+        for tag in normalize_tags(obj.tags)
+    ]
+
+
+def _write_rows(
+    connection,
+    entity_type: str,
+    entity_ids: Sequence[int],
+    rows: Sequence[Dict[str, Any]],
+) -> None:
+    """Replace the rows of the given records (delete + insert)."""
+    tag_table = EntityTag.__table__
+    connection.execute(
+        delete(tag_table).where(
+            tag_table.c.entity_type == entity_type,
+            tag_table.c.entity_id.in_(entity_ids),
+        )
+    )
+    if rows:
+        connection.execute(insert(tag_table), list(rows))
+
+
+def index_records(db: Session, objects: Iterable[Any]) -> int:
+    """Index (or re-index) persisted records in the session's transaction.
+
+    For write paths that bypass mapper events, e.g. ``bulk_save_objects``.
+    Objects must already have primary keys. Returns the number of rows written.
+    """
+    by_type: Dict[str, Tuple[List[int], List[Dict[str, Any]]]] = {}
+    for obj in objects:
+        entity_type = _TYPE_BY_MODEL.get(type(obj))
+        if entity_type is None:
+            continue
+        entity_ids, rows = by_type.setdefault(entity_type, ([], []))
+        entity_ids.append(obj.id)
+        rows.extend(build_rows(obj))
+
+    connection = db.connection()
+    written = 0
+    for entity_type, (entity_ids, rows) in by_type.items():
+        _write_rows(connection, entity_type, entity_ids, rows)
+        written += len(rows)
+    return written
+
+
+def remove_records(db: Session, entity_type: str, entity_ids: Any) -> None:
+    """Drop the rows of records of one type.
+
+    ``entity_ids`` may be a list of IDs or a select of IDs, so bulk deletes can
+    pass the same criteria they delete by.
+    """
+    tag_table = EntityTag.__table__
+    db.execute(
+        delete(tag_table).where(
+            tag_table.c.entity_type == entity_type,
+            tag_table.c.entity_id.in_(entity_ids),
+        )
+    )
+
+
+def tagged_ids(
+    entity_type: str,
+    tags: Sequence[str],
+    *,
+    match_all: bool = False,
+    patient_id: Optional[int] = None,
+    patient_ids: Any = None,
+):
+    """A select of the IDs of ``entity_type`` records tagged with ``tags``.
+
+    Any one of the tags by default; every one of them with ``match_all``.
+    ``patient_ids`` may be a list of IDs or a select of IDs.
+    """
+    distinct_tags = list(dict.fromkeys(tags))
+    query = select(EntityTag.entity_id).where(
+        EntityTag.entity_type == entity_type,
+        EntityTag.tag.in_(distinct_tags),
+    )
+    if patient_id is not None:
+        query = query.where(EntityTag.patient_id == patient_id)
+    if patient_ids is not None:
+        query = query.where(EntityTag.patient_id.in_(patient_ids))
+    if match_all and len(distinct_tags) > 1:
+        # One row per (record, tag), so a record has them all when its group
+        # holds one row per requested tag
+        return query.group_by(EntityTag.entity_id).having(
+            func.count(EntityTag.id) == len(distinct_tags)
+        )
+    return query.distinct()
+
+
+def _after_insert(_mapper, connection, target) -> None:
+    rows = build_rows(target)
+    if rows:
+        connection.execute(insert(EntityTag.__table__), rows)
+
+
+def _after_update(_mapper, connection, target) -> None:
+    state = inspect(target)
+    if not (
+        state.attrs.tags.history.has_changes()
+        or state.attrs.patient_id.history.has_changes()
+    ):
+        return
+    _write_rows(
+        connection, _TYPE_BY_MODEL[type(target)], [target.id], build_rows(target)
+    )
+
+
+def _after_delete(_mapper, connection, target) -> None:
+    _write_rows(connection, _TYPE_BY_MODEL[type(target)], [target.id], [])
+
+
+def register_entity_tags_listeners() -> None:
+    """Attach entity_tags maintenance to every tagged model. Idempotent."""
+    for model in _TYPE_BY_MODEL:
+        if event.contains(model, "after_insert", _after_insert):
+            continue
+        event.listen(model, "after_insert", _after_insert)
+        event.listen(model, "after_update", _after_update)
+        event.listen(model, "after_delete", _after_delete)
+
+
+def _source_rows(db: Session, entity_type: str, patient_id: Optional[int] = None):
+    """Stream (id, patient_id, tags) of one type's tagged records."""
+    model = TAGGED_MODELS[entity_type]
+    query = select(model.id, model.patient_id, model.tags).where(
+        model.tags.isnot(None), model.patient_id.isnot(None)
+    )
+    if patient_id is not None:
+        query = query.where(model.patient_id == patient_id)
+    return db.execute(
+        query.order_by(model.id).execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+
+
+def rebuild(db: Session, *, patient_id: Optional[int] = None) -> Dict[str, int]:
+    """Regenerate entity_tags rows from the source tables.
+
+    Rebuilds everything, or one patient's records when ``patient_id`` is given.
+    Commits once per record type. Returns the number of rows written per type.
+    """
+    tag_table = EntityTag.__table__
+    purge = delete(tag_table)
+    if patient_id is not None:
+        purge = purge.where(tag_table.c.patient_id == patient_id)
+    db.execute(purge)
+
+    counts: Dict[str, int] = {}
+    for entity_type in TAGGED_MODELS:
+        written = 0
+        batch: List[Dict[str, Any]] = []
+        for entity_id, owner_id, tags in _source_rows(db, entity_type, patient_id):
+            batch.extend(
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "patient_id": owner_id,
+                    "tag": tag,
+                }
+                for tag in normalize_tags(tags)
+            )
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                db.execute(insert(tag_table), batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            db.execute(insert(tag_table), batch)
+            written += len(batch)
+
+        db.commit()
+        counts[entity_type] = written
+
+    logger.info(
+        "Entity tags rebuilt",
+        extra={
+            LogFields.CATEGORY: "app",
+            LogFields.EVENT: "entity_tags_rebuilt",
+            LogFields.PATIENT_ID: patient_id,
+            LogFields.COUNT: sum(counts.values()),
+        },
+    )
+    return counts
+
+
+def check(db: Session, *, repair: bool = False) -> Dict[str, Dict[str, int]]:
+    """Compare entity_tags with the records' tags.
+
+    Returns, per record type, the rows the index is ``missing`` (tags on a
+    record with no row) and the ``extra`` rows it holds (for tags, records or
+    patients that no longer match). With ``repair``, inserts the missing rows,
+    deletes the extra ones and commits.
+    """
+    tag_table = EntityTag.__table__
+    report: Dict[str, Dict[str, int]] = {}
+    for entity_type in TAGGED_MODELS:
+        expected: Set[Tuple[int, int, str]] = {
+            (entity_id, owner_id, tag)
+            for entity_id, owner_id, tags in _source_rows(db, entity_type)
+            for tag in normalize_tags(tags)
+        }
+        extra_ids: List[int] = []
+        for row_id, entity_id, owner_id, tag in db.execute(
+            select(
+                tag_table.c.id,
+                tag_table.c.entity_id,
+                tag_table.c.patient_id,
+                tag_table.c.tag,
+            ).where(tag_table.c.entity_type == entity_type)
+        ):
+            key = (entity_id, owner_id, tag)
+            if key in expected:
+                expected.discard(key)
+            else:
+                extra_ids.append(row_id)
+
+        report[entity_type] = {"missing": len(expected), "extra": len(extra_ids)}
+        if not repair or not (expected or extra_ids):
+            continue
+
+        for start in range(0, len(extra_ids), REBUILD_BATCH_SIZE):
+            db.execute(
+                delete(tag_table).where(
+                    tag_table.c.id.in_(extra_ids[start : start + REBUILD_BATCH_SIZE])
+                )
+            )
+        missing = [
+            {
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "patient_id": owner_id,
+                "tag": tag,
+            }
+            for entity_id, owner_id, tag in sorted(expected)
+        ]
+        for start in range(0, len(missing), REBUILD_BATCH_SIZE):
+            db.execute(insert(tag_table), missing[start : start + REBUILD_BATCH_SIZE])
+        db.commit()
+
+    drift = {key: counts for key, counts in report.items() if any(counts.values())}
+    if drift:
+        logger.warning(
+            "Entity tags out of step with records",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "entity_tags_inconsistent",
+                "repaired": repair,
+                "by_type": drift,
+            },
+        )
+    return report
+
+
+def run_one_time_build(db: Session) -> Dict[str, Any]:
+    """Verify and repair the index once per INDEX_VERSION.
+
+    The Alembic migration backfills entity_tags; this covers databases whose
+    schema came from ``create_all`` (Windows EXE mode), where the table starts
+    empty next to existing records.
+    """
+    current = system_setting.get_setting(db, INDEX_VERSION_KEY)
+    if current == INDEX_VERSION:
+        return {"skipped": True, "reason": "already_built"}
+
+    report = check(db, repair=True)
+    system_setting.set_setting(db, INDEX_VERSION_KEY, INDEX_VERSION)
+    return {
+        "skipped": False,
+        "repaired": sum(
+            counts["missing"] + counts["extra"] for counts in report.values()
+        ),
+        "by_type": report,
+    }
+
+
+# Attached at import: app.crud.base_tags imports this module, so any process
+# that loads the tagged record CRUD keeps the index current.
+register_entity_tags_listeners()
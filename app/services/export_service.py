@@ -7,9 +7,10 @@ in various formats including JSON, CSV, and PDF.
 
 import csv
 import io
+import itertools
 import json
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -39,6 +40,7 @@ from app.models.models import (
     User,
     Vitals,
 )
+from app.services.dashboard_summary import get_patient_summary
 from app.services.report_translations import get_translator
 
 logger = get_logger(__name__, "app")
@@ -49,6 +51,63 @@ UNIT_LABELS = {
     "metric": {"weight": "kg", "height": "cm", "temperature": "°C"},
 }
 
+# Categories exported for scope "all", in output order
+EXPORT_CATEGORIES = (
+    "medications",
+    "lab_results",
+    "allergies",
+    "conditions",
+    "immunizations",
+    "procedures",
+    "treatments",
+    "encounters",
+    "vitals",
+    "emergency_contacts",
+    "practitioners",
+    "pharmacies",
+    "symptoms",
+    "injuries",
+    "family_history",
+    "insurance",
+    "medical_equipment",
+)
+
+# Scopes that can grow without bound (years of CGM vitals). The export
+# endpoint streams these through stream_patient_data() instead of building
+# the whole file in memory.
+STREAMED_EXPORT_SCOPES = frozenset({"all", "vitals"})
+
+# Vitals rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = 1000
+
+# Streamed output is flushed to the response in chunks of roughly this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(obj: Any) -> Any:
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def _buffered(chunks: Iterable[str]) -> Iterator[str]:
+    """Coalesce many small text chunks into ones of about STREAM_CHUNK_SIZE."""
+    pending: List[str] = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= STREAM_CHUNK_SIZE:
+            yield "".join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield "".join(pending)
+
 
 class UnitConverter:
     """Utility class for converting between imperial and metric units."""
@@ -129,46 +188,24 @@ class ExportService:
             Dictionary containing exported data
         """
         try:
-            # Get the active patient for the user
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if not user:
-                raise ValueError("User not found")
-
-            if not user.active_patient_id:
-                raise ValueError("No active patient selected")
-
-            patient = (
-                self.db.query(Patient)
-                .options(
-                    joinedload(Patient.practitioner).joinedload(
-                        Practitioner.specialty_rel
-                    )
-                )
-                .filter(Patient.id == user.active_patient_id)
-                .first()
-            )
-            if not patient:
-                raise ValueError("Active patient record not found")
+            patient = self._get_active_patient(user_id)
 
             # Validate unit_system
             if unit_system not in ("imperial", "metric"):
                 unit_system = "imperial"
 
             export_data = {
-                "export_metadata": {
-                    "generated_at": datetime.now().isoformat(),
-                    "format": format,
-                    "scope": scope,
-                    "include_files": include_files,
-                    "include_patient_info": include_patient_info,
-                    "unit_system": unit_system,
-                    "language": language,
-                    "date_format": date_format,
-                    "date_range": {
-                        "start": start_date.isoformat() if start_date else None,
-                        "end": end_date.isoformat() if end_date else None,
-                    },
-                },
+                "export_metadata": self._export_metadata(
+                    format,
+                    scope,
+                    start_date,
+                    end_date,
+                    include_files,
+                    include_patient_info,
+                    unit_system,
+                    language,
+                    date_format,
+                ),
             }
 
             # Conditionally include patient info
@@ -272,6 +309,200 @@ class ExportService:
             logger.error(f"Export failed for user {user_id}: {str(e)}")
             raise
 
+    def _get_active_patient(self, user_id: int) -> Patient:
+        """Load the user's active patient, raising ValueError if there is none."""
+        user = self.db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise ValueError("User not found")
+
+        if not user.active_patient_id:
+            raise ValueError("No active patient selected")
+
+        patient = (
+            self.db.query(Patient)
+            .options(
+                joinedload(Patient.practitioner).joinedload(Practitioner.specialty_rel)
+            )
+            .filter(Patient.id == user.active_patient_id)
+            .first()
+        )
+        if not patient:
+            raise ValueError("Active patient record not found")
+        return patient
+
+    def _export_metadata(
+        self,
+        format: str,
+        scope: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        include_files: bool,
+        include_patient_info: bool,
+        unit_system: str,
+        language: str,
+        date_format: str,
+    ) -> Dict[str, Any]:
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "format": format,
+            "scope": scope,
+            "include_files": include_files,
+            "include_patient_info": include_patient_info,
+            "unit_system": unit_system,
+            "language": language,
+            "date_format": date_format,
+            "date_range": {
+                "start": start_date.isoformat() if start_date else None,
+                "end": end_date.isoformat() if end_date else None,
+            },
+        }
+
+    def stream_patient_data(
+        self,
+        user_id: int,
+        format: str,
+        scope: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include_patient_info: bool = True,
+        unit_system: str = "imperial",
+        language: str = "en",
+        date_format: str = "mdy",
+    ) -> Iterator[str]:
+        """
+        Export patient data as a stream of text chunks.
+
+        Unlike export_patient_data(), no category is held in memory as a
+        whole: vitals are read in batches of EXPORT_BATCH_SIZE rows and each
+        record is serialized as soon as it is read. The other categories are
+        small and are still built one at a time.
+
+        The active patient and scope are validated before this returns, so
+        ValueError is raised here rather than midway through the stream.
+
+        Args:
+            format: "json" (one document, same keys as export_patient_data),
+                "jsonl" (one {"type", "data"} object per line) or "csv"
+                (same layout as convert_to_csv(), with a UTF-8 BOM)
+            See export_patient_data() for the remaining arguments.
+        """
+        patient = self._get_active_patient(user_id)
+        if scope != "all" and scope not in EXPORT_CATEGORIES:
+            raise ValueError(f"Unsupported export scope: {scope}")
+        if format not in ("json", "jsonl", "csv"):
+            raise ValueError(f"Unsupported streaming format: {format}")
+        if unit_system not in ("imperial", "metric"):
+            unit_system = "imperial"
+
+        metadata = self._export_metadata(
+            format,
+            scope,
+            start_date,
+            end_date,
+            False,
+            include_patient_info,
+            unit_system,
+            language,
+            date_format,
+        )
+        patient_info = (
+            self._get_patient_info(patient, unit_system)
+            if include_patient_info
+            else None
+        )
+        categories = EXPORT_CATEGORIES if scope == "all" else (scope,)
+        sections = (
+            (
+                category,
+                self._category_records(
+                    category, patient, start_date, end_date, unit_system
+                ),
+            )
+            for category in categories
+        )
+
+        if format == "csv":
+            chunks = self._stream_csv(metadata, patient_info, sections, scope)
+        elif format == "jsonl":
+            chunks = self._stream_jsonl(metadata, patient_info, sections)
+        else:
+            chunks = self._stream_json(metadata, patient_info, sections)
+        return _buffered(chunks)
+
+    def _category_records(
+        self,
+        category: str,
+        patient: Patient,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        unit_system: str,
+    ) -> Iterable[Dict[str, Any]]:
+        """Records of one category: a lazy iterator for vitals, else a list."""
+        if category == "vitals":
+            return self._iter_vitals(
+                patient, start_date, end_date, unit_system, batch_size=EXPORT_BATCH_SIZE
+            )
+        if category == "lab_results":
+            return self._export_lab_results(patient, start_date, end_date)
+        return getattr(self, f"_export_{category}")(patient, start_date, end_date)
+
+    def _stream_json(
+        self,
+        metadata: Dict[str, Any],
+        patient_info: Optional[Dict[str, Any]],
+        sections: Iterable[Tuple[str, Iterable[Dict[str, Any]]]],
+    ) -> Iterator[str]:
+        yield '{\n  "export_metadata": ' + _json_dumps(metadata)
+        if patient_info is not None:
+            yield ',\n  "patient_info": ' + _json_dumps(patient_info)
+        for category, records in sections:
+            yield f',\n  "{category}": ['
+            separator = "\n    "
+            for record in records:
+                yield separator + _json_dumps(record)
+                separator = ",\n    "
+            yield "]" if separator == "\n    " else "\n  ]"
+        yield "\n}\n"
+
+    def _stream_jsonl(
+        self,
+        metadata: Dict[str, Any],
+        patient_info: Optional[Dict[str, Any]],
+        sections: Iterable[Tuple[str, Iterable[Dict[str, Any]]]],
+    ) -> Iterator[str]:
+        yield _json_dumps({"type": "export_metadata", "data": metadata}) + "\n"
+        if patient_info is not None:
+            yield _json_dumps({"type": "patient_info", "data": patient_info}) + "\n"
+        for category, records in sections:
+            for record in records:
+                yield _json_dumps({"type": category, "data": record}) + "\n"
+
+    def _stream_csv(
+        self,
+        metadata: Dict[str, Any],
+        patient_info: Optional[Dict[str, Any]],
+        sections: Iterable[Tuple[str, Iterable[Dict[str, Any]]]],
+        scope: str,
+    ) -> Iterator[str]:
+        t = get_translator(metadata["language"], metadata["date_format"])
+        # UTF-8 BOM so Excel opens the file with correct encoding
+        yield "\ufeff"
+        if patient_info is not None:
+            yield self._csv_patient_header(patient_info, t)
+
+        for category, records in sections:
+            rows = self._iter_csv_section(records, translator=t)
+            header = next(rows, None)
+            if header is None:
+                if scope != "all":
+                    yield f"# {t.text('no_data')}\n"
+                continue
+            yield f"# {t.category(category).upper()}\n"
+            yield header
+            yield from rows
+            if scope == "all":
+                yield "\n"
+
     def _get_patient_info(
         self, patient: Patient, unit_system: str = "imperial"
     ) -> Dict[str, Any]:
@@ -866,18 +1097,32 @@ class ExportService:
         unit_system: str = "imperial",
     ) -> List[Dict[str, Any]]:
         """Export vitals data with unit conversion."""
+        return list(self._iter_vitals(patient, start_date, end_date, unit_system))
+
+    def _iter_vitals(
+        self,
+        patient: Patient,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        unit_system: str = "imperial",
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield vitals records with unit conversion.
+
+        With batch_size, rows are fetched that many at a time (server-side
+        cursor where the driver supports one) instead of all at once.
+        """
         query = (
             self.db.query(Vitals)
             .options(joinedload(Vitals.practitioner))
             .filter(Vitals.patient_id == patient.id)
         )
         query = self._apply_date_filter(query, Vitals, start_date, end_date)
-        vitals = query.all()
+        vitals = query.yield_per(batch_size) if batch_size else query.all()
 
         # Get unit labels
         unit_labels = UnitConverter.get_unit_labels(unit_system)
 
-        result = []
         for vital in vitals:
             # Convert measurements based on unit system
             if unit_system == "metric":
@@ -894,39 +1139,35 @@ class ExportService:
                 height_value = vital.height
                 bmi_value = vital.bmi
 
-            result.append(
-                {
-                    "id": vital.id,
-                    "recorded_date": (
-                        vital.recorded_date.isoformat() if vital.recorded_date else None
-                    ),
-                    "systolic_bp": vital.systolic_bp,
-                    "diastolic_bp": vital.diastolic_bp,
-                    "heart_rate": vital.heart_rate,
-                    "temperature": temperature_value,
-                    "temperature_unit": unit_labels["temperature"],
-                    "weight": weight_value,
-                    "weight_unit": unit_labels["weight"],
-                    "height": height_value,
-                    "height_unit": unit_labels["height"],
-                    "oxygen_saturation": vital.oxygen_saturation,
-                    "respiratory_rate": vital.respiratory_rate,
-                    "blood_glucose": vital.blood_glucose,
-                    "a1c": vital.a1c,
-                    "glucose_context": vital.glucose_context,
-                    "bmi": bmi_value,
-                    "pain_scale": vital.pain_scale,
-                    "location": vital.location,
-                    "device_used": vital.device_used,
-                    "import_source": vital.import_source,
-                    "recorded_by": (
-                        vital.practitioner.name if vital.practitioner else None
-                    ),
-                    "notes": vital.notes,
-                }
-            )
-
-        return result
+            yield {
+                "id": vital.id,
+                "recorded_date": (
+                    vital.recorded_date.isoformat() if vital.recorded_date else None
+                ),
+                "systolic_bp": vital.systolic_bp,
+                "diastolic_bp": vital.diastolic_bp,
+                "heart_rate": vital.heart_rate,
+                "temperature": temperature_value,
+                "temperature_unit": unit_labels["temperature"],
+                "weight": weight_value,
+                "weight_unit": unit_labels["weight"],
+                "height": height_value,
+                "height_unit": unit_labels["height"],
+                "oxygen_saturation": vital.oxygen_saturation,
+                "respiratory_rate": vital.respiratory_rate,
+                "blood_glucose": vital.blood_glucose,
+                "a1c": vital.a1c,
+                "glucose_context": vital.glucose_context,
+                "bmi": bmi_value,
+                "pain_scale": vital.pain_scale,
+                "location": vital.location,
+                "device_used": vital.device_used,
+                "import_source": vital.import_source,
+                "recorded_by": (
+                    vital.practitioner.name if vital.practitioner else None
+                ),
+                "notes": vital.notes,
+            }
 
     def _export_emergency_contacts(
         self, patient: Patient, start_date: Optional[date], end_date: Optional[date]
@@ -1370,128 +1611,15 @@ class ExportService:
         return await self.get_export_summary_by_patient_id(patient.id)
 
     async def get_export_summary_by_patient_id(self, patient_id: int) -> Dict[str, Any]:
-        """Get summary of available data for export by patient ID (Phase 1 compatible)."""
-        patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient:
-            raise ValueError("Patient record not found")
-
-        return {
-            "patient_id": patient.id,
-            "counts": {
-                "medications": self.db.query(Medication)
-                .filter(Medication.patient_id == patient.id)
-                .count(),
-                "lab_results": self.db.query(LabResult)
-                .filter(LabResult.patient_id == patient.id)
-                .count(),
-                "allergies": self.db.query(Allergy)
-                .filter(Allergy.patient_id == patient.id)
-                .count(),
-                "conditions": self.db.query(Condition)
-                .filter(Condition.patient_id == patient.id)
-                .count(),
-                "immunizations": self.db.query(Immunization)
-                .filter(Immunization.patient_id == patient.id)
-                .count(),
-                "procedures": self.db.query(Procedure)
-                .filter(Procedure.patient_id == patient.id)
-                .count(),
-                "treatments": self.db.query(Treatment)
-                .filter(Treatment.patient_id == patient.id)
-                .count(),
-                "encounters": self.db.query(Encounter)
-                .filter(Encounter.patient_id == patient.id)
-                .count(),
-                "vitals": self.db.query(Vitals)
-                .filter(Vitals.patient_id == patient.id)
-                .count(),
-                "emergency_contacts": self.db.query(EmergencyContact)
-                .filter(EmergencyContact.patient_id == patient.id)
-                .count(),
-                "practitioners": len(self._get_related_practitioner_ids(patient)),
-                "pharmacies": len(self._get_related_pharmacy_ids(patient)),
-                "symptoms": self.db.query(Symptom)
-                .filter(Symptom.patient_id == patient.id)
-                .count(),
-                "injuries": self.db.query(Injury)
-                .filter(Injury.patient_id == patient.id)
-                .count(),
-                "family_history": self.db.query(FamilyMember)
-                .filter(FamilyMember.patient_id == patient.id)
-                .count(),
-                "insurance": self.db.query(Insurance)
-                .filter(Insurance.patient_id == patient.id)
-                .count(),
-                "medical_equipment": self._count_medical_equipment(patient.id),
-            },
-        }
-
-    def _count_medical_equipment(self, patient_id: int) -> int:
-        """Count medical equipment records for a patient."""
-        from app.models.procedures import MedicalEquipment
-
-        return (
-            self.db.query(MedicalEquipment)
-            .filter(MedicalEquipment.patient_id == patient_id)
-            .count()
-        )
-
-    def _get_related_practitioner_ids(self, patient: Patient) -> List[int]:
-        """Get all practitioner IDs related to a patient."""
-        practitioner_ids = set()
-
-        # Primary care physician
-        if patient.physician_id:
-            practitioner_ids.add(patient.physician_id)
-
-        # Practitioners from medications
-        med_practitioners = (
-            self.db.query(Medication.practitioner_id)
-            .filter(
-                Medication.patient_id == patient.id,
-                Medication.practitioner_id.isnot(None),
-            )
-            .distinct()
-        )
-        for (practitioner_id,) in med_practitioners:
-            practitioner_ids.add(practitioner_id)
-
-        # Practitioners from encounters
-        encounter_practitioners = (
-            self.db.query(Encounter.practitioner_id)
-            .filter(
-                Encounter.patient_id == patient.id,
-                Encounter.practitioner_id.isnot(None),
-            )
-            .distinct()
-        )
-        for (practitioner_id,) in encounter_practitioners:
-            practitioner_ids.add(practitioner_id)
-
-        # Practitioners from lab results
-        lab_practitioners = (
-            self.db.query(LabResult.practitioner_id)
-            .filter(
-                LabResult.patient_id == patient.id,
-                LabResult.practitioner_id.isnot(None),
-            )
-            .distinct()
-        )
-        for (practitioner_id,) in lab_practitioners:
-            practitioner_ids.add(practitioner_id)
-
-        return list(practitioner_ids)
+        """Get summary of available data for export by patient ID (Phase 1 compatible).
 
-    def _get_related_pharmacy_ids(self, patient: Patient) -> List[int]:
-        """Get all pharmacy IDs related to a patient."""
-        pharmacy_ids = (
-            self.db.query(Medication.pharmacy_id)
-            .filter(
-                Medication.patient_id == patient.id, Medication.pharmacy_id.isnot(None)
-            )
-            .distinct()
-        )
-        return [pid for (pid,) in pharmacy_ids]
+        Counts come from app.services.dashboard_summary: one statement, cached
+        per patient until one of their records is written.
+        """
+        summary = get_patient_summary(self.db, patient_id)
+        if summary is None:
+            raise ValueError("Patient record not found")
+        return summary
 
     def convert_to_csv(self, export_data: Dict[str, Any], scope: str) -> str:
         """Convert export data to CSV format with translated headers."""
@@ -1506,32 +1634,7 @@ class ExportService:
 
         # Add patient info header if available
         if "patient_info" in export_data:
-            patient_info = export_data["patient_info"]
-            height_unit = patient_info.get("height_unit", "inches")
-            weight_unit = patient_info.get("weight_unit", "lbs")
-
-            output.write(f"# {t.text('patient_information').upper()}\n")
-            output.write(
-                f"# {t.field('name')}: {patient_info.get('first_name', '')} {patient_info.get('last_name', '')}\n"
-            )
-            birth_date_str = (
-                t.format_date(patient_info.get("birth_date"))
-                if patient_info.get("birth_date")
-                else ""
-            )
-            output.write(f"# {t.text('birth_date')}: {birth_date_str}\n")
-            output.write(
-                f"# {t.text('blood_type')}: {patient_info.get('blood_type', '')}\n"
-            )
-            if patient_info.get("height"):
-                output.write(
-                    f"# {t.field('height')}: {patient_info.get('height')} {height_unit}\n"
-                )
-            if patient_info.get("weight"):
-                output.write(
-                    f"# {t.field('weight')}: {patient_info.get('weight')} {weight_unit}\n"
-                )
-            output.write("\n")
+            output.write(self._csv_patient_header(export_data["patient_info"], t))
 
         if scope == "all":
             # For "all" scope, create separate sections for each data type
@@ -1645,6 +1748,73 @@ class ExportService:
 
         return str(value)
 
+    def _csv_patient_header(self, patient_info: Dict[str, Any], t) -> str:
+        """Commented patient information block that opens a CSV export."""
+        output = io.StringIO()
+        height_unit = patient_info.get("height_unit", "inches")
+        weight_unit = patient_info.get("weight_unit", "lbs")
+
+        output.write(f"# {t.text('patient_information').upper()}\n")
+        output.write(
+            f"# {t.field('name')}: {patient_info.get('first_name', '')} {patient_info.get('last_name', '')}\n"
+        )
+        birth_date_str = (
+            t.format_date(patient_info.get("birth_date"))
+            if patient_info.get("birth_date")
+            else ""
+        )
+        output.write(f"# {t.text('birth_date')}: {birth_date_str}\n")
+        output.write(
+            f"# {t.text('blood_type')}: {patient_info.get('blood_type', '')}\n"
+        )
+        if patient_info.get("height"):
+            output.write(
+                f"# {t.field('height')}: {patient_info.get('height')} {height_unit}\n"
+            )
+        if patient_info.get("weight"):
+            output.write(
+                f"# {t.field('weight')}: {patient_info.get('weight')} {weight_unit}\n"
+            )
+        output.write("\n")
+        return output.getvalue()
+
+    def _iter_csv_section(
+        self, records: Iterable[Dict[str, Any]], translator=None
+    ) -> Iterator[str]:
+        """Yield a CSV section's header row, then one chunk per record.
+
+        Lists get the same column union as _write_csv_section(); lazy record
+        iterators (which always produce one fixed set of keys) take their
+        columns from the first record. Yields nothing for no records.
+        """
+        if isinstance(records, list):
+            if not records:
+                return
+            fieldnames = sorted({field for record in records for field in record})
+        else:
+            records = iter(records)
+            first = next(records, None)
+            if first is None:
+                return
+            fieldnames = sorted(first)
+            records = itertools.chain([first], records)
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if translator:
+            writer.writerow([translator.field(f) for f in fieldnames])
+        else:
+            writer.writerow([f.replace("_", " ").title() for f in fieldnames])
+        yield output.getvalue()
+
+        for record in records:
+            output.seek(0)
+            output.truncate(0)
+            writer.writerow(
+                [self._format_csv_value(f, record.get(f)) for f in fieldnames]
+            )
+            yield output.getvalue()
+
     def _write_csv_section(
         self, output: io.StringIO, records: List[Dict[str, Any]], translator=None
     ):
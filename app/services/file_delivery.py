@@ -0,0 +1,315 @@
+"""
+File Delivery
+
+How a stored entity file reaches the client.
+
+Local files (and cached remote documents) are served from disk by path, so
+the response supports Range requests and zero-copy sends where the server
+offers them. Local files carry a strong ETag derived from their stored
+SHA-256, letting browsers revalidate with If-None-Match instead of
+downloading the file again.
+
+Paperless/Papra documents are streamed: chunks received from the backend
+are relayed to the client as they arrive instead of being read into memory
+first. While relaying, the document is also written to an on-disk cache of
+recently viewed remote documents (REMOTE_DOCUMENT_CACHE_DIR), bounded by
+REMOTE_DOCUMENT_CACHE_MAX_MB with least-recently-used eviction, so opening
+the same document again is served from disk.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Iterable, Optional
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+
+logger = get_logger(__name__, "app")
+
+# Bytes of a remote document kept in FileDownload.head, enough to recognise
+# the file type
+HEAD_SIZE = 8
+
+PART_SUFFIX = ".part"
+
+
+@dataclass
+class FileDownload:
+    """
+    A file ready to be sent: either a path on disk or a stream of chunks.
+
+    ``remote`` marks Paperless/Papra documents, whose stored name and type
+    may not match the content; ``head`` holds their first bytes to check.
+    """
+
+    filename: str
+    content_type: str
+    path: Optional[str] = None
+    stream: Optional[AsyncIterator[bytes]] = None
+    etag: Optional[str] = None
+    remote: bool = False
+    head: bytes = b""
+
+
+def strong_etag(content_hash: Optional[str]) -> Optional[str]:
+    """The ETag of a file with a stored SHA-256, None without one."""
+    return f'"{content_hash}"' if content_hash else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in candidates
+    )
+
+
+class RemoteDocumentCache:
+    """
+    Recently viewed remote documents on disk, bounded by total size.
+
+    Entries are files named by a hash of the backend and document ID,
+    followed by a hash of who fetched it: the instance URL, the MediKeep user
+    and their stored credentials. A copy is only served back to the user
+    whose credentials retrieved it, and changing or removing those
+    credentials stops it from being served. A hit touches the file's mtime,
+    so eviction removes the entries with the oldest mtime first.
+    """
+
+    _instance: Optional["RemoteDocumentCache"] = None
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: Optional[int] = None
+    ):
+        self.directory = Path(
+            settings.REMOTE_DOCUMENT_CACHE_DIR if directory is None else directory
+        )
+        self.max_bytes = (
+            settings.REMOTE_DOCUMENT_CACHE_MAX_MB * 1024 * 1024
+            if max_bytes is None
+            else max_bytes
+        )
+        self._lock = threading.Lock()
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Entries interrupted by a restart are never completed
+            for partial in self.directory.glob(f"*{PART_SUFFIX}"):
+                partial.unlink(missing_ok=True)
+
+    @classmethod
+    def get_instance(cls) -> "RemoteDocumentCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — forget the cache (its files are left on disk)."""
+        cls._instance = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def _document_prefix(backend: str, document_id: str) -> str:
+        return hashlib.sha256(f"{backend}\n{document_id}".encode()).hexdigest()
+
+    @classmethod
+    def key(
+        cls,
+        backend: str,
+        instance_url: str,
+        document_id: str,
+        user_id: int,
+        credentials: Iterable[Optional[str]] = (),
+    ) -> str:
+        """
+        The cache entry of a document as fetched by ``user_id``.
+
+        ``credentials`` are the user's stored (encrypted) credentials for the
+        backend; only a hash of them is kept.
+        """
+        principal = "\n".join(
+            [instance_url, str(user_id), *(value or "" for value in credentials)]
+        )
+        return (
+            f"{cls._document_prefix(backend, str(document_id))}_"
+            f"{hashlib.sha256(principal.encode()).hexdigest()}"
+        )
+
+    def get(self, key: str) -> Optional[Path]:
+        """The cached document for ``key``, marked as recently used."""
+        if not self.enabled:
+            return None
+        path = self.directory / key
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def open_writer(self, key: str) -> Optional["CacheWriter"]:
+        """A writer adding ``key`` to the cache, None when disabled."""
+        if not self.enabled:
+            return None
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f"{key}-", suffix=PART_SUFFIX, dir=self.directory
+        )
+        return CacheWriter(self, key, os.fdopen(fd, "wb"), Path(temp_name))
+
+    def _add(self, key: str, partial: Path) -> None:
+        os.replace(partial, self.directory / key)
+        self.evict()
+
+    def discard(self, backend: str, document_id: str) -> int:
+        """
+        Remove every user's cached copy of a document, returning how many.
+
+        Called when the document is deleted or unlinked, so copies of
+        patient files do not outlive their records.
+        """
+        if not self.enabled or not document_id:
+            return 0
+        removed = 0
+        prefix = self._document_prefix(backend, str(document_id))
+        with self._lock:
+            for path in self.directory.glob(f"{prefix}_*"):
+                if path.name.endswith(PART_SUFFIX):
+                    continue
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its limit."""
+        with self._lock:
+            entries = []
+            for path in self.directory.iterdir():
+                if path.name.endswith(PART_SUFFIX):
+                    continue
+                try:
+                    entries.append((path.stat(), path))
+                except FileNotFoundError:
+                    continue
+            total = sum(stat.st_size for stat, _ in entries)
+            for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+                logger.debug(f"Evicted cached remote document {path.name}")
+
+
+class CacheWriter:
+    """One document being written into the cache while it is relayed."""
+
+    def __init__(self, cache: RemoteDocumentCache, key: str, out, path: Path):
+        self.cache = cache
+        self.key = key
+        self.path = path
+        self._out = out
+        self._size = 0
+        self._abandoned = False
+
+    async def write(self, chunk: bytes) -> None:
+        if self._abandoned:
+            return
+        self._size += len(chunk)
+        if self._size > self.cache.max_bytes:
+            # Larger than the whole cache; relay it without caching
+            await self.discard()
+            return
+        await asyncio.to_thread(self._out.write, chunk)
+
+    async def commit(self) -> None:
+        if self._abandoned:
+            return
+        await asyncio.to_thread(self._finish)
+
+    async def discard(self) -> None:
+        self._abandoned = True
+        self._out.close()
+        await asyncio.to_thread(self.path.unlink, missing_ok=True)
+
+    def _finish(self) -> None:
+        self._out.close()
+        self.cache._add(self.key, self.path)
+
+
+async def _relay(
+    head: bytes,
+    chunks: AsyncGenerator[bytes, None],
+    writer: Optional[CacheWriter],
+) -> AsyncIterator[bytes]:
+    completed = False
+    try:
+        if head:
+            if writer:
+                await writer.write(head)
+            yield head
+        async for chunk in chunks:
+            if writer:
+                await writer.write(chunk)
+            yield chunk
+        completed = True
+    finally:
+        await chunks.aclose()
+        if writer:
+            await (writer.commit() if completed else writer.discard())
+
+
+async def stream_remote_document(
+    chunks: AsyncGenerator[bytes, None],
+    filename: str,
+    content_type: str,
+    cache_key: Optional[str] = None,
+) -> FileDownload:
+    """
+    Start relaying a remote document, caching it under ``cache_key``.
+
+    The first chunk is awaited here, so connection and permission errors are
+    raised before the response starts.
+    """
+    try:
+        head = await chunks.__anext__()
+    except StopAsyncIteration:
+        head = b""
+    cache = RemoteDocumentCache.get_instance()
+    writer = cache.open_writer(cache_key) if cache_key else None
+    return FileDownload(
+        filename=filename,
+        content_type=content_type,
+        stream=_relay(head, chunks, writer),
+        remote=True,
+        head=head[:HEAD_SIZE],
+    )
+
+
+def cached_remote_document(
+    cache_key: str, filename: str, content_type: str
+) -> Optional[FileDownload]:
+    """A remote document served from the cache, if it was viewed recently."""
+    path = RemoteDocumentCache.get_instance().get(cache_key)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+    except FileNotFoundError:
+        # Evicted meanwhile
+        return None
+    return FileDownload(
+        filename=filename,
+        content_type=content_type,
+        path=str(path),
+        remote=True,
+        head=head,
+    )
@@ -5,23 +5,42 @@ Supports lab-results, insurance, visits, procedures, and future entity types.
 
 import os
 import uuid
+from contextlib import aclosing
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncGenerator, Dict, Iterable, List, Optional
 
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.logging.config import get_logger
-from app.models.models import EntityFile, User, UserPreferences, get_utc_now
+from app.models.models import EntityFile, UserPreferences, get_utc_now
 from app.schemas.entity_file import (
     EntityFileCreate,
     EntityFileResponse,
     EntityType,
     FileOperationResult,
 )
+from app.services.blob_store import BlobStore, blob_references
+from app.services.document_sync import (
+    check_paperless_documents,
+    check_papra_documents,
+    is_recently_synced,
+)
+from app.services.file_delivery import (
+    FileDownload,
+    RemoteDocumentCache,
+    cached_remote_document,
+    stream_remote_document,
+    strong_etag,
+)
 from app.services.file_management_service import FileManagementService
+from app.services.upload_stream import (
+    SpooledUpload,
+    UploadTooLargeError,
+    spool_upload,
+)
 
 # New simplified architecture
 from app.services.paperless_client import (
@@ -34,11 +53,14 @@ from app.services.paperless_client import (
     create_paperless_client,
 )
 from app.services.paperless_service import (
+    PaperlessAuthenticationError,
     create_paperless_service_with_username_password,
 )
 
 logger = get_logger(__name__, "app")
 
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100MB
+
 
 class GenericEntityFileService:
     """Service for managing files across all entity types."""
@@ -56,6 +78,78 @@ class GenericEntityFileService:
             EntityType.PROCEDURE: "procedures",
         }
 
+    @property
+    def blob_store(self) -> BlobStore:
+        """Content-addressed storage for local uploads."""
+        return BlobStore(self.uploads_dir)
+
+    def _release_local_file(
+        self,
+        db: Session,
+        file_record: EntityFile,
+        reason: str,
+        exclude_ids: Iterable[int] = (),
+    ) -> bool:
+        """
+        Move a record's local file to trash unless other records share it.
+
+        Records in ``exclude_ids`` (being deleted along with this one) don't
+        count as references. Returns True if the file was moved to trash.
+
+        An upload of the same content may commit its record between the
+        reference count and the move; references are counted again after
+        the move and the blob is put back if one appeared.
+        """
+        other_references = blob_references(
+            db, file_record.content_hash, exclude_ids or [file_record.id]
+        )
+        if other_references:
+            logger.info(
+                f"Local file {file_record.file_name} is shared with "
+                f"{other_references} other records, keeping it"
+            )
+            return False
+        if not file_record.file_path or not os.path.exists(file_record.file_path):
+            logger.warning(
+                f"Local file not found for deletion: {file_record.file_path}"
+            )
+            return False
+        trash_result = self.file_management_service.move_to_trash(
+            file_record.file_path, reason=reason
+        )
+        logger.info(f"File moved to trash: {trash_result}")
+        if blob_references(
+            db, file_record.content_hash, exclude_ids or [file_record.id]
+        ):
+            self._restore_released_blob(trash_result["trash_path"], file_record)
+            return False
+        return True
+
+    @staticmethod
+    def _restore_released_blob(trash_path: str, file_record: EntityFile) -> None:
+        """Put back a blob a concurrent upload started referencing."""
+        trash_file = Path(trash_path)
+        if not os.path.exists(file_record.file_path):
+            # The upload may have restored it from its own copy meanwhile
+            os.replace(trash_file, file_record.file_path)
+        else:
+            trash_file.unlink(missing_ok=True)
+        trash_file.with_suffix(trash_file.suffix + ".meta").unlink(missing_ok=True)
+        logger.info(
+            f"Local file {file_record.file_name} was referenced by a new upload "
+            f"while being deleted, restored it"
+        )
+
+    @staticmethod
+    def _discard_cached_documents(file_records) -> None:
+        """Drop cached copies of deleted or unlinked remote documents."""
+        cache = RemoteDocumentCache.get_instance()
+        for file_record in file_records:
+            if file_record.storage_backend == "paperless":
+                cache.discard("paperless", file_record.paperless_document_id)
+            elif file_record.storage_backend == "papra":
+                cache.discard("papra", file_record.papra_document_id)
+
     def _get_entity_directory(self, entity_type: str) -> Path:
         """Get the directory path for a specific entity type."""
         entity_type_enum = EntityType(entity_type)
@@ -220,65 +314,79 @@ class GenericEntityFileService:
                         detail="Papra organization is not configured. Please select an organization in settings.",
                     )
 
-            # Read file content once for both backends
-            file_content = await file.read()
-            file_size = len(file_content)
-
-            # Validate file size (100MB limit)
-            max_size = 100 * 1024 * 1024  # 100MB
-            if file_size > max_size:
+            # Stream the upload to a temporary file, enforcing the size limit
+            # and hashing it on the way. Local uploads spool into the blob
+            # store so the final move is an atomic rename.
+            max_size = MAX_UPLOAD_SIZE
+            try:
+                upload = await spool_upload(
+                    file,
+                    max_size,
+                    directory=(
+                        self.blob_store.staging_dir()
+                        if storage_backend == "local"
+                        else None
+                    ),
+                )
+            except UploadTooLargeError:
                 raise HTTPException(
                     status_code=413,
-                    detail=f"File size ({file_size} bytes) exceeds maximum allowed size ({max_size} bytes)",
+                    detail=f"File size exceeds maximum allowed size ({max_size} bytes)",
                 )
+            logger.info(
+                f"Upload received: {file.filename} ({upload.size} bytes)",
+                extra={
+                    "file_name": file.filename,
+                    "file_size": upload.size,
+                    "sha256": upload.sha256,
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                },
+            )
 
             # Route to appropriate storage backend
             logger.info(f"Routing upload to {storage_backend} backend")
-            if storage_backend == "paperless":
-                result = await self._upload_to_paperless(
-                    db,
-                    entity_type,
-                    entity_id,
-                    file,
-                    file_content,
-                    file_size,
-                    description,
-                    category,
-                    current_user_id,
-                )
-                logger.info(f"Paperless upload completed: file_id={result.id}")
-                return result
-            if storage_backend == "papra":
-                result = await self._upload_to_papra(
-                    db,
-                    entity_type,
-                    entity_id,
-                    file,
-                    file_content,
-                    file_size,
-                    description,
-                    category,
-                    current_user_id,
-                )
-                logger.info(f"Papra upload completed: file_id={result.id}")
-                return result
-            if storage_backend == "local":
+            try:
+                if storage_backend == "paperless":
+                    result = await self._upload_to_paperless(
+                        db,
+                        entity_type,
+                        entity_id,
+                        file,
+                        upload,
+                        description,
+                        category,
+                        current_user_id,
+                    )
+                    logger.info(f"Paperless upload completed: file_id={result.id}")
+                    return result
+                if storage_backend == "papra":
+                    result = await self._upload_to_papra(
+                        db,
+                        entity_type,
+                        entity_id,
+                        file,
+                        upload,
+                        description,
+                        category,
+                        current_user_id,
+                    )
+                    logger.info(f"Papra upload completed: file_id={result.id}")
+                    return result
                 result = await self._upload_to_local(
                     db,
                     entity_type,
                     entity_id,
                     file,
-                    file_content,
-                    file_size,
+                    upload,
                     description,
                     category,
                 )
                 logger.info(f"Local upload completed: file_id={result.id}")
                 return result
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported storage backend: {storage_backend}",
-            )
+            finally:
+                # No-op once a local upload has been moved into place
+                await upload.discard()
 
         except HTTPException:
             raise
@@ -635,13 +743,11 @@ class GenericEntityFileService:
                 )
             elif file_record.storage_backend == "local":
                 # Handle local file deletion
-                file_path = file_record.file_path
-                if os.path.exists(file_path):
-                    trash_result = self.file_management_service.move_to_trash(
-                        file_path,
-                        reason=f"Deleted via API for {file_record.entity_type} {file_record.entity_id}",
-                    )
-                    logger.info(f"File moved to trash: {trash_result}")
+                self._release_local_file(
+                    db,
+                    file_record,
+                    reason=f"Deleted via API for {file_record.entity_type} {file_record.entity_id}",
+                )
             else:
                 raise HTTPException(
                     status_code=400,
@@ -651,6 +757,7 @@ class GenericEntityFileService:
             # Remove from database only after successful deletion from storage backend
             db.delete(file_record)
             db.commit()
+            self._discard_cached_documents([file_record])
 
             # Create appropriate success message based on operation type
             operation_type = "unlinked" if is_linked_document else "deleted"
@@ -684,9 +791,13 @@ class GenericEntityFileService:
 
     async def get_file_download_info(
         self, db: Session, file_id: int, current_user_id: Optional[int] = None
-    ) -> Tuple[str, str, str]:
+    ) -> FileDownload:
         """
-        Get file information for download from both local and paperless storage.
+        Get file information for download from local, Paperless or Papra storage.
+
+        Local files are returned by path with an ETag from their stored
+        checksum; remote documents as a stream relayed from the backend, or
+        by path when recently viewed ones are cached.
 
         Args:
             db: Database session
@@ -694,7 +805,7 @@ class GenericEntityFileService:
             current_user_id: ID of the current user for paperless access
 
         Returns:
-            Tuple of (file_path_or_content, filename, content_type)
+            FileDownload to send to the client
         """
         try:
             file_record = self.get_file_by_id(db, file_id)
@@ -729,10 +840,11 @@ class GenericEntityFileService:
                         detail=f"File not found on disk: {file_record.file_name}",
                     )
 
-                return (
-                    file_record.file_path,
-                    file_record.file_name,
-                    file_record.file_type or "application/octet-stream",
+                return FileDownload(
+                    filename=file_record.file_name,
+                    content_type=file_record.file_type or "application/octet-stream",
+                    path=file_record.file_path,
+                    etag=strong_etag(file_record.content_hash),
                 )
             raise HTTPException(
                 status_code=400,
@@ -749,156 +861,25 @@ class GenericEntityFileService:
 
     async def get_file_view_info(
         self, db: Session, file_id: int, current_user_id: Optional[int] = None
-    ) -> Tuple[str, str, str]:
+    ) -> FileDownload:
         """
         Get file information for viewing (inline display).
-        Similar to get_file_download_info but optimized for viewing.
+
+        Files are delivered the same way as downloads; the endpoint only
+        changes how the browser is told to present them.
 
         Args:
             db: Database session
             file_id: ID of the file
+            current_user_id: ID of the current user for remote backend access
 
         Returns:
-            Tuple of (file_path_or_content, filename, content_type)
+            FileDownload to send to the client
         """
-        try:
-            # Get file record from database
-            file_record = db.query(EntityFile).filter(EntityFile.id == file_id).first()
-            if not file_record:
-                raise HTTPException(status_code=404, detail="File not found")
-
+        file_record = self.get_file_by_id(db, file_id)
+        if file_record:
             logger.info(f"Retrieving file for viewing: {file_record.file_name}")
-
-            if file_record.storage_backend == "paperless":
-                # Handle Paperless files
-                if not file_record.paperless_document_id:
-                    raise HTTPException(
-                        status_code=404, detail="Paperless document ID not found"
-                    )
-
-                # Convert document ID to int once to avoid redundant casting
-                document_id = int(file_record.paperless_document_id)
-
-                # Use existing paperless service to get file content
-
-                # Get user for paperless credentials
-                if not current_user_id:
-                    raise HTTPException(
-                        status_code=401,
-                        detail="User authentication required for file viewing",
-                    )
-
-                user = db.query(User).filter(User.id == current_user_id).first()
-                if not user:
-                    raise HTTPException(status_code=404, detail="User not found")
-
-                # Get user preferences for paperless configuration
-                user_prefs = (
-                    db.query(UserPreferences)
-                    .filter(UserPreferences.user_id == user.id)
-                    .first()
-                )
-
-                if not user_prefs or not user_prefs.paperless_enabled:
-                    raise HTTPException(
-                        status_code=400, detail="Paperless integration is not enabled"
-                    )
-
-                # Log authentication details for debugging
-                logger.debug(
-                    f"View debug - User: {user.id}, URL: {user_prefs.paperless_url}"
-                )
-                logger.debug(
-                    f"View debug - Has token: {bool(user_prefs.paperless_api_token_encrypted)}"
-                )
-                logger.debug(
-                    f"View debug - Has username: {bool(user_prefs.paperless_username_encrypted)}"
-                )
-                logger.debug(
-                    f"View debug - Has password: {bool(user_prefs.paperless_password_encrypted)}"
-                )
-                logger.debug(f"View debug - Document ID: {document_id}")
-
-                # Create paperless service using token auth (supports 2FA)
-                from app.services.paperless_service import create_paperless_service
-
-                paperless_service = create_paperless_service(
-                    user_prefs.paperless_url,
-                    encrypted_token=user_prefs.paperless_api_token_encrypted,
-                    encrypted_username=user_prefs.paperless_username_encrypted,
-                    encrypted_password=user_prefs.paperless_password_encrypted,
-                    user_id=user.id,
-                )
-
-                logger.debug("Paperless service created successfully")
-
-                # First test if we can read document metadata (less restrictive than download)
-                logger.debug(
-                    f"Testing document access for ID: {file_record.paperless_document_id}"
-                )
-                async with paperless_service:
-                    try:
-                        # Try to get document info first to test permissions
-                        async with paperless_service._make_request(
-                            "GET", f"/api/documents/{document_id}/"
-                        ) as doc_response:
-                            if doc_response.status == 200:
-                                doc_info = await doc_response.json()
-                                logger.debug(
-                                    f"Document info accessible: {doc_info.get('title', 'N/A')}"
-                                )
-                            else:
-                                logger.debug(
-                                    f"Document info failed: {doc_response.status}"
-                                )
-                    except Exception as info_error:
-                        logger.debug(f"Document info error: {info_error}")
-
-                    # Now try download
-                    logger.debug(f"Starting download for document ID: {document_id}")
-                    try:
-                        file_content = await paperless_service.download_document(
-                            document_id=document_id
-                        )
-                        logger.debug(
-                            f"Download completed, content size: {len(file_content) if file_content else 0}"
-                        )
-                    except Exception as download_error:
-                        logger.error(
-                            f"Download failed for document {document_id}: {download_error}"
-                        )
-                        logger.error(
-                            "Document owner in search results might be different from authenticated user"
-                        )
-                        raise
-
-                return file_content, file_record.file_name, file_record.file_type
-            if file_record.storage_backend == "papra":
-                # Handle Papra files - same pattern as download
-                return await self._get_papra_download_info(
-                    db, file_record, current_user_id
-                )
-            if file_record.storage_backend == "local":
-                # Handle local files
-                file_path = file_record.file_path
-                if not os.path.exists(file_path):
-                    raise HTTPException(
-                        status_code=404, detail="File not found on disk"
-                    )
-
-                return file_path, file_record.file_name, file_record.file_type
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported storage backend: {file_record.storage_backend}",
-            )
-
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Error retrieving file for viewing: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to retrieve file for viewing: {str(e)}"
-            )
+        return await self.get_file_download_info(db, file_id, current_user_id)
 
     def get_files_count_batch(
         self, db: Session, entity_type: str, entity_ids: List[int]
@@ -954,8 +935,7 @@ class GenericEntityFileService:
         entity_type: str,
         entity_id: int,
         file: UploadFile,
-        file_content: bytes,
-        file_size: int,
+        upload: SpooledUpload,
         description: Optional[str] = None,
         category: Optional[str] = None,
     ) -> EntityFileResponse:
@@ -967,41 +947,35 @@ class GenericEntityFileService:
             entity_type: Type of entity
             entity_id: ID of the entity
             file: File to upload
-            file_content: File content bytes
-            file_size: Size of file in bytes
+            upload: The file's content, spooled into the blob store
             description: Optional description
             category: Optional category
 
         Returns:
             EntityFileResponse with file details
         """
-        # Get entity directory
-        entity_dir = self._get_entity_directory(entity_type)
+        blob_store = self.blob_store
+
+        # ✅ FIX: Validate with Pydantic schema BEFORE creating database record
+        # This ensures validation failures are caught BEFORE committing to database
+        file_create = EntityFileCreate(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            file_name=file.filename,
+            file_path=str(blob_store.path_for(upload.sha256)),
+            file_type=file.content_type,  # Pydantic validation happens HERE
+            file_size=upload.size,
+            description=description,
+            category=category,
+            storage_backend="local",
+            uploaded_at=get_utc_now(),
+            content_hash=upload.sha256,
+        )
 
-        # Generate unique filename
-        unique_filename = self._generate_unique_filename(file.filename, entity_dir)
-        file_path = entity_dir / unique_filename
+        # Identical content already uploaded for any entity shares its blob
+        file_path, created = await blob_store.store(upload)
 
         try:
-            # Save file to disk
-            with open(file_path, "wb") as f:
-                f.write(file_content)
-
-            # ✅ FIX: Validate with Pydantic schema BEFORE creating database record
-            # This ensures validation failures are caught BEFORE committing to database
-            file_create = EntityFileCreate(
-                entity_type=entity_type,
-                entity_id=entity_id,
-                file_name=file.filename,
-                file_path=str(file_path),
-                file_type=file.content_type,  # Pydantic validation happens HERE
-                file_size=file_size,
-                description=description,
-                category=category,
-                storage_backend="local",
-                uploaded_at=get_utc_now(),
-            )
-
             # Create database record from validated schema
             entity_file = EntityFile(**file_create.model_dump())
 
@@ -1009,16 +983,33 @@ class GenericEntityFileService:
             db.commit()
             db.refresh(entity_file)
 
+            if not created:
+                # A delete of the blob's last other record may have trashed it
+                # before this record was committed; put the content back
+                file_path, restored = await blob_store.store(upload)
+                if restored:
+                    logger.warning(
+                        f"Blob {upload.sha256} was released while being shared "
+                        f"by a new upload, restored it"
+                    )
+
             logger.info(
-                f"File uploaded to local storage: {file.filename} for {entity_type} {entity_id}"
+                f"File uploaded to local storage: {file.filename} for {entity_type} {entity_id}",
+                extra={
+                    "file_name": file.filename,
+                    "sha256": upload.sha256,
+                    "deduplicated": not created,
+                },
             )
 
             return EntityFileResponse.model_validate(entity_file)
 
         except Exception as e:
-            # Clean up file if database operation failed
-            if file_path.exists():
-                file_path.unlink()
+            # Clean up the blob if database operation failed and nothing else
+            # uses it
+            db.rollback()
+            if created and not blob_references(db, upload.sha256):
+                file_path.unlink(missing_ok=True)
             raise e
 
     async def _upload_to_paperless(
@@ -1027,8 +1018,7 @@ class GenericEntityFileService:
         entity_type: str,
         entity_id: int,
         file: UploadFile,
-        file_content: bytes,
-        file_size: int,
+        upload: SpooledUpload,
         description: Optional[str] = None,
         category: Optional[str] = None,
         current_user_id: Optional[int] = None,
@@ -1041,8 +1031,7 @@ class GenericEntityFileService:
             entity_type: Type of entity
             entity_id: ID of the entity
             file: File to upload
-            file_content: File content bytes
-            file_size: Size of file in bytes
+            upload: The file's spooled content, streamed to Paperless
             description: Optional description
             category: Optional category
             current_user_id: ID of the user uploading the file
@@ -1120,21 +1109,22 @@ class GenericEntityFileService:
                 f"UPLOAD_DEBUG: Starting actual Paperless upload for '{file.filename}'",
                 extra={
                     "file_name": file.filename,
-                    "file_size": file_size,
+                    "file_size": upload.size,
                     "entity_type": entity_type,
                     "entity_id": entity_id,
                     "user_id": current_user_id,
                 },
             )
 
-            async with paperless_service:
-                upload_result = await paperless_service.upload_document(
-                    file_data=file_content,
-                    filename=file.filename,
-                    entity_type=entity_type,
-                    entity_id=entity_id,
-                    description=description,
-                )
+            with upload.open() as file_data:
+                async with paperless_service:
+                    upload_result = await paperless_service.upload_document(
+                        file_data=file_data,
+                        filename=file.filename,
+                        entity_type=entity_type,
+                        entity_id=entity_id,
+                        description=description,
+                    )
 
             logger.info(
                 f"UPLOAD_DEBUG: Paperless upload completed for '{file.filename}'",
@@ -1183,7 +1173,7 @@ class GenericEntityFileService:
                 file_name=file.filename,
                 file_path="paperless://",  # Paperless storage, no local path
                 file_type=file.content_type,  # Pydantic validation happens HERE
-                file_size=file_size,
+                file_size=upload.size,
                 description=description,
                 category=category,
                 storage_backend="paperless",
@@ -1228,8 +1218,7 @@ class GenericEntityFileService:
         entity_type: str,
         entity_id: int,
         file: UploadFile,
-        file_content: bytes,
-        file_size: int,
+        upload: SpooledUpload,
         description: Optional[str],
         category: Optional[str],
         current_user_id: int,
@@ -1255,20 +1244,21 @@ class GenericEntityFileService:
                 f"Starting Papra upload for '{file.filename}'",
                 extra={
                     "file_name": file.filename,
-                    "file_size": file_size,
+                    "file_size": upload.size,
                     "entity_type": entity_type,
                     "entity_id": entity_id,
                     "user_id": current_user_id,
                 },
             )
 
-            async with papra_client:
-                upload_result = await papra_client.upload_document(
-                    file_data=file_content,
-                    filename=file.filename,
-                    title=description or file.filename,
-                    content_type=file.content_type,
-                )
+            with upload.open() as file_data:
+                async with papra_client:
+                    upload_result = await papra_client.upload_document(
+                        file_data=file_data,
+                        filename=file.filename,
+                        title=description or file.filename,
+                        content_type=file.content_type,
+                    )
 
             # Papra is synchronous - document_id is returned immediately
             document_id = upload_result.get("document_id")
@@ -1281,7 +1271,7 @@ class GenericEntityFileService:
                 file_name=file.filename,
                 file_path="papra://",
                 file_type=file.content_type,
-                file_size=file_size,
+                file_size=upload.size,
                 description=description,
                 category=category,
                 storage_backend="papra",
@@ -1312,7 +1302,7 @@ class GenericEntityFileService:
 
     async def _get_papra_download_info(
         self, db: Session, file_record, current_user_id: Optional[int] = None
-    ):
+    ) -> FileDownload:
         """Get download info for a Papra-stored file."""
         try:
             from app.services.papra_client import create_papra_client
@@ -1343,6 +1333,19 @@ class GenericEntityFileService:
                 file_record.papra_organization_id or user_prefs.papra_organization_id
             )
 
+            filename = file_record.file_name
+            content_type = file_record.file_type or "application/octet-stream"
+            cache_key = RemoteDocumentCache.key(
+                "papra",
+                f"{user_prefs.papra_url}/{org_id}",
+                file_record.papra_document_id,
+                current_user_id,
+                [user_prefs.papra_api_token_encrypted],
+            )
+            cached = cached_remote_document(cache_key, filename, content_type)
+            if cached:
+                return cached
+
             papra_client = create_papra_client(
                 url=user_prefs.papra_url,
                 encrypted_token=user_prefs.papra_api_token_encrypted,
@@ -1350,15 +1353,13 @@ class GenericEntityFileService:
                 user_id=current_user_id,
             )
 
-            async with papra_client:
-                file_content = await papra_client.download_document(
-                    file_record.papra_document_id
-                )
-
-            return (
-                file_content,
-                file_record.file_name,
-                file_record.file_type or "application/octet-stream",
+            return await stream_remote_document(
+                self._stream_remote_document(
+                    papra_client, file_record.papra_document_id
+                ),
+                filename,
+                content_type,
+                cache_key=cache_key,
             )
 
         except HTTPException:
@@ -1557,12 +1558,22 @@ class GenericEntityFileService:
             logger.error(f"Exception traceback: {traceback.format_exc()}")
             return False
 
+    @staticmethod
+    async def _stream_remote_document(
+        client, document_id
+    ) -> AsyncGenerator[bytes, None]:
+        """A remote document's chunks, keeping its client open while they're read."""
+        async with client:
+            async with aclosing(client.stream_document(document_id)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
     async def _get_paperless_download_info(
         self,
         db: Session,
         file_record: EntityFile,
         current_user_id: Optional[int] = None,
-    ) -> Tuple[bytes, str, str]:
+    ) -> FileDownload:
         """
         Get file download info from paperless-ngx storage.
 
@@ -1572,7 +1583,7 @@ class GenericEntityFileService:
             current_user_id: ID of the current user for paperless access
 
         Returns:
-            Tuple of (file_content_bytes, filename, content_type)
+            FileDownload streaming the document, or serving its cached copy
         """
         if not file_record.paperless_document_id:
             raise HTTPException(
@@ -1618,28 +1629,41 @@ class GenericEntityFileService:
             )
             logger.debug(f"Download debug - Document ID: {document_id}")
 
+            filename = file_record.file_name
+            content_type = file_record.file_type or "application/octet-stream"
+            cache_key = RemoteDocumentCache.key(
+                "paperless",
+                user_prefs.paperless_url,
+                str(document_id),
+                current_user_id,
+                [
+                    user_prefs.paperless_api_token_encrypted,
+                    user_prefs.paperless_username_encrypted,
+                    user_prefs.paperless_password_encrypted,
+                ],
+            )
+            cached = cached_remote_document(cache_key, filename, content_type)
+            if cached:
+                logger.debug(f"Serving cached paperless document {document_id}")
+                return cached
+
             # Create paperless client using new simplified architecture
-            async with await self._create_paperless_client(
+            paperless_client = await self._create_paperless_client(
                 user_prefs, current_user_id
-            ) as paperless_client:
-                logger.debug("Paperless client created successfully")
-
-                # Download from paperless
-                logger.debug(f"Starting download for document ID: {document_id}")
-                file_content = await paperless_client.download_document(document_id)
-            logger.debug(
-                f"Download completed, content size: {len(file_content) if file_content else 0}"
             )
 
-            logger.info(
-                f"File downloaded from paperless: document_id={document_id}, size={len(file_content)}"
+            # Stream from paperless
+            logger.debug(f"Starting download for document ID: {document_id}")
+            download = await stream_remote_document(
+                self._stream_remote_document(paperless_client, document_id),
+                filename,
+                content_type,
+                cache_key=cache_key,
             )
 
-            return (
-                file_content,
-                file_record.file_name,
-                file_record.file_type or "application/octet-stream",
-            )
+            logger.info(f"Streaming file from paperless: document_id={document_id}")
+
+            return download
 
         except Exception as e:
             logger.error(f"Failed to download file from paperless: {str(e)}")
@@ -1746,21 +1770,26 @@ class GenericEntityFileService:
             # Don't raise - this shouldn't stop the main sync check
 
     async def check_paperless_sync_status(
-        self, db: Session, current_user_id: int
+        self, db: Session, current_user_id: int, force: bool = False
     ) -> Dict[int, bool]:
         """
         Check sync status for all Paperless documents for a user.
         This is the core function that verifies if documents deleted from Paperless
         are properly detected and marked as missing.
 
+        Documents are checked in bulk (see app.services.document_sync); records
+        confirmed present within DOCUMENT_SYNC_TTL_SECONDS are skipped unless
+        force is set.
+
         Args:
             db: Database session
             current_user_id: User ID to check documents for
+            force: Re-check every document, ignoring recent results
 
         Returns:
             Dictionary mapping file_id to existence status (True = exists, False = missing)
         """
-        logger.error(
+        logger.info(
             f"🔍 SYNC SERVICE - check_paperless_sync_status called for user {current_user_id}"
         )
 
@@ -1771,22 +1800,6 @@ class GenericEntityFileService:
             # Get all paperless files for the user by joining with entity tables
             from app.models.models import LabResult, Procedure
 
-            # First, let's see what entity types actually exist for paperless files
-            all_paperless_files = (
-                db.query(EntityFile)
-                .filter(
-                    EntityFile.storage_backend == "paperless",
-                    EntityFile.paperless_document_id.isnot(None),
-                )
-                .all()
-            )
-
-            logger.debug(f"Total paperless files in system: {len(all_paperless_files)}")
-            for f in all_paperless_files:
-                logger.debug(
-                    f"File {f.id}: entity_type='{f.entity_type}', entity_id={f.entity_id}, document_id={f.paperless_document_id}"
-                )
-
             # Build a union query to find paperless files across all entity types for this user
             paperless_files = []
 
@@ -1942,7 +1955,11 @@ class GenericEntityFileService:
                 db, paperless_service, paperless_files
             )
 
-            # Check each document
+            # Sort records into those needing an existence check and those
+            # decided without one (still processing, orphaned, recently synced)
+            to_check = []
+            recent_count = 0
+            now = get_utc_now()
             async with paperless_service:
                 for file_record in paperless_files:
                     try:
@@ -2033,73 +2050,13 @@ class GenericEntityFileService:
                             )
                             continue
 
-                        # Log what we're checking
-                        logger.info(
-                            f"🔍 SYNC CHECK - Checking document {document_id} for file {file_record.file_name} (id: {file_record.id})"
-                        )
-
-                        # Check if document exists in Paperless
-                        exists = await paperless_service.check_document_exists(
-                            document_id
-                        )
-                        logger.info(
-                            f"🔍 SYNC CHECK - Document {document_id} exists: {exists}"
-                        )
-
-                        # Add detailed logging when marking documents as missing
-                        if not exists:
-                            logger.warning(
-                                f"🚨 SYNC CHECK - Document {document_id} (file: {file_record.file_name}, ID: {file_record.id}) will be marked as MISSING. "
-                                f"This could be due to: 1) Document deleted from Paperless, 2) Authentication/permission issues, 3) Invalid document ID. "
-                                f"Current sync_status: {file_record.sync_status}"
-                            )
-
-                        sync_status[file_record.id] = exists
-
-                        # Debug: Log what we're about to do
-                        logger.info(
-                            f"🔍 SYNC CHECK DEBUG - About to update status for document {document_id}: exists={exists}, current_status={file_record.sync_status}"
-                        )
-
-                        # Update sync status in database based on result
-                        if not exists:
-                            old_status = file_record.sync_status
-                            logger.info(
-                                f"🔍 SYNC CHECK DEBUG - Before update: file_record.sync_status = {file_record.sync_status}"
-                            )
-
-                            file_record.sync_status = "missing"
-                            file_record.last_sync_at = get_utc_now()
-                            missing_count += 1
-
-                            logger.info(
-                                f"🔍 SYNC CHECK DEBUG - After update: file_record.sync_status = {file_record.sync_status}"
-                            )
-                            logger.info(
-                                f"Document marked as MISSING: {file_record.file_name} "
-                                f"(id: {file_record.id}, document_id: {document_id}, "
-                                f"old_status: {old_status} -> missing)"
-                            )
-                        else:
-                            # Document exists - update status appropriately
-                            old_status = file_record.sync_status
+                        # Confirmed present recently - no need to ask Paperless again
+                        if not force and is_recently_synced(file_record, now):
+                            sync_status[file_record.id] = True
+                            recent_count += 1
+                            continue
 
-                            # If it was previously missing or in error, mark as synced
-                            if old_status in ["missing", "error", "processing"]:
-                                file_record.sync_status = "synced"
-                                file_record.last_sync_at = get_utc_now()
-                                logger.info(
-                                    f"Document status recovered: {file_record.file_name} "
-                                    f"(id: {file_record.id}, {old_status} -> synced)"
-                                )
-                            elif old_status == "synced":
-                                # Already synced, just update timestamp
-                                file_record.last_sync_at = get_utc_now()
-                            else:
-                                # Processing status - keep as is but update timestamp
-                                file_record.last_sync_at = get_utc_now()
-                                if old_status == "processing":
-                                    processing_count += 1
+                        to_check.append((file_record, str(document_id).strip()))
 
                     except PaperlessAuthenticationError as auth_error:
                         # Authentication errors should stop the entire sync check
@@ -2108,56 +2065,69 @@ class GenericEntityFileService:
                         )
                         raise auth_error
 
-                    except PaperlessError as paperless_error:
-                        # Handle specific paperless errors (e.g., connection issues)
+                    except Exception as e:
                         error_count += 1
-                        old_status = file_record.sync_status
+                        self._mark_sync_error(file_record, sync_status, e)
 
-                        logger.warning(
-                            f"Paperless error checking document {file_record.paperless_document_id} "
-                            f"for file {file_record.file_name}: {str(paperless_error)}"
-                        )
-
-                        # For connection/network errors, don't mark as missing - mark as error
-                        sync_status[file_record.id] = (
-                            None  # Indicates error, not missing
-                        )
-                        file_record.sync_status = "error"
-                        file_record.last_sync_at = get_utc_now()
+                logger.info(
+                    f"🔍 SYNC CHECK - Checking {len(to_check)} documents, "
+                    f"{recent_count} skipped as recently synced"
+                )
 
-                        logger.warning(
-                            f"Document marked as ERROR: {file_record.file_name} "
-                            f"(id: {file_record.id}, {old_status} -> error)"
-                        )
+                # Check if documents exist in Paperless, in bulk
+                try:
+                    existence = await check_paperless_documents(
+                        paperless_service,
+                        [document_id for _, document_id in to_check],
+                    )
+                except PaperlessAuthenticationError as auth_error:
+                    # Authentication errors should stop the entire sync check
+                    logger.error(
+                        f"Authentication error during sync check: {str(auth_error)}"
+                    )
+                    raise auth_error
+
+            for file_record, document_id in to_check:
+                result = existence[document_id]
+                if isinstance(result, Exception):
+                    # For connection/network errors, don't mark as missing - mark as error
+                    error_count += 1
+                    self._mark_sync_error(file_record, sync_status, result)
+                    continue
 
-                    except Exception as e:
-                        # Unexpected errors
-                        error_count += 1
-                        old_status = file_record.sync_status
+                exists = result
+                sync_status[file_record.id] = exists
 
-                        logger.error(
-                            f"🚨 SYNC CHECK EXCEPTION - Unexpected error checking document {file_record.paperless_document_id} "
-                            f"for file {file_record.file_name}: {str(e)}"
-                        )
-                        logger.error(
-                            f"🚨 SYNC CHECK EXCEPTION - Exception type: {type(e)}"
-                        )
-                        import traceback
+                # Update sync status in database based on result
+                if not exists:
+                    old_status = file_record.sync_status
+                    logger.warning(
+                        f"🚨 SYNC CHECK - Document {document_id} (file: {file_record.file_name}, ID: {file_record.id}) will be marked as MISSING. "
+                        f"This could be due to: 1) Document deleted from Paperless, 2) Authentication/permission issues, 3) Invalid document ID. "
+                        f"Current sync_status: {old_status}"
+                    )
 
-                        logger.error(
-                            f"🚨 SYNC CHECK EXCEPTION - Traceback: {traceback.format_exc()}"
-                        )
+                    file_record.sync_status = "missing"
+                    file_record.last_sync_at = get_utc_now()
+                    missing_count += 1
 
-                        sync_status[file_record.id] = (
-                            None  # Indicates error, not missing
-                        )
-                        file_record.sync_status = "error"
-                        file_record.last_sync_at = get_utc_now()
+                    logger.info(
+                        f"Document marked as MISSING: {file_record.file_name} "
+                        f"(id: {file_record.id}, document_id: {document_id}, "
+                        f"old_status: {old_status} -> missing)"
+                    )
+                else:
+                    # Document exists - update status appropriately
+                    old_status = file_record.sync_status
 
-                        logger.warning(
-                            f"Document marked as ERROR: {file_record.file_name} "
-                            f"(id: {file_record.id}, {old_status} -> error)"
+                    # If it was previously missing or in error, mark as synced
+                    if old_status in ["missing", "error", "processing"]:
+                        file_record.sync_status = "synced"
+                        logger.info(
+                            f"Document status recovered: {file_record.file_name} "
+                            f"(id: {file_record.id}, {old_status} -> synced)"
                         )
+                    file_record.last_sync_at = get_utc_now()
 
             # Commit all database updates
             try:
@@ -2217,15 +2187,20 @@ class GenericEntityFileService:
             return {}
 
     async def check_papra_sync_status(
-        self, db: Session, current_user_id: int
+        self, db: Session, current_user_id: int, force: bool = False
     ) -> Dict[int, Optional[bool]]:
         """
         Check sync status for all Papra documents belonging to the current user.
         Verifies if documents still exist on the Papra server.
 
+        Documents are checked concurrently (see app.services.document_sync);
+        records confirmed present within DOCUMENT_SYNC_TTL_SECONDS are skipped
+        unless force is set.
+
         Args:
             db: Database session
             current_user_id: User ID to check documents for
+            force: Re-check every document, ignoring recent results
 
         Returns:
             Dictionary mapping file_id to existence status
@@ -2307,44 +2282,59 @@ class GenericEntityFileService:
                 user_id=current_user_id,
             )
 
+            # Confirmed present recently - no need to ask Papra again
+            now = get_utc_now()
+            to_check = []
+            for file_record in papra_files:
+                if not force and is_recently_synced(file_record, now):
+                    sync_status[file_record.id] = True
+                else:
+                    to_check.append(file_record)
+
             async with papra_client:
-                for file_record in papra_files:
-                    try:
-                        doc_id = file_record.papra_document_id
+                existence = await check_papra_documents(
+                    papra_client, [f.papra_document_id for f in to_check]
+                )
 
-                        doc_info = await papra_client.get_document_info(doc_id)
-                        exists = doc_info is not None
+            error_count = 0
+            for file_record in to_check:
+                doc_id = file_record.papra_document_id
+                result = existence[doc_id]
 
-                        sync_status[file_record.id] = exists
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"Error checking Papra document {doc_id}: {str(result)}"
+                    )
+                    sync_status[file_record.id] = None
+                    file_record.sync_status = "error"
+                    file_record.last_sync_at = get_utc_now()
+                    error_count += 1
+                    continue
 
-                        if not exists:
-                            old_status = file_record.sync_status
-                            file_record.sync_status = "missing"
-                            file_record.last_sync_at = get_utc_now()
-                            missing_count += 1
-                            logger.warning(
-                                f"Papra document missing: {file_record.file_name} "
-                                f"(id: {file_record.id}, doc_id: {doc_id}, {old_status} -> missing)"
-                            )
-                        else:
-                            if file_record.sync_status in ["missing", "error"]:
-                                file_record.sync_status = "synced"
-                            file_record.last_sync_at = get_utc_now()
+                exists = result
+                sync_status[file_record.id] = exists
 
-                    except Exception as e:
-                        logger.error(
-                            f"Error checking Papra document {file_record.papra_document_id}: {str(e)}"
-                        )
-                        sync_status[file_record.id] = None
-                        file_record.sync_status = "error"
-                        file_record.last_sync_at = get_utc_now()
+                if not exists:
+                    old_status = file_record.sync_status
+                    file_record.sync_status = "missing"
+                    file_record.last_sync_at = get_utc_now()
+                    missing_count += 1
+                    logger.warning(
+                        f"Papra document missing: {file_record.file_name} "
+                        f"(id: {file_record.id}, doc_id: {doc_id}, {old_status} -> missing)"
+                    )
+                else:
+                    if file_record.sync_status in ["missing", "error"]:
+                        file_record.sync_status = "synced"
+                    file_record.last_sync_at = get_utc_now()
 
             db.commit()
 
-            synced_count = len(papra_files) - missing_count
+            synced_count = len(papra_files) - missing_count - error_count
             logger.info(
                 f"Papra sync check completed (user: {current_user_id}): "
-                f"{len(papra_files)} total, {synced_count} synced, {missing_count} missing"
+                f"{len(papra_files)} total, {synced_count} synced, {missing_count} missing, "
+                f"{error_count} errors, {len(papra_files) - len(to_check)} recently synced"
             )
 
             return sync_status
@@ -2353,6 +2343,24 @@ class GenericEntityFileService:
             logger.error(f"Error checking Papra sync status: {str(e)}")
             return {}
 
+    def _mark_sync_error(
+        self, file_record: EntityFile, sync_status: Dict, error: Exception
+    ) -> None:
+        """Record that a document's existence could not be determined."""
+        old_status = file_record.sync_status
+        logger.warning(
+            f"Error checking document {file_record.paperless_document_id or file_record.papra_document_id} "
+            f"for file {file_record.file_name}: {type(error).__name__}: {str(error)}"
+        )
+        # Not an answer about the document, so don't mark it missing
+        sync_status[file_record.id] = None  # Indicates error, not missing
+        file_record.sync_status = "error"
+        file_record.last_sync_at = get_utc_now()
+        logger.warning(
+            f"Document marked as ERROR: {file_record.file_name} "
+            f"(id: {file_record.id}, {old_status} -> error)"
+        )
+
     async def _resolve_task_uuids_to_document_ids(
         self, db: Session, paperless_service, paperless_files: List
     ) -> None:
@@ -2956,26 +2964,24 @@ class GenericEntityFileService:
             deleted_local_files = 0
             preserved_paperless_files = 0
             errors = 0
+            deleted_ids = [file_record.id for file_record in entity_files]
+            released_paths = set()
 
             for file_record in entity_files:
                 try:
                     if file_record.storage_backend == "local":
-                        # Delete local files (move to trash)
-                        if file_record.file_path and os.path.exists(
-                            file_record.file_path
+                        # Delete local files (move to trash) once no record
+                        # outside this entity shares them
+                        if file_record.file_path in released_paths:
+                            deleted_local_files += 1
+                        elif self._release_local_file(
+                            db,
+                            file_record,
+                            reason=f"{entity_type} {entity_id} deletion",
+                            exclude_ids=deleted_ids,
                         ):
-                            trash_result = self.file_management_service.move_to_trash(
-                                file_record.file_path,
-                                reason=f"{entity_type} {entity_id} deletion",
-                            )
-                            logger.info(
-                                f"Moved local file to trash: {file_record.file_name} -> {trash_result}"
-                            )
+                            released_paths.add(file_record.file_path)
                             deleted_local_files += 1
-                        else:
-                            logger.warning(
-                                f"Local file not found for deletion: {file_record.file_path}"
-                            )
 
                     elif file_record.storage_backend == "paperless":
                         if preserve_paperless:
@@ -3003,6 +3009,7 @@ class GenericEntityFileService:
 
             # Commit all file record deletions
             db.commit()
+            self._discard_cached_documents(entity_files)
 
             logger.info(
                 f"EntityFile cleanup completed for {entity_type} {entity_id}: "
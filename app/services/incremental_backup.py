@@ -0,0 +1,263 @@
+"""
+Incremental, Content-Addressed File Backups
+
+Uploaded documents are immutable once stored, so re-archiving the whole
+uploads directory every night mostly copies bytes the previous backup already
+holds. An incremental backup instead writes:
+
+- blobs: each distinct file content once, named by its SHA-256, under
+  BACKUP_DIR/incremental/blobs/<first two hex chars>/<sha256>
+- a snapshot manifest: JSON listing every upload at backup time as
+  {relative path: size, mtime_ns, sha256}, under
+  BACKUP_DIR/incremental/snapshots/
+
+Files whose size and mtime match the parent snapshot reuse its hash without
+being read; only new or changed content is hashed, and only content not
+already in the store is copied. Every manifest lists the complete tree, so
+any snapshot restores on its own from the shared blob store, whichever
+earlier snapshot in the chain first stored each blob.
+
+Blobs are shared between snapshots, so deleting a snapshot never deletes
+blobs directly: collect_garbage() removes the blobs no remaining snapshot
+references.
+
+All functions here do blocking I/O; BackupService and RestoreService run
+them via asyncio.to_thread.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.backup_archive import (
+    HASH_CHUNK_SIZE,
+    ProgressCallback,
+    collect_upload_entries,
+)
+
+SNAPSHOT_VERSION = 1
+# Blobs younger than this are never garbage collected: they may belong to a
+# snapshot that is still being written and has no manifest yet. Snapshots
+# touch the existing blobs they reuse, so this covers those too
+GC_GRACE_SECONDS = 3600
+
+
+def _hash_file(path: Path) -> str:
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """Read a snapshot manifest, rejecting files that are not one."""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("backup_type") != "incremental" or "files" not in manifest:
+        raise ValueError(f"Not an incremental backup manifest: {manifest_path}")
+    return manifest
+
+
+class SnapshotStore:
+    """Blob store and snapshot manifests under one directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.snapshot_dir = self.root / "snapshots"
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    def _reuse_blob(self, sha256: str) -> bool:
+        """
+        Refresh an existing blob's mtime; False if the store lacks it.
+
+        A snapshot in progress has no manifest yet, so this is what keeps
+        collect_garbage from deleting the blobs it is about to reference.
+        """
+        try:
+            os.utime(self.blob_path(sha256))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _store_blob(self, source: Path, sha256: str) -> bool:
+        """Copy source into the store unless its content is there; True if copied."""
+        target = self.blob_path(sha256)
+        if self._reuse_blob(sha256):
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{sha256}.{os.getpid()}.tmp")
+        shutil.copyfile(source, temp)
+        # Atomic, so a crash never leaves a truncated blob under its final name
+        os.replace(temp, target)
+        return True
+
+    def create_snapshot(
+        self,
+        uploads_dir: Path,
+        name: str,
+        parent_manifest: Optional[Path] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Snapshot uploads_dir, storing only content the store doesn't have.
+
+        Args:
+            uploads_dir: Directory to back up
+            name: Manifest file name (e.g. "files_incremental_<timestamp>.json")
+            parent_manifest: Previous snapshot; unchanged files reuse its hashes
+            progress: Called as progress(files_done, files_total)
+
+        Returns:
+            Snapshot statistics, the manifest path and the manifest's SHA-256
+        """
+        manifest_path = self.snapshot_dir / name
+        if manifest_path.exists():
+            raise FileExistsError(f"Snapshot already exists: {manifest_path}")
+
+        previous: Dict[str, Dict[str, Any]] = {}
+        if parent_manifest is not None and parent_manifest.exists():
+            previous = load_manifest(parent_manifest)["files"]
+
+        entries = collect_upload_entries(uploads_dir)
+        files: Dict[str, Dict[str, Any]] = {}
+        new_blobs = 0
+        stored_bytes = 0
+        hashed_files = 0
+        total_bytes = 0
+
+        for done, entry in enumerate(entries, start=1):
+            relative = entry.source.relative_to(uploads_dir).as_posix()
+            stat = entry.source.stat()
+            known = previous.get(relative)
+            if (
+                known
+                and known["size"] == stat.st_size
+                and known["mtime_ns"] == stat.st_mtime_ns
+                and self._reuse_blob(known["sha256"])
+            ):
+                sha256 = known["sha256"]
+            else:
+                sha256 = _hash_file(entry.source)
+                hashed_files += 1
+                if self._store_blob(entry.source, sha256):
+                    new_blobs += 1
+                    stored_bytes += stat.st_size
+
+            files[relative] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+            }
+            total_bytes += stat.st_size
+            if progress:
+                progress(done, len(entries))
+
+        stats = {
+            "files": len(files),
+            "total_bytes": total_bytes,
+            "hashed_files": hashed_files,
+            "new_blobs": new_blobs,
+            "stored_bytes": stored_bytes,
+        }
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "backup_type": "incremental",
+            "created_at": datetime.now().isoformat(),
+            "parent": parent_manifest.name if parent_manifest else None,
+            "stats": stats,
+            "files": files,
+        }
+
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+        temp = manifest_path.with_suffix(".tmp")
+        temp.write_bytes(data)
+        os.replace(temp, manifest_path)
+
+        return {
+            **stats,
+            "manifest_path": manifest_path,
+            "manifest_bytes": len(data),
+            "checksum": hashlib.sha256(data).hexdigest(),
+        }
+
+    def restore_snapshot(
+        self, manifest_path: Path, target_dir: Path
+    ) -> Tuple[int, int]:
+        """
+        Write every file of a snapshot into target_dir.
+
+        Returns:
+            (files restored, bytes restored)
+        """
+        files = load_manifest(manifest_path)["files"]
+        missing = self.missing_blobs(manifest_path)
+        if missing:
+            raise ValueError(
+                f"Snapshot is incomplete: {len(missing)} blobs are missing from the store"
+            )
+
+        root = Path(target_dir).resolve()
+        restored_bytes = 0
+        for relative, info in files.items():
+            target = (root / relative).resolve()
+            # Manifest paths must stay inside the uploads directory
+            if root not in target.parents:
+                raise ValueError(f"Unsafe path in snapshot manifest: {relative}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.blob_path(info["sha256"]), target)
+            restored_bytes += info["size"]
+        return len(files), restored_bytes
+
+    def missing_blobs(self, manifest_path: Path) -> List[str]:
+        """Hashes a snapshot references that are absent or the wrong size."""
+        files = load_manifest(manifest_path)["files"]
+        missing = []
+        for sha256, size in {
+            info["sha256"]: info["size"] for info in files.values()
+        }.items():
+            blob = self.blob_path(sha256)
+            if not blob.exists() or blob.stat().st_size != size:
+                missing.append(sha256)
+        return missing
+
+    def collect_garbage(self, live_manifests: Iterable[Path]) -> Dict[str, int]:
+        """
+        Delete blobs that none of live_manifests reference.
+
+        Returns:
+            Blobs removed and bytes freed
+        """
+        referenced: Set[str] = set()
+        for manifest_path in live_manifests:
+            if Path(manifest_path).exists():
+                referenced.update(
+                    info["sha256"]
+                    for info in load_manifest(Path(manifest_path))["files"].values()
+                )
+
+        removed = 0
+        freed = 0
+        if not self.blob_dir.exists():
+            return {"blobs_removed": removed, "bytes_freed": freed}
+
+        cutoff = time.time() - GC_GRACE_SECONDS
+        for blob in self.blob_dir.glob("*/*"):
+            if blob.name in referenced or not blob.is_file():
+                continue
+            stat = blob.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            blob.unlink()
+            removed += 1
+            freed += stat.st_size
+        return {"blobs_removed": removed, "bytes_freed": freed}
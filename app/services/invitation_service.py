@@ -16,6 +16,7 @@ from app.events.collaboration_events import (
     InvitationReceivedEvent,
 )
 from app.models.models import Invitation, User
+from app.services.patient_access_cache import patient_access_cache
 
 logger = get_logger(__name__, "app")
 
@@ -211,6 +212,13 @@ class InvitationService:
 
             self.db.commit()
 
+            # An accepted patient share changes what the responder may access
+            if (
+                response == "accepted"
+                and invitation.invitation_type == "patient_share"
+            ):
+                patient_access_cache.invalidate_user(user.id)
+
             # Publish invitation accepted event
             if response == "accepted":
                 event = InvitationAcceptedEvent(
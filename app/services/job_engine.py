@@ -0,0 +1,817 @@
+"""
+Background Job Engine
+
+Runs long-running user work (patient exports, custom PDF reports, backups)
+outside the HTTP request that asked for it. A submit endpoint records a
+BackgroundJob row and returns immediately; a bounded pool of worker tasks
+claims queued rows by priority, runs the job's handler in a thread with its
+own database session, and records progress, the result and any produced file
+(the job's "artifact") on the row. Clients poll the row for progress and
+download the artifact once the job has succeeded.
+
+Jobs live in the database rather than in memory, so queued work survives a
+restart and any process sharing the database can report on it. Claiming is a
+conditional UPDATE (status 'queued' -> 'running'), so two workers never run
+the same job. Completion and failure are published on the EventBus as
+JobCompletedEvent / JobFailedEvent, which the notification handler turns into
+user notifications.
+
+Handlers never write to the job row themselves: they report progress into
+their JobContext and the worker flushes it (with a heartbeat) every few
+seconds. This keeps the handler's long read transaction free of interleaved
+writes and lets the worker deliver cancellation requests between flushes.
+
+PHI is never logged: only job IDs, types and user IDs are recorded.
+"""
+
+import asyncio
+import os
+import shutil
+import socket
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events.base import DomainEvent
+from app.core.events.bus import get_event_bus
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.events.job_events import JobCompletedEvent, JobFailedEvent
+from app.models.base import get_utc_now
+from app.models.jobs import BackgroundJob
+from app.models.models import User
+
+logger = get_logger(__name__, "app")
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+# How often a worker flushes handler progress and checks for cancellation
+HEARTBEAT_SECONDS = 2
+# A running job whose heartbeat is older than this lost its worker (crash or
+# restart mid-job) and is failed by the janitor so the user can resubmit
+STALE_JOB_SECONDS = 300
+JANITOR_INTERVAL_SECONDS = 300
+# What the job's owner sees when a handler raises; the exception itself may
+# carry paths or record details, so it is only logged
+JOB_FAILED_MESSAGE = "The job could not be completed. Please try again later."
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job's owner asked to cancel it."""
+
+
+class JobQueueFull(Exception):
+    """Raised on submit when the user already has too many active jobs."""
+
+
+@dataclass
+class JobResult:
+    """
+    What a handler produced.
+
+    Attributes:
+        filename: Name of the artifact written via JobContext.artifact_path(),
+            or None if the job produced no downloadable file
+        media_type: Content type served when the artifact is downloaded
+        summary: Small JSON-serializable description stored on the job row
+    """
+
+    filename: Optional[str] = None
+    media_type: str = "application/octet-stream"
+    summary: Optional[Dict[str, Any]] = None
+
+
+class JobContext:
+    """Handle passed to a job handler; runs in the handler's worker thread."""
+
+    def __init__(self, job: BackgroundJob, job_dir: Path):
+        self.db: Optional[Session] = None  # set in the handler's thread
+        self.job_id: int = job.id
+        self.job_type: str = job.job_type
+        self.user_id: int = job.user_id
+        self.params: Dict[str, Any] = dict(job.params or {})
+        self.job_dir = job_dir
+        self.progress: Optional[int] = None
+        self.progress_message: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    def report_progress(
+        self, percent: Optional[int] = None, message: Optional[str] = None
+    ) -> None:
+        """
+        Record progress for the next worker flush.
+
+        Also the handler's cancellation point: raises JobCancelled once the
+        owner has asked to cancel, so handlers should call it regularly.
+        """
+        if percent is not None:
+            # 100 is reserved for the engine marking the job succeeded
+            self.progress = max(0, min(99, int(percent)))
+        if message is not None:
+            self.progress_message = message[:255]
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    @property
+    def cancel_requested(self) -> bool:
+        """True once the owner asked to cancel (delivered by the worker)."""
+        return self._cancelled.is_set()
+
+    def artifact_path(self, filename: str) -> Path:
+        """Path the handler should write its artifact ``filename`` to."""
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        return self.job_dir / Path(filename).name
+
+
+@dataclass(frozen=True)
+class JobType:
+    """Registered kind of job and how to run it."""
+
+    handler: Callable[[JobContext], JobResult]
+    priority: int = 0
+    admin_only: bool = False
+    validate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def register_job_type(
+    job_type: str,
+    handler: Callable[[JobContext], JobResult],
+    *,
+    priority: int = 0,
+    admin_only: bool = False,
+    validate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> None:
+    """
+    Register a job handler.
+
+    Args:
+        job_type: Name clients submit (stored in BackgroundJob.job_type)
+        handler: Synchronous callable run in a worker thread
+        priority: Higher-priority jobs are claimed first
+        admin_only: Only admins may submit this job type
+        validate: Normalizes submitted params; raises ValueError if invalid
+    """
+    JOB_TYPES[job_type] = JobType(
+        handler=handler, priority=priority, admin_only=admin_only, validate=validate
+    )
+
+
+def _is_admin(user: Optional[User]) -> bool:
+    role = getattr(user, "role", None)
+    return bool(role) and role.lower() in ("admin", "administrator")
+
+
+class JobEngine:
+    """Singleton pool of worker tasks that run queued background jobs."""
+
+    _instance: Optional["JobEngine"] = None
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        worker_count: Optional[int] = None,
+        artifact_dir: Optional[Path] = None,
+    ) -> None:
+        if session_factory is None:
+            from app.core.database.database import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self.worker_count = max(1, worker_count or settings.JOB_WORKER_COUNT)
+        self.artifact_dir = Path(artifact_dir or settings.JOB_ARTIFACT_DIR)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def get_instance(cls) -> "JobEngine":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — tear down the singleton."""
+        if cls._instance is not None:
+            for task in cls._instance._tasks:
+                task.cancel()
+            cls._instance = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the worker pool and the janitor."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{n}")
+            for n in range(self.worker_count)
+        ]
+        self._tasks.append(asyncio.create_task(self._janitor(), name="job-janitor"))
+
+        logger.info(
+            "Background job engine started",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "job_engine_started",
+                "workers": self.worker_count,
+            },
+        )
+
+    async def shutdown(self) -> None:
+        """
+        Stop the worker pool.
+
+        Queued jobs stay queued for the next start. A job whose handler is
+        mid-run cannot be interrupted; it is failed by the janitor once its
+        heartbeat goes stale.
+        """
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(
+            "Background job engine stopped",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "job_engine_stopped",
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Request-side API (called with the request's session)
+    # ------------------------------------------------------------------
+
+    def submit(
+        self, db: Session, user: User, job_type: str, params: Dict[str, Any]
+    ) -> BackgroundJob:
+        """
+        Queue a job for ``user``.
+
+        Raises:
+            ValueError: Unknown job type or invalid params
+            PermissionError: Admin-only job type submitted by a non-admin
+            JobQueueFull: The user already has JOB_MAX_ACTIVE_PER_USER active jobs
+        """
+        spec = JOB_TYPES.get(job_type)
+        if spec is None:
+            raise ValueError(f"Unsupported job type: {job_type}")
+        if spec.admin_only and not _is_admin(user):
+            raise PermissionError(f"Only administrators can run {job_type} jobs")
+        params = spec.validate(params or {}) if spec.validate else (params or {})
+
+        active = (
+            db.query(BackgroundJob)
+            .filter(
+                BackgroundJob.user_id == user.id,
+                BackgroundJob.status.in_(ACTIVE_STATUSES),
+            )
+            .count()
+        )
+        if active >= settings.JOB_MAX_ACTIVE_PER_USER:
+            raise JobQueueFull(
+                f"You already have {active} jobs in progress; "
+                "wait for one to finish before submitting another"
+            )
+
+        job = BackgroundJob(
+            user_id=user.id,
+            job_type=job_type,
+            status=STATUS_QUEUED,
+            priority=spec.priority,
+            params=params,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def cancel(self, db: Session, job: BackgroundJob) -> BackgroundJob:
+        """
+        Cancel a job. Queued jobs are cancelled at once; running jobs stop at
+        their handler's next progress report.
+        """
+        if job.status == STATUS_QUEUED:
+            now = get_utc_now()
+            cancelled = (
+                db.query(BackgroundJob)
+                .filter(
+                    BackgroundJob.id == job.id,
+                    BackgroundJob.status == STATUS_QUEUED,
+                )
+                .update(
+                    {
+                        BackgroundJob.status: STATUS_CANCELLED,
+                        BackgroundJob.finished_at: now,
+                        BackgroundJob.expires_at: self._expiry(now),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if cancelled:
+                db.commit()
+                db.refresh(job)
+                return job
+            # A worker claimed it in the meantime; fall through to running
+            db.refresh(job)
+
+        if job.status == STATUS_RUNNING:
+            job.cancel_requested = True
+            db.commit()
+            db.refresh(job)
+        return job
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    async def run_next(self) -> bool:
+        """Claim and run the next queued job. Returns False if none was queued."""
+        job_id = await asyncio.to_thread(self._claim_next)
+        if job_id is None:
+            return False
+        await self._execute(job_id)
+        return True
+
+    async def run_pending(self) -> int:
+        """Run queued jobs until none are left; returns how many ran."""
+        ran = 0
+        while await self.run_next():
+            ran += 1
+        return ran
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                if await self.run_next():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Background job worker iteration failed",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "job_worker_failed",
+                        LogFields.ERROR: str(e),
+                    },
+                )
+            # Idle: sleep until a local submit wakes us, polling for jobs
+            # queued by other processes
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _janitor(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.purge_expired)
+                await asyncio.to_thread(self.fail_stale)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Background job janitor failed",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "job_janitor_failed",
+                        LogFields.ERROR: str(e),
+                    },
+                )
+            await asyncio.sleep(JANITOR_INTERVAL_SECONDS)
+
+    def _claim_next(self) -> Optional[int]:
+        with self._session_factory() as db:
+            while True:
+                candidate = (
+                    db.query(BackgroundJob.id)
+                    .filter(BackgroundJob.status == STATUS_QUEUED)
+                    .order_by(BackgroundJob.priority.desc(), BackgroundJob.id)
+                    .first()
+                )
+                if candidate is None:
+                    return None
+                now = get_utc_now()
+                claimed = (
+                    db.query(BackgroundJob)
+                    .filter(
+                        BackgroundJob.id == candidate.id,
+                        BackgroundJob.status == STATUS_QUEUED,
+                    )
+                    .update(
+                        {
+                            BackgroundJob.status: STATUS_RUNNING,
+                            BackgroundJob.worker_id: self.worker_id,
+                            BackgroundJob.started_at: now,
+                            BackgroundJob.heartbeat_at: now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return candidate.id
+                # Lost the race to another worker; try the next job
+
+    async def _execute(self, job_id: int) -> None:
+        context = await asyncio.to_thread(self._load_context, job_id)
+        handler_task = asyncio.create_task(
+            asyncio.to_thread(self._run_handler, context)
+        )
+        while True:
+            done, _ = await asyncio.wait({handler_task}, timeout=HEARTBEAT_SECONDS)
+            if done:
+                break
+            await asyncio.to_thread(self._heartbeat, context)
+
+        event = await asyncio.to_thread(
+            self._finish, job_id, context, handler_task.result()
+        )
+        if event is not None:
+            try:
+                await get_event_bus().publish(event)
+            except Exception as e:
+                logger.warning(
+                    "Could not publish background job event",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "job_event_publish_failed",
+                        "job_id": job_id,
+                        LogFields.ERROR: str(e),
+                    },
+                )
+
+    def _load_context(self, job_id: int) -> JobContext:
+        with self._session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            return JobContext(job, self.artifact_dir / str(job_id))
+
+    def _run_handler(self, context: JobContext):
+        """Run the handler; returns a JobResult or the exception it raised."""
+        # The handler thread owns its session, so a worker cancelled while
+        # waiting on it (shutdown) never closes it mid-query
+        context.db = self._session_factory()
+        try:
+            spec = JOB_TYPES.get(context.job_type)
+            if spec is None:
+                raise ValueError("Job type is no longer supported")
+            return spec.handler(context)
+        except JobCancelled as e:
+            return e
+        except Exception as e:
+            logger.error(
+                "Background job handler failed",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "job_handler_error",
+                    "job_id": context.job_id,
+                    "job_type": context.job_type,
+                    LogFields.ERROR: str(e),
+                },
+                exc_info=True,
+            )
+            return e
+        finally:
+            context.db.close()
+
+    def _heartbeat(self, context: JobContext) -> None:
+        with self._session_factory() as db:
+            values = {BackgroundJob.heartbeat_at: get_utc_now()}
+            if context.progress is not None:
+                values[BackgroundJob.progress] = context.progress
+            if context.progress_message is not None:
+                values[BackgroundJob.progress_message] = context.progress_message
+            db.query(BackgroundJob).filter(BackgroundJob.id == context.job_id).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+            cancel_requested = (
+                db.query(BackgroundJob.cancel_requested)
+                .filter(BackgroundJob.id == context.job_id)
+                .scalar()
+            )
+        if cancel_requested:
+            context._cancelled.set()
+
+    def _finish(
+        self, job_id: int, context: JobContext, outcome
+    ) -> Optional[DomainEvent]:
+        with self._session_factory() as db:
+            job = db.get(BackgroundJob, job_id)
+            now = get_utc_now()
+            job.finished_at = now
+            job.expires_at = self._expiry(now)
+            job.heartbeat_at = now
+            event: Optional[DomainEvent] = None
+
+            if isinstance(outcome, JobCancelled):
+                job.status = STATUS_CANCELLED
+                shutil.rmtree(context.job_dir, ignore_errors=True)
+            elif isinstance(outcome, Exception):
+                job.status = STATUS_FAILED
+                job.error = JOB_FAILED_MESSAGE
+                shutil.rmtree(context.job_dir, ignore_errors=True)
+                event = JobFailedEvent(
+                    user_id=job.user_id,
+                    job_id=job.id,
+                    job_type=job.job_type,
+                    error=job.error,
+                )
+            else:
+                job.status = STATUS_SUCCEEDED
+                job.progress = 100
+                job.progress_message = None
+                job.result = outcome.summary
+                if outcome.filename:
+                    path = context.job_dir / outcome.filename
+                    job.artifact_path = str(path)
+                    job.artifact_filename = outcome.filename
+                    job.artifact_media_type = outcome.media_type
+                    job.artifact_size = path.stat().st_size
+                event = JobCompletedEvent(
+                    user_id=job.user_id,
+                    job_id=job.id,
+                    job_type=job.job_type,
+                    artifact_filename=job.artifact_filename,
+                )
+            db.commit()
+
+            log = logger.warning if job.status == STATUS_FAILED else logger.info
+            log(
+                "Background job finished",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "job_finished",
+                    LogFields.USER_ID: job.user_id,
+                    "job_id": job.id,
+                    "job_type": job.job_type,
+                    "status": job.status,
+                },
+            )
+            return event
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _expiry(finished_at: datetime) -> datetime:
+        return finished_at + timedelta(hours=settings.JOB_RETENTION_HOURS)
+
+    def _remove_artifacts(self, job_id: int) -> None:
+        job_dir = (self.artifact_dir / str(job_id)).resolve()
+        # Only ever delete inside the artifact directory
+        if job_dir.parent == self.artifact_dir.resolve():
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs past their retention, with their artifacts."""
+        with self._session_factory() as db:
+            expired = (
+                db.query(BackgroundJob)
+                .filter(
+                    BackgroundJob.status.in_(FINISHED_STATUSES),
+                    BackgroundJob.expires_at < get_utc_now(),
+                )
+                .all()
+            )
+            for job in expired:
+                self._remove_artifacts(job.id)
+                db.delete(job)
+            db.commit()
+
+            # Artifacts of jobs deleted with their user (ON DELETE CASCADE)
+            if self.artifact_dir.is_dir():
+                job_dirs = {
+                    int(path.name): path
+                    for path in self.artifact_dir.iterdir()
+                    if path.is_dir() and path.name.isdigit()
+                }
+                known = {
+                    job_id
+                    for (job_id,) in db.query(BackgroundJob.id).filter(
+                        BackgroundJob.id.in_(list(job_dirs))
+                    )
+                }
+                for job_id in job_dirs.keys() - known:
+                    self._remove_artifacts(job_id)
+        return len(expired)
+
+    def fail_stale(self) -> int:
+        """Fail running jobs whose worker stopped heartbeating."""
+        cutoff = get_utc_now() - timedelta(seconds=STALE_JOB_SECONDS)
+        with self._session_factory() as db:
+            stale = (
+                db.query(BackgroundJob)
+                .filter(
+                    BackgroundJob.status == STATUS_RUNNING,
+                    BackgroundJob.heartbeat_at < cutoff,
+                )
+                .all()
+            )
+            now = get_utc_now()
+            for job in stale:
+                self._remove_artifacts(job.id)
+                job.status = STATUS_FAILED
+                job.error = "The server stopped before the job finished"
+                job.finished_at = now
+                job.expires_at = self._expiry(now)
+            db.commit()
+        return len(stale)
+
+
+# ----------------------------------------------------------------------
+# Built-in job types
+# ----------------------------------------------------------------------
+
+EXPORT_FORMATS = {
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+
+def _validate_export(params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.services.export_service import EXPORT_CATEGORIES
+
+    export_format = params.get("format", "json")
+    scope = params.get("scope", "all")
+    unit_system = params.get("unit_system", "imperial")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if scope != "all" and scope not in EXPORT_CATEGORIES:
+        raise ValueError(f"Unsupported export scope: {scope}")
+    if unit_system not in ("imperial", "metric"):
+        raise ValueError("unit_system must be 'imperial' or 'metric'")
+    for key in ("start_date", "end_date"):
+        if params.get(key):
+            # Stored as ISO strings so the params column stays JSON
+            datetime.strptime(str(params[key]), "%Y-%m-%d")
+    return {
+        "format": export_format,
+        "scope": scope,
+        "unit_system": unit_system,
+        "include_patient_info": bool(params.get("include_patient_info", True)),
+        "start_date": params.get("start_date") or None,
+        "end_date": params.get("end_date") or None,
+    }
+
+
+def _run_export(context: JobContext) -> JobResult:
+    from app.crud.user_preferences import user_preferences as user_preferences_crud
+    from app.services.export_service import ExportService
+
+    params = context.params
+    export_format = params["format"]
+    scope = params["scope"]
+    start_date, end_date = (
+        datetime.strptime(params[key], "%Y-%m-%d").date() if params.get(key) else None
+        for key in ("start_date", "end_date")
+    )
+    prefs = user_preferences_crud.get_by_user_id(context.db, user_id=context.user_id)
+    options = dict(
+        user_id=context.user_id,
+        format=export_format,
+        scope=scope,
+        start_date=start_date,
+        end_date=end_date,
+        include_patient_info=params["include_patient_info"],
+        unit_system=params["unit_system"],
+        language=(prefs and prefs.language) or "en",
+        date_format=(prefs and prefs.date_format) or "mdy",
+    )
+    service = ExportService(context.db)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"medical_records_{scope}_{timestamp}.{export_format}"
+    path = context.artifact_path(filename)
+
+    context.report_progress(5, "Reading records")
+    if export_format == "pdf":
+        export_data = asyncio.run(service.export_patient_data(**options))
+        context.report_progress(60, "Rendering PDF")
+        path.write_bytes(asyncio.run(service.convert_to_pdf(export_data)))
+    else:
+        written = 0
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            for chunk in service.stream_patient_data(**options):
+                output.write(chunk)
+                written += len(chunk)
+                context.report_progress(message=f"Wrote {written // 1024:,} KB")
+
+    return JobResult(
+        filename=filename,
+        media_type=EXPORT_FORMATS[export_format],
+        summary={"format": export_format, "scope": scope},
+    )
+
+
+def _validate_custom_report(params: Dict[str, Any]) -> Dict[str, Any]:
+    from app.schemas.custom_reports import CustomReportRequest
+
+    # pydantic's ValidationError is a ValueError
+    return CustomReportRequest.model_validate(params).model_dump(mode="json")
+
+
+def _run_custom_report(context: JobContext) -> JobResult:
+    from app.schemas.custom_reports import CustomReportRequest
+    from app.services.custom_report_service import CustomReportService
+
+    request = CustomReportRequest.model_validate(context.params)
+    service = CustomReportService(context.db)
+
+    async def generate() -> bytes:
+        if request.selected_records:
+            await service.validate_record_ownership(
+                context.user_id, request.selected_records
+            )
+        return await service.generate_selective_report(context.user_id, request)
+
+    context.report_progress(5, "Generating report")
+    pdf_data = asyncio.run(generate())
+    context.report_progress(95)
+
+    filename = f"custom-medical-report-{context.user_id}.pdf"
+    context.artifact_path(filename).write_bytes(pdf_data)
+    return JobResult(filename=filename, media_type="application/pdf")
+
+
+BACKUP_METHODS = {
+    "full": "create_full_backup",
+    "database": "create_database_backup",
+    "files": "create_files_backup",
+    "incremental": "create_incremental_backup",
+}
+
+
+def _validate_backup(params: Dict[str, Any]) -> Dict[str, Any]:
+    backup_type = params.get("backup_type", "full")
+    if backup_type not in BACKUP_METHODS:
+        raise ValueError(f"Unsupported backup type: {backup_type}")
+    return {"backup_type": backup_type, "description": params.get("description")}
+
+
+def _run_backup(context: JobContext) -> JobResult:
+    from app.services.backup_service import BackupService
+
+    backup_type = context.params["backup_type"]
+    service = BackupService(context.db)
+    method = getattr(service, BACKUP_METHODS[backup_type])
+    options = {}
+    if backup_type != "database":
+        # Archiving the uploads dominates; pg_dump reports no progress
+        options["progress"] = lambda done, total: context.report_progress(
+            5 + 90 * done // max(total, 1), "Archiving files"
+        )
+
+    context.report_progress(5, "Creating backup")
+    try:
+        result = asyncio.run(method(context.params.get("description"), **options))
+    except Exception:
+        # BackupService wraps errors, including a cancelled archive
+        if context.cancel_requested:
+            raise JobCancelled()
+        raise
+    # The archive lives in BACKUP_DIR and is managed by the backup endpoints
+    return JobResult(
+        summary={
+            key: value
+            for key, value in result.items()
+            if isinstance(value, (str, int, float, bool, type(None)))
+        }
+    )
+
+
+# Interactive work a user is waiting on goes ahead of backups
+register_job_type("export", _run_export, priority=10, validate=_validate_export)
+register_job_type(
+    "custom_report", _run_custom_report, priority=10, validate=_validate_custom_report
+)
+register_job_type("backup", _run_backup, admin_only=True, validate=_validate_backup)
@@ -0,0 +1,182 @@
+"""
+Lab Trend Keys
+
+Keeps the trend lookup columns on lab_test_components current:
+
+- trend_key: the component's trend series, its normalized name (the
+  canonical test name when set, otherwise the test name) and normalized unit
+- effective_date: the date the reading counts for, the lab result's
+  completed_date or, failing that, the day the component was recorded
+- patient_id: the lab result's patient
+
+With the (patient_id, trend_key, effective_date) index these turn trend
+lookups and the component catalog into index range scans, instead of joining
+lab_results and normalizing names and dates row by row.
+
+Components are kept current by mapper events, and lab result edits that
+change the date or patient are pushed down to their components. Write paths
+that bypass the ORM unit of work and change names or units (Core UPDATEs)
+must call refresh_trend_keys afterwards.
+"""
+
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.base import get_utc_now
+from app.models.models import LabResult, LabTestComponent
+
+# Separates the name and unit parts of a trend key (ASCII unit separator, so
+# it cannot collide with characters entered in test names)
+TREND_KEY_SEPARATOR = "\x1f"
+
+
+def trend_name(
+    test_name: Optional[str], canonical_test_name: Optional[str] = None
+) -> str:
+    """
+    Normalized trend name of a component, or of a test name being looked up.
+
+    Canonical names win when set; empty or whitespace-only canonical names
+    (written by the test library sync for unmatched components) count as
+    unset.
+    """
+    if canonical_test_name and canonical_test_name.strip():
+        return canonical_test_name.strip().lower()
+    return (test_name or "").strip().rstrip(",;: ").lower()
+
+
+def normalize_unit(unit: Optional[str]) -> str:
+    """Unit as compared in trends: trimmed and lower-case, "" when missing."""
+    return (unit or "").strip().lower()
+
+
+def make_trend_key(name: str, unit: Optional[str]) -> str:
+    """Trend key for an already normalized name and a raw unit."""
+    return f"{name}{TREND_KEY_SEPARATOR}{normalize_unit(unit)}"
+
+
+def trend_key_prefix(test_name: str) -> str:
+    """Common prefix of a test's trend keys across all units."""
+    return f"{trend_name(test_name)}{TREND_KEY_SEPARATOR}"
+
+
+def trend_key_for(component: Any) -> str:
+    """Trend key of a component (or any object with the same attributes)."""
+    return make_trend_key(
+        trend_name(component.test_name, component.canonical_test_name),
+        component.unit,
+    )
+
+
+def refresh_trend_keys(db: Session, *criteria) -> int:
+    """
+    Recompute trend_key for the components matching ``criteria``.
+
+    For write paths that change test names, canonical names or units outside
+    the ORM unit of work. Returns the number of components whose key changed.
+    """
+    table = LabTestComponent.__table__
+    rows = db.execute(
+        select(
+            table.c.id,
+            table.c.test_name,
+            table.c.canonical_test_name,
+            table.c.unit,
+            table.c.trend_key,
+        ).where(*criteria)
+    ).all()
+    changes = [
+        {"component_id": row.id, "new_trend_key": key}
+        for row in rows
+        if (key := trend_key_for(row)) != row.trend_key
+    ]
+    if changes:
+        db.connection().execute(
+            update(table)
+            .where(table.c.id == bindparam("component_id"))
+            .values(trend_key=bindparam("new_trend_key")),
+            changes,
+        )
+    return len(changes)
+
+
+def _lab_result_fields(connection, component: LabTestComponent) -> Tuple[Any, Any]:
+    """(patient_id, completed_date) of the component's lab result."""
+    lab_result = component.__dict__.get("lab_result")
+    if lab_result is not None and lab_result.id in (None, component.lab_result_id):
+        return lab_result.patient_id, lab_result.completed_date
+    row = connection.execute(
+        select(LabResult.patient_id, LabResult.completed_date).where(
+            LabResult.id == component.lab_result_id
+        )
+    ).first()
+    return (row.patient_id, row.completed_date) if row else (None, None)
+
+
+def _set_lab_result_fields(connection, component: LabTestComponent) -> None:
+    patient_id, completed_date = _lab_result_fields(connection, component)
+    if component.created_at is None:
+        # Normally filled by the column default during the INSERT; set it
+        # here so effective_date agrees with it
+        component.created_at = get_utc_now()
+    component.patient_id = patient_id
+    component.effective_date = completed_date or component.created_at.date()
+
+
+def _before_component_insert(_mapper, connection, target) -> None:
+    target.trend_key = trend_key_for(target)
+    _set_lab_result_fields(connection, target)
+
+
+def _before_component_update(_mapper, connection, target) -> None:
+    target.trend_key = trend_key_for(target)
+    if inspect(target).attrs.lab_result_id.history.has_changes():
+        _set_lab_result_fields(connection, target)
+
+
+def _after_lab_result_update(_mapper, connection, target) -> None:
+    state = inspect(target)
+    if not (
+        state.attrs.completed_date.history.has_changes()
+        or state.attrs.patient_id.history.has_changes()
+    ):
+        return
+
+    table = LabTestComponent.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.lab_result_id == target.id)
+        .values(
+            patient_id=target.patient_id,
+            effective_date=(
+                target.completed_date
+                if target.completed_date is not None
+                else func.date(table.c.created_at)
+            ),
+        )
+    )
+    # Components already loaded in the session would otherwise keep the old
+    # values until expired
+    for component in target.__dict__.get("test_components") or []:
+        set_committed_value(component, "patient_id", target.patient_id)
+        if component.created_at is not None:
+            set_committed_value(
+                component,
+                "effective_date",
+                target.completed_date or component.created_at.date(),
+            )
+
+
+def register_trend_key_listeners() -> None:
+    """Attach trend column maintenance to component and lab result writes."""
+    if event.contains(LabTestComponent, "before_insert", _before_component_insert):
+        return
+    event.listen(LabTestComponent, "before_insert", _before_component_insert)
+    event.listen(LabTestComponent, "before_update", _before_component_update)
+    event.listen(LabResult, "after_update", _after_lab_result_update)
+
+
+register_trend_key_listeners()
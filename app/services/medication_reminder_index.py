@@ -0,0 +1,230 @@
+"""
+Medication Reminder Index
+
+In-memory schedule of medication reminders for the reminder scheduler:
+minute of the facility-local day -> {medication_id: weekday mask}. Each tick
+looks up its minute instead of loading every reminder in the system.
+
+The index holds reminder-enabled, active medications. It is built when the
+scheduler starts and kept current by mapper events on Medication: changes
+are collected while flushing and applied once the transaction commits, so a
+rolled-back edit never reaches the index.
+
+The index only narrows down which medications to look at. The scheduler
+still checks the due ones against the database (status, effective period,
+times and days), so a stale entry costs a lookup, never a wrong reminder.
+Writes the events can't see — another process, or bulk ``Query.update`` —
+are picked up by the scheduler's periodic rebuild. When several workers
+share the database, the scheduler also syncs medications updated since its
+last look on every tick, so edits made through other workers apply at once.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models.clinical import Medication
+
+_PENDING_KEY = "medication_reminder_index_pending"
+
+ALL_WEEKDAYS = 0b1111111
+
+Schedule = Tuple[Set[int], int]
+
+
+def minute_of_day(hhmm: str) -> Optional[int]:
+    """Minutes since midnight for an "HH:MM" string, None if invalid."""
+    try:
+        hours, minutes = (int(part) for part in hhmm.split(":"))
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return None
+    return hours * 60 + minutes
+
+
+def weekday_mask(reminder_days) -> int:
+    """One bit per weekday (Mon=0 .. Sun=6); null/empty means every day."""
+    if not reminder_days:
+        return ALL_WEEKDAYS
+    mask = 0
+    for day in reminder_days:
+        if isinstance(day, int) and 0 <= day <= 6:
+            mask |= 1 << day
+    return mask
+
+
+def schedule_of(reminder_enabled, status, reminder_times, reminder_days) -> Schedule:
+    """The minutes and weekday mask a medication is indexed under."""
+    if not reminder_enabled or status != "active":
+        return set(), 0
+    if not isinstance(reminder_times, list):
+        return set(), 0
+    minutes = {minute_of_day(hhmm) for hhmm in reminder_times} - {None}
+    return minutes, weekday_mask(reminder_days)
+
+
+class MedicationReminderIndex:
+    """Process-wide minute -> medication index; see the module docstring."""
+
+    _instance: Optional["MedicationReminderIndex"] = None
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_minute: Dict[int, Dict[int, int]] = {}
+        self._minutes: Dict[int, Set[int]] = {}
+        self.loaded = False
+
+    @classmethod
+    def get_instance(cls) -> "MedicationReminderIndex":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — drop the index."""
+        cls._instance = None
+
+    def __len__(self) -> int:
+        return len(self._minutes)
+
+    def rebuild(self, db: Session) -> int:
+        """Load the index from the database. Returns medications indexed."""
+        rows = (
+            db.query(
+                Medication.id,
+                Medication.reminder_times,
+                Medication.reminder_days,
+            )
+            .filter(Medication.reminder_enabled.is_(True))
+            .filter(Medication.status == "active")
+            .all()
+        )
+        by_minute: Dict[int, Dict[int, int]] = {}
+        minutes_by_medication: Dict[int, Set[int]] = {}
+        for row in rows:
+            minutes, mask = schedule_of(
+                True, "active", row.reminder_times, row.reminder_days
+            )
+            if not minutes or not mask:
+                continue
+            minutes_by_medication[row.id] = minutes
+            for minute in minutes:
+                by_minute.setdefault(minute, {})[row.id] = mask
+
+        with self._lock:
+            self._by_minute = by_minute
+            self._minutes = minutes_by_medication
+            self.loaded = True
+        return len(minutes_by_medication)
+
+    def sync(self, db: Session, since: datetime) -> int:
+        """Re-read medications updated since ``since``. Returns how many."""
+        rows = (
+            db.query(
+                Medication.id,
+                Medication.reminder_enabled,
+                Medication.status,
+                Medication.reminder_times,
+                Medication.reminder_days,
+            )
+            .filter(Medication.updated_at >= since)
+            .all()
+        )
+        for row in rows:
+            self.update(
+                row.id,
+                schedule_of(
+                    row.reminder_enabled,
+                    row.status,
+                    row.reminder_times,
+                    row.reminder_days,
+                ),
+            )
+        return len(rows)
+
+    def update(self, medication_id: int, schedule: Schedule) -> None:
+        """Replace a medication's entries; an empty schedule removes it."""
+        minutes, mask = schedule
+        with self._lock:
+            for minute in self._minutes.pop(medication_id, ()):
+                scheduled = self._by_minute.get(minute)
+                if scheduled is not None:
+                    scheduled.pop(medication_id, None)
+                    if not scheduled:
+                        del self._by_minute[minute]
+            if minutes and mask:
+                self._minutes[medication_id] = set(minutes)
+                for minute in minutes:
+                    self._by_minute.setdefault(minute, {})[medication_id] = mask
+
+    def due(self, minute: int, weekday: int) -> Tuple[int, List[int]]:
+        """
+        Medications with a reminder at ``minute``.
+
+        Returns the number scheduled at that minute on any day, and the IDs
+        of those scheduled on ``weekday``.
+        """
+        bit = 1 << weekday
+        with self._lock:
+            scheduled = self._by_minute.get(minute, {})
+            return len(scheduled), [
+                medication_id for medication_id, mask in scheduled.items() if mask & bit
+            ]
+
+
+def _pending(target: Medication) -> Optional[Dict[int, Schedule]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+def _after_medication_write(_mapper, _connection, target) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending[target.id] = schedule_of(
+            target.reminder_enabled,
+            target.status,
+            target.reminder_times,
+            target.reminder_days,
+        )
+
+
+def _after_medication_delete(_mapper, _connection, target) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending[target.id] = (set(), 0)
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    index = MedicationReminderIndex.get_instance()
+    # An index that isn't loaded yet reads everything when it is
+    if pending and index.loaded:
+        for medication_id, schedule in pending.items():
+            index.update(medication_id, schedule)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_medication_reminder_index_listeners() -> None:
+    """Keep the index current on Medication writes. Idempotent."""
+    if event.contains(Medication, "after_insert", _after_medication_write):
+        return
+    event.listen(Medication, "after_insert", _after_medication_write)
+    event.listen(Medication, "after_update", _after_medication_write)
+    event.listen(Medication, "after_delete", _after_medication_delete)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+# Attached at import: app.crud.medication and the scheduler import this
+# module, so any process that writes medications keeps its index current.
+register_medication_reminder_index_listeners()
@@ -7,37 +7,67 @@ reminder_times include the current facility-local HH:MM, provided the
 current date sits within the medication's effective period (inclusive).
 
 The cron uses the facility timezone from datetime_utils so reminders fire at
-wall-clock time, including across DST transitions. Idempotency is enforced by
-checking NotificationHistory for a matching (medication_id, scheduled_local_date,
-scheduled_time_local) triple before publishing — this guards against
+wall-clock time, including across DST transitions.
+
+Each tick is proportional to the reminders due that minute: the
+MedicationReminderIndex maps minute of day to medication IDs, and only those
+are queried. Idempotency is enforced by claiming each reminder in
+medication_reminder_fires, whose unique (medication_id, scheduled_date,
+scheduled_time) index makes the claim atomic — this guards against
 APScheduler misfires, restarts during a tick, and concurrent dev/EXE
-instances.
+instances. A reminder whose publish fails has its claim deleted again, so
+it is not suppressed by a claim for a reminder that was never sent. A
+second job rebuilds the index every INDEX_REFRESH_MINUTES (to pick up
+writes made by other processes) and prunes old claims.
+
+With several server workers, only the SchedulerLeadership leader runs either
+job; it builds its index when it takes over, and each tick syncs the
+medications other workers updated since the previous one.
 
 PHI is never logged: medication_name stays out of log payloads; only IDs and
 the scheduled HH:MM are recorded.
 """
 
 import asyncio
-from datetime import date, datetime
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Set
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy import or_
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
+from app.core.database.utils import get_database_type
 from app.core.events.bus import get_event_bus
 from app.core.logging.config import get_logger
 from app.core.logging.constants import LogFields
-from app.core.utils.datetime_utils import get_facility_timezone, to_utc
+from app.core.utils.datetime_utils import get_facility_timezone
 from app.events.medication_events import MedicationReminderDueEvent
+from app.models.base import get_utc_now
 from app.models.clinical import Medication
-from app.models.notifications import NotificationHistory
+from app.models.notifications import MedicationReminderFire
 from app.models.patient import Patient
+from app.services.medication_reminder_index import (
+    MedicationReminderIndex,
+    minute_of_day,
+)
+from app.services.scheduler_leadership import SchedulerLeadership
 
 logger = get_logger(__name__, "app")
 
 JOB_ID = "medication_reminder_tick"
+REFRESH_JOB_ID = "medication_reminder_index_refresh"
+
+# Rebuild the index this often to pick up writes its mapper events can't see
+INDEX_REFRESH_MINUTES = 15
+
+# Claims are only consulted for the current minute; older ones are pruned
+FIRE_RETENTION_DAYS = 7
+
+# Syncs re-read this far before the previous one, so a medication whose
+# update committed after it was stamped isn't missed
+SYNC_OVERLAP = timedelta(minutes=1)
 
 
 class MedicationReminderSchedulerService:
@@ -53,6 +83,9 @@ class MedicationReminderSchedulerService:
         self._scheduler: AsyncIOScheduler = AsyncIOScheduler(
             timezone=get_facility_timezone()
         )
+        # When the index was last brought up to date with the database
+        self._synced_at: Optional[datetime] = None
+        self._watching_leadership = False
 
     @classmethod
     def get_instance(cls) -> "MedicationReminderSchedulerService":
@@ -62,14 +95,21 @@ class MedicationReminderSchedulerService:
 
     @classmethod
     def reset_instance(cls) -> None:
-        """Tests only — tear down the singleton."""
+        """Tests only — tear down the singleton and its reminder index."""
         if cls._instance is not None:
             if cls._instance._scheduler.running:
                 cls._instance._scheduler.shutdown(wait=False)
             cls._instance = None
+        MedicationReminderIndex.reset_instance()
 
     async def start(self) -> None:
-        """Start the scheduler and register the per-minute tick job."""
+        """Build the reminder index, then start the tick and refresh jobs."""
+        if not self._watching_leadership:
+            # A worker that takes over from another builds a fresh index
+            SchedulerLeadership.get_instance().on_acquired(self._refresh)
+            self._watching_leadership = True
+        await self._refresh()
+
         if not self._scheduler.running:
             self._scheduler.start()
 
@@ -84,12 +124,21 @@ class MedicationReminderSchedulerService:
             misfire_grace_time=120,
             coalesce=True,
         )
+        self._scheduler.add_job(
+            self._refresh,
+            trigger=IntervalTrigger(minutes=INDEX_REFRESH_MINUTES),
+            id=REFRESH_JOB_ID,
+            name="Medication Reminder Index Refresh",
+            replace_existing=True,
+            coalesce=True,
+        )
 
         logger.info(
             "Medication reminder scheduler started",
             extra={
                 LogFields.CATEGORY: "app",
                 LogFields.EVENT: "medication_reminder_scheduler_started",
+                "medications_indexed": len(MedicationReminderIndex.get_instance()),
             },
         )
 
@@ -105,12 +154,57 @@ class MedicationReminderSchedulerService:
                 },
             )
 
+    async def _refresh(self) -> None:
+        """Rebuild the reminder index and prune old reminder claims."""
+        from app.core.database.database import SessionLocal
+
+        if not SchedulerLeadership.get_instance().is_leader:
+            return
+
+        db: Session = SessionLocal()
+        try:
+            today_local = datetime.now(get_facility_timezone()).date()
+            synced_at = get_utc_now()
+            indexed = await asyncio.to_thread(
+                MedicationReminderIndex.get_instance().rebuild, db
+            )
+            self._synced_at = synced_at
+            pruned = await asyncio.to_thread(self._prune_fires, db, today_local)
+            logger.debug(
+                "Medication reminder index refreshed",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "medication_reminder_index_refreshed",
+                    "medications_indexed": indexed,
+                    "fires_pruned": pruned,
+                },
+            )
+        except Exception as e:
+            logger.error(
+                "Medication reminder index refresh failed",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "medication_reminder_index_refresh_error",
+                    LogFields.ERROR: str(e),
+                },
+                exc_info=True,
+            )
+        finally:
+            db.close()
+
     async def _tick(self) -> None:
         """Discover due reminders and publish events for each."""
         from app.core.database.database import SessionLocal
 
+        leadership = SchedulerLeadership.get_instance()
+        if not leadership.is_leader:
+            return
+
         db: Session = SessionLocal()
         try:
+            if leadership.backend.shared:
+                await self._sync_index(db)
+
             now_local = datetime.now(get_facility_timezone())
             current_hhmm = now_local.strftime("%H:%M")
             today_local = now_local.date()
@@ -146,17 +240,37 @@ class MedicationReminderSchedulerService:
         finally:
             db.close()
 
+    async def _sync_index(self, db: Session) -> None:
+        """Apply medication updates made by other workers since the last sync."""
+        index = MedicationReminderIndex.get_instance()
+        if not index.loaded or self._synced_at is None:
+            return
+        since = self._synced_at - SYNC_OVERLAP
+        self._synced_at = get_utc_now()
+        await asyncio.to_thread(index.sync, db, since)
+
     async def _process_tick(
         self, db: Session, today_local: date, current_hhmm: str
     ) -> tuple:
         """Run discovery + publish loop. Returns (seen, due, skipped, published)."""
+        index = MedicationReminderIndex.get_instance()
         # DB queries are synchronous; run them off-loop so a slow query
         # doesn't stall in-flight HTTP requests every minute. Sharing the
         # Session across to_thread calls is safe because access is strictly
         # serialized — each call is awaited before the next; the Session is
         # never touched from two threads concurrently.
-        candidates = await asyncio.to_thread(self._discover_candidates, db, today_local)
+        if not index.loaded:
+            await asyncio.to_thread(index.rebuild, db)
+
         current_weekday = today_local.weekday()  # Mon=0, Sun=6; derived from same instant as today_local
+        seen, indexed_ids = index.due(minute_of_day(current_hhmm), current_weekday)
+        if not indexed_ids:
+            return seen, 0, 0, 0
+
+        candidates = await asyncio.to_thread(
+            self._fetch_candidates, db, indexed_ids, today_local
+        )
+        # The index can be stale; the rows are authoritative
         due_rows = [
             row
             for row in candidates
@@ -166,17 +280,21 @@ class MedicationReminderSchedulerService:
         ]
 
         if not due_rows:
-            return len(candidates), 0, 0, 0
+            return seen, 0, 0, 0
 
         scheduled_local_date = today_local.isoformat()
 
-        already_fired_ids = await asyncio.to_thread(
-            self._fetch_already_fired, db, today_local, current_hhmm
+        claimed_ids = await asyncio.to_thread(
+            self._claim_reminders,
+            db,
+            [row.id for row in due_rows],
+            today_local,
+            current_hhmm,
         )
 
         to_publish = []
         for row in due_rows:
-            if row.id in already_fired_ids:
+            if row.id not in claimed_ids:
                 logger.debug(
                     "Medication reminder dedup skip",
                     extra={
@@ -192,20 +310,44 @@ class MedicationReminderSchedulerService:
 
         # Deliveries are independent network sends; one slow channel must not
         # delay every subsequent reminder in the same minute.
-        await asyncio.gather(
+        results = await asyncio.gather(
             *(
                 self._publish_reminder(row, current_hhmm, scheduled_local_date)
                 for row in to_publish
-            )
+            ),
+            return_exceptions=True,
         )
+        failed = []
+        for row, result in zip(to_publish, results):
+            if isinstance(result, Exception):
+                failed.append(row.id)
+                logger.error(
+                    "Medication reminder publish failed",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "medication_reminder_publish_error",
+                        LogFields.ERROR: str(result),
+                        "medication_id": row.id,
+                        "scheduled_time_local": current_hhmm,
+                    },
+                )
+        if failed:
+            # A claim blocks every later attempt at the reminder; drop the
+            # claims of reminders that were not sent so a rerun of this
+            # minute (a misfire, another instance) can still send them
+            await asyncio.to_thread(
+                self._release_claims, db, failed, today_local, current_hhmm
+            )
 
         skipped = len(due_rows) - len(to_publish)
-        return len(candidates), len(due_rows), skipped, len(to_publish)
+        return seen, len(due_rows), skipped, len(to_publish) - len(failed)
 
-    def _discover_candidates(self, db: Session, today_local: date) -> list:
+    def _fetch_candidates(
+        self, db: Session, medication_ids: List[int], today_local: date
+    ) -> list:
         """Return rows of (id, patient_id, medication_name, dosage,
         reminder_times, reminder_message, reminder_days, owner_user_id)
-        for enabled+active+in-period meds.
+        for the given medications that are enabled+active+in-period.
 
         Selects only the columns the tick needs rather than hydrating full
         Medication entities — this query runs every minute.
@@ -226,6 +368,7 @@ class MedicationReminderSchedulerService:
                 Patient.owner_user_id,
             )
             .join(Patient, Patient.id == Medication.patient_id)
+            .filter(Medication.id.in_(medication_ids))
             .filter(Medication.reminder_enabled.is_(True))
             .filter(Medication.status == "active")
             .filter(
@@ -244,42 +387,85 @@ class MedicationReminderSchedulerService:
         )
         return rows
 
-    def _fetch_already_fired(
-        self, db: Session, today_local: date, current_hhmm: str
-    ) -> set:
-        """Return set of medication_ids already fired for this minute today.
-
-        Bounded by the UTC equivalent of facility-local midnight (NOT
-        naive-UTC midnight of the local date — the two diverge by the
-        facility offset and the latter excludes legitimate history rows
-        for east-of-UTC timezones).
+    def _claim_reminders(
+        self,
+        db: Session,
+        medication_ids: List[int],
+        today_local: date,
+        current_hhmm: str,
+    ) -> Set[int]:
+        """Record the reminders as fired; return the IDs not fired before.
+
+        One INSERT ... ON CONFLICT DO NOTHING against the unique index, so
+        two instances ticking the same minute can't both claim a reminder.
         """
-        scheduled_local_date = today_local.isoformat()
-        today_start_local = datetime.combine(today_local, datetime.min.time()).replace(
-            tzinfo=get_facility_timezone()
+        rows = [
+            {
+                "medication_id": medication_id,
+                "scheduled_date": today_local,
+                "scheduled_time": current_hhmm,
+            }
+            for medication_id in medication_ids
+        ]
+        dialect = get_database_type(db)
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            # No portable upsert; check first (not safe across instances)
+            existing = set(
+                db.execute(
+                    select(MedicationReminderFire.medication_id).where(
+                        MedicationReminderFire.medication_id.in_(medication_ids),
+                        MedicationReminderFire.scheduled_date == today_local,
+                        MedicationReminderFire.scheduled_time == current_hhmm,
+                    )
+                ).scalars()
+            )
+            new_rows = [row for row in rows if row["medication_id"] not in existing]
+            if new_rows:
+                db.execute(MedicationReminderFire.__table__.insert(), new_rows)
+            db.commit()
+            return {row["medication_id"] for row in new_rows}
+
+        statement = (
+            insert(MedicationReminderFire)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=["medication_id", "scheduled_date", "scheduled_time"]
+            )
+            .returning(MedicationReminderFire.medication_id)
         )
-        today_start_utc = to_utc(today_start_local)
+        claimed = set(db.execute(statement).scalars())
+        db.commit()
+        return claimed
 
-        recent = (
-            db.query(NotificationHistory.event_data)
-            .filter(NotificationHistory.event_type == "medication_reminder_due")
-            .filter(NotificationHistory.created_at >= today_start_utc)
-            .all()
+    def _release_claims(
+        self,
+        db: Session,
+        medication_ids: List[int],
+        today_local: date,
+        current_hhmm: str,
+    ) -> None:
+        """Delete claims taken by this tick for reminders it failed to publish."""
+        db.query(MedicationReminderFire).filter(
+            MedicationReminderFire.medication_id.in_(medication_ids),
+            MedicationReminderFire.scheduled_date == today_local,
+            MedicationReminderFire.scheduled_time == current_hhmm,
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    def _prune_fires(self, db: Session, today_local: date) -> int:
+        """Delete reminder claims older than FIRE_RETENTION_DAYS."""
+        cutoff = today_local - timedelta(days=FIRE_RETENTION_DAYS)
+        deleted = (
+            db.query(MedicationReminderFire)
+            .filter(MedicationReminderFire.scheduled_date < cutoff)
+            .delete(synchronize_session=False)
         )
-
-        already_fired = set()
-        for (data,) in recent:
-            data = data or {}
-            if data.get("is_test"):
-                continue
-            if (
-                data.get("scheduled_local_date") == scheduled_local_date
-                and data.get("scheduled_time_local") == current_hhmm
-            ):
-                medication_id = data.get("medication_id")
-                if medication_id is not None:
-                    already_fired.add(medication_id)
-        return already_fired
+        db.commit()
+        return deleted
 
     async def _publish_reminder(
         self,
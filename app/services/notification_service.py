@@ -7,6 +7,10 @@ This service handles:
 - Preference management
 - History tracking
 
+Apprise transports are built once per channel config and reused across
+sends (see notification_transport); deliveries run on a bounded pool and
+the history of a send is committed once, after all its channels reply.
+
 The service uses a registry pattern for channel URL builders, making it
 easy to add new channel types without modifying core logic.
 """
@@ -34,6 +38,7 @@ from app.schemas.notifications import (
     ChannelType,
     NotificationStatus,
 )
+from app.services.notification_transport import NotificationTransportPool
 
 logger = get_logger(__name__, "app")
 
@@ -315,6 +320,7 @@ class NotificationService:
 
         self.db.commit()
         self.db.refresh(channel)
+        NotificationTransportPool.get_instance().invalidate(channel_id)
 
         logger.info(
             "notification_channel_updated",
@@ -339,6 +345,7 @@ class NotificationService:
 
         self.db.delete(channel)
         self.db.commit()
+        NotificationTransportPool.get_instance().invalidate(channel_id)
 
         logger.info(
             "notification_channel_deleted",
@@ -595,9 +602,12 @@ class NotificationService:
 
         self.db.commit()
 
-        # Execute sends in parallel
+        # Execute sends in parallel; their status updates are committed together
         if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                self.db.commit()
 
         return history_records
 
@@ -608,31 +618,21 @@ class NotificationService:
         message: str,
         history: NotificationHistory,
     ) -> None:
-        """Send notification to a single channel and update history."""
-        try:
-            import apprise
-
-            # Build Apprise URL
-            config = self._decrypt_config(channel.config_encrypted)
-            builder = CHANNEL_BUILDERS.get(channel.channel_type)
-
-            if not builder:
-                raise ValueError(f"Unknown channel type: {channel.channel_type}")
-
-            apprise_url = builder(config)
-            if not apprise_url:
-                raise ValueError(
-                    f"Failed to build URL for channel type: {channel.channel_type}"
-                )
+        """Send notification to a single channel and update history.
 
-            # Create Apprise instance and add URL
-            apobj = apprise.Apprise()
-            apobj.add(apprise_url)
+        The caller commits the history (and channel counters) once all
+        channels of the send have replied.
+        """
+        try:
+            pool = NotificationTransportPool.get_instance()
+            transport = pool.transport(
+                channel.id,
+                channel.config_encrypted,
+                lambda: self._build_channel_url(channel),
+            )
 
             # Send notification
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: apobj.notify(title=title, body=message)
-            )
+            result = await pool.send(transport, title, message)
 
             if result:
                 history.status = NotificationStatus.SENT.value
@@ -676,8 +676,20 @@ class NotificationService:
                 },
             )
 
-        finally:
-            self.db.commit()
+    def _build_channel_url(self, channel: NotificationChannel) -> str:
+        """Decrypt a channel's config and build its Apprise URL."""
+        config = self._decrypt_config(channel.config_encrypted)
+        builder = CHANNEL_BUILDERS.get(channel.channel_type)
+
+        if not builder:
+            raise ValueError(f"Unknown channel type: {channel.channel_type}")
+
+        apprise_url = builder(config)
+        if not apprise_url:
+            raise ValueError(
+                f"Failed to build URL for channel type: {channel.channel_type}"
+            )
+        return apprise_url
 
     async def test_channel(
         self,
@@ -712,8 +724,6 @@ class NotificationService:
         self.db.commit()
 
         try:
-            import apprise
-
             config = self._decrypt_config(channel.config_encrypted)
             builder = CHANNEL_BUILDERS.get(channel.channel_type)
 
@@ -730,12 +740,11 @@ class NotificationService:
                 self.db.commit()
                 return False, "Failed to build notification URL"
 
-            apobj = apprise.Apprise()
-            apobj.add(apprise_url)
-
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: apobj.notify(title=test_title, body=test_message)
+            pool = NotificationTransportPool.get_instance()
+            transport = pool.transport(
+                channel.id, channel.config_encrypted, lambda: apprise_url
             )
+            result = await pool.send(transport, test_title, test_message)
 
             # Update channel test status
             channel.last_test_at = datetime.now(timezone.utc)
@@ -180,6 +180,50 @@ def password_changed_template(data: Dict) -> Tuple[str, str]:
     )
 
 
+def job_completed_template(data: Dict) -> Tuple[str, str]:
+    """
+    Template for a finished background job.
+
+    Args:
+        data: Event data containing:
+            - job_type: Kind of job (e.g., "export", "custom_report")
+            - artifact_filename: Name of the downloadable result (optional)
+
+    Returns:
+        Tuple of (title, message) for the notification
+    """
+    job_label = data.get("job_type", "background").replace("_", " ")
+    filename = data.get("artifact_filename")
+
+    message = f"Your {job_label} job has finished."
+    if filename:
+        message += f"\n\nFile: {filename}\n" "Log in to MediKeep to download it."
+    return ("Job Completed", message)
+
+
+def job_failed_template(data: Dict) -> Tuple[str, str]:
+    """
+    Template for a failed background job.
+
+    Args:
+        data: Event data containing:
+            - job_type: Kind of job that was attempted
+            - error: Error message describing the failure
+
+    Returns:
+        Tuple of (title, message) for the notification
+    """
+    job_label = data.get("job_type", "background").replace("_", " ")
+    error = data.get("error", "Unknown error")
+
+    return (
+        "Job Failed",
+        f"Your {job_label} job has failed.\n\n"
+        f"Error: {error}\n\n"
+        "Please try again.",
+    )
+
+
 # Template registry for easy lookup
 NOTIFICATION_TEMPLATES = {
     "backup_completed": backup_completed_template,
@@ -189,6 +233,8 @@ NOTIFICATION_TEMPLATES = {
     "share_revoked": share_revoked_template,
     "password_changed": password_changed_template,
     "medication_reminder_due": medication_reminder_due_template,
+    "job_completed": job_completed_template,
+    "job_failed": job_failed_template,
 }
 
 
@@ -0,0 +1,147 @@
+"""
+Notification Transport Pool
+
+Reusable Apprise transports for notification channels, shared by every
+NotificationService instance in the process.
+
+Building a transport means decrypting the channel config, building its
+Apprise URL and parsing it into an ``apprise.Apprise`` object. The pool keeps
+the result per channel, keyed by a version derived from the encrypted
+config, so a broadcast to many users only pays for channels it hasn't seen
+since their config last changed. NotificationService invalidates a channel
+when it is updated or deleted; a config changed by another process has a new
+version and is rebuilt on its next send.
+
+Deliveries are blocking network calls. They run on a dedicated, bounded
+thread pool (NOTIFICATION_DELIVERY_WORKERS) rather than the event loop's
+default executor, so a burst of notifications can't starve other
+``run_in_executor`` users. Sends through one transport are serialized, as
+Apprise plugins are not guaranteed to be thread-safe.
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+
+logger = get_logger(__name__, "app")
+
+# Transports kept at once; the least recently used is dropped beyond this
+MAX_TRANSPORTS = 256
+
+
+def config_version(config_encrypted: str) -> str:
+    """A version of a channel's config; changes whenever the config does."""
+    return hashlib.sha256(config_encrypted.encode()).hexdigest()[:16]
+
+
+class ChannelTransport:
+    """One channel's Apprise instance, ready to send."""
+
+    def __init__(self, version: str, apprise_obj: Any):
+        self.version = version
+        self._apprise = apprise_obj
+        self._lock = threading.Lock()
+
+    def notify(self, title: str, body: str) -> bool:
+        with self._lock:
+            return bool(self._apprise.notify(title=title, body=body))
+
+
+class NotificationTransportPool:
+    """Process-wide transport cache and delivery executor."""
+
+    _instance: Optional["NotificationTransportPool"] = None
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(
+            1, settings.NOTIFICATION_DELIVERY_WORKERS if workers is None else workers
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._transports: "OrderedDict[int, ChannelTransport]" = OrderedDict()
+
+    @classmethod
+    def get_instance(cls) -> "NotificationTransportPool":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — shut down the executor and drop cached transports."""
+        if cls._instance is not None:
+            cls._instance.shutdown()
+            cls._instance = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="notify"
+                )
+                logger.info(
+                    "Notification delivery pool started",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "notification_delivery_pool_started",
+                        "workers": self.workers,
+                    },
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._transports.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def transport(
+        self, channel_id: int, config_encrypted: str, build_url: Callable[[], str]
+    ) -> ChannelTransport:
+        """
+        The channel's transport, built with ``build_url`` if it isn't cached
+        or its config has changed. Errors from ``build_url`` propagate.
+        """
+        version = config_version(config_encrypted)
+        with self._lock:
+            cached = self._transports.get(channel_id)
+            if cached is not None and cached.version == version:
+                self._transports.move_to_end(channel_id)
+                return cached
+
+        import apprise
+
+        apprise_url = build_url()
+        apprise_obj = apprise.Apprise()
+        apprise_obj.add(apprise_url)
+        built = ChannelTransport(version, apprise_obj)
+
+        with self._lock:
+            self._transports[channel_id] = built
+            self._transports.move_to_end(channel_id)
+            while len(self._transports) > MAX_TRANSPORTS:
+                self._transports.popitem(last=False)
+        return built
+
+    def invalidate(self, channel_id: int) -> None:
+        """Forget a channel's transport (its config changed or it was deleted)."""
+        with self._lock:
+            self._transports.pop(channel_id, None)
+
+    async def send(self, transport: ChannelTransport, title: str, body: str) -> bool:
+        """Deliver through ``transport`` on the delivery pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), transport.notify, title, body
+        )
+
+    def __len__(self) -> int:
+        return len(self._transports)
@@ -5,7 +5,7 @@ A clean, maintainable client for Paperless operations without the complexity
 of the original inheritance-based architecture.
 """
 
-from typing import Optional, Tuple
+from typing import AsyncGenerator, Optional, Tuple
 
 import aiohttp
 
@@ -15,6 +15,9 @@ from app.services.paperless_task_resolver import PaperlessTaskResolver
 
 logger = get_logger(__name__)
 
+# Largest chunk stream_document yields at a time
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class PaperlessClientError(Exception):
     """Base exception for Paperless client errors."""
@@ -189,16 +192,7 @@ class PaperlessClient:
             url = f"{self.auth.url}/api/documents/{document_id}/download/"
 
             async with self._session.get(url) as response:
-                if response.status == 404:
-                    raise PaperlessClientError(f"Document {document_id} not found")
-                if response.status == 403:
-                    raise PaperlessClientError(
-                        f"Access denied to document {document_id}"
-                    )
-                if response.status != 200:
-                    raise PaperlessClientError(
-                        f"Download failed with status {response.status}"
-                    )
+                self._check_download_status(response, document_id)
 
                 content = await response.read()
                 logger.debug(f"Downloaded document {document_id}: {len(content)} bytes")
@@ -208,6 +202,43 @@ class PaperlessClient:
             logger.error(f"Download connection error: {e}")
             raise PaperlessConnectionError(f"Connection error during download: {e}")
 
+    async def stream_document(
+        self, document_id: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Download a document by ID, yielding its content as it arrives.
+
+        Args:
+            document_id: The document ID to download
+            chunk_size: Largest chunk yielded at a time
+
+        Raises:
+            PaperlessClientError: If download fails
+        """
+        await self._ensure_session()
+
+        try:
+            url = f"{self.auth.url}/api/documents/{document_id}/download/"
+
+            async with self._session.get(url) as response:
+                self._check_download_status(response, document_id)
+
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+        except aiohttp.ClientError as e:
+            logger.error(f"Download connection error: {e}")
+            raise PaperlessConnectionError(f"Connection error during download: {e}")
+
+    @staticmethod
+    def _check_download_status(response, document_id: str) -> None:
+        if response.status == 404:
+            raise PaperlessClientError(f"Document {document_id} not found")
+        if response.status == 403:
+            raise PaperlessClientError(f"Access denied to document {document_id}")
+        if response.status != 200:
+            raise PaperlessClientError(f"Download failed with status {response.status}")
+
     async def delete_document(self, document_id: str) -> bool:
         """
         Delete a document by ID.
@@ -12,7 +12,7 @@ import uuid
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 from urllib.parse import urlparse
 
 import aiohttp
@@ -21,6 +21,7 @@ from app.core.config import settings
 from app.core.logging.config import get_logger
 from app.core.utils.url_security import validate_no_ssrf
 from app.services.credential_encryption import credential_encryption
+from app.services.upload_stream import payload_size
 
 logger = get_logger(__name__)
 
@@ -571,6 +572,48 @@ class PaperlessServiceBase(ABC):
         """Return ``{id: name}`` for all Paperless tags."""
         return await self._fetch_lookup("/api/tags/")
 
+    async def get_existing_document_ids(self, document_ids: List[int]) -> set:
+        """
+        Return which of ``document_ids`` exist, in a single list request.
+
+        Uses the documents list filter ``id__in`` and asks only for the id
+        field. As with check_document_exists, documents the user may not view
+        are not returned and so count as missing.
+
+        Raises:
+            PaperlessAuthenticationError: If authentication fails
+            PaperlessError: If the server rejects the filtered listing (older
+                Paperless versions); callers fall back to per-document checks
+        """
+        if not document_ids:
+            return set()
+
+        async with self._make_request(
+            "GET",
+            "/api/documents/",
+            params={
+                "id__in": ",".join(str(doc_id) for doc_id in document_ids),
+                "fields": "id",
+                "page_size": len(document_ids),
+            },
+        ) as response:
+            if response.status == 401:
+                raise PaperlessAuthenticationError(
+                    "Authentication failed during document listing"
+                )
+            if response.status != 200:
+                raise PaperlessError(f"Document listing failed: HTTP {response.status}")
+            payload = await response.json()
+
+        results = payload.get("results", [])
+        # A server that ignores id__in returns unrelated documents; a count
+        # beyond what was asked for means the filter wasn't applied
+        if payload.get("count", len(results)) > len(document_ids):
+            raise PaperlessError("Document listing ignored the id__in filter")
+
+        requested = set(document_ids)
+        return {item["id"] for item in results if item.get("id") in requested}
+
     async def enrich_documents_with_metadata(
         self, documents: List[Dict[str, Any]]
     ) -> None:
@@ -689,7 +732,7 @@ class PaperlessServiceToken(PaperlessServiceBase):
 
     async def upload_document(  # pylint: disable=unused-argument
         self,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         filename: str,
         entity_type: str,
         entity_id: int,
@@ -702,7 +745,8 @@ class PaperlessServiceToken(PaperlessServiceBase):
         Upload document to paperless-ngx.
 
         Args:
-            file_data: File content as bytes
+            file_data: File content as bytes, or an open binary file to
+                stream from its current position
             filename: Original filename
             entity_type: Medical record entity type
             entity_id: Medical record entity ID
@@ -719,9 +763,10 @@ class PaperlessServiceToken(PaperlessServiceBase):
         """
         try:
             # Validate file size
-            if len(file_data) > settings.PAPERLESS_MAX_UPLOAD_SIZE:
+            file_size = payload_size(file_data)
+            if file_size > settings.PAPERLESS_MAX_UPLOAD_SIZE:
                 raise PaperlessUploadError(
-                    f"File size {len(file_data)} exceeds maximum {settings.PAPERLESS_MAX_UPLOAD_SIZE}"
+                    f"File size {file_size} exceeds maximum {settings.PAPERLESS_MAX_UPLOAD_SIZE}"
                 )
 
             # Prepare multipart form data
@@ -756,7 +801,7 @@ class PaperlessServiceToken(PaperlessServiceBase):
 
             # Make upload request with extended timeout
             logger.info(
-                f"Uploading document to Paperless: {filename} (size: {len(file_data)} bytes)"
+                f"Uploading document to Paperless: {filename} (size: {file_size} bytes)"
             )
             logger.info(
                 f"Using extended upload timeout of {settings.PAPERLESS_UPLOAD_TIMEOUT}s to prevent timeout during processing"
@@ -828,7 +873,7 @@ class PaperlessServiceToken(PaperlessServiceBase):
                     "task_id": task_uuid,
                     "document_id": None,  # Will be set once task completes
                     "document_filename": filename,
-                    "file_size": len(file_data),
+                    "file_size": file_size,
                     "upload_timestamp": datetime.utcnow().isoformat(),
                     "entity_type": entity_type,
                     "entity_id": entity_id,
@@ -1424,7 +1469,7 @@ class PaperlessService(PaperlessServiceBase):
 
     async def upload_document(  # pylint: disable=unused-argument
         self,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         filename: str,
         entity_type: str,
         entity_id: int,
@@ -1437,7 +1482,8 @@ class PaperlessService(PaperlessServiceBase):
         Upload document to paperless-ngx.
 
         Args:
-            file_data: File content as bytes
+            file_data: File content as bytes, or an open binary file to
+                stream from its current position
             filename: Original filename
             entity_type: Medical record entity type
             entity_id: Medical record entity ID
@@ -1454,9 +1500,10 @@ class PaperlessService(PaperlessServiceBase):
         """
         try:
             # Validate file size
-            if len(file_data) > settings.PAPERLESS_MAX_UPLOAD_SIZE:
+            file_size = payload_size(file_data)
+            if file_size > settings.PAPERLESS_MAX_UPLOAD_SIZE:
                 raise PaperlessUploadError(
-                    f"File size {len(file_data)} exceeds maximum {settings.PAPERLESS_MAX_UPLOAD_SIZE}"
+                    f"File size {file_size} exceeds maximum {settings.PAPERLESS_MAX_UPLOAD_SIZE}"
                 )
 
             # Prepare multipart form data
@@ -1491,7 +1538,7 @@ class PaperlessService(PaperlessServiceBase):
 
             # Make upload request with extended timeout
             logger.info(
-                f"Uploading document to Paperless: {filename} (size: {len(file_data)} bytes)"
+                f"Uploading document to Paperless: {filename} (size: {file_size} bytes)"
             )
             logger.info(
                 f"Using extended upload timeout of {settings.PAPERLESS_UPLOAD_TIMEOUT}s to prevent timeout during processing"
@@ -1563,7 +1610,7 @@ class PaperlessService(PaperlessServiceBase):
                     "task_id": task_uuid,
                     "document_id": None,  # Will be set once task completes
                     "document_filename": filename,
-                    "file_size": len(file_data),
+                    "file_size": file_size,
                     "upload_timestamp": datetime.utcnow().isoformat(),
                     "entity_type": entity_type,
                     "entity_id": entity_id,
@@ -5,7 +5,7 @@ A clean client for Papra document management operations.
 Unlike Paperless, Papra uploads are synchronous - no task polling needed.
 """
 
-from typing import Optional, Tuple
+from typing import AsyncGenerator, BinaryIO, Optional, Tuple, Union
 
 import aiohttp
 
@@ -14,6 +14,9 @@ from app.services.papra_auth import PapraAuth
 
 logger = get_logger(__name__)
 
+# Largest chunk stream_document yields at a time
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 class PapraClientError(Exception):
     """Base exception for Papra client errors."""
@@ -81,7 +84,7 @@ class PapraClient:
 
     async def upload_document(
         self,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         filename: str,
         title: Optional[str] = None,
         content_type: Optional[str] = None,
@@ -90,7 +93,8 @@ class PapraClient:
         Upload a document to Papra. Returns document info synchronously.
 
         Args:
-            file_data: The file content as bytes
+            file_data: The file content as bytes, or an open binary file to
+                stream from its current position
             filename: Name of the file
             title: Optional document title
             content_type: MIME type of the file
@@ -182,14 +186,7 @@ class PapraClient:
             url = self._org_url(f"/documents/{document_id}/file")
 
             async with self._session.get(url) as response:
-                if response.status == 404:
-                    raise PapraClientError(f"Document {document_id} not found")
-                if response.status == 403:
-                    raise PapraClientError(f"Access denied to document {document_id}")
-                if response.status != 200:
-                    raise PapraClientError(
-                        f"Download failed with status {response.status}"
-                    )
+                self._check_download_status(response, document_id)
 
                 content = await response.read()
                 logger.debug(
@@ -201,6 +198,43 @@ class PapraClient:
             logger.error(f"Papra download connection error: {e}")
             raise PapraConnectionError(f"Connection error during download: {e}")
 
+    async def stream_document(
+        self, document_id: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Download a document by ID, yielding its content as it arrives.
+
+        Args:
+            document_id: The document ID to download
+            chunk_size: Largest chunk yielded at a time
+
+        Raises:
+            PapraClientError: If download fails
+        """
+        await self._ensure_session()
+
+        try:
+            url = self._org_url(f"/documents/{document_id}/file")
+
+            async with self._session.get(url) as response:
+                self._check_download_status(response, document_id)
+
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+        except aiohttp.ClientError as e:
+            logger.error(f"Papra download connection error: {e}")
+            raise PapraConnectionError(f"Connection error during download: {e}")
+
+    @staticmethod
+    def _check_download_status(response, document_id: str) -> None:
+        if response.status == 404:
+            raise PapraClientError(f"Document {document_id} not found")
+        if response.status == 403:
+            raise PapraClientError(f"Access denied to document {document_id}")
+        if response.status != 200:
+            raise PapraClientError(f"Download failed with status {response.status}")
+
     async def delete_document(self, document_id: str) -> bool:
         """
         Delete a document by ID.
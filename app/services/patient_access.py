@@ -2,13 +2,15 @@
 Patient Access Service - Unified access control logic for all phases
 """
 
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Optional
 
 from sqlalchemy.orm import Session
 
 from app.core.logging.config import get_logger
 from app.core.utils.datetime_utils import get_utc_now
 from app.models.models import Patient, PatientShare, User
+from app.services.patient_access_cache import patient_access_cache
 
 logger = get_logger(__name__, "app")
 
@@ -74,6 +76,11 @@ class PatientAccessService:
         """
         Check if user can access a specific patient
 
+        Ownership and privacy are read from the patient object in hand; only the
+        share lookup is served from the access cache. Every outcome is recorded so
+        that ``check_patient_access`` can answer later requests without fetching
+        the patient at all.
+
         Args:
             user: The user requesting access
             patient: The patient to check access for
@@ -89,16 +96,30 @@ class PatientAccessService:
         # 1. Owner always has access
         if patient.owner_user_id == user.id:
             logger.debug("Access granted: User is owner")
+            patient_access_cache.set(user.id, patient.id, permission, True)
             return True
 
         # 2. Check privacy level (Phase 3+ feature, but basic check)
         if patient.privacy_level == "private":
             logger.debug("Access denied: Patient is private")
+            patient_access_cache.set(user.id, patient.id, permission, False)
             return False
 
+        cached = patient_access_cache.get(user.id, patient.id, permission)
+        if cached is not None:
+            return cached
+
         # 3. Check individual sharing (Phase 1)
-        if self._check_individual_sharing(user, patient, permission):
+        share = self._get_active_share(user, patient)
+        if self._share_grants(share, permission):
             logger.debug("Access granted: Individual sharing")
+            patient_access_cache.set(
+                user.id,
+                patient.id,
+                permission,
+                True,
+                expires_at=self._share_expiry(share),
+            )
             return True
 
         # 4. Check family context (Phase 2+ - will be implemented later)
@@ -107,8 +128,37 @@ class PatientAccessService:
         #     return True
 
         logger.debug("Access denied: No valid access path found")
+        patient_access_cache.set(user.id, patient.id, permission, False)
         return False
 
+    def check_patient_access(
+        self, user: User, patient_id: int, permission: str = "view"
+    ) -> Optional[bool]:
+        """
+        Check access to a patient by ID, fetching the patient only on a cache miss
+
+        Used by the request dependencies, which know only the ID. A cached
+        decision implies the patient existed when it was made; deletions
+        invalidate the patient's entries, so a hit is not re-verified.
+
+        Args:
+            user: The user requesting access
+            patient_id: ID of the patient to check access for
+            permission: Required permission level ('view', 'edit', 'full')
+
+        Returns:
+            True/False for the access decision, or None if the patient does not exist
+        """
+        cached = patient_access_cache.get(user.id, patient_id, permission)
+        if cached is not None:
+            return cached
+
+        patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
+        if patient is None:
+            return None
+
+        return self.can_access_patient(user, patient, permission)
+
     def get_patient_context(self, user: User, patient: Patient) -> dict:
         """
         Get context information about how user can access this patient
@@ -172,16 +222,14 @@ class PatientAccessService:
 
         accessible_patients = []
         for share in shares:
-            if self._check_individual_sharing(user, share.patient, permission):
+            if self._share_grants(share, permission):
                 accessible_patients.append(share.patient)
 
         return accessible_patients
 
-    def _check_individual_sharing(
-        self, user: User, patient: Patient, permission: str
-    ) -> bool:
-        """Check if user has individual sharing access to patient"""
-        share = (
+    def _get_active_share(self, user: User, patient: Patient) -> Optional[PatientShare]:
+        """Get the user's active share for a patient, if any"""
+        return (
             self.db.query(PatientShare)
             .filter(
                 PatientShare.patient_id == patient.id,
@@ -191,12 +239,23 @@ class PatientAccessService:
             .first()
         )
 
+    @staticmethod
+    def _share_expiry(share: PatientShare) -> Optional[datetime]:
+        """Share expiry as an aware UTC datetime (SQLite returns naive values)"""
+        expires_at = share.expires_at
+        if expires_at is not None and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at
+
+    def _share_grants(self, share: Optional[PatientShare], permission: str) -> bool:
+        """Check that a share is unexpired and at least the required permission level"""
         if not share:
             return False
 
         # Check expiration
-        if share.expires_at and share.expires_at < get_utc_now():
-            logger.debug(f"Share expired for patient {patient.id}")
+        expires_at = self._share_expiry(share)
+        if expires_at and expires_at < get_utc_now():
+            logger.debug(f"Share expired for patient {share.patient_id}")
             return False
 
         # Check permission level
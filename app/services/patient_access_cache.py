@@ -0,0 +1,199 @@
+"""Per-process cache of patient access decisions.
+
+Every patient-scoped request resolves the same question - may user U touch patient
+P at permission level L - and answering it costs a ``Patient`` fetch plus, for
+non-owners, a ``PatientShare`` lookup. The answer changes only when a share or the
+patient's ownership/privacy changes, so it is cached here keyed by
+``(user_id, patient_id, permission)``.
+
+Staleness is bounded two ways. Services that change sharing or ownership call
+``invalidate_patient`` / ``invalidate_user`` after they commit (not before: a
+request that reads the old committed state between flush and commit would
+otherwise re-cache it). Everything else - an admin editing rows through the
+generic model endpoints, a share reaching its ``expires_at`` - is covered by the
+TTL, and a share's expiry additionally caps the lifetime of the entry it granted.
+
+Decisions live in process memory, so with several workers each keeps its own
+copy. Under the database state backend an invalidation also bumps a shared
+generation (``app.core.shared_state.SharedGeneration``), and every lookup checks
+it first: a share revoked through one worker stops granting access in all of
+them on their next lookup, not one TTL later.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.shared_state import SharedGeneration
+from app.core.utils.datetime_utils import get_utc_now
+
+AccessKey = Tuple[int, int, str]
+
+
+class PatientAccessCache:
+    """TTL cache of access decisions with per-patient and per-user invalidation.
+
+    Thread-safe: sync endpoints run in FastAPI's threadpool, so lookups and
+    invalidations genuinely race. Secondary indexes by patient and by user make
+    invalidation O(entries for that patient/user) rather than a full scan.
+    """
+
+    def __init__(
+        self, ttl_seconds: int, max_entries: int, generation: str = "patient_access"
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._generation = SharedGeneration(generation)
+        self._entries: Dict[AccessKey, Tuple[bool, float]] = {}
+        self._by_patient: Dict[int, Set[AccessKey]] = {}
+        self._by_user: Dict[int, Set[AccessKey]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, user_id: int, patient_id: int, permission: str) -> Optional[bool]:
+        """Return the cached decision, or None on a miss or an expired entry."""
+        if not self.enabled:
+            return None
+
+        if self._generation.changed():
+            # Another worker invalidated decisions
+            with self._lock:
+                self._drop_entries()
+
+        key = (user_id, patient_id, permission)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                self._discard(key)
+            self._misses += 1
+            return None
+
+    def set(
+        self,
+        user_id: int,
+        patient_id: int,
+        permission: str,
+        allowed: bool,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        """Record a decision.
+
+        ``expires_at`` is the expiry of the share that granted access, if any; the
+        entry never outlives it, so an expiring share stops granting access on time
+        rather than up to one TTL late.
+        """
+        if not self.enabled:
+            return
+
+        lifetime = float(self.ttl_seconds)
+        if expires_at is not None:
+            remaining = (expires_at - get_utc_now()).total_seconds()
+            if remaining <= 0:
+                return
+            lifetime = min(lifetime, remaining)
+
+        key = (user_id, patient_id, permission)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict_one()
+            self._entries[key] = (allowed, time.monotonic() + lifetime)
+            self._by_patient.setdefault(patient_id, set()).add(key)
+            self._by_user.setdefault(user_id, set()).add(key)
+
+    def invalidate_patient(self, patient_id: int) -> None:
+        """Drop every decision about a patient (share or ownership changed)."""
+        with self._lock:
+            keys = self._by_patient.pop(patient_id, set())
+            for key in keys:
+                self._discard(key)
+            self._invalidations += 1
+        if self.enabled:
+            self._generation.bump()
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every decision made for a user (user deleted or shares bulk-revoked)."""
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+            for key in keys:
+                self._discard(key)
+            self._invalidations += 1
+        if self.enabled:
+            self._generation.bump()
+
+    def clear(self) -> None:
+        """Drop all decisions and reset the counters. For tests and admin resets."""
+        with self._lock:
+            self._drop_entries()
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+            self._evictions = 0
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for the admin dashboard."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+            }
+
+    def _drop_entries(self) -> None:
+        """Remove every entry. Caller must hold ``_lock``."""
+        self._entries.clear()
+        self._by_patient.clear()
+        self._by_user.clear()
+
+    def _discard(self, key: AccessKey) -> None:
+        """Remove one entry and its index references. Caller must hold ``_lock``."""
+        self._entries.pop(key, None)
+        user_id, patient_id, _ = key
+        patient_keys = self._by_patient.get(patient_id)
+        if patient_keys is not None:
+            patient_keys.discard(key)
+            if not patient_keys:
+                del self._by_patient[patient_id]
+        user_keys = self._by_user.get(user_id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._by_user[user_id]
+
+    def _evict_one(self) -> None:
+        """Make room for one entry by dropping the oldest insertion. Caller must
+        hold ``_lock``.
+
+        Every entry gets the same TTL (or less, when a share expires sooner), so the
+        oldest insertion is also the one closest to expiring. The store is sized
+        well above the working set of a self-hosted instance; eviction is a safety
+        valve, not the normal path.
+        """
+        oldest = next(iter(self._entries), None)
+        if oldest is not None:
+            self._discard(oldest)
+            self._evictions += 1
+
+
+patient_access_cache = PatientAccessCache(
+    ttl_seconds=settings.PATIENT_ACCESS_CACHE_TTL_SECONDS,
+    max_entries=settings.PATIENT_ACCESS_CACHE_MAX_ENTRIES,
+)
@@ -13,6 +13,7 @@ from app.core.logging.constants import LogFields
 from app.core.utils.activity_tracker import activity_tracking_disabled_var
 from app.models.models import Patient, PatientShare, User
 from app.services.patient_access import PatientAccessService
+from app.services.patient_access_cache import patient_access_cache
 
 security_logger = get_logger(__name__, "security")
 
@@ -299,6 +300,7 @@ class PatientManagementService:
 
             # Commit all changes
             self.db.commit()
+            patient_access_cache.invalidate_patient(patient_id)
 
             # Ensure transaction is fully flushed and visible to other connections
             self.db.flush()
@@ -605,6 +607,7 @@ class PatientManagementService:
                 self.db.add(new_share)
 
             self.db.commit()
+            patient_access_cache.invalidate_patient(patient_id)
 
             log_security_event(
                 security_logger,
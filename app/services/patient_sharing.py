@@ -25,6 +25,7 @@ from app.exceptions.patient_sharing import (
 )
 from app.models.models import Invitation, Patient, PatientShare, User
 from app.services.invitation_service import InvitationService
+from app.services.patient_access_cache import patient_access_cache
 
 logger = get_logger(__name__, "app")
 
@@ -117,6 +118,7 @@ class PatientSharingService:
             existing_share.expires_at = expires_at
             existing_share.custom_permissions = custom_permissions
             self.db.commit()
+            patient_access_cache.invalidate_patient(patient_id)
             logger.info(
                 "Reactivated existing share",
                 extra={
@@ -141,6 +143,7 @@ class PatientSharingService:
             self.db.add(share)
             self.db.commit()
             self.db.refresh(share)
+            patient_access_cache.invalidate_patient(patient_id)
 
             logger.info(
                 "Patient share created",
@@ -230,6 +233,7 @@ class PatientSharingService:
                 )
 
         self.db.commit()
+        patient_access_cache.invalidate_patient(patient_id)
 
         # Publish share revoked event
         event = ShareRevokedEvent(
@@ -319,6 +323,7 @@ class PatientSharingService:
 
         self.db.commit()
         self.db.refresh(share)
+        patient_access_cache.invalidate_patient(patient_id)
 
         logger.info(
             "Updated patient share",
@@ -413,6 +418,8 @@ class PatientSharingService:
             count += 1
 
         self.db.commit()
+        for patient_id in {share.patient_id for share in expired_shares}:
+            patient_access_cache.invalidate_patient(patient_id)
         logger.info(
             "Deactivated expired patient shares",
             extra={"count": count, "component": "patient_sharing"},
@@ -475,6 +482,7 @@ class PatientSharingService:
         # Deactivate the share
         share.is_active = False
         self.db.commit()
+        patient_access_cache.invalidate_patient(patient_id)
 
         logger.info(
             "Removed user access to patient",
@@ -738,6 +746,7 @@ class PatientSharingService:
             # Commit both share and invitation update
             self.db.commit()
             self.db.refresh(share)
+            patient_access_cache.invalidate_user(user.id)
 
             logger.info(
                 "Patient share created from invitation",
@@ -927,6 +936,7 @@ class PatientSharingService:
 
             # Commit all changes atomically
             self.db.commit()
+            patient_access_cache.invalidate_user(user.id)
 
             logger.info(
                 "Bulk patient share invitation accepted",
@@ -0,0 +1,236 @@
+"""
+PDF Extraction Engine
+
+Runs lab PDF text extraction (pdfplumber, and OCR for scanned reports) off
+the event loop. pdfplumber's layout analysis is pure Python and holds the
+GIL, so documents are extracted in a bounded pool of worker processes
+(PDF_EXTRACTION_WORKERS, 0 extracts in a thread instead); a PDF that kills
+its worker fails rather than being retried in the server process. Within a
+worker, OCR rasterizes and recognizes pages in parallel, a page at a time
+(see PDFTextExtractionService._extract_ocr_text).
+
+Results are kept in an on-disk cache keyed by the PDF's SHA-256
+(PDF_EXTRACTION_CACHE_DIR, bounded by PDF_EXTRACTION_CACHE_MAX_MB with
+least-recently-used eviction), so uploading the same PDF again returns
+without re-extracting. Failed extractions are not cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+
+logger = get_logger(__name__, "app")
+
+# Bump when extraction or lab parsing changes, so cached results are not reused
+EXTRACTION_VERSION = 1
+
+
+def extract_pdf(pdf_bytes: bytes, filename: str) -> Dict:
+    """Extract one PDF; runs in a worker process (or a thread)."""
+    from app.services import pdf_text_extraction_service
+
+    return pdf_text_extraction_service.pdf_extraction_service.extract_text(
+        pdf_bytes=pdf_bytes, filename=filename
+    )
+
+
+class ExtractionResultCache:
+    """Extraction results on disk, one JSON file per PDF hash."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(pdf_bytes: bytes, ocr_available: bool) -> str:
+        # Whether OCR could run changes the result for scanned PDFs
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        return f"{digest}-v{EXTRACTION_VERSION}-{'ocr' if ocr_available else 'text'}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            os.utime(path)
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict) -> None:
+        if not self.enabled:
+            return
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f"{key}-", suffix=".part", dir=self.directory
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, default=str)
+            os.replace(temp_name, self.directory / f"{key}.json")
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used results until the cache fits its limit."""
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    entries.append((path.stat(), path))
+                except FileNotFoundError:
+                    continue
+            total = sum(stat.st_size for stat, _ in entries)
+            for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+
+
+class PDFExtractionEngine:
+    """Process-wide extraction pool and result cache."""
+
+    _instance: Optional["PDFExtractionEngine"] = None
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: Optional[int] = None,
+    ):
+        self.workers = max(
+            0, settings.PDF_EXTRACTION_WORKERS if workers is None else workers
+        )
+        self.cache = ExtractionResultCache(
+            settings.PDF_EXTRACTION_CACHE_DIR if cache_dir is None else cache_dir,
+            (
+                settings.PDF_EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+                if cache_max_bytes is None
+                else cache_max_bytes
+            ),
+        )
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "PDFExtractionEngine":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — shut down the pool (cached results stay on disk)."""
+        if cls._instance is not None:
+            cls._instance.shutdown()
+            cls._instance = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        """The worker pool, started on first use; None extracts in threads."""
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers don't inherit the server's threads, locks or
+                # database connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(
+                    "PDF extraction pool started",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "pdf_extraction_pool_started",
+                        "workers": self.workers,
+                    },
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _extract(self, pdf_bytes: bytes, filename: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(extract_pdf, pdf_bytes, filename)
+        try:
+            return await loop.run_in_executor(
+                executor, extract_pdf, pdf_bytes, filename
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory, or a decompression bomb).
+            # The PDF is untrusted, so it is never retried in the server
+            # process; later uploads get a fresh pool.
+            logger.warning(
+                "PDF extraction worker died",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "pdf_extraction_pool_broken",
+                    "pdf_filename": filename,
+                },
+            )
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            return {
+                "text": "",
+                "method": "failed",
+                "confidence": 0.0,
+                "page_count": 0,
+                "char_count": 0,
+                "error": "The PDF could not be processed.",
+                "fallback_triggered": False,
+            }
+
+    async def extract(self, pdf_bytes: bytes, filename: str = "document.pdf") -> Dict:
+        """
+        Extract a PDF's text, from the cache when the same PDF was extracted.
+
+        Returns the PDFTextExtractionService.extract_text result, with
+        ``cached`` set to whether it came from the cache.
+        """
+        from app.services.pdf_text_extraction_service import (
+            PDFTextExtractionService,
+        )
+
+        ocr_available = bool(PDFTextExtractionService._tesseract_available_cache)
+        key = self.cache.key(pdf_bytes, ocr_available)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        result = await self._extract(pdf_bytes, filename)
+        if result.get("method") != "failed":
+            try:
+                await asyncio.to_thread(self.cache.put, key, result)
+            except OSError as e:
+                logger.warning(f"Could not cache PDF extraction result: {e}")
+        return {**result, "cached": False}
@@ -0,0 +1,407 @@
+"""
+PDF Rendering Context
+
+Process-wide ReportLab resources shared by every custom report:
+
+- fonts: the Unicode and CJK TrueType fonts, looked up and registered with
+  ReportLab once per process (registration probes a dozen paths and parses
+  the font files, several MB for the CJK collections)
+- styles: the report stylesheet, built once per font pair, i.e. once for
+  Latin/Cyrillic/Greek languages and once for CJK languages
+- translators: one ReportTranslator per (language, date format)
+
+All three are read-only once built, so report generators running in
+parallel threads share them. Building is guarded by a lock and happens on
+first use; startup calls warmup() so the first report after a restart does
+not pay for it.
+"""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.services.report_translations import ReportTranslator, get_translator
+
+logger = get_logger(__name__, "app")
+
+# CJK languages that require dedicated CJK fonts for PDF rendering.
+# Latin-based fonts (DejaVu, Arial) lack glyphs for these scripts.
+CJK_LANGUAGES = frozenset({"zh", "ja", "ko"})
+
+# Latin/Cyrillic font priority: DejaVu Sans (best Unicode coverage for
+# Latin/Cyrillic/Greek), then Arial (common on Windows, supports Cyrillic);
+# Helvetica is the fallback, limited to Latin characters only
+UNICODE_FONT_PATHS = [
+    # DejaVu Sans (best Unicode support)
+    "C:/Windows/Fonts/DejaVuSans.ttf",  # Windows
+    "C:/Windows/Fonts/dejavu-sans/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",  # macOS
+    "/System/Library/Fonts/Supplemental/DejaVuSans.ttf",
+    # Arial (fallback, available on most Windows systems, supports Cyrillic)
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/Arial.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+]
+
+UNICODE_BOLD_FONT_PATHS = [
+    # DejaVu Sans Bold
+    "C:/Windows/Fonts/DejaVuSans-Bold.ttf",
+    "C:/Windows/Fonts/dejavu-sans/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+    "/Library/Fonts/DejaVuSans-Bold.ttf",
+    "/System/Library/Fonts/Supplemental/DejaVuSans-Bold.ttf",
+    # Arial Bold (fallback)
+    "C:/Windows/Fonts/arialbd.ttf",
+    "C:/Windows/Fonts/Arial Bold.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/arialbd.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+]
+
+# CJK font priority: Microsoft YaHei (ships with modern Windows), Noto Sans
+# CJK SC (common on Linux), PingFang SC (ships with macOS)
+CJK_FONT_PATHS = [
+    "C:/Windows/Fonts/msyh.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJKsc-Regular.otf",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/Library/Fonts/PingFang.ttc",
+]
+
+CJK_BOLD_FONT_PATHS = [
+    "C:/Windows/Fonts/msyhbd.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJKsc-Bold.otf",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/Library/Fonts/PingFang.ttc",
+]
+
+
+@dataclass(frozen=True)
+class FontSet:
+    """ReportLab font names to render with, after fallbacks."""
+
+    normal: str
+    bold: str
+    cjk_normal: str
+    cjk_bold: str
+    has_cjk: bool
+
+    def for_language(self, language: str) -> Tuple[str, str]:
+        """(normal, bold) font names for a report language."""
+        if language in CJK_LANGUAGES:
+            return self.cjk_normal, self.cjk_bold
+        return self.normal, self.bold
+
+
+FALLBACK_FONTS = FontSet(
+    normal="Helvetica",
+    bold="Helvetica-Bold",
+    cjk_normal="Helvetica",
+    cjk_bold="Helvetica-Bold",
+    has_cjk=False,
+)
+
+
+def _try_register_font(font_name: str, font_paths: List[str]) -> bool:
+    """
+    Register a font from the first of ``font_paths`` that loads.
+
+    Returns:
+        bool: True if font was successfully registered, False otherwise
+    """
+    for font_path in font_paths:
+        if Path(font_path).exists():
+            try:
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+                logger.info(f"Registered font '{font_name}': {font_path}")
+                return True
+            except Exception as e:
+                logger.debug(f"Failed to register font from {font_path}: {e}")
+                continue
+    return False
+
+
+def register_fonts() -> FontSet:
+    """
+    Register Unicode-compatible fonts for international character support.
+
+    Registers two font families with ReportLab:
+    1. Latin/Cyrillic fonts (UnicodeFont / UnicodeFont-Bold) for most languages
+    2. CJK fonts (CJKFont / CJKFont-Bold) for Chinese, Japanese, and Korean
+
+    Searches common font directories across Windows, Linux, and macOS and
+    falls back to Helvetica where nothing is found.
+    """
+    try:
+        font_registered = _try_register_font("UnicodeFont", UNICODE_FONT_PATHS)
+        bold_registered = _try_register_font(
+            "UnicodeFont-Bold", UNICODE_BOLD_FONT_PATHS
+        )
+
+        if not font_registered:
+            logger.warning(
+                "No Unicode font found (DejaVu Sans or Arial). "
+                "Falling back to Helvetica (limited Unicode support). "
+                "International characters like Cyrillic may not render correctly."
+            )
+
+        font_normal = "UnicodeFont" if font_registered else "Helvetica"
+        font_bold = "UnicodeFont-Bold" if bold_registered else "Helvetica-Bold"
+
+        cjk_registered = _try_register_font("CJKFont", CJK_FONT_PATHS)
+        cjk_bold_registered = _try_register_font("CJKFont-Bold", CJK_BOLD_FONT_PATHS)
+
+        # CJK font names fall back to the Latin fonts if unavailable
+        cjk_normal = "CJKFont" if cjk_registered else font_normal
+        return FontSet(
+            normal=font_normal,
+            bold=font_bold,
+            cjk_normal=cjk_normal,
+            cjk_bold="CJKFont-Bold" if cjk_bold_registered else cjk_normal,
+            has_cjk=cjk_registered,
+        )
+
+    except Exception as e:
+        logger.error(f"Error registering fonts: {e}")
+        return FALLBACK_FONTS
+
+
+def build_styles(font_normal: str, font_bold: str) -> StyleSheet1:
+    """Create the report's paragraph styles using the given fonts."""
+    styles = getSampleStyleSheet()
+
+    # Medical document colors (from UI/UX recommendations)
+    critical_red = colors.HexColor("#D32F2F")
+    warning_orange = colors.HexColor("#F57C00")
+    info_blue = colors.HexColor("#1976D2")
+    neutral_gray = colors.HexColor("#616161")
+    dark_text = colors.HexColor("#212121")
+
+    # Title style
+    styles.add(
+        ParagraphStyle(
+            name="CustomTitle",
+            parent=styles["Title"],
+            fontSize=20,
+            textColor=dark_text,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName=font_bold,
+        )
+    )
+
+    # Patient header style
+    styles.add(
+        ParagraphStyle(
+            name="PatientHeader",
+            parent=styles["Heading1"],
+            fontSize=16,
+            textColor=dark_text,
+            spaceAfter=10,
+            fontName=font_bold,
+            alignment=TA_LEFT,
+        )
+    )
+
+    # Emergency alert style
+    styles.add(
+        ParagraphStyle(
+            name="EmergencyAlert",
+            parent=styles["BodyText"],
+            fontSize=12,
+            textColor=colors.white,
+            fontName=font_bold,
+            alignment=TA_LEFT,
+            leftIndent=10,
+            rightIndent=10,
+            spaceBefore=5,
+            spaceAfter=5,
+        )
+    )
+
+    # Section header style with icon space
+    styles.add(
+        ParagraphStyle(
+            name="SectionHeader",
+            parent=styles["Heading1"],
+            fontSize=14,
+            textColor=info_blue,
+            spaceAfter=8,
+            spaceBefore=16,
+            fontName=font_bold,
+            leftIndent=0,
+        )
+    )
+
+    # Subsection header style
+    styles.add(
+        ParagraphStyle(
+            name="SubsectionHeader",
+            parent=styles["Heading2"],
+            fontSize=12,
+            textColor=dark_text,
+            spaceAfter=4,
+            spaceBefore=8,
+            fontName=font_bold,
+        )
+    )
+
+    # Body text style
+    styles.add(
+        ParagraphStyle(
+            name="CustomBody",
+            parent=styles["BodyText"],
+            fontSize=10,
+            leading=12,
+            textColor=dark_text,
+            fontName=font_normal,
+        )
+    )
+
+    # Critical info style
+    styles.add(
+        ParagraphStyle(
+            name="CriticalInfo",
+            parent=styles["BodyText"],
+            fontSize=10,
+            textColor=critical_red,
+            fontName=font_bold,
+        )
+    )
+
+    # Warning style
+    styles.add(
+        ParagraphStyle(
+            name="WarningInfo",
+            parent=styles["BodyText"],
+            fontSize=10,
+            textColor=warning_orange,
+            fontName=font_bold,
+        )
+    )
+
+    # Info text style (for metadata)
+    styles.add(
+        ParagraphStyle(
+            name="InfoText",
+            parent=styles["BodyText"],
+            fontSize=9,
+            textColor=neutral_gray,
+            alignment=TA_RIGHT,
+            fontName=font_normal,
+        )
+    )
+
+    # Small text for references
+    styles.add(
+        ParagraphStyle(
+            name="SmallText",
+            parent=styles["BodyText"],
+            fontSize=8,
+            textColor=neutral_gray,
+            fontName=font_normal,
+        )
+    )
+
+    return styles
+
+
+class PDFRenderingContext:
+    """
+    Shared fonts, stylesheets and translators for report PDF generation.
+
+    Callers must treat the returned stylesheets and translators as
+    read-only; derive new ParagraphStyles from them instead of editing them.
+    """
+
+    _instance: Optional["PDFRenderingContext"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fonts: Optional[FontSet] = None
+        self._styles: Dict[Tuple[str, str], StyleSheet1] = {}
+        self._translators: Dict[Tuple[str, str], ReportTranslator] = {}
+
+    @classmethod
+    def get_instance(cls) -> "PDFRenderingContext":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests and benchmarks only — drop the cached resources."""
+        cls._instance = None
+
+    @property
+    def fonts(self) -> FontSet:
+        """Registered font names, registering the fonts on first use."""
+        if self._fonts is None:
+            with self._lock:
+                if self._fonts is None:
+                    self._fonts = register_fonts()
+        return self._fonts
+
+    def styles(self, font_normal: str, font_bold: str) -> StyleSheet1:
+        """The report stylesheet for a font pair."""
+        key = (font_normal, font_bold)
+        styles = self._styles.get(key)
+        if styles is None:
+            with self._lock:
+                styles = self._styles.get(key)
+                if styles is None:
+                    styles = self._styles[key] = build_styles(font_normal, font_bold)
+        return styles
+
+    def styles_for_language(self, language: str) -> StyleSheet1:
+        """The report stylesheet with the fonts a language needs."""
+        return self.styles(*self.fonts.for_language(language))
+
+    def translator(
+        self, language: str = "en", date_format: str = "mdy"
+    ) -> ReportTranslator:
+        """The report translator for a language and date format."""
+        key = (language, date_format)
+        translator = self._translators.get(key)
+        if translator is None:
+            translator = get_translator(language, date_format)
+            # Unsupported codes fall back inside the translator; cache under
+            # the resolved codes only, so arbitrary input can't grow the cache
+            resolved = (translator.language, translator.date_format_code)
+            with self._lock:
+                translator = self._translators.setdefault(resolved, translator)
+        return translator
+
+    def warmup(self, languages: Tuple[str, ...] = ("en",)) -> None:
+        """Register fonts and build the stylesheets and translators up front."""
+        fonts = self.fonts
+        self.styles(fonts.normal, fonts.bold)
+        self.styles(fonts.cjk_normal, fonts.cjk_bold)
+        for language in languages:
+            self.translator(language)
+        logger.info(
+            "PDF rendering resources ready",
+            extra={
+                LogFields.CATEGORY: "app",
+                LogFields.EVENT: "pdf_rendering_warmup",
+                "cjk_font": fonts.has_cjk,
+            },
+        )
@@ -2,15 +2,22 @@
 PDF Text Extraction Service with hybrid OCR approach.
 Tries fast PDF text extraction first, falls back to OCR if needed.
 Includes lab-specific parsing for structured extraction.
+
+Extraction is synchronous and CPU-bound; API code runs it through
+PDFExtractionEngine (app.services.pdf_extraction_engine), never on the
+event loop.
 """
 
 import io
+import os
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Dict, Optional
 
 import pdfplumber
 import pytesseract
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
 from app.core.config import Settings
@@ -32,7 +39,10 @@ MIN_DIGIT_RATIO = 0.01  # Minimum ratio of digits in text (lab results contain n
 # OCR configuration - Balance between accuracy and performance
 # Tested with 15MB PDFs on 4-core containers
 OCR_DPI = 300  # High DPI for accuracy, tested with typical lab PDFs (2-10MB)
-OCR_THREAD_COUNT = 2  # Prevents thread exhaustion, optimized for 4-core containers
+# Memory for one page in flight: its grayscale raster at OCR_DPI (a letter page
+# is ~8MB) plus Tesseract's working copy. OCR_MEMORY_LIMIT_MB / this bounds how
+# many pages are processed at once.
+OCR_PAGE_MEMORY_MB = 24
 
 # Common unit patterns for lab results
 UNIT_PATTERNS = (
@@ -101,6 +111,31 @@ COMPILED_NOISE_PATTERNS = [
 ]
 
 
+class _PDFDocument:
+    """
+    A PDF opened with pdfplumber on first use, shared by every text pass.
+
+    The plain and layout-preserving passes read the same pages, so parsing
+    the file once saves the second open and lets pdfplumber reuse the
+    page objects it already extracted.
+    """
+
+    def __init__(self, pdf_bytes: bytes):
+        self.pdf_bytes = pdf_bytes
+        self._pdf = None
+
+    @property
+    def pdf(self) -> pdfplumber.PDF:
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(io.BytesIO(self.pdf_bytes))
+        return self._pdf
+
+    def close(self) -> None:
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+
 class PDFTextExtractionService:
     """Service for extracting text from PDF files using hybrid approach."""
 
@@ -301,9 +336,10 @@ class PDFTextExtractionService:
             },
         )
 
+        document = _PDFDocument(pdf_bytes)
         try:
             # Phase 1: Try native text extraction (fast path)
-            native_result = self._extract_native_text(pdf_bytes)
+            native_result = self._extract_native_text(document)
 
             if self._is_valid_text(native_result["text"]):
                 # Try lab-specific parsing first. Layout-preserved text is
@@ -311,7 +347,7 @@ class PDFTextExtractionService:
                 # provider, so the expensive layout pass is skipped otherwise.
                 parsed_result = self._try_lab_specific_parsing(
                     native_result["text"],
-                    layout_text_provider=lambda: self._extract_layout_text(pdf_bytes),
+                    layout_text_provider=lambda: self._extract_layout_text(document),
                 )
 
                 if parsed_result:
@@ -402,7 +438,9 @@ class PDFTextExtractionService:
                     "native_char_count": native_result["char_count"],
                 },
             )
-            ocr_result = self._extract_ocr_text(pdf_bytes)
+            ocr_result = self._extract_ocr_text(
+                pdf_bytes, page_count=native_result["page_count"]
+            )
 
             # Clean OCR text as well
             cleaned_text = self._clean_extracted_text(ocr_result["text"])
@@ -436,24 +474,17 @@ class PDFTextExtractionService:
                 "error": str(e),
                 "fallback_triggered": False,
             }
+        finally:
+            document.close()
 
-    def _extract_native_text(self, pdf_bytes: bytes) -> Dict:
+    def _extract_native_text(self, document: _PDFDocument) -> Dict:
         """Extract text using pdfplumber (fast, for digital PDFs)."""
-        text_parts = []
-        page_count = 0
+        pages = document.pdf.pages
+        text = "\n".join(page.extract_text() or "" for page in pages)
 
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            page_count = len(pdf.pages)
-
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text_parts.append(page_text)
-
-        text = "\n".join(text_parts)
+        return {"text": text, "page_count": len(pages), "char_count": len(text)}
 
-        return {"text": text, "page_count": page_count, "char_count": len(text)}
-
-    def _extract_layout_text(self, pdf_bytes: bytes) -> Optional[str]:
+    def _extract_layout_text(self, document: _PDFDocument) -> Optional[str]:
         """Extract a layout-preserved rendering (pdfplumber ``layout=True``).
 
         This retains horizontal positions as whitespace so column-aware parsers
@@ -469,28 +500,31 @@ class PDFTextExtractionService:
         or misaligned layout.
         """
         layout_parts = []
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page_number, page in enumerate(pdf.pages, start=1):
-                try:
-                    layout_parts.append(page.extract_text(layout=True) or "")
-                except Exception as e:
-                    logger.warning(
-                        "Layout extraction failed for a page; falling back to "
-                        "plain-text extraction for the whole document",
-                        extra={
-                            "component": "PDFTextExtractionService",
-                            "page_number": page_number,
-                            "error": str(e),
-                        },
-                    )
-                    return None
+        for page_number, page in enumerate(document.pdf.pages, start=1):
+            try:
+                layout_parts.append(page.extract_text(layout=True) or "")
+            except Exception as e:
+                logger.warning(
+                    "Layout extraction failed for a page; falling back to "
+                    "plain-text extraction for the whole document",
+                    extra={
+                        "component": "PDFTextExtractionService",
+                        "page_number": page_number,
+                        "error": str(e),
+                    },
+                )
+                return None
         return "\n".join(layout_parts)
 
-    def _extract_ocr_text(self, pdf_bytes: bytes) -> Dict:
+    def _extract_ocr_text(
+        self, pdf_bytes: bytes, page_count: Optional[int] = None
+    ) -> Dict:
         """
         Extract text using OCR (slower, for scanned PDFs).
 
-        Processes pages one at a time to reduce memory usage.
+        Each page is rasterized on its own and OCR'd as soon as it is ready;
+        a few pages run in parallel (OCR_PAGE_WORKERS, capped by
+        OCR_MEMORY_LIMIT_MB), so at most that many page images exist at once.
 
         Raises:
             RuntimeError: If Tesseract is not available
@@ -500,51 +534,77 @@ class PDFTextExtractionService:
                 "Tesseract OCR is not available. Cannot perform OCR extraction."
             )
 
-        text_parts = []
-        page_count = 0
-
         # Get Poppler path for Windows EXE
         poppler_path = get_poppler_path()
+        poppler_path = str(poppler_path) if poppler_path else None
 
-        # Process pages one at a time to reduce memory usage
-        # First, get the page count without loading all images
-        images = convert_from_bytes(
-            pdf_bytes,
-            dpi=OCR_DPI,  # Configured for accuracy vs performance balance
-            fmt="jpeg",
-            thread_count=OCR_THREAD_COUNT,  # Optimized for container resources
-            poppler_path=str(poppler_path) if poppler_path else None,
-        )
-        page_count = len(images)
+        # Poppler reads a file; write the PDF once rather than once per page
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
 
-        # Process each page individually
-        for i, image in enumerate(images):
-            # Preprocess image for better OCR
-            processed_image = self._preprocess_image(image)
+            if page_count is None:
+                page_count = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)[
+                    "Pages"
+                ]
 
-            # Run OCR
-            page_text = pytesseract.image_to_string(
-                processed_image, config="--psm 6"  # Assume uniform block of text
-            )
+            def ocr_page(page_number: int) -> str:
+                return self._ocr_page(pdf_path, page_number, page_count, poppler_path)
 
-            text_parts.append(page_text)
-            logger.info(
-                f"OCR page {i+1}/{page_count} complete",
-                extra={
-                    "component": "PDFTextExtractionService",
-                    "page_number": i + 1,
-                    "char_count": len(page_text),
-                },
-            )
-
-            # Clear image from memory after processing
-            del image
-            del processed_image
+            with ThreadPoolExecutor(
+                max_workers=self._ocr_page_workers(), thread_name_prefix="ocr"
+            ) as pool:
+                text_parts = list(pool.map(ocr_page, range(1, page_count + 1)))
+        finally:
+            os.unlink(pdf_path)
 
         text = "\n".join(text_parts)
 
         return {"text": text, "page_count": page_count, "char_count": len(text)}
 
+    def _ocr_page_workers(self) -> int:
+        """Pages OCR'd at once: OCR_PAGE_WORKERS within the memory limit."""
+        by_memory = self.settings.OCR_MEMORY_LIMIT_MB // OCR_PAGE_MEMORY_MB
+        return max(1, min(self.settings.OCR_PAGE_WORKERS, by_memory))
+
+    def _ocr_page(
+        self,
+        pdf_path: str,
+        page_number: int,
+        page_count: int,
+        poppler_path: Optional[str],
+    ) -> str:
+        """Rasterize and OCR one page (1-based)."""
+        images = convert_from_path(
+            pdf_path,
+            dpi=OCR_DPI,  # Configured for accuracy vs performance balance
+            first_page=page_number,
+            last_page=page_number,
+            grayscale=True,
+            poppler_path=poppler_path,
+        )
+        if not images:
+            return ""
+
+        # Preprocess image for better OCR
+        processed_image = self._preprocess_image(images[0])
+        del images
+
+        # Run OCR
+        page_text = pytesseract.image_to_string(
+            processed_image, config="--psm 6"  # Assume uniform block of text
+        )
+        logger.info(
+            f"OCR page {page_number}/{page_count} complete",
+            extra={
+                "component": "PDFTextExtractionService",
+                "page_number": page_number,
+                "char_count": len(page_text),
+            },
+        )
+        return page_text
+
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """Enhance image for better OCR accuracy."""
         # Convert to grayscale
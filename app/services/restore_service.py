@@ -5,6 +5,7 @@ This service handles the restoration of database and file backups.
 Simplified version using centralized security validation and native PostgreSQL tools.
 """
 
+import asyncio
 import json
 import os
 import shutil
@@ -13,7 +14,7 @@ import tempfile
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -23,6 +24,7 @@ from app.core.logging.config import get_logger
 from app.core.utils.security import SecurityValidator
 from app.models.models import BackupRecord
 from app.services.backup_service import BackupService
+from app.services.incremental_backup import SnapshotStore, load_manifest
 
 logger = get_logger(__name__, "app")
 
@@ -99,6 +101,10 @@ class RestoreService:
                 preview_info.update(await self._preview_database_restore(backup_path))
             elif backup_type == "files":
                 preview_info.update(await self._preview_files_restore(backup_path))
+            elif backup_type == "incremental":
+                preview_info.update(
+                    await self._preview_incremental_restore(backup_path)
+                )
             elif backup_type == "full":
                 preview_info.update(await self._preview_full_restore(backup_path))
             else:
@@ -170,46 +176,84 @@ class RestoreService:
                         total_files += 1
                         total_size += info.file_size
 
-            # Check current uploads directory
-            current_files = []
-            current_total = 0
-            if self.upload_dir.exists():
-                for file_path in self.upload_dir.rglob("*"):
-                    if file_path.is_file():
-                        current_files.append(
-                            str(file_path.relative_to(self.upload_dir))
-                        )
-                        current_total += 1
-
-            warnings = []
-            if current_total > 0:
-                warnings.append(
-                    f"Current uploads directory contains {current_total} files that will be replaced"
-                )
+            return self._files_restore_preview(file_list, total_files, total_size)
 
+        except Exception as e:
+            logger.error(f"Failed to preview files restore: {str(e)}")
             return {
-                "warnings": warnings,
-                "affected_data": {
-                    "backup_files": {
-                        "total_files": total_files,
-                        "total_size": total_size,
-                        "sample_files": file_list[:10],  # Show first 10 files
-                    },
-                    "current_files": {
-                        "total_files": current_total,
-                        "sample_files": current_files[:10],
-                    },
-                    "restore_method": "Complete files replacement",
-                },
+                "warnings": [f"Could not analyze backup: {str(e)}"],
+                "affected_data": {"error": str(e)},
             }
 
+    async def _preview_incremental_restore(self, backup_path: Path) -> Dict[str, Any]:
+        """Preview incremental files restore operation from its manifest."""
+        try:
+            manifest = load_manifest(backup_path)
+            file_list = [
+                {
+                    "filename": f"uploads/{relative}",
+                    "size": info["size"],
+                    "modified": datetime.fromtimestamp(
+                        info["mtime_ns"] / 1e9
+                    ).isoformat(),
+                }
+                for relative, info in sorted(manifest["files"].items())
+            ]
+            total_size = sum(item["size"] for item in file_list)
+
+            preview = self._files_restore_preview(file_list, len(file_list), total_size)
+            missing = await asyncio.to_thread(
+                SnapshotStore(backup_path.parent.parent).missing_blobs, backup_path
+            )
+            if missing:
+                preview["warnings"].append(
+                    f"{len(missing)} stored files are missing from the backup store; "
+                    "restore will fail"
+                )
+            return preview
+
         except Exception as e:
-            logger.error(f"Failed to preview files restore: {str(e)}")
+            logger.error(f"Failed to preview incremental restore: {str(e)}")
             return {
                 "warnings": [f"Could not analyze backup: {str(e)}"],
                 "affected_data": {"error": str(e)},
             }
 
+    def _files_restore_preview(
+        self, file_list: list, total_files: int, total_size: int
+    ) -> Dict[str, Any]:
+        """Compare backed-up files against the current uploads directory."""
+        # Check current uploads directory
+        current_files = []
+        current_total = 0
+        if self.upload_dir.exists():
+            for file_path in self.upload_dir.rglob("*"):
+                if file_path.is_file():
+                    current_files.append(str(file_path.relative_to(self.upload_dir)))
+                    current_total += 1
+
+        warnings = []
+        if current_total > 0:
+            warnings.append(
+                f"Current uploads directory contains {current_total} files that will be replaced"
+            )
+
+        return {
+            "warnings": warnings,
+            "affected_data": {
+                "backup_files": {
+                    "total_files": total_files,
+                    "total_size": total_size,
+                    "sample_files": file_list[:10],  # Show first 10 files
+                },
+                "current_files": {
+                    "total_files": current_total,
+                    "sample_files": current_files[:10],
+                },
+                "restore_method": "Complete files replacement",
+            },
+        }
+
     async def _preview_full_restore(self, backup_path: Path) -> Dict[str, Any]:
         """Preview full backup restore operation."""
         try:
@@ -360,7 +404,7 @@ class RestoreService:
             )
             if backup_type == "database":
                 result = await self._restore_database(backup_path)
-            elif backup_type == "files":
+            elif backup_type in ("files", "incremental"):
                 result = await self._restore_files(backup_path)
             elif backup_type == "full":
                 result = await self._restore_full_backup(backup_path)
@@ -408,6 +452,8 @@ class RestoreService:
                 result = await backup_service.create_database_backup(description)
             elif backup_type == "files":
                 result = await backup_service.create_files_backup(description)
+            elif backup_type == "incremental":
+                result = await backup_service.create_incremental_backup(description)
             elif backup_type == "full":
                 result = await backup_service.create_full_backup(description)
             else:
@@ -708,8 +754,20 @@ class RestoreService:
                 raise Exception(f"Docker restore failed: {e.stderr}")
 
     async def _restore_files(self, backup_path: Path) -> Dict[str, Any]:
-        """Restore files from ZIP archive."""
+        """Restore files from a ZIP archive or an incremental snapshot manifest."""
         try:
+            store = None
+            if backup_path.suffix == ".json":
+                # Check the snapshot is complete before the uploads directory
+                # is touched, so a broken backup store can't leave it empty
+                store = SnapshotStore(backup_path.parent.parent)
+                missing = await asyncio.to_thread(store.missing_blobs, backup_path)
+                if missing:
+                    raise ValueError(
+                        f"Snapshot is incomplete: {len(missing)} stored files "
+                        "are missing from the backup store"
+                    )
+
             # Create backup of current uploads directory
             if self.upload_dir.exists():
                 backup_dir = (
@@ -728,25 +786,14 @@ class RestoreService:
             extracted_files = 0
             total_size = 0
 
-            with zipfile.ZipFile(backup_path, "r") as zipf:
-                for member in zipf.infolist():
-                    if not member.is_dir():
-                        # Remove 'uploads/' prefix from archive path
-                        target_path = Path(member.filename)
-                        if target_path.parts[0] == "uploads":
-                            target_path = Path(*target_path.parts[1:])
-
-                        full_target_path = self.upload_dir / target_path
-                        full_target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                        # Extract file
-                        with zipf.open(member) as source, open(
-                            full_target_path, "wb"
-                        ) as target:
-                            shutil.copyfileobj(source, target)
-
-                        extracted_files += 1
-                        total_size += member.file_size
+            if store is not None:
+                # Incremental snapshot: the manifest lists the complete tree,
+                # so any point in the chain restores from the blob store alone
+                extracted_files, total_size = await asyncio.to_thread(
+                    store.restore_snapshot, backup_path, self.upload_dir
+                )
+            else:
+                extracted_files, total_size = self._extract_files_archive(backup_path)
 
             logger.info(f"Restored {extracted_files} files ({total_size} bytes)")
 
@@ -762,6 +809,33 @@ class RestoreService:
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    def _extract_files_archive(self, backup_path: Path) -> Tuple[int, int]:
+        """Extract a files backup ZIP into the uploads directory."""
+        extracted_files = 0
+        total_size = 0
+
+        with zipfile.ZipFile(backup_path, "r") as zipf:
+            for member in zipf.infolist():
+                if not member.is_dir():
+                    # Remove 'uploads/' prefix from archive path
+                    target_path = Path(member.filename)
+                    if target_path.parts[0] == "uploads":
+                        target_path = Path(*target_path.parts[1:])
+
+                    full_target_path = self.upload_dir / target_path
+                    full_target_path.parent.mkdir(parents=True, exist_ok=True)
+
+                    # Extract file
+                    with zipf.open(member) as source, open(
+                        full_target_path, "wb"
+                    ) as target:
+                        shutil.copyfileobj(source, target)
+
+                    extracted_files += 1
+                    total_size += member.file_size
+
+        return extracted_files, total_size
+
     async def _restore_full_backup(self, backup_path: Path) -> Dict[str, Any]:
         """Restore full backup (database + files) from ZIP archive."""
         try:
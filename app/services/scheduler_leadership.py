@@ -0,0 +1,137 @@
+"""
+Scheduler Leadership
+
+Decides which server worker runs the scheduled jobs (auto-backups and
+medication reminders). Every worker starts the schedulers, but their jobs
+only do work in the worker holding the "schedulers" lease in the shared
+state backend (app.core.shared_state).
+
+The leader renews the lease every LEASE_RENEW_SECONDS. If it stops renewing
+(shutdown, crash, a lost database connection), the lease lapses after
+LEASE_TTL_SECONDS and the next worker to renew takes over; a leader that
+shuts down releases it for the next renewal to take. Jobs due while no
+worker leads are skipped, as they are while the server is down.
+
+With the in-memory state backend there is one worker, and it always leads.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.core.shared_state import get_state_backend
+
+logger = get_logger(__name__, "app")
+
+LEASE_NAME = "schedulers"
+LEASE_TTL_SECONDS = 90
+LEASE_RENEW_SECONDS = 30
+
+
+class SchedulerLeadership:
+    """Process-wide holder of the scheduler lease."""
+
+    _instance: Optional["SchedulerLeadership"] = None
+
+    def __init__(self, backend=None) -> None:
+        self._backend = backend
+        # Unique per process start, so a restarted worker with a recycled pid
+        # doesn't inherit its predecessor's lease
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leading = False
+        self._task: Optional[asyncio.Task] = None
+        self._on_acquired: List[Callable[[], Awaitable[None]]] = []
+
+    @classmethod
+    def get_instance(cls) -> "SchedulerLeadership":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — forget leadership (the lease lapses on its own)."""
+        if cls._instance is not None and cls._instance._task is not None:
+            cls._instance._task.cancel()
+        cls._instance = None
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else get_state_backend()
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this worker should run scheduled jobs now."""
+        return self._leading or not self.backend.shared
+
+    def on_acquired(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Await ``callback`` whenever this worker becomes the leader."""
+        self._on_acquired.append(callback)
+
+    async def renew(self) -> bool:
+        """Take or renew the lease. Returns whether this worker leads."""
+        try:
+            leading = await asyncio.to_thread(
+                self.backend.acquire_lease,
+                LEASE_NAME,
+                self.holder,
+                LEASE_TTL_SECONDS,
+            )
+        except Exception as e:
+            # Can't confirm the lease, so stop running jobs; the lease is
+            # still ours if the database comes back before it lapses
+            logger.warning(f"Could not renew scheduler lease: {e}")
+            leading = False
+
+        gained = leading and not self._leading
+        if leading != self._leading:
+            logger.info(
+                "Scheduler leadership " + ("acquired" if leading else "lost"),
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: (
+                        "scheduler_leadership_acquired"
+                        if leading
+                        else "scheduler_leadership_lost"
+                    ),
+                    "holder": self.holder,
+                },
+            )
+        self._leading = leading
+
+        if gained:
+            for callback in self._on_acquired:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.warning(f"Scheduler leadership callback failed: {e}")
+        return leading
+
+    async def _renew_loop(self) -> None:
+        while True:
+            await asyncio.sleep(LEASE_RENEW_SECONDS)
+            await self.renew()
+
+    async def start(self) -> None:
+        """Contend for the lease now and keep renewing it in the background."""
+        if not self.backend.shared or self._task is not None:
+            return
+        await self.renew()
+        self._task = asyncio.create_task(self._renew_loop())
+
+    async def stop(self) -> None:
+        """Stop renewing and release the lease so another worker takes over."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._leading:
+            self._leading = False
+            await asyncio.to_thread(self.backend.release_lease, LEASE_NAME, self.holder)
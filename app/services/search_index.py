@@ -0,0 +1,673 @@
+"""
+Search Index Service - maintains and queries the cross-type patient search index.
+
+Every searchable record (medications, conditions, lab results, procedures,
+immunizations, treatments, encounters, allergies, vitals) has one row in
+``search_index`` holding its normalized text, tags, sort date and the fields the
+search response renders. ``search`` answers a query across all requested types
+with a single statement that ranks, windows and counts per type.
+
+Rows are written from SQLAlchemy mapper events, so every ORM insert, update and
+delete on an indexed model - CRUD layer, services, admin endpoints - keeps the
+index current in the same transaction. Bulk paths that bypass the ORM unit of
+work (``bulk_save_objects``, ``Query.delete``, raw SQL) call ``index_records`` /
+``remove_records`` themselves. ``rebuild`` regenerates the index from the source
+tables; it runs once on startup for existing databases and is available from
+``app/scripts/search_index_cli.py``.
+
+Matching backends:
+- SQLite: FTS5 trigram index (see app.models.search) with bm25 ranking; queries
+  shorter than a trigram fall back to substring matching on ``document``.
+- PostgreSQL: substring matching on ``document`` served by a pg_trgm GIN index,
+  ranked with ``ts_rank`` over a title/tags/body weighted tsvector.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    case,
+    column,
+    delete,
+    event,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.crud.system_setting import system_setting
+from app.models.models import (
+    Allergy,
+    Condition,
+    Encounter,
+    Immunization,
+    LabResult,
+    Medication,
+    Procedure,
+    SearchIndexEntry,
+    Treatment,
+    Vitals,
+)
+
+logger = get_logger(__name__, "app")
+
+# Bump when the indexed fields or payload shape change; startup rebuilds the
+# index once for each new version.
+INDEX_VERSION = "1"
+INDEX_VERSION_KEY = "search_index_version"
+
+# Trigram tokenizer: FTS5 cannot match terms shorter than this
+FTS_MIN_QUERY_LENGTH = 3
+
+# bm25 column weights for (title, body, tags)
+FTS_COLUMN_WEIGHTS = (10.0, 1.0, 5.0)
+
+# Relevance tiers by where the term matched; blended with the backend's text rank
+TITLE_PREFIX_SCORE = 1.0
+TITLE_MATCH_SCORE = 0.8
+TAG_MATCH_SCORE = 0.6
+BODY_MATCH_SCORE = 0.4
+TIER_WEIGHT = 0.75
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _iso(value: Optional[date]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _medication_payload(med: Medication) -> Dict[str, Any]:
+    return {
+        "type": "medication",
+        "medication_name": med.medication_name,
+        "dosage": med.dosage,
+        "status": med.status,
+        "start_date": _iso(med.effective_period_start),
+        "highlight": med.medication_name,
+    }
+
+
+def _condition_payload(cond: Condition) -> Dict[str, Any]:
+    return {
+        "type": "condition",
+        "condition_name": cond.condition_name,
+        "diagnosis": cond.diagnosis,
+        "status": cond.status,
+        "diagnosed_date": _iso(cond.onset_date),
+        "highlight": cond.condition_name or cond.diagnosis or "Condition",
+    }
+
+
+def _lab_result_payload(lab: LabResult) -> Dict[str, Any]:
+    return {
+        "type": "lab_result",
+        "test_name": lab.test_name,
+        "result": lab.labs_result,
+        "status": lab.status,
+        "test_date": _iso(lab.completed_date),
+        "highlight": lab.test_name,
+    }
+
+
+def _procedure_payload(proc: Procedure) -> Dict[str, Any]:
+    return {
+        "type": "procedure",
+        "name": proc.procedure_name,
+        "description": proc.description,
+        "status": proc.status,
+        "procedure_date": _iso(proc.date),
+        "highlight": proc.procedure_name,
+    }
+
+
+def _immunization_payload(imm: Immunization) -> Dict[str, Any]:
+    return {
+        "type": "immunization",
+        "vaccine_name": imm.vaccine_name,
+        "dose_number": imm.dose_number,
+        "status": None,
+        "administered_date": _iso(imm.date_administered),
+        "highlight": imm.vaccine_name,
+    }
+
+
+def _treatment_payload(treat: Treatment) -> Dict[str, Any]:
+    return {
+        "type": "treatment",
+        "treatment_name": treat.treatment_name,
+        "treatment_type": treat.treatment_type,
+        "description": treat.description,
+        "status": treat.status,
+        "start_date": _iso(treat.start_date),
+        "highlight": treat.treatment_name,
+    }
+
+
+def _encounter_payload(enc: Encounter) -> Dict[str, Any]:
+    return {
+        "type": "encounter",
+        "visit_type": enc.visit_type,
+        "chief_complaint": enc.chief_complaint,
+        "reason": enc.reason,
+        "encounter_date": _iso(enc.date),
+        "highlight": enc.visit_type or enc.reason or "Encounter",
+    }
+
+
+def _allergy_payload(allergy: Allergy) -> Dict[str, Any]:
+    return {
+        "type": "allergy",
+        "allergen": allergy.allergen,
+        "reaction": allergy.reaction,
+        "severity": allergy.severity,
+        "identified_date": _iso(allergy.onset_date),
+        "highlight": allergy.allergen,
+    }
+
+
+def _vital_payload(vital: Vitals) -> Dict[str, Any]:
+    return {
+        "type": "vital",
+        "systolic_bp": vital.systolic_bp,
+        "diastolic_bp": vital.diastolic_bp,
+        "heart_rate": vital.heart_rate,
+        "temperature": vital.temperature,
+        "weight": vital.weight,
+        "recorded_date": _iso(vital.recorded_date),
+        "highlight": (
+            f"BP: {vital.systolic_bp}/{vital.diastolic_bp}"
+            if vital.systolic_bp
+            else "Vitals"
+        ),
+    }
+
+
+@dataclass(frozen=True)
+class SearchRecordType:
+    """How one model is projected into the search index."""
+
+    key: str  # record_type value and the response group name
+    model: type
+    title_field: Optional[str]
+    body_fields: Tuple[str, ...]
+    date_field: str
+    payload: Callable[[Any], Dict[str, Any]]
+    has_tags: bool = True
+
+
+# Order is the order groups appear in search responses
+SEARCH_RECORD_TYPES: Dict[str, SearchRecordType] = {
+    spec.key: spec
+    for spec in (
+        SearchRecordType(
+            "medications",
+            Medication,
+            "medication_name",
+            ("dosage", "indication"),
+            "effective_period_start",
+            _medication_payload,
+        ),
+        SearchRecordType(
+            "conditions",
+            Condition,
+            "condition_name",
+            ("diagnosis", "notes"),
+            "onset_date",
+            _condition_payload,
+        ),
+        SearchRecordType(
+            "lab_results",
+            LabResult,
+            "test_name",
+            ("labs_result", "notes"),
+            "completed_date",
+            _lab_result_payload,
+        ),
+        SearchRecordType(
+            "procedures",
+            Procedure,
+            "procedure_name",
+            ("description", "notes"),
+            "date",
+            _procedure_payload,
+        ),
+        SearchRecordType(
+            "immunizations",
+            Immunization,
+            "vaccine_name",
+            ("notes",),
+            "date_administered",
+            _immunization_payload,
+        ),
+        SearchRecordType(
+            "treatments",
+            Treatment,
+            "treatment_name",
+            ("treatment_type", "description", "notes"),
+            "start_date",
+            _treatment_payload,
+        ),
+        SearchRecordType(
+            "encounters",
+            Encounter,
+            "visit_type",
+            ("chief_complaint", "notes"),
+            "date",
+            _encounter_payload,
+        ),
+        SearchRecordType(
+            "allergies",
+            Allergy,
+            "allergen",
+            ("reaction", "notes"),
+            "onset_date",
+            _allergy_payload,
+        ),
+        SearchRecordType(
+            "vitals",
+            Vitals,
+            None,
+            ("notes",),
+            "recorded_date",
+            _vital_payload,
+            has_tags=False,
+        ),
+    )
+}
+
+_SPEC_BY_MODEL: Dict[type, SearchRecordType] = {
+    spec.model: spec for spec in SEARCH_RECORD_TYPES.values()
+}
+
+
+@dataclass
+class SearchGroup:
+    """One record type's page of hits and its total match count."""
+
+    count: int = 0
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return None
+
+
+def build_entry(obj: Any) -> Optional[Dict[str, Any]]:
+    """Project a model instance into search_index column values.
+
+    Returns None for instances of unindexed models or without a patient.
+    """
+    spec = _SPEC_BY_MODEL.get(type(obj))
+    if spec is None or obj.patient_id is None:
+        return None
+
+    title = getattr(obj, spec.title_field) if spec.title_field else None
+    body = "\n".join(
+        str(value).lower()
+        for value in (getattr(obj, name) for name in spec.body_fields)
+        if value
+    )
+    tag_list = [str(tag) for tag in (obj.tags or [])] if spec.has_tags else []
+    tags = "\n".join(tag.lower() for tag in tag_list)
+
+    payload = spec.payload(obj)
+    payload["id"] = obj.id
+    payload["tags"] = tag_list
+
+    return {
+        "patient_id": obj.patient_id,
+        "record_type": spec.key,
+        "record_id": obj.id,
+        "title": title,
+        "body": body,
+        "tags": tags,
+        "document": "\n".join(
+            part for part in ((title or "").lower(), body, tags) if part
+        ),
+        "sort_date": _to_datetime(getattr(obj, spec.date_field)),
+        "payload": payload,
+    }
+
+
+def _write_entries(connection, entries: Sequence[Dict[str, Any]]) -> None:
+    """Replace the index rows for the given entries (delete + insert)."""
+    if not entries:
+        return
+    index_table = SearchIndexEntry.__table__
+    by_type: Dict[str, List[int]] = {}
+    for entry in entries:
+        by_type.setdefault(entry["record_type"], []).append(entry["record_id"])
+    for record_type, record_ids in by_type.items():
+        connection.execute(
+            delete(index_table).where(
+                index_table.c.record_type == record_type,
+                index_table.c.record_id.in_(record_ids),
+            )
+        )
+    connection.execute(insert(index_table), list(entries))
+
+
+def index_records(db: Session, objects: Iterable[Any]) -> int:
+    """Index (or re-index) persisted records in the session's transaction.
+
+    For write paths that bypass mapper events, e.g. ``bulk_save_objects``.
+    Objects must already have primary keys. Returns the number indexed.
+    """
+    entries = [entry for entry in (build_entry(obj) for obj in objects) if entry]
+    _write_entries(db.connection(), entries)
+    return len(entries)
+
+
+def remove_records(db: Session, record_type: str, record_ids: Any) -> None:
+    """Drop index rows for records of one type.
+
+    ``record_ids`` may be a list of IDs or a select of IDs, so bulk deletes can
+    pass the same criteria they delete by.
+    """
+    index_table = SearchIndexEntry.__table__
+    db.execute(
+        delete(index_table).where(
+            index_table.c.record_type == record_type,
+            index_table.c.record_id.in_(record_ids),
+        )
+    )
+
+
+def _after_insert_or_update(_mapper, connection, target) -> None:
+    entry = build_entry(target)
+    if entry is not None:
+        _write_entries(connection, [entry])
+    elif type(target) in _SPEC_BY_MODEL:
+        _after_delete(_mapper, connection, target)
+
+
+def _after_delete(_mapper, connection, target) -> None:
+    spec = _SPEC_BY_MODEL[type(target)]
+    index_table = SearchIndexEntry.__table__
+    connection.execute(
+        delete(index_table).where(
+            index_table.c.record_type == spec.key,
+            index_table.c.record_id == target.id,
+        )
+    )
+
+
+def register_search_index_listeners() -> None:
+    """Attach index maintenance to every indexed model. Idempotent."""
+    for model in _SPEC_BY_MODEL:
+        if event.contains(model, "after_insert", _after_insert_or_update):
+            continue
+        event.listen(model, "after_insert", _after_insert_or_update)
+        event.listen(model, "after_update", _after_insert_or_update)
+        event.listen(model, "after_delete", _after_delete)
+
+
+def rebuild(db: Session, *, patient_id: Optional[int] = None) -> Dict[str, int]:
+    """Regenerate index rows from the source tables.
+
+    Rebuilds everything, or one patient's records when ``patient_id`` is given.
+    Commits once per record type. Returns the number of rows indexed per type.
+    """
+    index_table = SearchIndexEntry.__table__
+    purge = delete(index_table)
+    if patient_id is not None:
+        purge = purge.where(index_table.c.patient_id == patient_id)
+    db.execute(purge)
+
+    counts: Dict[str, int] = {}
+    for spec in SEARCH_RECORD_TYPES.values():
+        query = db.query(spec.model)
+        if patient_id is not None:
+            query = query.filter(spec.model.patient_id == patient_id)
+
+        indexed = 0
+        batch: List[Dict[str, Any]] = []
+        for obj in query.order_by(spec.model.id).yield_per(REBUILD_BATCH_SIZE):
+            entry = build_entry(obj)
+            if entry is None:
+                continue
+            batch.append(entry)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                db.execute(insert(index_table), batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            db.execute(insert(index_table), batch)
+            indexed += len(batch)
+
+        db.commit()
+        counts[spec.key] = indexed
+
+    if db.get_bind().dialect.name == "sqlite" and _fts_available(db):
+        # Merge FTS segments left behind by the bulk load
+        db.execute(
+            text("INSERT INTO search_index_fts(search_index_fts) VALUES ('optimize')")
+        )
+        db.commit()
+
+    logger.info(
+        "Search index rebuilt",
+        extra={
+            LogFields.CATEGORY: "app",
+            LogFields.EVENT: "search_index_rebuilt",
+            LogFields.PATIENT_ID: patient_id,
+            LogFields.COUNT: sum(counts.values()),
+        },
+    )
+    return counts
+
+
+def run_one_time_build(db: Session) -> Dict[str, Any]:
+    """Build the index once per INDEX_VERSION (existing databases, format changes)."""
+    current = system_setting.get_setting(db, INDEX_VERSION_KEY)
+    if current == INDEX_VERSION:
+        return {"skipped": True, "reason": "already_built"}
+
+    counts = rebuild(db)
+    system_setting.set_setting(db, INDEX_VERSION_KEY, INDEX_VERSION)
+    return {"skipped": False, "indexed": sum(counts.values()), "by_type": counts}
+
+
+_fts_support: Dict[str, bool] = {}
+
+
+def _fts_available(db: Session) -> bool:
+    """Whether the SQLite FTS5 index exists on this database (cached per URL).
+
+    Also requires SQLite 3.35+, which the MATERIALIZED hint in search() needs.
+    """
+    bind = db.get_bind()
+    cache_key = str(bind.url)
+    if cache_key not in _fts_support:
+        supports_materialized = bind.dialect.dbapi.sqlite_version_info >= (3, 35)
+        _fts_support[cache_key] = supports_materialized and (
+            db.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'search_index_fts'"
+                )
+            ).first()
+            is not None
+        )
+    return _fts_support[cache_key]
+
+
+def _fts_phrase(term: str) -> str:
+    """Quote a user term as a single FTS5 phrase so operators are literal."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def search(
+    db: Session,
+    *,
+    patient_id: int,
+    query: Optional[str],
+    record_types: Sequence[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: str = "relevance",
+    skip: int = 0,
+    limit: int = 20,
+) -> Dict[str, SearchGroup]:
+    """Search a patient's records across types in one statement.
+
+    Each requested type gets a group with its total match count and the
+    ``skip``/``limit`` page of hits, ranked by ``sort``. Hit dicts are the
+    stored payload plus a ``score`` in [0, 1). Without a query every record
+    matches (list mode) and ``relevance`` sorts by date.
+    """
+    record_types = [key for key in SEARCH_RECORD_TYPES if key in record_types]
+    groups = {key: SearchGroup() for key in record_types}
+    if not record_types:
+        return groups
+
+    entry = SearchIndexEntry
+    conditions = [
+        entry.patient_id == patient_id,
+        entry.record_type.in_(record_types),
+    ]
+    if date_from:
+        conditions.append(entry.sort_date >= datetime.combine(date_from, time.min))
+    if date_to:
+        # Half-open upper bound keeps the whole end day for datetime columns
+        conditions.append(
+            entry.sort_date < datetime.combine(date_to + timedelta(days=1), time.min)
+        )
+
+    source = entry.__table__
+    # NUL never occurs in indexed text and FTS5 rejects it inside a phrase
+    term = query.replace("\x00", "").lower() if query else None
+    text_rank = literal(0.0)
+    if term:
+        dialect = db.get_bind().dialect.name
+        if (
+            dialect == "sqlite"
+            and len(term) >= FTS_MIN_QUERY_LENGTH
+            and _fts_available(db)
+        ):
+            # The full-text match runs once, materialized, and drives the join;
+            # as a plain join SQLite's planner probes MATCH once per candidate
+            # row. bm25 is lower-is-better and <= 0 for matches.
+            fts = table("search_index_fts", column("rowid"))
+            hits = (
+                select(
+                    fts.c.rowid.label("rowid"),
+                    (
+                        -func.bm25(
+                            literal_column("search_index_fts"), *FTS_COLUMN_WEIGHTS
+                        )
+                    ).label("text_rank"),
+                )
+                .where(
+                    literal_column("search_index_fts").op("MATCH")(_fts_phrase(term))
+                )
+                .cte("fts_hits")
+                .prefix_with("MATERIALIZED")
+            )
+            source = hits.join(source, source.c.id == hits.c.rowid)
+            text_rank = hits.c.text_rank
+        elif dialect == "postgresql":
+            conditions.append(entry.document.contains(term, autoescape=True))
+            weighted = (
+                func.setweight(
+                    func.to_tsvector("simple", func.coalesce(entry.title, "")), "A"
+                )
+                .op("||")(func.setweight(func.to_tsvector("simple", entry.tags), "B"))
+                .op("||")(func.setweight(func.to_tsvector("simple", entry.body), "C"))
+            )
+            text_rank = func.ts_rank(weighted, func.plainto_tsquery("simple", term))
+        else:
+            conditions.append(entry.document.contains(term, autoescape=True))
+
+        title_lower = func.lower(func.coalesce(entry.title, ""))
+        tier = case(
+            (title_lower.startswith(term, autoescape=True), TITLE_PREFIX_SCORE),
+            (title_lower.contains(term, autoescape=True), TITLE_MATCH_SCORE),
+            (entry.tags.contains(term, autoescape=True), TAG_MATCH_SCORE),
+            else_=BODY_MATCH_SCORE,
+        )
+        score = TIER_WEIGHT * tier + (1 - TIER_WEIGHT) * (text_rank / (1.0 + text_rank))
+    else:
+        score = literal(0.0)
+
+    # Matching and scoring run first: ranking functions such as bm25 are only
+    # valid in the statement that performs the MATCH, and scoring here keeps
+    # the window below from evaluating the score expression twice per row
+    matched = (
+        select(
+            entry.id,
+            entry.record_type,
+            entry.record_id,
+            entry.title,
+            entry.sort_date,
+            score.label("score"),
+        )
+        .select_from(source)
+        .where(*conditions)
+        .subquery()
+    )
+
+    newest_first = [matched.c.sort_date.desc(), matched.c.record_id.desc()]
+    if sort == "relevance" and term:
+        ordering = [matched.c.score.desc(), *newest_first]
+    elif sort == "date_asc":
+        ordering = [matched.c.sort_date.asc(), matched.c.record_id.asc()]
+    elif sort == "title":
+        ordering = [matched.c.title.asc(), *newest_first]
+    elif sort == "title_desc":
+        ordering = [matched.c.title.desc(), *newest_first]
+    else:
+        ordering = newest_first
+
+    ranked = (
+        select(
+            matched.c.id,
+            matched.c.record_type,
+            matched.c.score,
+            func.row_number()
+            .over(partition_by=matched.c.record_type, order_by=ordering)
+            .label("rn"),
+            func.count().over(partition_by=matched.c.record_type).label("type_total"),
+        )
+    ).subquery()
+
+    # Row 1 of every type rides along so the total count is known even when the
+    # requested page is past the end. Payloads are only read for returned rows.
+    page_start, page_end = skip, skip + limit
+    rows = db.execute(
+        select(ranked, entry.payload)
+        .join(entry, entry.id == ranked.c.id)
+        .where(
+            or_(
+                ranked.c.rn == 1,
+                (ranked.c.rn > page_start) & (ranked.c.rn <= page_end),
+            )
+        )
+        .order_by(ranked.c.record_type, ranked.c.rn)
+    ).all()
+
+    for row in rows:
+        group = groups[row.record_type]
+        group.count = row.type_total
+        if page_start < row.rn <= page_end:
+            group.items.append({**row.payload, "score": round(float(row.score), 4)})
+
+    return groups
+
+
+# Attached at import: app.crud imports this module (see app.crud.vitals), so any
+# process that writes through the CRUD layer keeps the index maintained.
+register_search_index_listeners()
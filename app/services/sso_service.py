@@ -10,6 +10,7 @@ from app.auth.sso.exceptions import *
 from app.auth.sso.providers import create_sso_provider
 from app.core.config import settings
 from app.core.logging.config import get_logger
+from app.core.shared_state import get_state_backend
 from app.crud.user import user as user_crud
 
 logger = get_logger(__name__, "sso")
@@ -28,20 +29,24 @@ _STATE_STORE_MAX_ENTRIES = 10000
 
 # In-memory state storage for temporary SSO tokens.
 #
-# This dict is per-process, so it requires the server to run with a single worker:
-# a callback handled by a different worker than the one that minted the state would
-# fail validation. docker/entrypoint.sh pins --workers 1 on every startup path
-# (lines 180, 187, 191). Anyone raising the worker count must move this store to
-# shared storage (database or Redis) first, or SSO will fail intermittently.
+# This dict is per-process: a callback handled by a different worker than the one
+# that minted the state would fail validation. It is only used with the "memory"
+# state backend, i.e. a single worker. With STATE_BACKEND=database (which
+# docker/entrypoint.sh selects whenever UVICORN_WORKERS > 1) entries live in the
+# shared_state_entries table under _STATE_NAMESPACE instead - see
+# app.core.shared_state.
 #
-# Three unrelated flows share this dict, keyed as:
+# Three unrelated flows share this store, keyed as:
 #   <state>                        - CSRF state for the authorization redirect
 #   sso_conflict_<token>           - pending account-conflict resolution
 #   github_manual_link_<token>     - pending GitHub manual account link
-# Write through _store_state_entry, which stamps the timestamps every entry must
-# carry and keeps the store swept and bounded on every write path.
+# Go through the _*_state_entry helpers below, never the dict: _store_state_entry
+# stamps the timestamps every entry must carry and keeps the store swept and
+# bounded on every write path, and the others pick the backend in use.
 _state_storage = {}
 
+_STATE_NAMESPACE = "sso"
+
 
 def _sweep_expired_states() -> int:
     """Drop expired entries of every kind. Returns the number reclaimed."""
@@ -110,6 +115,12 @@ def _serialize_user_info(user_info) -> Dict:
     return user_info
 
 
+def _shared_state_backend():
+    """The shared state backend, or None when entries live in _state_storage."""
+    backend = get_state_backend()
+    return backend if backend.shared else None
+
+
 def _store_state_entry(key: str, payload: Dict) -> None:
     """Stamp and store a state entry, keeping the store swept and under its cap.
 
@@ -118,8 +129,13 @@ def _store_state_entry(key: str, payload: Dict) -> None:
     an action of their own - so a wholly idle instance retains them until the next
     sign-in attempt. The cap is enforced after the insert, so the store never exceeds
     the ceiling; the entry just written is the newest, so oldest-first eviction never
-    discards it.
+    discards it. The shared backend sweeps expired entries on write as well.
     """
+    backend = _shared_state_backend()
+    if backend is not None:
+        backend.put_entry(_STATE_NAMESPACE, key, payload, _STATE_TTL)
+        return
+
     _sweep_expired_states()
 
     now = datetime.utcnow()
@@ -132,6 +148,35 @@ def _store_state_entry(key: str, payload: Dict) -> None:
     _enforce_state_store_cap()
 
 
+def _load_state_entry(key: str) -> Optional[Dict]:
+    """The entry under ``key``, expired or not - callers check ``expires_at``."""
+    backend = _shared_state_backend()
+    if backend is not None:
+        return backend.get_entry(_STATE_NAMESPACE, key)
+    return _state_storage.get(key)
+
+
+def _consume_state_entry(key: str) -> Optional[Dict]:
+    """Remove and return the entry under ``key``.
+
+    Atomic: of two callbacks presenting the same state at once - on one worker or
+    on several - exactly one receives the entry.
+    """
+    backend = _shared_state_backend()
+    if backend is not None:
+        return backend.take_entry(_STATE_NAMESPACE, key)
+    return _state_storage.pop(key, None)
+
+
+def _discard_state_entry(key: str) -> None:
+    """Remove the entry under ``key``, if it is still there."""
+    backend = _shared_state_backend()
+    if backend is not None:
+        backend.delete_entry(_STATE_NAMESPACE, key)
+        return
+    _state_storage.pop(key, None)
+
+
 class SSOService:
     """Simple SSO service - clean and maintainable"""
 
@@ -269,15 +314,13 @@ class SSOService:
         Returns the consumed entry so callers can read the ``return_url`` that
         ``/auth/sso/initiate`` was given.
         """
-        if state not in _state_storage:
+        state_data = _consume_state_entry(state)
+        if state_data is None:
             raise SSOAuthenticationError("Invalid or expired state parameter")
 
-        state_data = _state_storage[state]
         if datetime.utcnow() > state_data["expires_at"]:
-            del _state_storage[state]
             raise SSOAuthenticationError("State parameter expired")
 
-        del _state_storage[state]
         return state_data
 
     @staticmethod
@@ -554,14 +597,13 @@ class SSOService:
         """Resolve account conflict based on user's choice"""
         # Retrieve conflict data
         conflict_key = f"sso_conflict_{temp_token}"
-        if conflict_key not in _state_storage:
+        conflict_data = _load_state_entry(conflict_key)
+        if conflict_data is None:
             raise SSOAuthenticationError("Invalid or expired conflict resolution token")
 
-        conflict_data = _state_storage[conflict_key]
-
         # Check if token is expired
         if datetime.utcnow() > conflict_data["expires_at"]:
-            del _state_storage[conflict_key]
+            _discard_state_entry(conflict_key)
             raise SSOAuthenticationError("Conflict resolution token expired")
 
         # Get existing user
@@ -589,7 +631,7 @@ class SSOService:
             result = self._link_existing_user(existing_user, user_info, db)
 
             # Clean up temporary data
-            del _state_storage[conflict_key]
+            _discard_state_entry(conflict_key)
             return result
 
         if action == "create_separate":
@@ -607,7 +649,7 @@ class SSOService:
             result = self._create_new_separate_user(user_info, db)
 
             # Clean up temporary data
-            del _state_storage[conflict_key]
+            _discard_state_entry(conflict_key)
             return result
 
         raise SSOAuthenticationError(
@@ -622,14 +664,13 @@ class SSOService:
 
         # Retrieve GitHub linking data
         github_key = f"github_manual_link_{temp_token}"
-        if github_key not in _state_storage:
+        github_data = _load_state_entry(github_key)
+        if github_data is None:
             raise SSOAuthenticationError("Invalid or expired GitHub linking token")
 
-        github_data = _state_storage[github_key]
-
         # Check if token is expired
         if datetime.utcnow() > github_data["expires_at"]:
-            del _state_storage[github_key]
+            _discard_state_entry(github_key)
             raise SSOAuthenticationError("GitHub linking token expired")
 
         # Find user by username
@@ -656,7 +697,7 @@ class SSOService:
         result = self._link_existing_user(existing_user, user_info, db)
 
         # Clean up temporary data
-        del _state_storage[github_key]
+        _discard_state_entry(github_key)
 
         logger.info(
             f"GitHub account manually linked to user {existing_user.username}",
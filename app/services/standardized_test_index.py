@@ -0,0 +1,394 @@
+"""
+Standardized Test Index
+
+In-memory search index over the standardized test catalogue, answering the
+lab test picker's autocomplete and batch name matching without a query per
+keystroke or per name.
+
+A snapshot of the catalogue is indexed three ways:
+
+- exact: every test name, short name, LOINC code and common name, lowercased
+- prefix trie: the same keys plus each of their words, for "starts with"
+- n-gram postings: every one- to three-character substring of the test
+  name, short name and LOINC code, for "contains". A query of up to three
+  characters is a single posting list; a longer one intersects the lists of
+  its trigrams and checks the few survivors
+
+Candidates from the indexes are ranked in tiers (exact name, exact common
+name, name prefix, word or common-name prefix, substring, all words present),
+then common tests first, then earlier matches and shorter names.
+
+The index is built at startup and whenever a search finds it unloaded. Mapper
+events on StandardizedTest mark it stale when a transaction that wrote a test
+commits, and the bulk CRUD paths that bypass the unit of work
+(``bulk_create_tests``, ``clear_all_tests``) invalidate it themselves; the
+next search reloads it. Under the database state backend an invalidation
+also bumps a shared generation, which every worker checks before searching,
+so changes made through another worker are picked up on its next search.
+Writes outside the app are noticed by a cheap count/last-modified check, run
+at most every STALE_CHECK_SECONDS.
+"""
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+
+from app.core.shared_state import SharedGeneration
+from app.models.models import StandardizedTest
+
+_PENDING_KEY = "standardized_test_index_pending"
+
+STALE_CHECK_SECONDS = 60
+
+# Ranking tiers, best first
+EXACT_NAME = 0
+EXACT_COMMON_NAME = 1
+NAME_PREFIX = 2
+WORD_PREFIX = 3
+SUBSTRING = 4
+ALL_WORDS = 5
+
+
+@dataclass(frozen=True)
+class IndexedTest:
+    """A standardized test as the search endpoints return it."""
+
+    id: int
+    loinc_code: Optional[str]
+    test_name: str
+    short_name: Optional[str]
+    default_unit: Optional[str]
+    category: Optional[str]
+    common_names: Optional[List[str]]
+    is_common: bool
+    display_order: Optional[int]
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Every substring of one to three characters."""
+    return {text[i : i + n] for n in (1, 2, 3) for i in range(len(text) - n + 1)}
+
+
+class _Trie:
+    """Prefix trie mapping every prefix of the inserted keys to their ids."""
+
+    __slots__ = ("_root",)
+
+    def __init__(self) -> None:
+        self._root: Dict = {}
+
+    def insert(self, key: str, test_id: int) -> None:
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(test_id)
+
+    def lookup(self, prefix: str) -> Set[int]:
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(None, set())
+
+
+@dataclass
+class _Snapshot:
+    tests: Dict[int, IndexedTest] = field(default_factory=dict)
+    # Lowercased fields per test: (test_name, short_name, loinc_code)
+    fields: Dict[int, Tuple[str, str, str]] = field(default_factory=dict)
+    common_names: Dict[int, Tuple[str, ...]] = field(default_factory=dict)
+    exact_names: Dict[str, Set[int]] = field(default_factory=dict)
+    exact_common_names: Dict[str, Set[int]] = field(default_factory=dict)
+    by_test_name: Dict[str, int] = field(default_factory=dict)
+    trie: _Trie = field(default_factory=_Trie)
+    ngrams: Dict[str, Set[int]] = field(default_factory=dict)
+    common: List[IndexedTest] = field(default_factory=list)
+    signature: Tuple = ()
+
+
+def _signature(db: Session) -> Tuple:
+    return tuple(
+        db.query(
+            func.count(StandardizedTest.id),
+            func.max(StandardizedTest.id),
+            func.max(StandardizedTest.updated_at),
+        ).one()
+    )
+
+
+def _build(rows: Iterable[StandardizedTest], signature: Tuple) -> _Snapshot:
+    snapshot = _Snapshot(signature=signature)
+    for row in rows:
+        test = IndexedTest(
+            id=row.id,
+            loinc_code=row.loinc_code,
+            test_name=row.test_name,
+            short_name=row.short_name,
+            default_unit=row.default_unit,
+            category=row.category,
+            common_names=list(row.common_names) if row.common_names else None,
+            is_common=bool(row.is_common),
+            display_order=row.display_order,
+        )
+        snapshot.tests[test.id] = test
+
+        name = (test.test_name or "").lower()
+        short = (test.short_name or "").lower()
+        loinc = (test.loinc_code or "").lower()
+        commons = tuple(
+            alias.lower() for alias in test.common_names or () if isinstance(alias, str)
+        )
+        snapshot.fields[test.id] = (name, short, loinc)
+        snapshot.common_names[test.id] = commons
+        # First test by id wins, like the database's get_test_by_name
+        snapshot.by_test_name.setdefault(name, test.id)
+
+        for key in (name, short, loinc):
+            if key:
+                snapshot.exact_names.setdefault(key, set()).add(test.id)
+                for gram in _ngrams(key):
+                    snapshot.ngrams.setdefault(gram, set()).add(test.id)
+        for alias in commons:
+            snapshot.exact_common_names.setdefault(alias, set()).add(test.id)
+
+        for key in (name, short, loinc) + commons:
+            if not key:
+                continue
+            snapshot.trie.insert(key, test.id)
+            for word in key.split()[1:]:
+                snapshot.trie.insert(word, test.id)
+
+    snapshot.common = sorted(
+        (test for test in snapshot.tests.values() if test.is_common),
+        key=lambda test: (
+            test.display_order is None,
+            test.display_order or 0,
+            test.id,
+        ),
+    )
+    return snapshot
+
+
+def _rank(
+    snapshot: _Snapshot, test_id: int, term: str, words: List[str]
+) -> Optional[Tuple[int, int]]:
+    """(tier, match position) of a test for ``term``, None if it doesn't match."""
+    fields = snapshot.fields[test_id]
+    commons = snapshot.common_names[test_id]
+    if term in fields:
+        return EXACT_NAME, 0
+    if term in commons:
+        return EXACT_COMMON_NAME, 0
+    if any(value.startswith(term) for value in fields):
+        return NAME_PREFIX, 0
+    for value in fields + commons:
+        if value.startswith(term) or f" {term}" in value:
+            return WORD_PREFIX, 0
+    positions = [value.find(term) for value in fields if term in value]
+    if positions:
+        return SUBSTRING, min(positions)
+    if len(words) > 1 and all(word in fields[0] or word in fields[1] for word in words):
+        return ALL_WORDS, 0
+    return None
+
+
+class StandardizedTestIndex:
+    """Process-wide search index over standardized tests; see the module docstring."""
+
+    _instance: Optional["StandardizedTestIndex"] = None
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._generation = SharedGeneration("standardized_test_index")
+
+    @classmethod
+    def get_instance(cls) -> "StandardizedTestIndex":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Tests only — drop the index."""
+        cls._instance = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def __len__(self) -> int:
+        snapshot = self._snapshot
+        return len(snapshot.tests) if snapshot else 0
+
+    def _load(self, db: Session) -> _Snapshot:
+        # Whatever invalidations came before this read are reflected in it
+        self._generation.changed()
+        signature = _signature(db)
+        rows = db.query(StandardizedTest).order_by(StandardizedTest.id).all()
+        snapshot = _build(rows, signature)
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    def rebuild(self, db: Session) -> int:
+        """Load the index from the database. Returns tests indexed."""
+        return len(self._load(db).tests)
+
+    def invalidate(self) -> None:
+        """Reload from the database on the next search."""
+        with self._lock:
+            self._snapshot = None
+        self._generation.bump()
+
+    def _current(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or self._generation.changed():
+            return self._load(db)
+        if time.monotonic() - self._checked_at >= STALE_CHECK_SECONDS:
+            self._checked_at = time.monotonic()
+            if _signature(db) != snapshot.signature:
+                return self._load(db)
+        return snapshot
+
+    def _containing(self, snapshot: _Snapshot, term: str) -> Set[int]:
+        """Tests whose name, short name or LOINC code contains ``term``."""
+        if len(term) <= 3:
+            return set(snapshot.ngrams.get(term, ()))
+        postings = [snapshot.ngrams.get(trigram) for trigram in _trigrams(term)]
+        if not all(postings):
+            return set()
+        candidates = set.intersection(*sorted(postings, key=len))
+        return {
+            test_id
+            for test_id in candidates
+            if any(term in value for value in snapshot.fields[test_id])
+        }
+
+    def _search(
+        self,
+        snapshot: _Snapshot,
+        query: str,
+        category: Optional[str],
+        limit: int,
+    ) -> List[IndexedTest]:
+        term = (query or "").strip().lower()
+        if not term:
+            common = snapshot.common
+            if category:
+                common = [test for test in common if test.category == category]
+            return common[:limit]
+
+        words = term.split()
+        # Candidate groups in ranking order: exact and prefix matches, then
+        # substrings, then all-words matches
+        groups = [
+            lambda: snapshot.exact_names.get(term, set())
+            | snapshot.exact_common_names.get(term, set())
+            | snapshot.trie.lookup(term),
+            lambda: self._containing(snapshot, term),
+        ]
+        if len(words) > 1:
+            groups.append(
+                lambda: set.intersection(
+                    *(self._containing(snapshot, word) for word in words)
+                )
+            )
+
+        ranked = []
+        seen: Set[int] = set()
+        for group in groups:
+            # Later groups only hold lower tiers, so once the limit is met
+            # they can't change the result. A term with a space can match
+            # a word prefix the trie (single words) doesn't list.
+            if len(ranked) >= limit and " " not in term:
+                break
+            for test_id in group() - seen:
+                seen.add(test_id)
+                test = snapshot.tests[test_id]
+                if category and test.category != category:
+                    continue
+                rank = _rank(snapshot, test_id, term, words)
+                if rank is not None:
+                    tier, position = rank
+                    sort_key = (
+                        tier,
+                        not test.is_common,
+                        position,
+                        len(test.test_name),
+                        test.test_name,
+                    )
+                    ranked.append((sort_key, test))
+        best = heapq.nsmallest(limit, ranked, key=lambda item: item[0])
+        return [test for _, test in best]
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 200,
+    ) -> List[IndexedTest]:
+        """
+        Tests matching ``query``, best first. An empty query returns the
+        common tests in display order.
+        """
+        return self._search(self._current(db), query, category, limit)
+
+    def match(self, db: Session, names: List[str]) -> List[Optional[IndexedTest]]:
+        """
+        The best test for each name: an exact (case-insensitive) test name
+        match, else the top search result; None where nothing matches.
+        """
+        snapshot = self._current(db)
+        matches = []
+        for name in names:
+            test_id = snapshot.by_test_name.get((name or "").lower())
+            if test_id is not None:
+                matches.append(snapshot.tests[test_id])
+                continue
+            found = self._search(snapshot, name, None, 1)
+            matches.append(found[0] if found else None)
+        return matches
+
+
+def _after_test_write(_mapper, _connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_KEY, False):
+        StandardizedTestIndex.get_instance().invalidate()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_standardized_test_index_listeners() -> None:
+    """Invalidate the index when a standardized test is written. Idempotent."""
+    if event.contains(Session, "after_commit", _after_commit):
+        return
+    for mapper_event in ("after_insert", "after_update", "after_delete"):
+        event.listen(StandardizedTest, mapper_event, _after_test_write)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+# Attached at import: app.crud.standardized_test imports this module, so any
+# process that writes tests through the CRUD layer keeps the index current.
+register_standardized_test_index_listeners()
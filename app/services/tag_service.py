@@ -1,9 +1,13 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, func, select, text
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.database.utils import get_database_type
 from app.core.logging.config import get_logger
+from app.models.models import EntityTag, Patient, UserTag
+from app.services import entity_tags, search_index
 
 logger = get_logger(__name__, "app")
 
@@ -11,15 +15,15 @@ logger = get_logger(__name__, "app")
 class TagService:
     """Universal tag management across all entities
 
-    This service requires PostgreSQL and uses PostgreSQL-specific functions:
-    - json_array_elements_text() for expanding JSON arrays
-    - json_agg() for JSON aggregation
-    - array_agg() for array aggregation
-    - ILIKE for case-insensitive matching
-    - ON CONFLICT for upsert operations
+    Records are found through the normalized entity_tags index
+    (app.services.entity_tags) rather than by expanding each record's JSON
+    tags: usage counts group its rows, and searches, renames and deletions
+    select record IDs from it with indexed tag lookups. Renames and deletions
+    then rewrite the matching records' tags with one UPDATE per record type
+    and re-index those records in entity_tags and the search index, in the
+    same transaction.
 
-    Tag matching uses json_array_elements_text() with WHERE clauses
-    instead of the @> containment operator for JSON (vs JSONB) compatibility.
+    Tag autocomplete matches with ILIKE and requires PostgreSQL.
     """
 
     ENTITY_TABLES = {
@@ -34,21 +38,88 @@ class TagService:
     }
 
     def _validate_entity_type(self, entity_type: str) -> str:
-        """Validate and return table name for entity type to prevent SQL injection"""
+        """Validate and return table name for entity type"""
         if entity_type not in self.ENTITY_TABLES:
             raise ValueError(f"Invalid entity type: {entity_type}")
         return self.ENTITY_TABLES[entity_type]
 
-    def _validate_table_name(self, table_name: str) -> str:
-        """Validate table name against allowed tables to prevent SQL injection"""
-        allowed_tables = set(self.ENTITY_TABLES.values())
-        if table_name not in allowed_tables:
-            raise ValueError(f"Invalid table name: {table_name}")
-        return table_name
+    def _user_patient_ids(self, user_id: int):
+        """Select of the IDs of a user's patients."""
+        return select(Patient.id).where(Patient.user_id == user_id)
 
-    def _user_patient_filter(self) -> str:
-        """Return a SQL subquery fragment that restricts to a user's patients."""
-        return "patient_id IN (SELECT id FROM patients WHERE user_id = :user_id)"
+    def _rewrite_tags(
+        self,
+        db: Session,
+        *,
+        tag: str,
+        user_id: int,
+        rewrite: Callable[[List[str]], List[str]],
+        action: str,
+    ) -> int:
+        """Apply ``rewrite`` to the tags of the user's records tagged ``tag``.
+
+        Returns the number of records updated.
+        """
+        total_updated = 0
+
+        for entity_type, table_name in self.ENTITY_TABLES.items():
+            try:
+                model = entity_tags.TAGGED_MODELS[entity_type]
+                records = (
+                    db.query(model)
+                    .filter(
+                        model.id.in_(
+                            entity_tags.tagged_ids(
+                                entity_type,
+                                [tag],
+                                patient_ids=self._user_patient_ids(user_id),
+                            )
+                        )
+                    )
+                    .all()
+                )
+                if not records:
+                    continue
+
+                # One UPDATE for the type, then re-index the records the
+                # statement bypassed the mapper events for
+                new_tags = {
+                    record.id: rewrite(list(record.tags or [])) for record in records
+                }
+                records_table = model.__table__
+                db.execute(
+                    records_table.update()
+                    .where(records_table.c.id == bindparam("record_id"))
+                    .values(tags=bindparam("new_tags")),
+                    [
+                        {"record_id": record_id, "new_tags": tags}
+                        for record_id, tags in new_tags.items()
+                    ],
+                )
+                for record in records:
+                    set_committed_value(record, "tags", new_tags[record.id])
+                entity_tags.index_records(db, records)
+                search_index.index_records(db, records)
+
+                total_updated += len(records)
+
+                logger.debug(
+                    f"Updated {len(records)} records in {table_name}",
+                    extra={
+                        "table": table_name,
+                        "action": action,
+                        "tag": tag,
+                        "updated_count": len(records),
+                    },
+                )
+
+            except Exception as e:
+                logger.error(
+                    f"Failed to {action} tag in {table_name}",
+                    extra={"table": table_name, "tag": tag, "error": str(e)},
+                )
+
+        return total_updated
 
     def get_popular_tags_across_entities(
         self,
@@ -64,91 +135,45 @@ class TagService:
         """
 
         if not entity_types:
-            entity_types = [
-                "lab_result",
-                "medication",
-                "condition",
-                "procedure",
-                "immunization",
-                "treatment",
-                "encounter",
-                "allergy",
-            ]
-
-        # Build subquery for usage counts across all entity types
-        usage_subqueries = []
-        query_params: Dict[str, Any] = {}
+            entity_types = list(self.ENTITY_TABLES)
 
+        valid_types = []
         for entity_type in entity_types:
             try:
-                # Validate entity type and get safe table name
-                table_name = self._validate_entity_type(entity_type)
-
-                # Validate the table name is in our allowed list
-                self._validate_table_name(table_name)
-
-                # Since we've validated the table name against our whitelist, it's safe to use
-                # We use parameterized queries for the entity_type value
-                param_key = f"entity_type_{len(usage_subqueries)}"
-                query_params[param_key] = entity_type
-
-                # Scope usage counts to user's patients when user_id is provided
-                user_filter = ""
-                if user_id is not None:
-                    user_filter = f"AND {self._user_patient_filter()}"
-
-                usage_subqueries.append(
-                    f"""
-                    SELECT tag, COUNT(*) as usage_count, :{param_key} as entity_type
-                    FROM "{table_name}", json_array_elements_text(tags) as tag
-                    WHERE tags IS NOT NULL {user_filter}
-                    GROUP BY tag
-                """
-                )
+                self._validate_entity_type(entity_type)
+                valid_types.append(entity_type)
             except ValueError as e:
                 logger.warning(
                     "Invalid entity type in tag search",
                     extra={"entity_type": entity_type, "error": str(e)},
                 )
-                continue
 
-        if not usage_subqueries:
-            # If no entity tables, just return user tags with 0 usage
-            query = """
-                SELECT id, tag, color, 0 as usage_count, ARRAY[]::text[] as entity_types
-                FROM user_tags
-                ORDER BY tag ASC
-                LIMIT :limit
-            """
-        else:
-            # Get all user tags and their usage counts
-            query = f"""
-                WITH usage_stats AS (
-                    {' UNION ALL '.join(usage_subqueries)}
-                )
-                SELECT
-                    ut.id,
-                    ut.tag,
-                    ut.color,
-                    COALESCE(SUM(us.usage_count), 0) as total_usage,
-                    CASE
-                        WHEN COUNT(us.entity_type) > 0
-                        THEN array_agg(DISTINCT us.entity_type)
-                        ELSE ARRAY[]::text[]
-                    END as entity_types
-                FROM user_tags ut
-                LEFT JOIN usage_stats us ON ut.tag = us.tag
-                GROUP BY ut.id, ut.tag, ut.color
-                ORDER BY total_usage DESC, ut.tag ASC
-                LIMIT :limit
-            """
+        usage_filters = [EntityTag.entity_type.in_(valid_types)]
+        if user_id is not None:
+            # Scope usage counts to user's patients when user_id is provided
+            usage_filters.append(
+                EntityTag.patient_id.in_(self._user_patient_ids(user_id))
+            )
 
         try:
-            # Combine limit parameter with entity type parameters
-            final_params: Dict[str, Any] = {"limit": limit, **query_params}
-            if user_id is not None:
-                final_params["user_id"] = user_id
-            result = db.execute(text(query), final_params).fetchall()
+            # Usage per (tag, entity type): a range scan of entity_tags
+            usage_by_tag: Dict[str, int] = {}
+            types_by_tag: Dict[str, List[str]] = {}
+            if valid_types:
+                for tag, entity_type, usage_count in db.execute(
+                    select(EntityTag.tag, EntityTag.entity_type, func.count())
+                    .where(*usage_filters)
+                    .group_by(EntityTag.tag, EntityTag.entity_type)
+                ):
+                    usage_by_tag[tag] = usage_by_tag.get(tag, 0) + usage_count
+                    types_by_tag.setdefault(tag, []).append(entity_type)
+
+            user_tags = db.execute(
+                select(UserTag.id, UserTag.tag, UserTag.color)
+            ).fetchall()
+            result = sorted(
+                user_tags, key=lambda row: (-usage_by_tag.get(row[1], 0), row[1])
+            )[:limit]
 
             logger.info(
                 "Retrieved user tags with usage counts",
@@ -160,8 +185,8 @@ class TagService:
                     "id": row[0],
                     "tag": row[1],
                     "color": row[2],
-                    "usage_count": row[3],
-                    "entity_types": row[4],
+                    "usage_count": usage_by_tag.get(row[1], 0),
+                    "entity_types": sorted(types_by_tag.get(row[1], [])),
                 }
                 for row in result
             ]
@@ -182,8 +207,8 @@ class TagService:
     ) -> Dict[str, List[Any]]:
         """Search for records across entity types by tags.
 
-        Uses json_array_elements_text() with EXISTS for JSON column compatibility
-        (the @> containment operator only works on JSONB, not JSON).
+        Matching record IDs come from entity_tags; only the matched rows are
+        read from each record table.
 
         match_mode: "any" returns records matching ANY tag (OR),
                     "all" returns records matching ALL tags (AND).
@@ -195,75 +220,55 @@ class TagService:
             match_mode = "any"
 
         if not entity_types:
-            entity_types = [
-                "lab_result",
-                "medication",
-                "condition",
-                "procedure",
-                "immunization",
-                "treatment",
-                "encounter",
-                "allergy",
-            ]
+            entity_types = list(self.ENTITY_TABLES)
+
+        valid_tags = []
+        for tag in tags:
+            # Validate tag input
+            if not isinstance(tag, str) or len(tag) > 100:
+                logger.warning("Invalid tag in search", extra={"tag": tag})
+                continue
+            valid_tags.append(tag)
 
         results = {}
 
         for entity_type in entity_types:
             try:
-                # Validate entity type and get safe table name
-                table_name = self._validate_entity_type(entity_type)
-                self._validate_table_name(table_name)
-
-                # Build tag filter conditions using parameterized queries
-                tag_conditions = []
-                query_params: Dict[str, Any] = {"limit": limit_per_entity}
-
-                for i, tag in enumerate(tags):
-                    # Validate tag input to prevent injection
-                    if not isinstance(tag, str) or len(tag) > 100:
-                        logger.warning(
-                            "Invalid tag in search",
-                            extra={"tag": tag, "entity_type": entity_type},
-                        )
-                        continue
+                self._validate_entity_type(entity_type)
 
-                    param_key = f"tag_{i}"
-                    query_params[param_key] = tag
-                    tag_conditions.append(
-                        f"EXISTS (SELECT 1 FROM json_array_elements_text(tags) AS t WHERE t = :{param_key})"
+                if not valid_tags:
+                    results[entity_type] = []
+                    continue
+
+                records = entity_tags.TAGGED_MODELS[entity_type].__table__
+                query = (
+                    select(records)
+                    .where(
+                        records.c.id.in_(
+                            entity_tags.tagged_ids(
+                                entity_type,
+                                valid_tags,
+                                match_all=match_mode == "all",
+                                patient_id=patient_id,
+                            )
+                        )
                     )
+                    .order_by(records.c.created_at.desc())
+                    .limit(limit_per_entity)
+                )
 
-                if tag_conditions:
-                    joiner = " AND " if match_mode == "all" else " OR "
-
-                    # Scope to patient when provided
-                    patient_filter = ""
-                    if patient_id is not None:
-                        patient_filter = "AND patient_id = :patient_id"
-                        query_params["patient_id"] = patient_id
-
-                    query = f"""
-                        SELECT * FROM "{table_name}"
-                        WHERE tags IS NOT NULL AND ({joiner.join(tag_conditions)})
-                        {patient_filter}
-                        ORDER BY created_at DESC
-                        LIMIT :limit
-                    """
-
-                    rows = db.execute(text(query), query_params).fetchall()
-
-                    results[entity_type] = [dict(row._mapping) for row in rows]
-
-                    logger.debug(
-                        "Retrieved records by tags",
-                        extra={
-                            "entity_type": entity_type,
-                            "tags": tags,
-                            "result_count": len(results[entity_type]),
-                        },
-                    )
-                else:
-                    results[entity_type] = []
+                rows = db.execute(query).fetchall()
+
+                results[entity_type] = [dict(row._mapping) for row in rows]
+
+                logger.debug(
+                    "Retrieved records by tags",
+                    extra={
+                        "entity_type": entity_type,
+                        "tags": tags,
+                        "result_count": len(results[entity_type]),
+                    },
+                )
 
             except ValueError as e:
                 logger.error(
@@ -331,59 +336,16 @@ class TagService:
     ) -> int:
         """Rename a tag across all entity types, scoped to a user's patients."""
 
-        total_updated = 0
-
-        for table_name in self.ENTITY_TABLES.values():
-            try:
-                # Validate table name for security
-                self._validate_table_name(table_name)
-
-                query = f"""
-                    UPDATE "{table_name}"
-                    SET tags = (
-                        SELECT json_agg(
-                            CASE
-                                WHEN tag_element = :old_tag THEN :new_tag
-                                ELSE tag_element
-                            END
-                        )
-                        FROM json_array_elements_text(tags) AS tag_element
-                    )
-                    WHERE EXISTS (
-                        SELECT 1 FROM json_array_elements_text(tags) AS tag_element
-                        WHERE tag_element = :old_tag
-                    )
-                    AND {self._user_patient_filter()}
-                """
-
-                result = db.execute(
-                    text(query),
-                    {"old_tag": old_tag, "new_tag": new_tag, "user_id": user_id},
-                )
-
-                updated_count = result.rowcount
-                total_updated += updated_count
-
-                logger.debug(
-                    f"Updated {updated_count} records in {table_name}",
-                    extra={
-                        "table": table_name,
-                        "old_tag": old_tag,
-                        "new_tag": new_tag,
-                        "updated_count": updated_count,
-                    },
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Failed to rename tag in {table_name}",
-                    extra={
-                        "table": table_name,
-                        "old_tag": old_tag,
-                        "new_tag": new_tag,
-                        "error": str(e),
-                    },
-                )
+        # A record already tagged with new_tag keeps a single copy
+        total_updated = self._rewrite_tags(
+            db,
+            tag=old_tag,
+            user_id=user_id,
+            rewrite=lambda tags: list(
+                dict.fromkeys(new_tag if t == old_tag else t for t in tags)
+            ),
+            action="rename",
+        )
 
         # Update user_tags registry: rename old_tag to new_tag
         # If new_tag already exists in user_tags for this user, delete old_tag instead
@@ -455,46 +417,13 @@ class TagService:
     def delete_tag_across_entities(self, db: Session, *, tag: str, user_id: int) -> int:
         """Delete a tag from all entity types, scoped to a user's patients."""
 
-        total_updated = 0
-
-        for table_name in self.ENTITY_TABLES.values():
-            try:
-                # Validate table name for security
-                self._validate_table_name(table_name)
-
-                query = f"""
-                    UPDATE "{table_name}"
-                    SET tags = (
-                        SELECT json_agg(tag_element)
-                        FROM json_array_elements_text(tags) AS tag_element
-                        WHERE tag_element != :tag
-                    )
-                    WHERE EXISTS (
-                        SELECT 1 FROM json_array_elements_text(tags) AS tag_element
-                        WHERE tag_element = :tag
-                    )
-                    AND {self._user_patient_filter()}
-                """
-
-                result = db.execute(text(query), {"tag": tag, "user_id": user_id})
-
-                updated_count = result.rowcount
-                total_updated += updated_count
-
-                logger.debug(
-                    f"Removed tag from {updated_count} records in {table_name}",
-                    extra={
-                        "table": table_name,
-                        "tag": tag,
-                        "updated_count": updated_count,
-                    },
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Failed to delete tag from {table_name}",
-                    extra={"table": table_name, "tag": tag, "error": str(e)},
-                )
+        total_updated = self._rewrite_tags(
+            db,
+            tag=tag,
+            user_id=user_id,
+            rewrite=lambda tags: [t for t in tags if t != tag],
+            action="delete",
+        )
 
         # Remove the tag from user_tags registry
         try:
@@ -526,61 +455,13 @@ class TagService:
     ) -> int:
         """Replace one tag with another across all entity types, scoped to a user's patients."""
 
-        total_updated = 0
-
-        for table_name in self.ENTITY_TABLES.values():
-            try:
-                # Validate table name for security
-                self._validate_table_name(table_name)
-
-                query = f"""
-                    UPDATE "{table_name}"
-                    SET tags = (
-                        SELECT json_agg(DISTINCT tag_element ORDER BY tag_element)
-                        FROM (
-                            SELECT
-                                CASE
-                                    WHEN tag_element = :old_tag THEN :new_tag
-                                    ELSE tag_element
-                                END AS tag_element
-                            FROM json_array_elements_text(tags) AS tag_element
-                        ) AS updated_tags
-                    )
-                    WHERE EXISTS (
-                        SELECT 1 FROM json_array_elements_text(tags) AS tag_element
-                        WHERE tag_element = :old_tag
-                    )
-                    AND {self._user_patient_filter()}
-                """
-
-                result = db.execute(
-                    text(query),
-                    {"old_tag": old_tag, "new_tag": new_tag, "user_id": user_id},
-                )
-
-                updated_count = result.rowcount
-                total_updated += updated_count
-
-                logger.debug(
-                    f"Replaced tag in {updated_count} records in {table_name}",
-                    extra={
-                        "table": table_name,
-                        "old_tag": old_tag,
-                        "new_tag": new_tag,
-                        "updated_count": updated_count,
-                    },
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Failed to replace tag in {table_name}",
-                    extra={
-                        "table": table_name,
-                        "old_tag": old_tag,
-                        "new_tag": new_tag,
-                        "error": str(e),
-                    },
-                )
+        total_updated = self._rewrite_tags(
+            db,
+            tag=old_tag,
+            user_id=user_id,
+            rewrite=lambda tags: sorted({new_tag if t == old_tag else t for t in tags}),
+            action="replace",
+        )
 
         # Remove old tag from user_tags registry
         # The new tag should already exist in user_tags (or will be created by sync)
@@ -711,38 +592,43 @@ class TagService:
 
         try:
 
-            # Get all unique tags used in this user's medical records
-            union_queries = []
-            for table_name in self.ENTITY_TABLES.values():
-                # Validate table name for security
-                self._validate_table_name(table_name)
-
-                union_queries.append(
-                    f"""
-                    SELECT DISTINCT tag
-                    FROM "{table_name}" r
-                    JOIN patients p ON r.patient_id = p.id
-                    JOIN users u ON p.user_id = u.id,
-                    json_array_elements_text(r.tags) as tag
-                    WHERE r.tags IS NOT NULL AND u.id = :user_id
-                """
+            # Tags used in this user's medical records but not yet registered
+            new_tags = (
+                db.execute(
+                    select(EntityTag.tag)
+                    .where(
+                        EntityTag.entity_type.in_(list(self.ENTITY_TABLES)),
+                        EntityTag.patient_id.in_(self._user_patient_ids(user_id)),
+                        EntityTag.tag.notin_(
+                            select(UserTag.tag).where(UserTag.user_id == user_id)
+                        ),
+                    )
+                    .distinct()
                 )
+                .scalars()
+                .all()
+            )
 
-            if not union_queries:
+            if not new_tags:
                 return 0
 
-            # Insert all found tags into user_tags (ignore duplicates)
-            sync_query = f"""
-                INSERT INTO user_tags (user_id, tag, created_at)
-                SELECT DISTINCT :user_id, tag, CURRENT_TIMESTAMP
-                FROM (
-                    {' UNION '.join(union_queries)}
-                ) all_user_tags
-                ON CONFLICT (user_id, tag) DO NOTHING
-            """
-
-            result = db.execute(text(sync_query), {"user_id": user_id})
-            synced_count = result.rowcount
+            rows = [{"user_id": user_id, "tag": tag} for tag in new_tags]
+            dialect = get_database_type(db)
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                # No portable upsert; a concurrent sync may hit the unique constraint
+                from sqlalchemy import insert
+
+            statement = insert(UserTag).values(rows)
+            if dialect in ("postgresql", "sqlite"):
+                # Ignore tags registered by a concurrent sync
+                statement = statement.on_conflict_do_nothing(
+                    index_elements=["user_id", "tag"]
+                )
+            synced_count = db.execute(statement).rowcount
 
             db.commit()
 
@@ -6,18 +6,26 @@ LabTestComponent records to canonical test names.
 
 This service enables one-time migration to standardize test naming across
 the application using the canonical test library as the source of truth.
+
+Bulk syncs are set-based: test names repeat heavily across components, so
+each distinct normalized name (lower(trim(test_name))) is matched against the
+library once, and the results are written with one UPDATE per chunk of
+components rather than one ORM write per row. Chunks are walked by primary
+key (keyset pagination), so each chunk costs the same however far into the
+table it is.
 """
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
 
 from app.core.logging.config import get_logger
 from app.core.logging.constants import LogFields
 from app.crud.system_setting import system_setting
-from app.models.models import LabTestComponent
+from app.models.models import LabResult, LabTestComponent
+from app.services.lab_trend_keys import refresh_trend_keys
 
 logger = get_logger(__name__, "app")
 
@@ -36,7 +44,8 @@ class TestLibrarySyncService:
     """
 
     MIGRATION_KEY = "canonical_test_migration_completed"
-    BATCH_SIZE = 100
+    # Components per bulk UPDATE chunk
+    BATCH_SIZE = 1000
 
     def auto_link_component(self, component: LabTestComponent) -> Optional[str]:
         """
@@ -90,53 +99,232 @@ class TestLibrarySyncService:
             )
             return None
 
-    def auto_link_all_for_patient(self, db: Session, patient_id: int) -> dict:
+    def _resolve_name(self, test_name: str) -> Optional[Tuple[str, Optional[str]]]:
         """
-        Auto-link all LabTestComponent records for a patient to canonical names.
+        Match a normalized test name against the test library.
 
         Returns:
-            Dictionary with stats: {"processed": int, "linked": int, "unlinked": int}
+            (canonical name, library category or None) if matched, None otherwise
         """
+        from app.services.canonical_test_matching import canonical_test_matching
+
         try:
-            components = (
-                db.query(LabTestComponent)
-                .join(LabTestComponent.lab_result)
-                .filter(
-                    and_(
-                        LabTestComponent.canonical_test_name.is_(None),
-                        LabTestComponent.lab_result.has(patient_id=patient_id),
-                    )
-                )
-                .all()
+            canonical_name = canonical_test_matching.find_canonical_match(test_name)
+            if not canonical_name:
+                return None
+            test_info = canonical_test_matching.get_test_info(canonical_name)
+            category = test_info.get("category") if test_info else None
+            return canonical_name, category or None
+
+        except Exception as e:
+            logger.error(
+                "Error matching test name to canonical test",
+                extra={
+                    LogFields.CATEGORY: "app",
+                    LogFields.EVENT: "component_canonical_link_error",
+                    "test_name": test_name,
+                    LogFields.ERROR: str(e),
+                },
             )
+            return None
+
+    def sync_components(
+        self,
+        db: Session,
+        force_all: bool = False,
+        patient_id: Optional[int] = None,
+        mark_unmatched: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
+        """
+        Link LabTestComponent records to canonical names and library categories.
 
-            total_linked = 0
+        Commits after each chunk, so an interrupted sync keeps the chunks it
+        finished. Blocking; call it from a worker thread in async code.
 
-            for component in components:
-                canonical_name = self.auto_link_component(component)
-                if canonical_name:
-                    component.canonical_test_name = canonical_name
-                    total_linked += 1
+        Args:
+            db: Database session
+            force_all: Re-match every component. Otherwise only components
+                without a canonical_test_name (NULL) are processed.
+            patient_id: Limit the sync to one patient's components
+            mark_unmatched: When not forcing, set canonical_test_name to ""
+                on components with no library match, so they aren't picked
+                up again by the next sync
+            progress: Called with (components processed, total) after each chunk
 
+        Returns:
+            Dictionary with stats: {"processed", "linked", "unlinked",
+            "canonical_updated", "category_updated", "distinct_names"}
+        """
+        normalized_name = func.lower(func.trim(LabTestComponent.test_name))
+        scope = []
+        if not force_all:
+            scope.append(LabTestComponent.canonical_test_name.is_(None))
+        if patient_id is not None:
+            scope.append(
+                LabTestComponent.lab_result_id.in_(
+                    select(LabResult.id).where(LabResult.patient_id == patient_id)
+                )
+            )
+
+        names = db.scalars(select(normalized_name).where(*scope).distinct()).all()
+        matches: Dict[str, Tuple[str, Optional[str]]] = {}
+        for name in names:
+            resolved = self._resolve_name(name) if name else None
+            if resolved:
+                matches[name] = resolved
+
+        total = db.scalar(
+            select(func.count()).select_from(LabTestComponent).where(*scope)
+        )
+        stats = {
+            "processed": 0,
+            "linked": 0,
+            "canonical_updated": 0,
+            "category_updated": 0,
+            "distinct_names": len(names),
+        }
+
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(LabTestComponent.id, normalized_name)
+                .where(LabTestComponent.id > last_id, *scope)
+                .order_by(LabTestComponent.id)
+                .limit(self.BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            chunk = [
+                LabTestComponent.id > last_id,
+                LabTestComponent.id <= rows[-1][0],
+                *scope,
+            ]
+            matched = {name for _, name in rows if name in matches}
+            counts = self._apply_matches(db, chunk, normalized_name, matched, matches)
+            stats["category_updated"] += counts[0]
+            stats["canonical_updated"] += counts[1]
+            if mark_unmatched and not force_all:
+                # Everything in the chunk still NULL had no library match
+                db.execute(
+                    update(LabTestComponent)
+                    .where(*chunk)
+                    .values(canonical_test_name="")
+                    .execution_options(synchronize_session=False)
+                )
+            if counts[1]:
+                refresh_trend_keys(
+                    db,
+                    LabTestComponent.id > last_id,
+                    LabTestComponent.id <= rows[-1][0],
+                )
             db.commit()
 
-            total_processed = len(components)
+            last_id = rows[-1][0]
+            stats["processed"] += len(rows)
+            stats["linked"] += sum(1 for _, name in rows if name in matched)
+            if progress:
+                progress(stats["processed"], total)
+            if total > self.BATCH_SIZE:
+                logger.debug(
+                    "Test library sync progress",
+                    extra={
+                        LogFields.CATEGORY: "app",
+                        LogFields.EVENT: "test_library_sync_progress",
+                        "processed": stats["processed"],
+                        "progress": round(stats["processed"] / total * 100, 2),
+                    },
+                )
+
+        # Rows were updated behind the session's back
+        db.expire_all()
+        stats["unlinked"] = stats["processed"] - stats["linked"]
+        return stats
+
+    def _apply_matches(
+        self,
+        db: Session,
+        chunk: List,
+        normalized_name,
+        matched: set,
+        matches: Dict[str, Tuple[str, Optional[str]]],
+    ) -> Tuple[int, int]:
+        """
+        Write library matches for one chunk of components.
+
+        Returns:
+            (categories updated, canonical names updated)
+        """
+        if not matched:
+            return 0, 0
+
+        # Categories first: when not forcing, the chunk condition selects
+        # components by their still-NULL canonical_test_name
+        by_category: Dict[str, List[str]] = {}
+        for name in matched:
+            category = matches[name][1]
+            if category:
+                by_category.setdefault(category, []).append(name)
+        category_updated = 0
+        for category, category_names in by_category.items():
+            result = db.execute(
+                update(LabTestComponent)
+                .where(
+                    *chunk,
+                    normalized_name.in_(category_names),
+                    LabTestComponent.category.is_distinct_from(category),
+                )
+                .values(category=category)
+                .execution_options(synchronize_session=False)
+            )
+            category_updated += result.rowcount
+
+        canonical_name = case(
+            {name: matches[name][0] for name in matched}, value=normalized_name
+        )
+        result = db.execute(
+            update(LabTestComponent)
+            .where(
+                *chunk,
+                normalized_name.in_(matched),
+                LabTestComponent.canonical_test_name.is_distinct_from(canonical_name),
+            )
+            .values(canonical_test_name=canonical_name)
+            .execution_options(synchronize_session=False)
+        )
+        return category_updated, result.rowcount
+
+    def auto_link_all_for_patient(self, db: Session, patient_id: int) -> dict:
+        """
+        Auto-link all LabTestComponent records for a patient to canonical names.
+
+        Components without a library match are left unlinked (NULL).
+
+        Returns:
+            Dictionary with stats: {"processed": int, "linked": int, "unlinked": int}
+        """
+        try:
+            stats = self.sync_components(
+                db, patient_id=patient_id, mark_unmatched=False
+            )
+
             logger.info(
                 "Completed auto-link for patient",
                 extra={
                     LogFields.CATEGORY: "app",
                     LogFields.EVENT: "patient_components_autolinked",
                     LogFields.PATIENT_ID: patient_id,
-                    "processed": total_processed,
-                    "linked": total_linked,
-                    "unlinked": total_processed - total_linked,
+                    "processed": stats["processed"],
+                    "linked": stats["linked"],
+                    "unlinked": stats["unlinked"],
                 },
             )
 
             return {
-                "processed": total_processed,
-                "linked": total_linked,
-                "unlinked": total_processed - total_linked,
+                "processed": stats["processed"],
+                "linked": stats["linked"],
+                "unlinked": stats["unlinked"],
             }
 
         except Exception as e:
@@ -190,46 +378,9 @@ class TestLibrarySyncService:
                 },
             )
 
-            total_processed = 0
-            total_linked = 0
-
-            # Process in batches without offset - the filter on canonical_test_name.is_(None)
-            # naturally excludes already-processed records after each commit
-            while True:
-                batch = (
-                    db.query(LabTestComponent)
-                    .filter(LabTestComponent.canonical_test_name.is_(None))
-                    .limit(self.BATCH_SIZE)
-                    .all()
-                )
-
-                if not batch:
-                    break
-
-                for component in batch:
-                    canonical_name = self.auto_link_component(component)
-                    if canonical_name:
-                        component.canonical_test_name = canonical_name
-                        total_linked += 1
-                    else:
-                        # Mark as processed with no match (empty string)
-                        # This prevents infinite loop - distinguishes from unprocessed (None)
-                        component.canonical_test_name = ""
-                    total_processed += 1
-
-                db.commit()
-
-                if total_components > self.BATCH_SIZE:
-                    progress = round((total_processed / total_components) * 100, 2)
-                    logger.debug(
-                        "Migration progress",
-                        extra={
-                            LogFields.CATEGORY: "app",
-                            LogFields.EVENT: "canonical_migration_progress",
-                            "processed": total_processed,
-                            "progress": progress,
-                        },
-                    )
+            stats = self.sync_components(db)
+            total_processed = stats["processed"]
+            total_linked = stats["linked"]
 
             timestamp = get_utc_now().isoformat()
             system_setting.set_setting(
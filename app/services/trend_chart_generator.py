@@ -8,8 +8,7 @@ Charts are designed for print: white background, dark text, clear gridlines.
 """
 
 import io
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional
 
 import matplotlib
 
@@ -18,10 +17,11 @@ matplotlib.use("Agg")  # Non-interactive backend, must be set before importing F
 # pylint: disable=wrong-import-position  # matplotlib.use() must precede submodule imports
 import numpy as np
 from matplotlib.backends.backend_agg import FigureCanvasAgg
-from matplotlib.dates import date2num
+from matplotlib.dates import date2num, num2date
 from matplotlib.figure import Figure
 
 from app.core.logging.config import get_logger
+from app.utils.trend_series import TrendSeries
 
 # pylint: enable=wrong-import-position
 
@@ -32,6 +32,9 @@ CHART_WIDTH_INCHES = 6.5
 CHART_HEIGHT_INCHES = 3.0
 CHART_DPI = 150
 MAX_RAW_DATA_POINTS = 10000
+# Denser series are thinned to this many points (LTTB, keeping peaks and
+# dips) before plotting; about two per horizontal pixel of the chart
+MAX_PLOTTED_POINTS = 2000
 
 # Print-friendly colors
 COLOR_TEXT = "#212121"
@@ -92,7 +95,8 @@ class TrendChartGenerator:
         if not dates or not values:
             return None
 
-        dates, values = _downsample_if_needed(dates, values)
+        series = _monthly_if_needed(TrendSeries.from_lists(dates, values))
+        plotted = series.downsample(MAX_PLOTTED_POINTS)
         display_name = vital_data.get("display_name", vital_type)
         unit = vital_data.get("unit", "")
         ref_range = vital_data.get("reference_range")
@@ -120,10 +124,10 @@ class TrendChartGenerator:
                 )
 
             # Plot line (adapt markers/thickness to data density)
-            n = len(dates)
+            n = len(plotted)
             ax.plot(
-                dates,
-                values,
+                plotted.dates,
+                plotted.column(),
                 color=COLOR_LINE,
                 linewidth=_line_width(n),
                 markerfacecolor=COLOR_LINE,
@@ -132,7 +136,7 @@ class TrendChartGenerator:
             )
 
             # Trend line
-            _add_trend_line(ax, dates, values)
+            _add_trend_line(ax, series.dates, series.column())
 
             # Labels
             ylabel = f"{display_name} ({unit})" if unit else display_name
@@ -161,9 +165,8 @@ class TrendChartGenerator:
         if not dates:
             return None
 
-        dates, systolic, diastolic = _downsample_bp_if_needed(
-            dates, systolic, diastolic
-        )
+        series = _monthly_if_needed(TrendSeries.from_lists(dates, systolic, diastolic))
+        plotted = series.downsample(MAX_PLOTTED_POINTS)
 
         fig = Figure(figsize=(CHART_WIDTH_INCHES, CHART_HEIGHT_INCHES), dpi=CHART_DPI)
         canvas = FigureCanvasAgg(fig)
@@ -190,12 +193,12 @@ class TrendChartGenerator:
             )
 
             # Plot both lines (adapt to data density)
-            n = len(dates)
+            n = len(plotted)
             lw = _line_width(n)
             mk = _marker_style(n)
             ax.plot(
-                dates,
-                systolic,
+                plotted.dates,
+                plotted.column(0),
                 color=COLOR_SYSTOLIC,
                 linewidth=lw,
                 label="Systolic",
@@ -203,8 +206,8 @@ class TrendChartGenerator:
                 **mk,
             )
             ax.plot(
-                dates,
-                diastolic,
+                plotted.dates,
+                plotted.column(1),
                 color=COLOR_DIASTOLIC,
                 linewidth=lw,
                 label="Diastolic",
@@ -213,8 +216,8 @@ class TrendChartGenerator:
             )
 
             # Trend lines
-            _add_trend_line(ax, dates, systolic)
-            _add_trend_line(ax, dates, diastolic)
+            _add_trend_line(ax, series.dates, series.column(0))
+            _add_trend_line(ax, series.dates, series.column(1))
 
             bp_display = bp_data.get("display_name", "Blood Pressure")
             ax.set_ylabel(f"{bp_display} (mmHg)", fontsize=9, color=COLOR_TEXT)
@@ -259,19 +262,13 @@ class TrendChartGenerator:
         if not dates or not values:
             return None
 
-        # Filter out None values
-        filtered = [
-            (d, v, s) for d, v, s in zip(dates, values, statuses) if v is not None
-        ]
-        if not filtered:
+        # Drop readings without a value
+        series = TrendSeries.from_lists(dates, values, statuses=statuses).complete()
+        if not len(series):
             return None
 
-        dates, values, statuses = zip(*filtered)
-        dates = list(dates)
-        values = [float(v) for v in values]
-        statuses = list(statuses)
-
-        dates, values, statuses = _downsample_lab_if_needed(dates, values, statuses)
+        series = _monthly_if_needed(series)
+        plotted = series.downsample(MAX_PLOTTED_POINTS)
 
         display_name = lab_data.get("display_name", "Lab Test")
         unit = lab_data.get("unit", "")
@@ -297,16 +294,22 @@ class TrendChartGenerator:
                 )
 
             # Plot line (adapt to data density)
-            n = len(dates)
+            n = len(plotted)
             lw = _line_width(n)
-            ax.plot(dates, values, color=COLOR_LINE, linewidth=lw, zorder=4)
+            ax.plot(
+                plotted.dates,
+                plotted.column(),
+                color=COLOR_LINE,
+                linewidth=lw,
+                zorder=4,
+            )
 
             # Data point dots (skip when too dense)
             if n <= 80:
                 dot_size = 5 if n <= 30 else 3
                 ax.plot(
-                    dates,
-                    values,
+                    plotted.dates,
+                    plotted.column(),
                     linestyle="none",
                     marker="o",
                     markersize=dot_size,
@@ -316,7 +319,7 @@ class TrendChartGenerator:
                 )
 
             # Trend line
-            _add_trend_line(ax, dates, values)
+            _add_trend_line(ax, series.dates, series.column())
 
             ylabel = f"{display_name} ({unit})" if unit else display_name
             ax.set_ylabel(ylabel, fontsize=9, color=COLOR_TEXT)
@@ -474,23 +477,23 @@ def _calendar_ticks(dt_min, dt_max, span_days):
     return ticks
 
 
-def _add_trend_line(ax, dates: List, values: List[float]) -> None:
-    """Add a linear regression trend line to the chart."""
+def _add_trend_line(ax, dates: np.ndarray, values: np.ndarray) -> None:
+    """Add a linear regression trend line, fitted to every reading."""
     n = len(values)
     if n < 3:
         return
 
     # Convert dates to numeric values for regression
-    numeric_dates = date2num(dates)
-    x = np.array(numeric_dates)
-    y = np.array(values)
+    x = date2num(dates)
+    y = np.asarray(values, dtype=np.float64)
 
-    # Least-squares fit
+    # Least-squares fit; a straight line only needs its two ends drawn
     coeffs = np.polyfit(x, y, 1)
-    trend_y = np.polyval(coeffs, x)
+    ends = np.array([x.min(), x.max()])
+    trend_y = np.polyval(coeffs, ends)
 
     ax.plot(
-        dates,
+        num2date(ends),
         trend_y,
         color=COLOR_TREND_LINE,
         linewidth=1.0,
@@ -509,91 +512,10 @@ def _figure_to_png(_fig: Figure, canvas: FigureCanvasAgg) -> bytes:
     return png_bytes
 
 
-def _group_by_month(
-    dates: List,
-    *series: List,
-) -> List[Tuple[List, ...]]:
-    """
-    Group dates and parallel value series into monthly buckets.
-
-    Returns a chronologically sorted list of tuples, each containing:
-      (bucket_dates, bucket_series_1, bucket_series_2, ...)
-    """
-    monthly: Dict[str, Tuple[list, ...]] = {}
-    num_series = len(series)
-    for i, d in enumerate(dates):
-        dt = d if isinstance(d, datetime) else datetime.combine(d, datetime.min.time())
-        key = dt.strftime("%Y-%m")
-        if key not in monthly:
-            monthly[key] = tuple([] for _ in range(num_series + 1))
-        monthly[key][0].append(dt)
-        for s_idx in range(num_series):
-            monthly[key][s_idx + 1].append(series[s_idx][i])
-
-    return [monthly[key] for key in sorted(monthly.keys())]
-
-
-def _monthly_median_date(bucket_dates: List) -> datetime:
-    """Pick the median date from a monthly bucket."""
-    return bucket_dates[len(bucket_dates) // 2]
-
-
-def _downsample_if_needed(
-    dates: List,
-    values: List[float],
-) -> Tuple[List, List[float]]:
+def _monthly_if_needed(series: TrendSeries) -> TrendSeries:
     """Downsample data if over the safety cap by monthly averaging."""
-    if len(dates) <= MAX_RAW_DATA_POINTS:
-        return dates, values
-
-    logger.info("Downsampling %d data points to monthly averages", len(dates))
-    avg_dates = []
-    avg_values = []
-    for bucket_dates, bucket_values in _group_by_month(dates, values):
-        avg_dates.append(_monthly_median_date(bucket_dates))
-        avg_values.append(sum(bucket_values) / len(bucket_values))
-    return avg_dates, avg_values
-
-
-def _downsample_bp_if_needed(
-    dates: List,
-    systolic: List[float],
-    diastolic: List[float],
-) -> Tuple[List, List[float], List[float]]:
-    """Downsample blood pressure data if over the safety cap."""
-    if len(dates) <= MAX_RAW_DATA_POINTS:
-        return dates, systolic, diastolic
-
-    logger.info("Downsampling %d BP data points to monthly averages", len(dates))
-    avg_dates = []
-    avg_sys = []
-    avg_dia = []
-    for bucket_dates, bucket_sys, bucket_dia in _group_by_month(
-        dates, systolic, diastolic
-    ):
-        avg_dates.append(_monthly_median_date(bucket_dates))
-        avg_sys.append(sum(bucket_sys) / len(bucket_sys))
-        avg_dia.append(sum(bucket_dia) / len(bucket_dia))
-    return avg_dates, avg_sys, avg_dia
-
-
-def _downsample_lab_if_needed(
-    dates: List,
-    values: List[float],
-    statuses: List[str],
-) -> Tuple[List, List[float], List[str]]:
-    """Downsample lab data if over the safety cap."""
-    if len(dates) <= MAX_RAW_DATA_POINTS:
-        return dates, values, statuses
-
-    logger.info("Downsampling %d lab data points to monthly averages", len(dates))
-    avg_dates = []
-    avg_values = []
-    last_statuses = []
-    for bucket_dates, bucket_values, bucket_statuses in _group_by_month(
-        dates, values, statuses
-    ):
-        avg_dates.append(_monthly_median_date(bucket_dates))
-        avg_values.append(sum(bucket_values) / len(bucket_values))
-        last_statuses.append(bucket_statuses[-1])
-    return avg_dates, avg_values, last_statuses
+    if len(series) <= MAX_RAW_DATA_POINTS:
+        return series
+
+    logger.info("Downsampling %d data points to monthly averages", len(series))
+    return series.monthly_means()
@@ -5,19 +5,25 @@ Thin adapter that wraps existing CRUD functions to fetch vital sign
 and lab test trend data for chart generation in custom reports.
 """
 
-from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+import numpy as np
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session, joinedload
 
 from app.core.logging.config import get_logger
 from app.crud.lab_test_component import (
-    apply_unit_filter,
     lab_test_component as crud_lab_test_component,
+    trend_series_criteria,
+    trend_series_filter,
 )
+from app.models.clinical import VITAL_TYPE_COLUMNS
 from app.models.models import LabResult, LabTestComponent, Vitals
 from app.schemas.trend_charts import SUPPORTED_VITAL_TYPES
+from app.services import vitals_rollup
+from app.services.lab_trend_keys import make_trend_key, trend_key_prefix, trend_name
+from app.utils.trend_series import TrendSeries, value_statistics
 from app.utils.trend_statistics import compute_trend_direction
 
 logger = get_logger(__name__, "app")
@@ -62,6 +68,142 @@ VITAL_REFERENCE_RANGES: Dict[str, Tuple[float, float]] = {
 }
 
 
+# Series with more readings than this are charted from monthly rollups. Matches
+# trend_chart_generator.MAX_RAW_DATA_POINTS, above which the generator would
+# downsample the raw series to monthly means anyway.
+MAX_RAW_VITAL_POINTS = 10000
+
+# One vital chart request: (vital_type, date_from, date_to)
+VitalSeriesRequest = Tuple[str, Optional[date], Optional[date]]
+
+# One lab test chart request: (test_name, date_from, date_to, unit)
+LabSeriesRequest = Tuple[str, Optional[date], Optional[date], Optional[str]]
+
+
+def _date_bounds(
+    date_from: Optional[date], date_to: Optional[date]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Inclusive calendar-day range as half-open [start, end) timestamps."""
+    start = datetime.combine(date_from, time.min) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+    return start, end
+
+
+def _recorded_date_filters(
+    date_from: Optional[date], date_to: Optional[date]
+) -> List[Any]:
+    """Range predicates on Vitals.recorded_date that can use its indexes.
+
+    Compares the raw column against timestamp bounds; wrapping the column in
+    func.date() would force a scan of every row for the patient.
+    """
+    start, end = _date_bounds(date_from, date_to)
+    filters = []
+    if start is not None:
+        filters.append(Vitals.recorded_date >= start)
+    if end is not None:
+        filters.append(Vitals.recorded_date < end)
+    return filters
+
+
+def _vital_type_filters(vital_type: str) -> List[Any]:
+    return [
+        getattr(Vitals, column).isnot(None) for column in VITAL_TYPE_COLUMNS[vital_type]
+    ]
+
+
+def _in_lab_series(
+    component: LabTestComponent,
+    test_name: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    unit: Optional[str],
+) -> bool:
+    """Whether a component belongs to a requested series (trend_series_criteria)."""
+    key = component.trend_key or ""
+    if unit is None:
+        in_series = key.startswith(trend_key_prefix(test_name))
+    else:
+        in_series = key == make_trend_key(trend_name(test_name), unit)
+    effective_date = component.effective_date
+    if date_from and (effective_date is None or effective_date < date_from):
+        return False
+    if date_to and (effective_date is None or effective_date > date_to):
+        return False
+    return in_series
+
+
+def _lab_test_trend(
+    components: Sequence[LabTestComponent],
+    test_name: str,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    unit: Optional[str],
+) -> Dict[str, Any]:
+    """Lab test trend dict for a series' components, newest first."""
+    display_name = f"{test_name} ({unit})" if unit else test_name
+
+    if not components:
+        return {
+            "dates": [],
+            "values": [],
+            "statuses": [],
+            "display_name": display_name,
+            "unit": unit or "",
+            "ref_range_min": None,
+            "ref_range_max": None,
+            "statistics": {},
+        }
+
+    # Inline import to avoid circular dependency with lab_test_component endpoint
+    from app.api.v1.endpoints.lab_test_component import calculate_trend_statistics
+
+    statistics = calculate_trend_statistics(components)
+
+    # Components are returned newest-first; reverse for chronological order
+    components_chronological = list(reversed(components))
+
+    dates = []
+    values = []
+    statuses = []
+    for comp in components_chronological:
+        recorded = (
+            comp.lab_result.completed_date
+            if comp.lab_result and comp.lab_result.completed_date
+            else comp.created_at
+        )
+        dates.append(recorded)
+        values.append(comp.value)
+        statuses.append(comp.status or "unknown")
+
+    resolved_unit = unit if unit is not None else (components[0].unit or "")
+    ref_min = components[0].ref_range_min
+    ref_max = components[0].ref_range_max
+
+    return {
+        "dates": dates,
+        "values": values,
+        "statuses": statuses,
+        "display_name": display_name,
+        "unit": resolved_unit,
+        "ref_range_min": ref_min,
+        "ref_range_max": ref_max,
+        "date_from": date_from,
+        "date_to": date_to,
+        "statistics": {
+            "count": statistics.count,
+            "latest": statistics.latest,
+            "average": statistics.average,
+            "min": statistics.min,
+            "max": statistics.max,
+            "trend_direction": statistics.trend_direction,
+            "time_in_range_percent": statistics.time_in_range_percent,
+            "normal_count": statistics.normal_count,
+            "abnormal_count": statistics.abnormal_count,
+        },
+    }
+
+
 class TrendDataFetcher:
     """Fetches trend data for vital signs and lab tests."""
 
@@ -80,46 +222,10 @@ class TrendDataFetcher:
 
         Returns dict with keys: dates, values, display_name, unit, reference_range, statistics
         """
-        if vital_type not in SUPPORTED_VITAL_TYPES:
-            raise ValueError(f"Unsupported vital type: {vital_type}")
-
-        # Blood pressure is a combined chart with systolic + diastolic
-        if vital_type == "blood_pressure":
-            return self.fetch_blood_pressure_trend(patient_id, date_from, date_to)
-
-        column = getattr(Vitals, vital_type)
-
-        query = (
-            self.db.query(Vitals.recorded_date, column)
-            .filter(
-                Vitals.patient_id == patient_id,
-                column.isnot(None),
-            )
-            .order_by(Vitals.recorded_date.asc())
+        (trend,) = self.fetch_vital_trends(
+            patient_id, [(vital_type, date_from, date_to)]
         )
-
-        if date_from:
-            query = query.filter(func.date(Vitals.recorded_date) >= date_from)
-        if date_to:
-            query = query.filter(func.date(Vitals.recorded_date) <= date_to)
-
-        rows = query.all()
-
-        dates = [row[0] for row in rows]
-        values = [float(row[1]) for row in rows]
-
-        statistics = _compute_vital_statistics(values) if values else {}
-
-        return {
-            "dates": dates,
-            "values": values,
-            "display_name": VITAL_TYPE_DISPLAY.get(vital_type, vital_type),
-            "unit": VITAL_TYPE_UNITS.get(vital_type, ""),
-            "reference_range": VITAL_REFERENCE_RANGES.get(vital_type),
-            "statistics": statistics,
-            "date_from": date_from,
-            "date_to": date_to,
-        }
+        return trend
 
     def fetch_blood_pressure_trend(
         self,
@@ -132,45 +238,139 @@ class TrendDataFetcher:
 
         Returns dict with systolic_values, diastolic_values, dates, and statistics.
         """
-        query = (
+        (trend,) = self.fetch_vital_trends(
+            patient_id, [("blood_pressure", date_from, date_to)]
+        )
+        return trend
+
+    def fetch_vital_trends(
+        self, patient_id: int, series: Sequence[VitalSeriesRequest]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several vital trends for a patient in one pass.
+
+        Each request is a (vital_type, date_from, date_to) tuple; the result
+        list is in request order and each entry has the same shape as
+        fetch_vital_trend() (or fetch_blood_pressure_trend() for BP).
+
+        The day rollups for the requested range are read first. Series with
+        more than MAX_RAW_VITAL_POINTS readings are built from them as
+        monthly means, which is what the chart would have downsampled the raw
+        series to anyway. Every other series is read raw in a single query
+        bounded by the union of their date ranges.
+        """
+        for vital_type, _, _ in series:
+            if vital_type not in SUPPORTED_VITAL_TYPES:
+                raise ValueError(f"Unsupported vital type: {vital_type}")
+        if not series:
+            return []
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(series)
+        raw_requests = []
+        day_rows = self._day_rollups_for(patient_id, series)
+        for index, (vital_type, date_from, date_to) in enumerate(series):
+            columns = VITAL_TYPE_COLUMNS[vital_type]
+            start, end = _date_bounds(date_from, date_to)
+            in_range = {
+                column: [
+                    row
+                    for row in day_rows
+                    if row.series == column
+                    and (start is None or row.period_start >= start)
+                    and (end is None or row.period_start < end)
+                ]
+                for column in columns
+            }
+            readings = sum(row.count for row in in_range[columns[0]])
+            if readings > MAX_RAW_VITAL_POINTS:
+                results[index] = _rollup_trend(vital_type, in_range, date_from, date_to)
+            else:
+                raw_requests.append(index)
+
+        if raw_requests:
+            raw_trends = self._fetch_raw_vital_trends(
+                patient_id, [series[index] for index in raw_requests]
+            )
+            for index, trend in zip(raw_requests, raw_trends):
+                results[index] = trend
+        return results
+
+    def _day_rollups_for(
+        self, patient_id: int, series: Sequence[VitalSeriesRequest]
+    ) -> List[Any]:
+        """Day rollups covering every requested column and date range."""
+        date_froms = [date_from for _, date_from, _ in series]
+        date_tos = [date_to for _, _, date_to in series]
+        return vitals_rollup.day_rollups(
+            self.db,
+            patient_id=patient_id,
+            series=list(
+                dict.fromkeys(
+                    column
+                    for vital_type, _, _ in series
+                    for column in VITAL_TYPE_COLUMNS[vital_type]
+                )
+            ),
+            date_from=None if None in date_froms else min(date_froms),
+            date_to=None if None in date_tos else max(date_tos),
+        )
+
+    def _fetch_raw_vital_trends(
+        self, patient_id: int, series: Sequence[VitalSeriesRequest]
+    ) -> List[Dict[str, Any]]:
+        """Read the raw readings for every requested series in one query."""
+        column_names = list(
+            dict.fromkeys(
+                column
+                for vital_type, _, _ in series
+                for column in VITAL_TYPE_COLUMNS[vital_type]
+            )
+        )
+        series_filters = [
+            and_(
+                *_vital_type_filters(vital_type),
+                *_recorded_date_filters(date_from, date_to),
+            )
+            for vital_type, date_from, date_to in series
+        ]
+        rows = (
             self.db.query(
                 Vitals.recorded_date,
-                Vitals.systolic_bp,
-                Vitals.diastolic_bp,
-            )
-            .filter(
-                Vitals.patient_id == patient_id,
-                Vitals.systolic_bp.isnot(None),
-                Vitals.diastolic_bp.isnot(None),
+                *[getattr(Vitals, column) for column in column_names],
             )
+            .filter(Vitals.patient_id == patient_id, or_(*series_filters))
             .order_by(Vitals.recorded_date.asc())
+            .all()
         )
 
-        if date_from:
-            query = query.filter(func.date(Vitals.recorded_date) >= date_from)
-        if date_to:
-            query = query.filter(func.date(Vitals.recorded_date) <= date_to)
-
-        rows = query.all()
-
-        dates = [row[0] for row in rows]
-        systolic = [float(row[1]) for row in rows]
-        diastolic = [float(row[2]) for row in rows]
+        # One array per column for all rows; missing readings become NaN
+        readings = TrendSeries.from_lists(
+            [row[0] for row in rows],
+            *[
+                [row[position] for row in rows]
+                for position in range(1, len(column_names) + 1)
+            ],
+        )
 
-        return {
-            "dates": dates,
-            "systolic_values": systolic,
-            "diastolic_values": diastolic,
-            "display_name": "Blood Pressure",
-            "unit": "mmHg",
-            "reference_range": {"systolic": (90, 120), "diastolic": (60, 80)},
-            "statistics": {
-                "systolic": _compute_vital_statistics(systolic) if systolic else {},
-                "diastolic": _compute_vital_statistics(diastolic) if diastolic else {},
-            },
-            "date_from": date_from,
-            "date_to": date_to,
-        }
+        results = []
+        for vital_type, date_from, date_to in series:
+            positions = [
+                column_names.index(column) for column in VITAL_TYPE_COLUMNS[vital_type]
+            ]
+            start, end = _date_bounds(date_from, date_to)
+            in_range = np.ones(len(readings), dtype=bool)
+            if start is not None:
+                in_range &= readings.dates >= np.datetime64(start)
+            if end is not None:
+                in_range &= readings.dates < np.datetime64(end)
+            points = TrendSeries(
+                readings.dates[in_range], readings.values[in_range][:, positions]
+            ).complete()
+            if vital_type == "blood_pressure":
+                results.append(_blood_pressure_trend(points, date_from, date_to))
+            else:
+                results.append(_vital_trend(vital_type, points, date_from, date_to))
+        return results
 
     def fetch_lab_test_trend(
         self,
@@ -200,88 +400,77 @@ class TrendDataFetcher:
             date_to=date_to,
             unit=unit,
         )
+        return _lab_test_trend(components, test_name, date_from, date_to, unit)
 
-        display_name = f"{test_name} ({unit})" if unit else test_name
-
-        if not components:
-            return {
-                "dates": [],
-                "values": [],
-                "statuses": [],
-                "display_name": display_name,
-                "unit": unit or "",
-                "ref_range_min": None,
-                "ref_range_max": None,
-                "statistics": {},
-            }
-
-        # Inline import to avoid circular dependency with lab_test_component endpoint
-        from app.api.v1.endpoints.lab_test_component import calculate_trend_statistics
-
-        statistics = calculate_trend_statistics(components)
-
-        # Components are returned newest-first; reverse for chronological order
-        components_chronological = list(reversed(components))
+    def fetch_lab_test_trends(
+        self, patient_id: int, series: Sequence[LabSeriesRequest]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several lab test trends for a patient in one query.
 
-        dates = []
-        values = []
-        statuses = []
-        for comp in components_chronological:
-            recorded = (
-                comp.lab_result.completed_date
-                if comp.lab_result and comp.lab_result.completed_date
-                else comp.created_at
+        Each request is a (test_name, date_from, date_to, unit) tuple; the
+        result list is in request order and each entry has the same shape as
+        fetch_lab_test_trend().
+        """
+        if not series:
+            return []
+
+        series_filters = [
+            and_(
+                *trend_series_criteria(
+                    patient_id=patient_id,
+                    test_name=test_name,
+                    unit=unit,
+                    date_from=date_from,
+                    date_to=date_to,
+                )
             )
-            dates.append(recorded)
-            values.append(comp.value)
-            statuses.append(comp.status or "unknown")
-
-        resolved_unit = unit if unit is not None else (components[0].unit or "")
-        ref_min = components[0].ref_range_min
-        ref_max = components[0].ref_range_max
+            for test_name, date_from, date_to, unit in series
+        ]
+        rows = (
+            self.db.query(LabTestComponent)
+            .options(joinedload(LabTestComponent.lab_result))
+            .filter(or_(*series_filters))
+            .order_by(
+                LabTestComponent.effective_date.desc(), LabTestComponent.id.desc()
+            )
+            .all()
+        )
 
-        return {
-            "dates": dates,
-            "values": values,
-            "statuses": statuses,
-            "display_name": display_name,
-            "unit": resolved_unit,
-            "ref_range_min": ref_min,
-            "ref_range_max": ref_max,
-            "date_from": date_from,
-            "date_to": date_to,
-            "statistics": {
-                "count": statistics.count,
-                "latest": statistics.latest,
-                "average": statistics.average,
-                "min": statistics.min,
-                "max": statistics.max,
-                "trend_direction": statistics.trend_direction,
-                "time_in_range_percent": statistics.time_in_range_percent,
-                "normal_count": statistics.normal_count,
-                "abnormal_count": statistics.abnormal_count,
-            },
-        }
+        results = []
+        for test_name, date_from, date_to, unit in series:
+            components = [
+                row
+                for row in rows
+                if _in_lab_series(row, test_name, date_from, date_to, unit)
+            ]
+            results.append(
+                _lab_test_trend(components, test_name, date_from, date_to, unit)
+            )
+        return results
 
     def _vital_count_query(self, patient_id: int, vital_type: str):
         """Build a count query for a vital type, handling BP's dual-column requirement."""
-        if vital_type == "blood_pressure":
-            return self.db.query(func.count(Vitals.id)).filter(
-                Vitals.patient_id == patient_id,
-                Vitals.systolic_bp.isnot(None),
-                Vitals.diastolic_bp.isnot(None),
-            )
-        column = getattr(Vitals, vital_type)
         return self.db.query(func.count(Vitals.id)).filter(
             Vitals.patient_id == patient_id,
-            column.isnot(None),
+            *_vital_type_filters(vital_type),
         )
 
     def get_available_vital_types(self, patient_id: int) -> List[Dict[str, str]]:
         """Return vital types that have at least one data point for the patient."""
+        # One pass over the patient's vitals, counting every type at once
+        counts = (
+            self.db.query(
+                *[
+                    func.count(case((and_(*_vital_type_filters(vital_type)), 1)))
+                    for vital_type in SUPPORTED_VITAL_TYPES
+                ]
+            )
+            .filter(Vitals.patient_id == patient_id)
+            .one()
+        )
         available = []
-        for vital_type in SUPPORTED_VITAL_TYPES:
-            count = self._vital_count_query(patient_id, vital_type).scalar()
+        for vital_type, count in zip(SUPPORTED_VITAL_TYPES, counts):
             if count:
                 available.append(
                     {
@@ -349,11 +538,9 @@ class TrendDataFetcher:
         """Count vital records for a type within a date range."""
         if vital_type not in SUPPORTED_VITAL_TYPES:
             return 0
-        query = self._vital_count_query(patient_id, vital_type)
-        if date_from:
-            query = query.filter(func.date(Vitals.recorded_date) >= date_from)
-        if date_to:
-            query = query.filter(func.date(Vitals.recorded_date) <= date_to)
+        query = self._vital_count_query(patient_id, vital_type).filter(
+            *_recorded_date_filters(date_from, date_to)
+        )
         return query.scalar() or 0
 
     def count_lab_test_records(
@@ -371,68 +558,122 @@ class TrendDataFetcher:
           - Non-empty string: case-insensitive, whitespace-trimmed match.
           - Empty string: rows with NULL or empty unit.
         """
-        query = (
-            self.db.query(func.count(LabTestComponent.id))
-            .join(LabTestComponent.lab_result)
-            .filter(
-                and_(
-                    LabTestComponent.lab_result.has(patient_id=patient_id),
-                    or_(
-                        and_(
-                            LabTestComponent.canonical_test_name.isnot(None),
-                            func.trim(LabTestComponent.canonical_test_name) != "",
-                            func.lower(func.trim(LabTestComponent.canonical_test_name))
-                            == func.lower(func.trim(test_name)),
-                        ),
-                        and_(
-                            or_(
-                                LabTestComponent.canonical_test_name.is_(None),
-                                func.trim(LabTestComponent.canonical_test_name) == "",
-                            ),
-                            func.lower(func.rtrim(LabTestComponent.test_name, ",;: "))
-                            == func.lower(test_name),
-                        ),
-                    ),
-                )
-            )
+        query = trend_series_filter(
+            self.db.query(func.count(LabTestComponent.id)),
+            patient_id=patient_id,
+            test_name=test_name,
+            unit=unit,
+            date_from=date_from,
+            date_to=date_to,
         )
+        return query.scalar() or 0
 
-        query = apply_unit_filter(query, LabTestComponent.unit, unit)
-
-        if date_from or date_to:
-            recorded_date_expr = func.coalesce(
-                LabResult.completed_date,
-                func.date(LabTestComponent.created_at),
-            )
-            if date_from:
-                query = query.filter(recorded_date_expr >= date_from)
-            if date_to:
-                query = query.filter(recorded_date_expr <= date_to)
 
-        return query.scalar() or 0
+def _vital_trend(
+    vital_type: str,
+    points: TrendSeries,
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> Dict[str, Any]:
+    """Shape one single-column vital series for chart generation."""
+    return {
+        "dates": points.date_list(),
+        "values": points.value_list(),
+        "display_name": VITAL_TYPE_DISPLAY.get(vital_type, vital_type),
+        "unit": VITAL_TYPE_UNITS.get(vital_type, ""),
+        "reference_range": VITAL_REFERENCE_RANGES.get(vital_type),
+        "statistics": value_statistics(points.column()),
+        "date_from": date_from,
+        "date_to": date_to,
+    }
 
 
-def _compute_vital_statistics(values: List[float]) -> Dict[str, Any]:
-    """Compute basic statistics for a list of vital sign values."""
-    if not values:
-        return {}
+def _blood_pressure_trend(
+    points: TrendSeries,
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> Dict[str, Any]:
+    """Shape a systolic/diastolic series for the combined BP chart."""
+    return {
+        "dates": points.date_list(),
+        "systolic_values": points.value_list(0),
+        "diastolic_values": points.value_list(1),
+        "display_name": "Blood Pressure",
+        "unit": "mmHg",
+        "reference_range": {"systolic": (90, 120), "diastolic": (60, 80)},
+        "statistics": {
+            "systolic": value_statistics(points.column(0)),
+            "diastolic": value_statistics(points.column(1)),
+        },
+        "date_from": date_from,
+        "date_to": date_to,
+    }
 
-    count = len(values)
-    latest = values[-1]
-    avg = sum(values) / count
-    minimum = min(values)
-    maximum = max(values)
 
-    trend = _compute_trend_direction(values)
+def _rollup_statistics(
+    day_rows: List[Any], monthly_values: List[float]
+) -> Dict[str, Any]:
+    """Vital statistics over the full readings, from day rollups.
 
+    Count, latest, average, min and max cover every reading; the trend
+    direction is fitted to the monthly means that are charted.
+    """
+    if not day_rows:
+        return {}
+    count = sum(row.count for row in day_rows)
     return {
         "count": count,
-        "latest": round(latest, 2),
-        "average": round(avg, 2),
-        "min": round(minimum, 2),
-        "max": round(maximum, 2),
-        "trend_direction": trend,
+        "latest": round(day_rows[-1].last_value, 2),
+        "average": round(sum(row.value_sum for row in day_rows) / count, 2),
+        "min": round(min(row.min_value for row in day_rows), 2),
+        "max": round(max(row.max_value for row in day_rows), 2),
+        "trend_direction": _compute_trend_direction(monthly_values),
+    }
+
+
+def _rollup_trend(
+    vital_type: str,
+    day_rows: Dict[str, List[Any]],
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> Dict[str, Any]:
+    """Shape a series from its day rollups as one monthly-mean point per month."""
+    if vital_type != "blood_pressure":
+        (rows,) = day_rows.values()
+        points = vitals_rollup.monthly_points(rows)
+        trend = _vital_trend(
+            vital_type,
+            TrendSeries.from_lists(
+                [when for when, _ in points], [mean for _, mean in points]
+            ),
+            date_from,
+            date_to,
+        )
+        trend["statistics"] = _rollup_statistics(rows, trend["values"])
+        return trend
+
+    systolic_rows = day_rows["systolic_bp"]
+    diastolic_rows = day_rows["diastolic_bp"]
+    diastolic_by_date = dict(vitals_rollup.monthly_points(diastolic_rows))
+    points = [
+        (when, systolic, diastolic_by_date[when])
+        for when, systolic in vitals_rollup.monthly_points(systolic_rows)
+        if when in diastolic_by_date
+    ]
+    trend = _blood_pressure_trend(
+        TrendSeries.from_lists(
+            [when for when, _, _ in points],
+            [systolic for _, systolic, _ in points],
+            [diastolic for _, _, diastolic in points],
+        ),
+        date_from,
+        date_to,
+    )
+    trend["statistics"] = {
+        "systolic": _rollup_statistics(systolic_rows, trend["systolic_values"]),
+        "diastolic": _rollup_statistics(diastolic_rows, trend["diastolic_values"]),
     }
+    return trend
 
 
 # Kept as private alias for internal callers
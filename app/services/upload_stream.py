@@ -0,0 +1,141 @@
+"""
+Upload Stream
+
+Streams an uploaded file to disk in fixed-size chunks instead of reading it
+into memory, so concurrent uploads of large scans cost one chunk each rather
+than the whole file.
+
+While streaming, the size limit is enforced (the upload is abandoned as
+soon as it is exceeded) and the content's SHA-256 is computed. Chunks are
+written to a temporary file off the event loop. A local upload then moves
+the temporary file into place with an atomic rename, so a half-written file
+never appears under its final name. A remote upload streams the temporary
+file to Paperless/Papra and discards it.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from fastapi import UploadFile
+
+from app.core.logging.config import get_logger
+
+logger = get_logger(__name__, "app")
+
+# Bytes read from the request and written to disk at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+TEMP_PREFIX = ".upload-"
+TEMP_SUFFIX = ".part"
+
+
+class UploadTooLargeError(Exception):
+    """The upload exceeded its size limit while streaming."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File exceeds maximum allowed size ({max_size} bytes)")
+
+
+@dataclass
+class SpooledUpload:
+    """An upload streamed to a temporary file, with its size and hash."""
+
+    path: Path
+    size: int
+    sha256: str
+
+    def open(self) -> BinaryIO:
+        """The spooled content, for streaming to a remote backend."""
+        return open(self.path, "rb")
+
+    async def commit(self, destination: Path) -> None:
+        """Atomically move the spooled file to its final path."""
+        await asyncio.to_thread(os.replace, self.path, destination)
+
+    async def discard(self) -> None:
+        """Remove the temporary file if it was not committed."""
+        await asyncio.to_thread(_remove_quietly, self.path)
+
+
+def _remove_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove temporary upload {path}: {e}")
+
+
+def _write_chunk(out: BinaryIO, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _finish(out: BinaryIO) -> None:
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: int,
+    directory: Optional[Path] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Stream an upload into a temporary file, hashing it on the way.
+
+    Args:
+        file: The uploaded file, read from its current position
+        max_size: Largest allowed size in bytes
+        directory: Where to create the temporary file. Local uploads pass
+            their destination directory so commit() is a same-filesystem
+            rename; None uses the system temporary directory.
+        chunk_size: Bytes read and written at a time
+
+    Returns:
+        The spooled upload; the caller must commit() or discard() it
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_size
+    """
+    fd, temp_name = await asyncio.to_thread(
+        tempfile.mkstemp, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX, dir=directory
+    )
+    path = Path(temp_name)
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(max_size)
+            await asyncio.to_thread(_write_chunk, out, digest, chunk)
+        await asyncio.to_thread(_finish, out)
+    except BaseException:
+        out.close()
+        await asyncio.to_thread(_remove_quietly, path)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+def payload_size(file_data: Union[bytes, BinaryIO]) -> int:
+    """Size of an upload payload given as bytes or as an open binary file."""
+    if isinstance(file_data, (bytes, bytearray)):
+        return len(file_data)
+    position = file_data.tell()
+    size = file_data.seek(0, io.SEEK_END) - position
+    file_data.seek(position)
+    return size
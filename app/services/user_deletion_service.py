@@ -19,6 +19,7 @@ from app.models.models import (
     User,
     UserPreferences,
 )
+from app.services.patient_access_cache import patient_access_cache
 
 logger = get_logger(__name__, "app")
 
@@ -208,6 +209,12 @@ class UserDeletionService:
             db.delete(user_obj)
             deletion_stats["deleted_records"]["user"] = 1
 
+        # The caller commits, but user IDs can be reused on SQLite, so drop the
+        # cached decisions now rather than let a new account inherit them.
+        patient_access_cache.invalidate_user(user_id)
+        if patient_id is not None:
+            patient_access_cache.invalidate_patient(patient_id)
+
         logger.info(
             f"User deletion completed for {username}",
             extra={
@@ -0,0 +1,591 @@
+"""
+Vitals Rollup Service - maintains and reads pre-aggregated vitals.
+
+``vitals_rollups`` holds count/sum/min/max/first/last per patient, vital column
+and UTC day or month (see app.models.vitals_rollup). Stats and long-range trend
+charts read these few hundred rows instead of every raw reading, which matters
+once a CGM import has added 288 glucose readings a day.
+
+Maintenance is per bucket: any change to a reading marks its (patient, day)
+dirty, and at the end of the flush those days are recomputed from the raw rows
+and their months from the day rollups. Recomputing rather than adjusting
+running totals keeps deletes and edits exact (a deleted minimum cannot be
+"un-minned") at the cost of re-reading one day of readings.
+
+Rows are kept current from SQLAlchemy mapper/session events, so every ORM
+write to Vitals maintains them in the same transaction. Bulk paths that bypass
+the unit of work (``bulk_save_objects``, ``Query.delete``) call ``refresh_days``
+themselves. ``rebuild`` regenerates everything; it runs once on startup for
+existing databases and, with ``check``, is available from
+``app/scripts/vitals_rollup_cli.py``.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, delete, event, func, insert, inspect, or_, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.logging.config import get_logger
+from app.core.logging.constants import LogFields
+from app.crud.system_setting import system_setting
+from app.models.models import Vitals, VitalsRollup
+
+logger = get_logger(__name__, "app")
+
+# Bump when the rollup definition changes; startup rebuilds once per version
+ROLLUP_VERSION = "1"
+ROLLUP_VERSION_KEY = "vitals_rollup_version"
+
+DAY = "day"
+MONTH = "month"
+
+# Vitals value columns that get rollups
+ROLLUP_SERIES: Tuple[str, ...] = (
+    "systolic_bp",
+    "diastolic_bp",
+    "heart_rate",
+    "temperature",
+    "weight",
+    "height",
+    "oxygen_saturation",
+    "respiratory_rate",
+    "blood_glucose",
+    "a1c",
+    "bmi",
+    "pain_scale",
+)
+
+# Adjacent dirty days are read with one range predicate; this caps how many
+# ranges go into a single statement
+MAX_RANGES_PER_QUERY = 200
+
+_DIRTY_KEY = "vitals_rollup_dirty"
+
+Bucket = Tuple[int, date]  # (patient_id, UTC day)
+
+
+@dataclass
+class SeriesSummary:
+    """Aggregate of one vital series over some span of rollup periods."""
+
+    count: int
+    value_sum: float
+    min_value: float
+    max_value: float
+    first_value: float
+    first_recorded_at: datetime
+    last_value: float
+    last_recorded_at: datetime
+
+    @property
+    def mean(self) -> float:
+        return self.value_sum / self.count
+
+
+def _day_of(recorded: datetime) -> date:
+    return recorded.date()
+
+
+def _month_of(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _day_ranges(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Collapse days into half-open [start, end) runs of consecutive days."""
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1] = (ranges[-1][0], day + timedelta(days=1))
+        else:
+            ranges.append((day, day + timedelta(days=1)))
+    return ranges
+
+
+def _merge(summaries: Iterable[SeriesSummary]) -> Optional[SeriesSummary]:
+    """Combine chronologically ordered summaries into one."""
+    merged: Optional[SeriesSummary] = None
+    for item in summaries:
+        if merged is None:
+            merged = SeriesSummary(**vars(item))
+            continue
+        merged.count += item.count
+        merged.value_sum += item.value_sum
+        merged.min_value = min(merged.min_value, item.min_value)
+        merged.max_value = max(merged.max_value, item.max_value)
+        if item.first_recorded_at < merged.first_recorded_at:
+            merged.first_value = item.first_value
+            merged.first_recorded_at = item.first_recorded_at
+        if item.last_recorded_at >= merged.last_recorded_at:
+            merged.last_value = item.last_value
+            merged.last_recorded_at = item.last_recorded_at
+    return merged
+
+
+def _summary_from_row(row: Any) -> SeriesSummary:
+    return SeriesSummary(
+        count=row.count,
+        value_sum=row.value_sum,
+        min_value=row.min_value,
+        max_value=row.max_value,
+        first_value=row.first_value,
+        first_recorded_at=row.first_recorded_at,
+        last_value=row.last_value,
+        last_recorded_at=row.last_recorded_at,
+    )
+
+
+def _rollup_row(
+    patient_id: int, series: str, granularity: str, period: date, summary: SeriesSummary
+) -> Dict[str, Any]:
+    return {
+        "patient_id": patient_id,
+        "series": series,
+        "granularity": granularity,
+        "period_start": _midnight(period),
+        **vars(summary),
+    }
+
+
+def _aggregate_readings(
+    readings: Iterable[Any],
+) -> Dict[Tuple[str, date], SeriesSummary]:
+    """Fold chronologically ordered raw rows into per (series, day) summaries."""
+    summaries: Dict[Tuple[str, date], SeriesSummary] = {}
+    for reading in readings:
+        recorded = reading.recorded_date
+        day = _day_of(recorded)
+        for series in ROLLUP_SERIES:
+            value = getattr(reading, series)
+            if value is None:
+                continue
+            value = float(value)
+            key = (series, day)
+            current = summaries.get(key)
+            if current is None:
+                summaries[key] = SeriesSummary(
+                    count=1,
+                    value_sum=value,
+                    min_value=value,
+                    max_value=value,
+                    first_value=value,
+                    first_recorded_at=recorded,
+                    last_value=value,
+                    last_recorded_at=recorded,
+                )
+            else:
+                current.count += 1
+                current.value_sum += value
+                current.min_value = min(current.min_value, value)
+                current.max_value = max(current.max_value, value)
+                current.last_value = value
+                current.last_recorded_at = recorded
+    return summaries
+
+
+def _readings_in(connection, patient_id: int, ranges: Sequence[Tuple[date, date]]):
+    vitals = Vitals.__table__
+    columns = [vitals.c.recorded_date, *(vitals.c[name] for name in ROLLUP_SERIES)]
+    for offset in range(0, len(ranges), MAX_RANGES_PER_QUERY):
+        chunk = ranges[offset : offset + MAX_RANGES_PER_QUERY]
+        yield from connection.execute(
+            select(*columns)
+            .where(
+                vitals.c.patient_id == patient_id,
+                or_(
+                    *(
+                        and_(
+                            vitals.c.recorded_date >= _midnight(start),
+                            vitals.c.recorded_date < _midnight(end),
+                        )
+                        for start, end in chunk
+                    )
+                ),
+            )
+            .order_by(vitals.c.recorded_date, vitals.c.id)
+        )
+
+
+def _replace_periods(
+    connection,
+    patient_id: int,
+    granularity: str,
+    periods: Set[date],
+    rows: List[Dict[str, Any]],
+) -> None:
+    rollups = VitalsRollup.__table__
+    starts = sorted(_midnight(period) for period in periods)
+    for offset in range(0, len(starts), 500):
+        connection.execute(
+            delete(rollups).where(
+                rollups.c.patient_id == patient_id,
+                rollups.c.granularity == granularity,
+                rollups.c.period_start.in_(starts[offset : offset + 500]),
+            )
+        )
+    if rows:
+        connection.execute(insert(rollups), rows)
+
+
+def _refresh_patient_days(connection, patient_id: int, days: Set[date]) -> None:
+    # Day rollups straight from the raw readings of the dirty days
+    day_summaries = _aggregate_readings(
+        _readings_in(connection, patient_id, _day_ranges(days))
+    )
+    _replace_periods(
+        connection,
+        patient_id,
+        DAY,
+        days,
+        [
+            _rollup_row(patient_id, series, DAY, day, summary)
+            for (series, day), summary in day_summaries.items()
+        ],
+    )
+
+    # Month rollups from that month's day rollups
+    months = {_month_of(day) for day in days}
+    rollups = VitalsRollup.__table__
+    day_rows = []
+    for month in months:
+        day_rows.extend(
+            connection.execute(
+                select(rollups)
+                .where(
+                    rollups.c.patient_id == patient_id,
+                    rollups.c.granularity == DAY,
+                    rollups.c.period_start >= _midnight(month),
+                    rollups.c.period_start < _midnight(_next_month(month)),
+                )
+                .order_by(rollups.c.period_start)
+            )
+        )
+    by_month: Dict[Tuple[str, date], List[SeriesSummary]] = defaultdict(list)
+    for row in day_rows:
+        by_month[(row.series, _month_of(row.period_start.date()))].append(
+            _summary_from_row(row)
+        )
+    _replace_periods(
+        connection,
+        patient_id,
+        MONTH,
+        months,
+        [
+            _rollup_row(patient_id, series, MONTH, month, _merge(summaries))
+            for (series, month), summaries in by_month.items()
+        ],
+    )
+
+
+def refresh_buckets(connection, buckets: Iterable[Bucket]) -> None:
+    """Recompute the day and month rollups covering the given buckets."""
+    days_by_patient: Dict[int, Set[date]] = defaultdict(set)
+    for patient_id, day in buckets:
+        days_by_patient[patient_id].add(day)
+    for patient_id, days in days_by_patient.items():
+        _refresh_patient_days(connection, patient_id, days)
+
+
+def refresh_days(db: Session, patient_id: int, recorded_dates: Iterable[Any]) -> None:
+    """Recompute rollups for the days holding ``recorded_dates``.
+
+    For write paths that bypass mapper events, e.g. ``bulk_save_objects`` or
+    ``Query.delete``. Accepts datetimes or dates.
+    """
+    days = {
+        value.date() if isinstance(value, datetime) else value
+        for value in recorded_dates
+        if value is not None
+    }
+    if days:
+        refresh_buckets(db.connection(), [(patient_id, day) for day in days])
+
+
+def _mark_dirty(target: Vitals) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    dirty = session.info.setdefault(_DIRTY_KEY, set())
+    if target.patient_id is not None and target.recorded_date is not None:
+        dirty.add((target.patient_id, _day_of(target.recorded_date)))
+
+    # An edit that moves a reading to another day or patient also dirties
+    # the bucket it left
+    state = inspect(target)
+    old_patients = state.attrs.patient_id.history.deleted or [target.patient_id]
+    old_dates = state.attrs.recorded_date.history.deleted or [target.recorded_date]
+    for patient_id in old_patients:
+        for recorded in old_dates:
+            if patient_id is not None and recorded is not None:
+                dirty.add((patient_id, _day_of(recorded)))
+
+
+def _after_vitals_change(_mapper, _connection, target) -> None:
+    _mark_dirty(target)
+
+
+def _after_flush_postexec(session: Session, _flush_context) -> None:
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        refresh_buckets(session.connection(), dirty)
+
+
+def register_vitals_rollup_listeners() -> None:
+    """Attach rollup maintenance to Vitals writes. Idempotent."""
+    if event.contains(Vitals, "after_insert", _after_vitals_change):
+        return
+    event.listen(Vitals, "after_insert", _after_vitals_change)
+    event.listen(Vitals, "after_update", _after_vitals_change)
+    event.listen(Vitals, "after_delete", _after_vitals_change)
+    event.listen(Session, "after_flush_postexec", _after_flush_postexec)
+
+
+def summarize(
+    db: Session,
+    *,
+    patient_id: int,
+    series: Optional[Sequence[str]] = None,
+) -> Dict[str, SeriesSummary]:
+    """All-time summary per series for a patient, from the month rollups."""
+    query = db.query(VitalsRollup).filter(
+        VitalsRollup.patient_id == patient_id,
+        VitalsRollup.granularity == MONTH,
+    )
+    if series is not None:
+        query = query.filter(VitalsRollup.series.in_(series))
+
+    by_series: Dict[str, List[SeriesSummary]] = defaultdict(list)
+    for row in query.order_by(VitalsRollup.period_start):
+        by_series[row.series].append(_summary_from_row(row))
+    return {name: _merge(items) for name, items in by_series.items()}
+
+
+def day_rollups(
+    db: Session,
+    *,
+    patient_id: int,
+    series: Sequence[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> List[VitalsRollup]:
+    """Day rollups for the given series in [date_from, date_to], oldest first."""
+    query = db.query(VitalsRollup).filter(
+        VitalsRollup.patient_id == patient_id,
+        VitalsRollup.granularity == DAY,
+        VitalsRollup.series.in_(series),
+    )
+    if date_from:
+        query = query.filter(VitalsRollup.period_start >= _midnight(date_from))
+    if date_to:
+        query = query.filter(
+            VitalsRollup.period_start < _midnight(date_to + timedelta(days=1))
+        )
+    return query.order_by(VitalsRollup.period_start).all()
+
+
+def day_counts(
+    db: Session,
+    *,
+    patient_id: int,
+    series: Sequence[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, int]:
+    """Number of raw readings per series in [date_from, date_to]."""
+    query = db.query(VitalsRollup.series, func.sum(VitalsRollup.count)).filter(
+        VitalsRollup.patient_id == patient_id,
+        VitalsRollup.granularity == DAY,
+        VitalsRollup.series.in_(series),
+    )
+    if date_from:
+        query = query.filter(VitalsRollup.period_start >= _midnight(date_from))
+    if date_to:
+        query = query.filter(
+            VitalsRollup.period_start < _midnight(date_to + timedelta(days=1))
+        )
+    return {
+        name: int(total or 0) for name, total in query.group_by(VitalsRollup.series)
+    }
+
+
+def monthly_points(rows: Sequence[VitalsRollup]) -> List[Tuple[datetime, float]]:
+    """Collapse one series' day rollups into (representative date, mean) per month.
+
+    The date is the middle day that had readings, mirroring the chart
+    generator's median-date monthly downsampling.
+    """
+    by_month: Dict[date, List[VitalsRollup]] = defaultdict(list)
+    for row in rows:
+        by_month[_month_of(row.period_start.date())].append(row)
+    points = []
+    for month in sorted(by_month):
+        days = by_month[month]
+        total = sum(row.count for row in days)
+        mean = sum(row.value_sum for row in days) / total
+        points.append((days[len(days) // 2].period_start, mean))
+    return points
+
+
+def _patient_ids(db: Session, patient_id: Optional[int]) -> List[int]:
+    if patient_id is not None:
+        return [patient_id]
+    return [
+        pid
+        for (pid,) in db.query(Vitals.patient_id).distinct().order_by(Vitals.patient_id)
+    ]
+
+
+def _expected_rollups(
+    db: Session, patient_id: int
+) -> Dict[Tuple[str, str, date], SeriesSummary]:
+    """Day and month summaries for a patient computed from the raw readings.
+
+    Keyed by (granularity, series, period).
+    """
+    vitals = Vitals.__table__
+    readings = db.execute(
+        select(vitals.c.recorded_date, *(vitals.c[name] for name in ROLLUP_SERIES))
+        .where(vitals.c.patient_id == patient_id)
+        .order_by(vitals.c.recorded_date, vitals.c.id)
+        .execution_options(yield_per=5000)
+    )
+    days = _aggregate_readings(readings)
+
+    by_month: Dict[Tuple[str, date], List[SeriesSummary]] = defaultdict(list)
+    for (series, day), summary in sorted(days.items(), key=lambda item: item[0][1]):
+        by_month[(series, _month_of(day))].append(summary)
+
+    expected = {(DAY, series, day): summary for (series, day), summary in days.items()}
+    expected.update(
+        ((MONTH, series, month), _merge(summaries))
+        for (series, month), summaries in by_month.items()
+    )
+    return expected
+
+
+def rebuild(db: Session, *, patient_id: Optional[int] = None) -> Dict[str, int]:
+    """Regenerate rollups from the raw readings, committing per patient.
+
+    Rebuilds every patient, or one patient when ``patient_id`` is given.
+    Returns the number of patients processed and rollup rows written.
+    """
+    rollups = VitalsRollup.__table__
+    purge = delete(rollups)
+    if patient_id is not None:
+        purge = purge.where(rollups.c.patient_id == patient_id)
+    db.execute(purge)
+    db.commit()
+
+    patients = 0
+    written = 0
+    for pid in _patient_ids(db, patient_id):
+        rows = [
+            _rollup_row(pid, series, granularity, period, summary)
+            for (granularity, series, period), summary in _expected_rollups(
+                db, pid
+            ).items()
+        ]
+        for offset in range(0, len(rows), 5000):
+            db.execute(insert(rollups), rows[offset : offset + 5000])
+        db.commit()
+        patients += 1
+        written += len(rows)
+
+    logger.info(
+        "Vitals rollups rebuilt",
+        extra={
+            LogFields.CATEGORY: "app",
+            LogFields.EVENT: "vitals_rollups_rebuilt",
+            LogFields.PATIENT_ID: patient_id,
+            LogFields.COUNT: written,
+        },
+    )
+    return {"patients": patients, "rollups": written}
+
+
+def run_one_time_build(db: Session) -> Dict[str, Any]:
+    """Build rollups once per ROLLUP_VERSION (existing databases, format changes)."""
+    current = system_setting.get_setting(db, ROLLUP_VERSION_KEY)
+    if current == ROLLUP_VERSION:
+        return {"skipped": True, "reason": "already_built"}
+
+    result = rebuild(db)
+    system_setting.set_setting(db, ROLLUP_VERSION_KEY, ROLLUP_VERSION)
+    return {"skipped": False, **result}
+
+
+def _same(expected: SeriesSummary, stored: SeriesSummary) -> bool:
+    return (
+        expected.count == stored.count
+        and math.isclose(
+            expected.value_sum, stored.value_sum, rel_tol=1e-9, abs_tol=1e-6
+        )
+        and expected.min_value == stored.min_value
+        and expected.max_value == stored.max_value
+        and expected.first_value == stored.first_value
+        and expected.first_recorded_at == stored.first_recorded_at
+        and expected.last_value == stored.last_value
+        and expected.last_recorded_at == stored.last_recorded_at
+    )
+
+
+def check(db: Session, *, patient_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Compare stored rollups against the raw readings.
+
+    Returns one dict per mismatching (patient, granularity, series, period):
+    ``problem`` is "missing", "stale" or "orphaned". An empty list means the
+    rollups are consistent.
+    """
+    problems: List[Dict[str, Any]] = []
+    patient_ids = set(_patient_ids(db, patient_id))
+    if patient_id is None:
+        # Rollups left behind for patients that no longer have readings
+        patient_ids.update(
+            pid for (pid,) in db.query(VitalsRollup.patient_id).distinct()
+        )
+
+    for pid in sorted(patient_ids):
+        expected = _expected_rollups(db, pid)
+        stored = {
+            (row.granularity, row.series, row.period_start.date()): _summary_from_row(
+                row
+            )
+            for row in db.query(VitalsRollup).filter(VitalsRollup.patient_id == pid)
+        }
+
+        for key in sorted(set(expected) | set(stored), key=str):
+            if key not in stored:
+                problem = "missing"
+            elif key not in expected:
+                problem = "orphaned"
+            elif not _same(expected[key], stored[key]):
+                problem = "stale"
+            else:
+                continue
+            granularity, series, period = key
+            problems.append(
+                {
+                    "patient_id": pid,
+                    "granularity": granularity,
+                    "series": series,
+                    "period_start": period.isoformat(),
+                    "problem": problem,
+                }
+            )
+    return problems
+
+
+# Attached at import: app.crud.vitals imports this module, so any process that
+# writes vitals through the CRUD layer keeps the rollups maintained.
+register_vitals_rollup_listeners()
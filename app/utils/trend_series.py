@@ -0,0 +1,181 @@
+"""
+Trend Series
+
+Array-backed time series for trend statistics and charts: readings as a
+datetime64 array plus a float64 value array (one column per series, e.g.
+systolic and diastolic), with optional per-reading statuses.
+
+Monthly bucketing, statistics and shape-preserving downsampling run as
+NumPy array operations instead of per-point Python loops, which matters for
+dense series such as CGM glucose readings (tens of thousands of points).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.trend_statistics import compute_trend_direction
+
+DATETIME_DTYPE = "datetime64[us]"
+
+
+def to_datetime64(dates: Sequence[Any]) -> np.ndarray:
+    """Dates or datetimes as a datetime64 array (aware ones at wall time)."""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype(DATETIME_DTYPE)
+    return np.array(
+        [
+            (
+                d.replace(tzinfo=None)
+                if isinstance(d, datetime) and d.tzinfo is not None
+                else d
+            )
+            for d in dates
+        ],
+        dtype=DATETIME_DTYPE,
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Keeps the first and last point and, from each of ``threshold - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the next bucket's average. Peaks and dips
+    survive, unlike with bucket averaging. ``y`` may have several columns,
+    whose triangle areas are summed so they share the kept points.
+    """
+    n = x.size
+    if threshold < 3 or n <= threshold:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.reshape(n, -1).astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Bucket averages from running sums
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.vstack((np.zeros((1, y.shape[1])), np.cumsum(y, axis=0)))
+    counts = (ends - starts)[:, None]
+    avg_x = (x_sums[ends] - x_sums[starts]) / counts[:, 0]
+    avg_y = (y_sums[ends] - y_sums[starts]) / counts
+    # The bucket after the last one is the final point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.vstack((avg_y[1:], y[-1:]))
+
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        areas = np.abs(
+            (x[a] - avg_x[bucket]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end, None]) * (avg_y[bucket] - y[a])
+        ).sum(axis=1)
+        a = start + int(np.argmax(areas))
+        kept[bucket + 1] = a
+    return kept
+
+
+@dataclass
+class TrendSeries:
+    """Readings of one or more value columns sharing their timestamps."""
+
+    dates: np.ndarray
+    values: np.ndarray
+    statuses: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_lists(
+        cls,
+        dates: Sequence[Any],
+        *columns: Sequence[Any],
+        statuses: Optional[Sequence[str]] = None,
+    ) -> "TrendSeries":
+        """Series from parallel lists; None values become NaN."""
+        values = (
+            np.column_stack(
+                [np.asarray(column, dtype=np.float64) for column in columns]
+            )
+            if dates
+            else np.empty((0, len(columns)))
+        )
+        return cls(
+            to_datetime64(dates),
+            values,
+            np.asarray(statuses, dtype=object) if statuses is not None else None,
+        )
+
+    def __len__(self) -> int:
+        return int(self.dates.size)
+
+    def column(self, index: int = 0) -> np.ndarray:
+        return self.values[:, index]
+
+    def take(self, indices: np.ndarray) -> "TrendSeries":
+        return TrendSeries(
+            self.dates[indices],
+            self.values[indices],
+            self.statuses[indices] if self.statuses is not None else None,
+        )
+
+    def where(self, mask: np.ndarray) -> "TrendSeries":
+        return self.take(np.flatnonzero(mask))
+
+    def complete(self) -> "TrendSeries":
+        """Readings where every value column is present."""
+        return self.where(~np.isnan(self.values).any(axis=1))
+
+    def date_list(self) -> List[datetime]:
+        return self.dates.astype(DATETIME_DTYPE).tolist()
+
+    def value_list(self, index: int = 0) -> List[float]:
+        return self.column(index).tolist()
+
+    def monthly_means(self) -> "TrendSeries":
+        """
+        One point per calendar month: the mean of each column, dated at the
+        month's middle reading (in input order), with the month's last
+        status.
+        """
+        if not len(self):
+            return self
+        months = self.dates.astype("datetime64[M]")
+        order = np.argsort(months, kind="stable")
+        months = months[order]
+        starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        counts = np.diff(np.r_[starts, months.size])
+        values = self.values[order]
+        means = np.add.reduceat(values, starts, axis=0) / counts[:, None]
+        dates = self.dates[order][starts + counts // 2]
+        statuses = (
+            self.statuses[order][starts + counts - 1]
+            if self.statuses is not None
+            else None
+        )
+        return TrendSeries(dates, means, statuses)
+
+    def downsample(self, threshold: int) -> "TrendSeries":
+        """At most ``threshold`` readings, keeping the series' shape (LTTB)."""
+        if len(self) <= threshold:
+            return self
+        x = self.dates.astype("datetime64[us]").astype(np.int64)
+        return self.take(lttb_indices(x, self.values, threshold))
+
+
+def value_statistics(values: np.ndarray) -> Dict[str, Any]:
+    """Count, latest, average, min, max and trend direction of a value array."""
+    values = np.asarray(values, dtype=np.float64)
+    if not values.size:
+        return {}
+    return {
+        "count": int(values.size),
+        "latest": round(float(values[-1]), 2),
+        "average": round(float(values.sum()) / values.size, 2),
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "trend_direction": compute_trend_direction(values),
+    }
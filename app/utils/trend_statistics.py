@@ -4,18 +4,40 @@ Trend Statistics Utilities
 Shared statistical helpers for trend analysis across vitals and lab results.
 """
 
-from typing import List
+from typing import Sequence
 
+import numpy as np
 
-def compute_trend_direction(values: List[float]) -> str:
+
+def compute_trend_direction(values: Sequence[float]) -> str:
     """
     Determine trend direction using linear regression slope.
 
     Fits a least-squares line y = mx + b to the values (using index as x)
     and checks whether the total predicted change over the dataset is
-    meaningful relative to the data's range.
+    meaningful relative to the data's range. Accepts a list or a float
+    array.
+    """
+    if len(values) < 3:
+        return "stable"
+    y = np.asarray(values, dtype=np.float64)
+    return trend_direction_from_sums(
+        int(y.size),
+        float(y.sum()),
+        float(np.arange(y.size, dtype=np.float64) @ y),
+        float(y.min()),
+        float(y.max()),
+    )
+
+
+def trend_direction_from_sums(
+    n: int, sum_y: float, sum_xy: float, min_y: float, max_y: float
+) -> str:
+    """
+    compute_trend_direction from aggregates of the series: its length, sum,
+    sum of index * value, minimum and maximum. Lets callers aggregate in SQL
+    instead of loading every value.
     """
-    n = len(values)
     if n < 3:
         return "stable"
 
@@ -23,8 +45,6 @@ def compute_trend_direction(values: List[float]) -> str:
     # x values are 0, 1, 2, ..., n-1
     sum_x = n * (n - 1) / 2
     sum_x2 = n * (n - 1) * (2 * n - 1) / 6
-    sum_y = sum(values)
-    sum_xy = sum(i * v for i, v in enumerate(values))
 
     denominator = n * sum_x2 - sum_x * sum_x
     if abs(denominator) < 1e-10:
@@ -36,7 +56,7 @@ def compute_trend_direction(values: List[float]) -> str:
     total_change = slope * (n - 1)
 
     # Compare against the data range to determine significance
-    data_range = max(values) - min(values)
+    data_range = max_y - min_y
     avg = sum_y / n
 
     # Use whichever is larger as the baseline for comparison
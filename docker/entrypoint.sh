@@ -174,19 +174,29 @@ fi
 echo "Starting FastAPI server..."
 LOG_LEVEL_LOWER=$(echo "${LOG_LEVEL:-INFO}" | tr '[:upper:]' '[:lower:]')
 
+# Workers share SSO state, rate limits, scheduler leadership and cache
+# invalidations through the database, so more than one requires the database
+# state backend
+UVICORN_WORKERS="${UVICORN_WORKERS:-1}"
+if [ "$UVICORN_WORKERS" -gt 1 ] && [ "${STATE_BACKEND:-memory}" != "database" ]; then
+    echo "UVICORN_WORKERS=$UVICORN_WORKERS: using STATE_BACKEND=database (shared state across workers)"
+    export STATE_BACKEND=database
+fi
+echo "Starting $UVICORN_WORKERS worker(s)"
+
 if [ "$ENABLE_SSL" = "true" ]; then
     if [ -f "/app/certs/localhost.crt" ] && [ -f "/app/certs/localhost.key" ]; then
         echo "Starting with HTTPS on port 8000"
-        exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 1 --log-level "$LOG_LEVEL_LOWER" \
+        exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$UVICORN_WORKERS" --log-level "$LOG_LEVEL_LOWER" \
             --ssl-certfile /app/certs/localhost.crt --ssl-keyfile /app/certs/localhost.key
     else
         echo "HTTPS enabled but certificates not found at /app/certs/"
         echo "   Expected: /app/certs/localhost.crt and /app/certs/localhost.key"
         echo "   Falling back to HTTP mode"
         echo "Starting with HTTP on port 8000"
-        exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 1 --log-level "$LOG_LEVEL_LOWER"
+        exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$UVICORN_WORKERS" --log-level "$LOG_LEVEL_LOWER"
     fi
 else
     echo "Starting with HTTP on port 8000"
-    exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 1 --log-level "$LOG_LEVEL_LOWER"
+    exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$UVICORN_WORKERS" --log-level "$LOG_LEVEL_LOWER"
 fi
@@ -20,6 +20,11 @@ load_dotenv()
 sys.path.append(os.path.join(os.path.dirname(__file__), "app"))
 
 if __name__ == "__main__":
+    # Lets the Windows EXE start the report chart render workers
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+
     # Import and configure custom Uvicorn logging
     from app.core.config import settings
     from app.core.logging.config import get_logger
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Write-Endpoint Throughput Benchmark for Medical Records System
+
+Measures how audit logging affects write throughput. Sends POST
+/api/v1/medications/ in-process (httpx over ASGI) from several concurrent
+clients against a throwaway SQLite database and reports requests per second
+and latency percentiles for:
+
+    inline   - each request writes its activity log entry itself (commit +
+               refresh), as before the batched writer existed
+    batched  - entries go to ActivityLogWriter and are inserted in batches
+
+After the batched run the writer is flushed and the number of activity log
+rows is checked against the number of requests, so the benchmark also
+confirms no entries are lost. Exits non-zero if the batched mode is not at
+least --min-speedup times the inline throughput.
+
+Usage:
+    python scripts/benchmarks/activity_log_benchmark.py
+    python scripts/benchmarks/activity_log_benchmark.py --requests 5000 --concurrency 16
+
+Options:
+    --requests: Requests per mode (default: 1000)
+    --concurrency: Concurrent clients (default: 8)
+    --min-speedup: Required batched/inline throughput ratio (default: 1.0)
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+
+def seed():
+    """Create one user with an active patient; returns the username."""
+    from app.core.database.database import SessionLocal
+    from app.models.models import Patient, User
+
+    db = SessionLocal()
+    try:
+        user = User(
+            username="bench",
+            email="bench@example.com",
+            password_hash="x",
+            full_name="Benchmark User",
+            role="user",
+        )
+        db.add(user)
+        db.flush()
+        patient = Patient(
+            user_id=user.id,
+            owner_user_id=user.id,
+            first_name="Bench",
+            last_name="Mark",
+            birth_date=date(1980, 1, 1),
+        )
+        db.add(patient)
+        db.flush()
+        user.active_patient_id = patient.id
+        db.commit()
+        return user.username, patient.id
+    finally:
+        db.close()
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(headers, patient_id, requests, concurrency):
+    import httpx
+
+    from app.main import app
+
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client_loop(client):
+        for n in remaining:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/medications/",
+                json={
+                    "medication_name": f"Benchmark {n}",
+                    "dosage": "10mg daily",
+                    "status": "active",
+                    "patient_id": patient_id,
+                },
+                headers=headers,
+            )
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(c) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark write throughput with inline vs batched activity logging"
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--min-speedup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="activity-log-benchmark-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.core.database.database import Base, SessionLocal, engine
+    from app.core.utils.security import create_access_token
+    from app.models.activity_log import ActivityLog
+    from app.services.activity_log_writer import ActivityLogWriter
+
+    Base.metadata.create_all(bind=engine)
+    username, patient_id = seed()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': username})}"}
+
+    try:
+        print(
+            f"{'mode':<8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'batches':>8}"
+        )
+        throughput = {}
+        for mode in ("inline", "batched"):
+            writer = ActivityLogWriter.get_instance()
+            if mode == "batched":
+                writer.start()
+            latencies, seconds = asyncio.run(
+                measure(headers, patient_id, args.requests, args.concurrency)
+            )
+            stats = writer.stats()
+            writer.stop()
+            throughput[mode] = len(latencies) / seconds
+            print(
+                f"{mode:<8} {len(latencies):>9} {throughput[mode]:>8.0f} "
+                f"{statistics.median(latencies):>8.1f} "
+                f"{_percentile(latencies, 0.99):>8.1f} {stats['batches']:>8}"
+            )
+
+        db = SessionLocal()
+        try:
+            logged = db.query(ActivityLog).count()
+        finally:
+            db.close()
+        expected = 2 * args.requests
+        if logged != expected:
+            print(f"FAIL: {logged} activity log entries for {expected} requests")
+            sys.exit(1)
+
+        speedup = throughput["batched"] / throughput["inline"]
+        print(f"speedup: {speedup:.2f}x")
+        if speedup < args.min_speedup:
+            print(
+                f"FAIL: batched throughput is {speedup:.2f}x inline "
+                f"(required {args.min_speedup:.2f}x)"
+            )
+            sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
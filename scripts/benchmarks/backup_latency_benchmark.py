@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Backup API Latency Benchmark for Medical Records System
+
+Measures how a running files backup affects API responsiveness. Seeds a
+throwaway uploads directory with a mix of already-compressed files (PDF/JPEG
+stand-ins filled with random bytes) and compressible text, then polls
+GET /health in-process (httpx over ASGI) while a backup runs and reports
+request latency percentiles.
+
+Two modes are compared:
+    inline   - the archive is built on the event loop with every file
+               deflated, as BackupService did before archiving moved to a
+               worker thread
+    offloop  - BackupService.create_files_backup() (worker thread, streaming
+               checksum, compressed formats stored)
+
+Exits non-zero if the off-loop p99 exceeds --max-p99-ms, so the benchmark
+doubles as a regression check.
+
+Usage:
+    python scripts/benchmarks/backup_latency_benchmark.py
+    python scripts/benchmarks/backup_latency_benchmark.py --size-mb 1024
+
+Options:
+    --size-mb: Total size of the seeded uploads (default: 256)
+    --max-p99-ms: Allowed p99 /health latency during an off-loop backup (default: 100)
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+FILE_MB = 8
+
+
+def seed_uploads(uploads_dir: Path, size_mb: int) -> None:
+    """Write size_mb of uploads: 3/4 incompressible PDFs/JPEGs, 1/4 text."""
+    chunk = FILE_MB * 1024 * 1024
+    for n in range(max(1, size_mb // FILE_MB)):
+        if n % 4 == 3:
+            line = f"{n},2024-01-01T08:00:00,120,80,72,98.6,blood pressure reading\n"
+            (uploads_dir / f"vitals_{n}.csv").write_text(
+                line * (chunk // len(line)), encoding="utf-8"
+            )
+        else:
+            suffix = ".pdf" if n % 2 else ".jpg"
+            (uploads_dir / f"document_{n}{suffix}").write_bytes(os.urandom(chunk))
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(mode: str, backup_dir: Path):
+    import httpx
+
+    from app.core.config import settings
+    from app.core.database.database import SessionLocal
+    from app.main import app
+    from app.services.backup_archive import build_archive, collect_upload_entries
+    from app.services.backup_service import BackupService
+
+    latencies = []
+    done = asyncio.Event()
+
+    async def poll():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+    async def backup():
+        # Let the poller establish a baseline first
+        await asyncio.sleep(0.2)
+        try:
+            if mode == "inline":
+                build_archive(
+                    backup_dir / "inline_backup.zip",
+                    collect_upload_entries(settings.UPLOAD_DIR),
+                    compression="deflate",
+                )
+            else:
+                db = SessionLocal()
+                try:
+                    await BackupService(db).create_files_backup("benchmark")
+                finally:
+                    db.close()
+        finally:
+            done.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(poll(), backup())
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API latency during backups")
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--max-p99-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="backup-benchmark-"))
+    uploads_dir = work_dir / "uploads"
+    backup_dir = work_dir / "backups"
+    uploads_dir.mkdir()
+    os.environ["UPLOAD_DIR"] = str(uploads_dir)
+    os.environ["BACKUP_DIR"] = str(backup_dir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.core.database.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    seed_uploads(uploads_dir, args.size_mb)
+
+    try:
+        print(
+            f"{'mode':<8} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'max ms':>8} {'backup s':>9}"
+        )
+        results = {}
+        for mode in ("inline", "offloop"):
+            latencies, seconds = asyncio.run(measure(mode, backup_dir))
+            results[mode] = _percentile(latencies, 0.99)
+            print(
+                f"{mode:<8} {len(latencies):>9} {statistics.median(latencies):>8.1f} "
+                f"{results[mode]:>8.1f} {max(latencies):>8.1f} {seconds:>9.1f}"
+            )
+
+        if results["offloop"] > args.max_p99_ms:
+            print(
+                f"FAIL: p99 /health latency during an off-loop backup was "
+                f"{results['offloop']:.1f} ms (budget {args.max_p99_ms:.0f} ms)"
+            )
+            sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
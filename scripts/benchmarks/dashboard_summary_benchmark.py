@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Dashboard Summary Benchmark for Medical Records System
+
+Compares the record counts the dashboards used to compute (one COUNT query
+per record type, plus the practitioner and pharmacy lookups) against
+app.services.dashboard_summary: one statement, then the cache.
+
+Seeds a throwaway SQLite database with several patients holding N records
+each, then for the patient dashboard and the admin dashboard reports the
+queries issued and the median latency of:
+
+    legacy    - the per-model COUNT queries
+    single    - the single-statement summary, cache disabled
+    cached    - the summary served from the cache
+
+Usage:
+    python scripts/benchmarks/dashboard_summary_benchmark.py
+    python scripts/benchmarks/dashboard_summary_benchmark.py --records 100000
+
+Options:
+    --patients: Patients to seed (default: 20)
+    --records: Records per patient (default: 20000)
+    --repeat: Timed runs per mode; the median is reported (default: 20)
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Point the app at a throwaway database before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="dashboard-summary-benchmark-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models.models import (  # noqa: E402
+    Base,
+    Condition,
+    Encounter,
+    LabResult,
+    MedicalSpecialty,
+    Medication,
+    Patient,
+    Practitioner,
+    User,
+    Vitals,
+)
+from app.services import dashboard_summary  # noqa: E402
+
+
+def seed(db, patients, records):
+    """``patients`` patients, each with ``records`` records over five types."""
+    specialty = MedicalSpecialty(name="General Practice", is_active=True)
+    db.add(specialty)
+    db.flush()
+    practitioner = Practitioner(name="Dr. Bench", specialty_id=specialty.id)
+    db.add(practitioner)
+    db.flush()
+
+    patient_ids = []
+    for n in range(patients):
+        user = User(
+            username=f"bench{n}",
+            email=f"bench{n}@example.com",
+            password_hash="x",
+            full_name="Benchmark User",
+            role="user",
+        )
+        db.add(user)
+        db.flush()
+        patient = Patient(
+            user_id=user.id,
+            owner_user_id=user.id,
+            first_name="Bench",
+            last_name=str(n),
+            birth_date=date(1980, 1, 1),
+            physician_id=practitioner.id,
+        )
+        db.add(patient)
+        db.flush()
+        patient_ids.append(patient.id)
+    db.commit()
+
+    per_type = records // 5
+    start = date(2015, 1, 1)
+    for patient_id in patient_ids:
+        days = [start + timedelta(days=i % 4000) for i in range(per_type)]
+        tables = {
+            Medication: [
+                dict(
+                    patient_id=patient_id,
+                    medication_name="Lisinopril",
+                    status="active",
+                    practitioner_id=practitioner.id,
+                )
+                for _ in days
+            ],
+            LabResult: [
+                dict(patient_id=patient_id, test_name="CBC", status="completed")
+                for _ in days
+            ],
+            Condition: [
+                dict(patient_id=patient_id, diagnosis="Hypertension", status="active")
+                for _ in days
+            ],
+            Vitals: [
+                dict(
+                    patient_id=patient_id,
+                    recorded_date=datetime(day.year, day.month, day.day),
+                )
+                for day in days
+            ],
+            Encounter: [
+                dict(patient_id=patient_id, reason="Follow-up", date=day)
+                for day in days
+            ],
+        }
+        for model, rows in tables.items():
+            db.execute(insert(model.__table__), rows)
+        db.commit()
+    return patient_ids
+
+
+def legacy_patient_summary(db, patient_id):
+    """The per-model COUNTs ExportService.get_export_summary_by_patient_id ran."""
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    counts = {}
+    for name, model in dashboard_summary.PATIENT_COUNT_MODELS.items():
+        if model is not None:
+            counts[name] = (
+                db.query(model).filter(model.patient_id == patient.id).count()
+            )
+
+    practitioner_ids = {patient.physician_id} - {None}
+    for model in (Medication, Encounter, LabResult):
+        practitioner_ids.update(
+            pid
+            for (pid,) in db.query(model.practitioner_id)
+            .filter(model.patient_id == patient.id, model.practitioner_id.isnot(None))
+            .distinct()
+        )
+    counts["practitioners"] = len(practitioner_ids)
+    counts["pharmacies"] = (
+        db.query(Medication.pharmacy_id)
+        .filter(Medication.patient_id == patient.id, Medication.pharmacy_id.isnot(None))
+        .distinct()
+        .count()
+    )
+    return counts
+
+
+def legacy_global_summary(db):
+    """The per-model COUNTs the admin get_dashboard_stats ran."""
+    counts = {
+        name: db.query(model).count()
+        for name, model in dashboard_summary.GLOBAL_COUNT_MODELS.items()
+    }
+    counts["recent_registrations"] = (
+        db.query(User)
+        .filter(User.created_at >= datetime.utcnow() - timedelta(days=30))
+        .count()
+    )
+    counts["active_medications"] = (
+        db.query(Medication)
+        .filter(Medication.status.in_(["active", "current"]))
+        .count()
+    )
+    counts["pending_lab_results"] = (
+        db.query(LabResult).filter(LabResult.status == "pending").count()
+    )
+    return counts
+
+
+def _measure(fn, repeat, statements):
+    """Queries per call and median latency, after one warm-up call."""
+    timings = []
+    fn()
+    statements.clear()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return len(statements) // repeat, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard summaries")
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    cache = dashboard_summary.dashboard_summary_cache
+    try:
+        patient_ids = seed(db, args.patients, args.records)
+        patient_id = patient_ids[len(patient_ids) // 2]
+
+        single = dashboard_summary.get_patient_summary(db, patient_id)["counts"]
+        if single != legacy_patient_summary(db, patient_id):
+            print("warning: patient counts differ between legacy and single")
+
+        print(f"Database: {os.environ['DATABASE_URL']}")
+        print(f"{args.patients} patients x {args.records:,} records")
+        print(f"{'summary':<9} {'mode':<8} {'queries':>8} {'median ms':>10}")
+        for label, legacy, summary in (
+            (
+                "patient",
+                lambda: legacy_patient_summary(db, patient_id),
+                lambda: dashboard_summary.get_patient_summary(db, patient_id),
+            ),
+            (
+                "admin",
+                lambda: legacy_global_summary(db),
+                lambda: dashboard_summary.get_global_summary(db),
+            ),
+        ):
+            ttl = cache.ttl_seconds
+            cache.ttl_seconds = 0
+            results = {
+                "legacy": _measure(legacy, args.repeat, statements),
+                "single": _measure(summary, args.repeat, statements),
+            }
+            cache.ttl_seconds = ttl
+            cache.clear()
+            results["cached"] = _measure(summary, args.repeat, statements)
+            for mode, (queries, median_ms) in results.items():
+                print(f"{label:<9} {mode:<8} {queries:>8} {median_ms:>10.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
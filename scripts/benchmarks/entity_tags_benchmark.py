@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Entity Tags Benchmark for Medical Records System
+
+Compares tag queries as they used to run - expanding every record's JSON tags
+array (json_array_elements_text on PostgreSQL; json_each, its SQLite
+equivalent, here) - against the entity_tags index behind
+app.services.tag_service.
+
+Seeds a throwaway SQLite database with several patients holding N tagged
+medications and conditions each, then reports queries and median latency for:
+
+    search   - one patient's records tagged with two tags, any and all
+    popular  - tag usage counts across a user's patients
+    rename   - renaming a tag on one user's records (and back)
+
+Usage:
+    python scripts/benchmarks/entity_tags_benchmark.py
+    python scripts/benchmarks/entity_tags_benchmark.py --records 20000
+
+Options:
+    --patients: Patients to seed, one user each (default: 20)
+    --records: Records per patient, half medications, half conditions
+               (default: 5000)
+    --tags: Distinct tags in use (default: 200)
+    --repeat: Timed runs per mode; the median is reported (default: 5)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+# Point the app at a throwaway database before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="entity-tags-benchmark-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, event, insert, select, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models.models import (  # noqa: E402
+    Base,
+    Condition,
+    Medication,
+    Patient,
+    SearchIndexEntry,
+    User,
+)
+from app.services import entity_tags, search_index  # noqa: E402
+from app.services.tag_service import tag_service  # noqa: E402
+
+TYPES = {"medication": "medications", "condition": "conditions"}
+
+
+def seed(db, patients, records, tag_count):
+    """``patients`` users with one patient each, ``records`` records apiece."""
+    rng = random.Random(5)
+    pool = [f"tag-{n}" for n in range(tag_count)]
+    patient_ids = []
+    for n in range(patients):
+        user = User(
+            username=f"bench{n}",
+            email=f"bench{n}@example.com",
+            password_hash="x",
+            full_name="Benchmark User",
+            role="user",
+        )
+        db.add(user)
+        db.flush()
+        patient = Patient(
+            user_id=user.id,
+            owner_user_id=user.id,
+            first_name="Bench",
+            last_name=str(n),
+            birth_date=date(1980, 1, 1),
+        )
+        db.add(patient)
+        db.flush()
+        patient_ids.append((user.id, patient.id))
+    db.commit()
+
+    per_type = records // 2
+    for _, patient_id in patient_ids:
+        db.execute(
+            insert(Medication.__table__),
+            [
+                dict(
+                    patient_id=patient_id,
+                    medication_name="Lisinopril",
+                    status="active",
+                    tags=rng.sample(pool, rng.randint(0, 4)),
+                )
+                for _ in range(per_type)
+            ],
+        )
+        db.execute(
+            insert(Condition.__table__),
+            [
+                dict(
+                    patient_id=patient_id,
+                    diagnosis="Hypertension",
+                    status="active",
+                    tags=rng.sample(pool, rng.randint(0, 4)),
+                )
+                for _ in range(per_type)
+            ],
+        )
+        db.commit()
+    # Core inserts skip the mapper events that maintain the indexes
+    entity_tags.rebuild(db)
+    search_index.rebuild(db)
+    return patient_ids
+
+
+def legacy_search(db, tags, patient_id, match_all):
+    """The per-table EXISTS-over-the-array query the tag search ran."""
+    results = {}
+    params = {"patient_id": patient_id, "limit": 10}
+    conditions = []
+    for i, tag in enumerate(tags):
+        params[f"tag_{i}"] = tag
+        conditions.append(
+            f"EXISTS (SELECT 1 FROM json_each(tags) AS t WHERE t.value = :tag_{i})"
+        )
+    joiner = " AND " if match_all else " OR "
+    for entity_type, table_name in TYPES.items():
+        rows = db.execute(
+            text(
+                f"SELECT * FROM {table_name} "
+                f"WHERE tags IS NOT NULL AND ({joiner.join(conditions)}) "
+                "AND patient_id = :patient_id "
+                "ORDER BY created_at DESC LIMIT :limit"
+            ),
+            params,
+        ).fetchall()
+        results[entity_type] = [dict(row._mapping) for row in rows]
+    return results
+
+
+def legacy_popular(db, user_id):
+    """The UNION ALL of per-table array expansions the usage counts ran."""
+    usage = " UNION ALL ".join(
+        f"SELECT t.value AS tag, COUNT(*) AS usage_count, '{entity_type}' AS entity_type "
+        f"FROM {table_name}, json_each({table_name}.tags) AS t "
+        "WHERE tags IS NOT NULL "
+        "AND patient_id IN (SELECT id FROM patients WHERE user_id = :user_id) "
+        "GROUP BY t.value"
+        for entity_type, table_name in TYPES.items()
+    )
+    return db.execute(
+        text(
+            f"WITH usage_stats AS ({usage}) "
+            "SELECT ut.id, ut.tag, ut.color, COALESCE(SUM(us.usage_count), 0) AS total, "
+            "group_concat(DISTINCT us.entity_type) "
+            "FROM user_tags ut LEFT JOIN usage_stats us ON ut.tag = us.tag "
+            "GROUP BY ut.id, ut.tag, ut.color ORDER BY total DESC, ut.tag LIMIT 20"
+        ),
+        {"user_id": user_id},
+    ).fetchall()
+
+
+def legacy_reindex(db, user_id, tag):
+    """The search index refresh that followed: a substring scan of its tags."""
+    index_table = SearchIndexEntry.__table__
+    rows = db.execute(
+        select(index_table.c.record_type, index_table.c.record_id).where(
+            index_table.c.patient_id.in_(
+                select(Patient.id).where(Patient.user_id == user_id)
+            ),
+            index_table.c.tags.contains(tag.lower(), autoescape=True),
+        )
+    ).all()
+    ids_by_type = {}
+    for record_type, record_id in rows:
+        ids_by_type.setdefault(record_type, []).append(record_id)
+    for record_type, record_ids in ids_by_type.items():
+        model = search_index.SEARCH_RECORD_TYPES[record_type].model
+        objects = (
+            db.query(model).filter(model.id.in_(record_ids)).populate_existing().all()
+        )
+        search_index.index_records(db, objects)
+
+
+def legacy_rename(db, old_tag, new_tag, user_id):
+    """The per-table JSON-rewriting UPDATE the tag rename ran, and the reindex."""
+    for table_name in TYPES.values():
+        db.execute(
+            text(
+                f"UPDATE {table_name} SET tags = ("
+                "SELECT json_group_array(CASE WHEN t.value = :old_tag "
+                "THEN :new_tag ELSE t.value END) "
+                f"FROM json_each({table_name}.tags) AS t) "
+                "WHERE EXISTS (SELECT 1 FROM json_each(tags) AS t "
+                "WHERE t.value = :old_tag) "
+                "AND patient_id IN (SELECT id FROM patients WHERE user_id = :user_id)"
+            ),
+            {"old_tag": old_tag, "new_tag": new_tag, "user_id": user_id},
+        )
+    legacy_reindex(db, user_id, old_tag)
+    db.commit()
+
+
+def _measure(fn, repeat, statements):
+    """Queries per call and median latency, after one warm-up call."""
+    timings = []
+    fn()
+    statements.clear()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return len(statements) // repeat, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tag queries")
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        patient_ids = seed(db, args.patients, args.records, args.tags)
+        user_id, patient_id = patient_ids[0]
+        tag_service.sync_tags_from_records(db, user_id=user_id)
+        pair = ["tag-1", "tag-2"]
+
+        def rename_and_back(rename):
+            rename("tag-3", "tag-renamed")
+            rename("tag-renamed", "tag-3")
+
+        print(f"Database: {os.environ['DATABASE_URL']}")
+        print(
+            f"{args.patients * args.records:,} records, "
+            f"{db.query(entity_tags.EntityTag).count():,} entity_tags rows"
+        )
+        print(f"{'benchmark':<22} {'mode':<7} {'queries':>8} {'median ms':>10}")
+        for label, legacy, indexed in (
+            (
+                "search (any)",
+                lambda: legacy_search(db, pair, patient_id, False),
+                lambda: tag_service.search_across_entities_by_tags(
+                    db, tags=pair, entity_types=list(TYPES), patient_id=patient_id
+                ),
+            ),
+            (
+                "search (all)",
+                lambda: legacy_search(db, pair, patient_id, True),
+                lambda: tag_service.search_across_entities_by_tags(
+                    db,
+                    tags=pair,
+                    entity_types=list(TYPES),
+                    match_mode="all",
+                    patient_id=patient_id,
+                ),
+            ),
+            (
+                "popular",
+                lambda: legacy_popular(db, user_id),
+                lambda: tag_service.get_popular_tags_across_entities(
+                    db, entity_types=list(TYPES), user_id=user_id
+                ),
+            ),
+            (
+                "rename (and back)",
+                lambda: rename_and_back(
+                    lambda old, new: legacy_rename(db, old, new, user_id)
+                ),
+                lambda: rename_and_back(
+                    lambda old, new: tag_service.rename_tag_across_entities(
+                        db, old_tag=old, new_tag=new, user_id=user_id
+                    )
+                ),
+            ),
+        ):
+            for mode, fn in (("legacy", legacy), ("index", indexed)):
+                queries, median_ms = _measure(fn, args.repeat, statements)
+                print(f"{label:<22} {mode:<7} {queries:>8} {median_ms:>10.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
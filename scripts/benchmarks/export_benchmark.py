@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Export Memory Benchmark for Medical Records System
+
+Compares peak memory of the in-memory patient export (export_patient_data()
+followed by json.dumps / convert_to_csv, as /api/v1/export/data does for small
+scopes) against the streaming path (ExportService.stream_patient_data()).
+
+Seeds a throwaway SQLite database with one patient holding N vitals readings
+(CGM-style, one every five minutes), then runs each export in a fresh child
+process and reports the growth in peak RSS over the child's post-import
+baseline. Exits non-zero if any streamed export grows by more than
+--max-stream-mb, so the benchmark doubles as a regression check.
+
+Usage:
+    python scripts/benchmarks/export_benchmark.py
+    python scripts/benchmarks/export_benchmark.py --sizes 100000 500000 --formats csv
+
+Options:
+    --sizes: Vitals readings per patient to benchmark (default: 50000 200000)
+    --formats: Export formats to compare (default: json csv)
+    --max-stream-mb: Allowed peak RSS growth for a streamed export (default: 64)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+
+def _peak_rss_mb():
+    import resource
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(database_url, readings):
+    """Create one user/patient with ``readings`` vitals rows; returns the user id."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.models.models import Base, Patient, User, Vitals
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = User(
+            username="bench",
+            email="bench@example.com",
+            password_hash="x",
+            full_name="Benchmark User",
+            role="user",
+        )
+        db.add(user)
+        db.flush()
+        patient = Patient(
+            user_id=user.id,
+            owner_user_id=user.id,
+            first_name="Bench",
+            last_name="Mark",
+            birth_date=datetime(1980, 1, 1).date(),
+        )
+        db.add(patient)
+        db.flush()
+        user.active_patient_id = patient.id
+        db.commit()
+
+        start = datetime(2020, 1, 1)
+        batch = []
+        for n in range(readings):
+            batch.append(
+                dict(
+                    patient_id=patient.id,
+                    recorded_date=start + timedelta(minutes=5 * n),
+                    blood_glucose=80 + (n * 7) % 120,
+                    glucose_context="cgm",
+                    import_source="dexcom_clarity",
+                    device_used="Dexcom G7",
+                )
+            )
+            if len(batch) >= 10000:
+                db.execute(insert(Vitals.__table__), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Vitals.__table__), batch)
+        db.commit()
+        return user.id
+
+
+def run_export(mode, export_format, user_id):
+    """Child process body: run one export and print '<peak MB> <seconds> <bytes>'."""
+    import asyncio
+    import json
+
+    from app.core.database.database import SessionLocal
+    from app.services.export_service import ExportService
+
+    db = SessionLocal()
+    service = ExportService(db)
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+
+    if mode == "streamed":
+        size = 0
+        for chunk in service.stream_patient_data(
+            user_id=user_id, format=export_format, scope="all"
+        ):
+            size += len(chunk.encode("utf-8"))
+    else:
+        export_data = asyncio.run(
+            service.export_patient_data(
+                user_id=user_id, format=export_format, scope="all"
+            )
+        )
+        if export_format == "csv":
+            content = "\ufeff" + service.convert_to_csv(export_data, "all")
+        else:
+            content = json.dumps(export_data, default=str, indent=2)
+        size = len(content.encode("utf-8"))
+
+    elapsed = time.perf_counter() - started
+    db.close()
+    print(f"{_peak_rss_mb() - baseline:.1f} {elapsed:.2f} {size}")
+
+
+def _measure(database_url, mode, export_format, user_id):
+    output = subprocess.run(
+        [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--child",
+            mode,
+            "--format",
+            export_format,
+            "--user-id",
+            str(user_id),
+        ],
+        env={**os.environ, "DATABASE_URL": database_url},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    peak_mb, seconds, size = output[-3:]
+    return float(peak_mb), float(seconds), int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark patient export memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50000, 200000])
+    parser.add_argument(
+        "--formats", nargs="+", choices=["json", "csv"], default=["json", "csv"]
+    )
+    parser.add_argument("--max-stream-mb", type=float, default=64.0)
+    parser.add_argument("--child", choices=["materialized", "streamed"])
+    parser.add_argument("--format", choices=["json", "csv"])
+    parser.add_argument("--user-id", type=int)
+    args = parser.parse_args()
+
+    if args.child:
+        run_export(args.child, args.format, args.user_id)
+        return
+
+    print(
+        f"{'readings':>9}  {'format':<6} {'in-memory MB':>13} {'streamed MB':>12} "
+        f"{'in-memory s':>12} {'streamed s':>11} {'output MB':>10}"
+    )
+    over_budget = []
+    for size in args.sizes:
+        db_dir = tempfile.mkdtemp(prefix="export-benchmark-")
+        database_url = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+        user_id = seed(database_url, size)
+        for export_format in args.formats:
+            full_mb, full_s, _ = _measure(
+                database_url, "materialized", export_format, user_id
+            )
+            stream_mb, stream_s, stream_bytes = _measure(
+                database_url, "streamed", export_format, user_id
+            )
+            print(
+                f"{size:>9,}  {export_format:<6} {full_mb:>13.1f} {stream_mb:>12.1f} "
+                f"{full_s:>12.2f} {stream_s:>11.2f} {stream_bytes / 2**20:>10.1f}"
+            )
+            if stream_mb > args.max_stream_mb:
+                over_budget.append((size, export_format, stream_mb))
+
+    for size, export_format, stream_mb in over_budget:
+        print(
+            f"FAIL: streamed {export_format} export of {size:,} readings grew peak "
+            f"RSS by {stream_mb:.1f} MB (budget {args.max_stream_mb:.0f} MB)"
+        )
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+PDF Extraction Latency Benchmark for Medical Records System
+
+Measures how extracting an uploaded lab PDF affects the event loop. Builds a
+text-heavy multi-page lab report with reportlab, then extracts it while a
+probe coroutine wakes every 5 ms and records how late each wake-up was
+(event-loop lag, what every other request waiting on the loop experiences).
+
+Three modes are compared:
+    inline  - PDFTextExtractionService.extract_text() called on the event
+              loop, as the OCR parse endpoint did before extraction moved off
+              the loop
+    pool    - PDFExtractionEngine.extract() (worker process, cache disabled)
+    cached  - PDFExtractionEngine.extract() on a PDF it has already extracted
+
+Scanned PDFs (OCR) aren't generated here — they need Tesseract and Poppler —
+but run through the same pool, so their loop lag matches the pool mode.
+
+Exits non-zero if the pool mode's p99 lag exceeds --max-p99-ms, so the
+benchmark doubles as a regression check.
+
+Usage:
+    python scripts/benchmarks/pdf_extraction_benchmark.py
+    python scripts/benchmarks/pdf_extraction_benchmark.py --pages 60
+
+Options:
+    --pages: Pages in the generated report (default: 30)
+    --max-p99-ms: Allowed p99 event-loop lag while the pool extracts (default: 50)
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+PROBE_INTERVAL = 0.005
+ROWS_PER_PAGE = 45
+
+
+def build_report(pages: int) -> bytes:
+    """A lab report with a table of results on every page."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(pages):
+        pdf.setFont("Helvetica", 9)
+        pdf.drawString(40, 760, f"Laboratory Report  Page {page + 1} of {pages}")
+        for row in range(ROWS_PER_PAGE):
+            y = 730 - row * 15
+            value = 3.4 + (page * ROWS_PER_PAGE + row) % 70 / 10
+            pdf.drawString(40, y, f"Analyte {page}-{row}")
+            pdf.drawString(220, y, f"{value:.1f}")
+            pdf.drawString(300, y, "x10E3/uL")
+            pdf.drawString(400, y, "3.4-10.8")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def measure(mode: str, pdf_bytes: bytes, engine):
+    from app.services.pdf_text_extraction_service import pdf_extraction_service
+
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+    async def extract():
+        # Let the probe establish a baseline first
+        await asyncio.sleep(0.1)
+        try:
+            if mode == "inline":
+                return pdf_extraction_service.extract_text(pdf_bytes, "report.pdf")
+            return await engine.extract(pdf_bytes, "report.pdf")
+        finally:
+            done.set()
+
+    started = time.perf_counter()
+    _, result = await asyncio.gather(probe(), extract())
+    return lags, time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark event-loop lag during PDF extraction"
+    )
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--max-p99-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="pdf-extraction-benchmark-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.services.pdf_extraction_engine import PDFExtractionEngine
+
+    pdf_bytes = build_report(args.pages)
+    pool = PDFExtractionEngine(workers=1, cache_max_bytes=0)
+    cached = PDFExtractionEngine(
+        workers=1, cache_dir=work_dir / "cache", cache_max_bytes=64 * 1024 * 1024
+    )
+
+    try:
+        # Warm up: start the worker processes and fill the cache
+        asyncio.run(pool.extract(build_report(1), "warmup.pdf"))
+        asyncio.run(cached.extract(pdf_bytes, "report.pdf"))
+
+        print(
+            f"{'mode':<8} {'probes':>7} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'max ms':>8} {'extract s':>10} {'method':>16}"
+        )
+        results = {}
+        for mode, engine in (("inline", None), ("pool", pool), ("cached", cached)):
+            lags, seconds, result = asyncio.run(measure(mode, pdf_bytes, engine))
+            results[mode] = _percentile(lags, 0.99)
+            print(
+                f"{mode:<8} {len(lags):>7} {statistics.median(lags):>8.1f} "
+                f"{results[mode]:>8.1f} {max(lags):>8.1f} {seconds:>10.2f} "
+                f"{result['method']:>16}"
+            )
+
+        if results["pool"] > args.max_p99_ms:
+            print(
+                f"FAIL: p99 event-loop lag during pooled extraction was "
+                f"{results['pool']:.1f} ms (budget {args.max_p99_ms:.0f} ms)"
+            )
+            sys.exit(1)
+    finally:
+        pool.shutdown()
+        cached.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Custom Report PDF Benchmark for Medical Records System
+
+Measures time-to-first-byte of a custom report PDF: the time from creating
+the report generator, as CustomReportService does for every request, until
+the PDF bytes are available. The report is a typical multi-section one
+(medications, conditions, lab results, immunizations, allergies, encounters)
+sized to about --pages pages.
+
+    cold  - the shared rendering context is dropped before every report, so
+            each one registers the fonts and builds its stylesheet, as every
+            report did before the context existed
+    warm  - reports share the process-wide context, warmed up once the way
+            application startup does
+
+A CJK report is included with --language zh, which also pays for the CJK
+font collection when cold (if one is installed).
+
+Usage:
+    python scripts/benchmarks/pdf_report_benchmark.py
+    python scripts/benchmarks/pdf_report_benchmark.py --runs 10 --pages 40 --language zh
+
+Options:
+    --runs: Reports per mode (default: 10)
+    --pages: Approximate report length in pages (default: 20)
+    --language: Report language (default: en)
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+# Records per category per page, roughly, for the report built below
+RECORDS_PER_PAGE = 1.1
+
+# Page objects in ReportLab's uncompressed PDF object table
+PAGE_OBJECT_RE = re.compile(rb"/Type /Page\b(?!s)")
+
+
+def build_report(pages, language):
+    """Report data for a report of about ``pages`` pages."""
+    per_category = max(1, int(pages * RECORDS_PER_PAGE))
+    start = date(2018, 1, 1)
+
+    def day(n):
+        return (start + timedelta(days=37 * n)).isoformat()
+
+    data = {
+        "medications": [
+            {
+                "medication_name": f"Medication {n}",
+                "dosage": f"{10 * (n % 5 + 1)} mg",
+                "frequency": "twice daily",
+                "route": "oral",
+                "medication_type": "prescription",
+                "indication": "Long-term management of a chronic condition",
+                "status": "active" if n % 3 else "stopped",
+                "effective_period_start": day(n),
+                "practitioner_name": "Dr. Example",
+                "notes": "Take with food. Monitor blood pressure weekly.",
+            }
+            for n in range(per_category)
+        ],
+        "conditions": [
+            {
+                "condition_name": f"Condition {n}",
+                "diagnosis": "Diagnosed during routine examination",
+                "severity": ("mild", "moderate", "severe")[n % 3],
+                "status": "active",
+                "onset_date": day(n),
+                "notes": "Follow-up every six months.",
+            }
+            for n in range(per_category)
+        ],
+        "lab_results": [
+            {
+                "test_name": f"Metabolic Panel {n}",
+                "test_category": "chemistry",
+                "status": "completed",
+                "ordered_date": day(n),
+                "completed_date": day(n),
+                "facility": "General Hospital Laboratory",
+                "labs_result": "normal",
+                "notes": "Fasting sample.",
+            }
+            for n in range(per_category)
+        ],
+        "immunizations": [
+            {
+                "vaccine_name": f"Vaccine {n}",
+                "date_administered": day(n),
+                "dose_number": n % 3 + 1,
+                "manufacturer": "Example Pharma",
+                "location": "Left arm",
+                "notes": "No reaction.",
+            }
+            for n in range(per_category)
+        ],
+        "allergies": [
+            {
+                "allergen": f"Allergen {n}",
+                "severity": ("mild", "moderate", "severe")[n % 3],
+                "reaction": "Hives",
+                "status": "active",
+                "onset_date": day(n),
+            }
+            for n in range(per_category)
+        ],
+        "encounters": [
+            {
+                "reason": f"Follow-up visit {n}",
+                "date": day(n),
+                "visit_type": "routine",
+                "practitioner_name": "Dr. Example",
+                "diagnosis": "Stable",
+                "notes": "Continue current treatment plan.",
+            }
+            for n in range(per_category)
+        ],
+    }
+    return {
+        "report_title": "Medical Summary Report",
+        "language": language,
+        "date_format": "mdy",
+        "unit_system": "imperial",
+        "patient": {
+            "first_name": "Bench",
+            "last_name": "Mark",
+            "birth_date": "1980-01-01",
+        },
+        "data": data,
+    }
+
+
+def time_report(report, cold):
+    """
+    Seconds spent setting up the generator and until the PDF bytes are
+    available, and the PDF size.
+    """
+    from app.services.custom_report_pdf_generator import CustomReportPDFGenerator
+    from app.services.pdf_rendering_context import PDFRenderingContext
+
+    if cold:
+        PDFRenderingContext.reset_instance()
+    started = time.perf_counter()
+    generator = CustomReportPDFGenerator()
+    set_up = time.perf_counter()
+    pdf = asyncio.run(generator.generate_pdf(report))
+    finished = time.perf_counter()
+    return set_up - started, finished - started, len(pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark custom report PDFs")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    # Imports pull in app settings; point them at a throwaway database
+    db_dir = tempfile.mkdtemp(prefix="pdf-benchmark-")
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    )
+    from app.services.custom_report_pdf_generator import CustomReportPDFGenerator
+    from app.services.pdf_rendering_context import PDFRenderingContext
+
+    report = build_report(args.pages, args.language)
+
+    results = {}
+    for mode in ("cold", "warm"):
+        if mode == "warm":
+            PDFRenderingContext.reset_instance()
+            PDFRenderingContext.get_instance().warmup((args.language,))
+        setups, timings = [], []
+        for _ in range(args.runs):
+            setup, seconds, size = time_report(report, cold=(mode == "cold"))
+            setups.append(setup)
+            timings.append(seconds)
+        results[mode] = (setups, timings, size)
+
+    pdf = asyncio.run(CustomReportPDFGenerator().generate_pdf(report))
+    page_count = len(PAGE_OBJECT_RE.findall(pdf))
+
+    print(f"report: {page_count} pages, language {args.language}, {args.runs} runs")
+    print(
+        f"{'mode':<6} {'setup ms':>9} {'TTFB median ms':>15} {'TTFB p95 ms':>12} "
+        f"{'KB':>7}"
+    )
+    for mode, (setups, timings, size) in results.items():
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"{mode:<6} {statistics.median(setups) * 1000:>9.1f} "
+            f"{statistics.median(timings) * 1000:>15.1f} "
+            f"{p95 * 1000:>12.1f} {size / 1024:>7.1f}"
+        )
+    cold = statistics.median(results["cold"][1])
+    warm = statistics.median(results["warm"][1])
+    print(f"warm saves {(cold - warm) * 1000:.1f} ms per report ({cold / warm:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
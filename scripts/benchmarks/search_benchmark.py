@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Search Latency Benchmark for Medical Records System
+
+Compares the per-type search that /api/v1/search used to run (one windowed
+LIKE query per record type, each with a correlated json_each tag EXISTS)
+against the single indexed query in app.services.search_index.
+
+Seeds a throwaway SQLite database with one patient holding N records spread
+across the searchable types, builds the search index, then times both paths
+for a handful of representative queries.
+
+Usage:
+    python scripts/benchmarks/search_benchmark.py
+    python scripts/benchmarks/search_benchmark.py --sizes 10000 100000 --repeat 10
+
+Options:
+    --sizes: Records per patient to benchmark (default: 10000 100000)
+    --repeat: Timed runs per query; the median is reported (default: 5)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Point the app at a throwaway database before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="search-benchmark-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, event, func, insert, or_, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models.models import (  # noqa: E402
+    Allergy,
+    Base,
+    Condition,
+    LabResult,
+    Medication,
+    Patient,
+    Procedure,
+    Treatment,
+    User,
+)
+from app.services import search_index  # noqa: E402
+
+QUERIES = ["lisinopril", "pain", "follow", "zz-no-match"]
+SEARCH_TYPES = [
+    "medications",
+    "conditions",
+    "lab_results",
+    "procedures",
+    "treatments",
+    "allergies",
+]
+WORDS = [
+    "lisinopril", "metformin", "atorvastatin", "ibuprofen", "hypertension",
+    "diabetes", "asthma", "migraine", "chronic", "acute", "pain", "follow-up",
+    "routine", "panel", "screening", "therapy", "daily", "morning", "severe",
+    "mild", "rash", "swelling", "review", "stable", "improving",
+]
+TAGS = ["cardio", "chronic", "pain", "follow-up", "annual", "urgent"]
+# Filler vocabulary so the clinical WORDS above match a realistic slice of
+# records rather than nearly all of them
+FILLER = [f"word{n:04d}" for n in range(5000)]
+CLINICAL_WORD_RATE = 0.1
+
+
+def _text(rng, n):
+    return " ".join(
+        rng.choice(WORDS) if rng.random() < CLINICAL_WORD_RATE else rng.choice(FILLER)
+        for _ in range(n)
+    )
+
+
+def _rows(spec_key, patient_id, count, rng):
+    """Generate ``count`` core-insert rows for one record type."""
+    base = date(2015, 1, 1)
+    for _ in range(count):
+        day = base + timedelta(days=rng.randrange(4000))
+        tags = rng.sample(TAGS, rng.randrange(3))
+        if spec_key == "medications":
+            yield dict(patient_id=patient_id, medication_name=_text(rng, 2),
+                       dosage="10mg", indication=_text(rng, 4),
+                       effective_period_start=day, status="active", tags=tags)
+        elif spec_key == "conditions":
+            yield dict(patient_id=patient_id, condition_name=_text(rng, 2),
+                       diagnosis=_text(rng, 3), notes=_text(rng, 8),
+                       onset_date=day, status="active", tags=tags)
+        elif spec_key == "lab_results":
+            yield dict(patient_id=patient_id, test_name=_text(rng, 2),
+                       labs_result="normal", notes=_text(rng, 8),
+                       completed_date=day, status="completed", tags=tags)
+        elif spec_key == "procedures":
+            yield dict(patient_id=patient_id, procedure_name=_text(rng, 2),
+                       description=_text(rng, 6), notes=_text(rng, 6),
+                       date=day, status="completed", tags=tags)
+        elif spec_key == "treatments":
+            yield dict(patient_id=patient_id, treatment_name=_text(rng, 2),
+                       treatment_type=_text(rng, 1), description=_text(rng, 6),
+                       notes=_text(rng, 6), start_date=day, status="active",
+                       tags=tags)
+        elif spec_key == "allergies":
+            yield dict(patient_id=patient_id, allergen=_text(rng, 1),
+                       reaction=_text(rng, 2), notes=_text(rng, 6),
+                       onset_date=day, status="active", tags=tags)
+
+
+def seed(db, records_per_patient, rng):
+    """Create one user/patient with ``records_per_patient`` records."""
+    user = User(
+        username=f"bench{records_per_patient}",
+        email=f"bench{records_per_patient}@example.com",
+        password_hash="x",
+        full_name="Benchmark User",
+        role="user",
+    )
+    db.add(user)
+    db.flush()
+    patient = Patient(
+        user_id=user.id,
+        owner_user_id=user.id,
+        first_name="Bench",
+        last_name="Mark",
+        birth_date=date(1980, 1, 1),
+    )
+    db.add(patient)
+    db.commit()
+
+    per_type = records_per_patient // len(SEARCH_TYPES)
+    for key in SEARCH_TYPES:
+        model = search_index.SEARCH_RECORD_TYPES[key].model
+        batch = []
+        for row in _rows(key, patient.id, per_type, rng):
+            batch.append(row)
+            if len(batch) >= 5000:
+                db.execute(insert(model.__table__), batch)
+                batch = []
+        if batch:
+            db.execute(insert(model.__table__), batch)
+        db.commit()
+
+    started = time.perf_counter()
+    search_index.rebuild(db, patient_id=patient.id)
+    return patient.id, time.perf_counter() - started
+
+
+def legacy_search(db, patient_id, query, limit=20):
+    """The pre-index endpoint: one LIKE + tag EXISTS query per record type."""
+    query_lower = query.lower()
+    results = {}
+    for key in SEARCH_TYPES:
+        spec = search_index.SEARCH_RECORD_TYPES[key]
+        model = spec.model
+        columns = [spec.title_field, *spec.body_fields]
+        tag_filter = text(
+            f'EXISTS (SELECT 1 FROM json_each("{model.__tablename__}"."tags") '
+            "WHERE lower(json_each.value) LIKE '%' || :_tag_q || '%')"
+        ).bindparams(_tag_q=query_lower)
+        rows = (
+            db.query(model, func.count(model.id).over())
+            .filter(model.patient_id == patient_id)
+            .filter(
+                or_(
+                    *[
+                        func.lower(getattr(model, column)).contains(query_lower)
+                        for column in columns
+                    ],
+                    tag_filter,
+                )
+            )
+            .order_by(getattr(model, spec.date_field).desc())
+            .limit(limit)
+            .all()
+        )
+        results[key] = rows[0][1] if rows else 0
+    return results
+
+
+def indexed_search(db, patient_id, query, limit=20):
+    groups = search_index.search(
+        db,
+        patient_id=patient_id,
+        query=query,
+        record_types=SEARCH_TYPES,
+        sort="relevance",
+        limit=limit,
+    )
+    return {key: group.count for key, group in groups.items()}
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark patient search latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    rng = random.Random(42)
+
+    print(f"Database: {os.environ['DATABASE_URL']}")
+    print(f"{'records':>9}  {'query':<12} {'legacy ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        db = Session()
+        try:
+            patient_id, build_seconds = seed(db, size, rng)
+            for query in QUERIES:
+                legacy = legacy_search(db, patient_id, query)
+                indexed = indexed_search(db, patient_id, query)
+                if legacy != indexed:
+                    print(f"  warning: counts differ for {query!r}: {legacy} vs {indexed}")
+
+                legacy_ms = _median_ms(
+                    lambda: legacy_search(db, patient_id, query), args.repeat
+                )
+                indexed_ms = _median_ms(
+                    lambda: indexed_search(db, patient_id, query), args.repeat
+                )
+                print(
+                    f"{size:>9,}  {query:<12} {legacy_ms:>10.1f} {indexed_ms:>11.1f} "
+                    f"{legacy_ms / indexed_ms:>7.1f}x"
+                )
+            print(f"{size:>9,}  index build: {build_seconds:.1f}s")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Standardized Test Index Benchmark for Medical Records System
+
+Compares standardized test search as it used to run - a SQL query of LIKE
+conditions and a CASE relevance score per keystroke, and two queries per name
+in batch matching - against app.services.standardized_test_index.
+
+Seeds a throwaway SQLite database with the shared test library
+(shared/data/test_library.json) plus synthetic LOINC-style tests up to
+--tests, then reports queries and median latency for:
+
+    autocomplete - one search per prefix of a few typed test names
+    batch match  - resolving --batch names (library names, aliases, typos)
+
+Usage:
+    python scripts/benchmarks/standardized_test_index_benchmark.py
+    python scripts/benchmarks/standardized_test_index_benchmark.py --tests 20000
+
+Options:
+    --tests: Catalogue size (default: 5000)
+    --batch: Names per batch match (default: 500)
+    --repeat: Timed runs per mode; the median is reported (default: 5)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Point the app at a throwaway database before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="standardized-test-index-benchmark-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import case, create_engine, event, func, or_  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.crud import standardized_test  # noqa: E402
+from app.crud._search_helpers import json_array_text_contains  # noqa: E402
+from app.models.models import Base, StandardizedTest  # noqa: E402
+from app.services.standardized_test_index import StandardizedTestIndex  # noqa: E402
+
+LIBRARY_PATH = os.path.join(project_root, "shared", "data", "test_library.json")
+SPECIMENS = ["Serum or Plasma", "Blood", "Urine", "Cerebral spinal fluid"]
+PROPERTIES = ["Mass/volume", "Moles/volume", "#/volume", "Presence"]
+TYPED = ["hemoglobin a1c", "cholesterol", "tsh", "vitamin d", "wbc"]
+
+
+def seed(db, total):
+    """The shared test library plus synthetic tests, ``total`` in all."""
+    with open(LIBRARY_PATH, encoding="utf-8") as f:
+        library = json.load(f)["tests"]
+
+    rows = [
+        {
+            "loinc_code": test.get("test_code"),
+            "test_name": test["test_name"],
+            "short_name": test.get("abbreviation"),
+            "default_unit": test.get("default_unit"),
+            "category": test.get("category"),
+            "common_names": test.get("common_names"),
+            "is_common": bool(test.get("is_common")),
+            "display_order": test.get("display_order"),
+        }
+        for test in library
+    ]
+    codes = {row["loinc_code"] for row in rows}
+    rng = random.Random(7)
+    n = 0
+    while len(rows) < total:
+        n += 1
+        code = f"{90000 + n}-{n % 10}"
+        if code in codes:
+            continue
+        base = rng.choice(library)
+        rows.append(
+            {
+                "loinc_code": code,
+                "test_name": f"{base['test_name']} [{rng.choice(PROPERTIES)}] "
+                f"in {rng.choice(SPECIMENS)} #{n}",
+                "short_name": None,
+                "default_unit": base.get("default_unit"),
+                "category": base.get("category"),
+                "common_names": None,
+                "is_common": False,
+                "display_order": None,
+            }
+        )
+    standardized_test.bulk_create_tests(db, rows)
+    return library
+
+
+def legacy_search(db, query, category=None, limit=200):
+    """The SQL search StandardizedTestCRUD.search_tests ran per keystroke."""
+    search_term = query.strip().lower()
+    name = func.lower(StandardizedTest.test_name)
+    short = func.lower(StandardizedTest.short_name)
+    loinc = func.lower(StandardizedTest.loinc_code)
+    q = db.query(StandardizedTest)
+    if category:
+        q = q.filter(StandardizedTest.category == category)
+    conditions = [
+        name == search_term,
+        short == search_term,
+        loinc == search_term,
+        json_array_text_contains(StandardizedTest.common_names, search_term),
+    ]
+    for column in (name, short, loinc):
+        conditions.append(column.startswith(search_term, autoescape=True))
+        conditions.append(column.contains(search_term, autoescape=True))
+    q = q.filter(or_(*conditions))
+    relevance = case(
+        (name == search_term, 1),
+        (short == search_term, 1),
+        (loinc == search_term, 1),
+        (json_array_text_contains(StandardizedTest.common_names, search_term), 2),
+        (name.startswith(search_term, autoescape=True), 3),
+        (short.startswith(search_term, autoescape=True), 3),
+        (loinc.startswith(search_term, autoescape=True), 3),
+        else_=4,
+    )
+    q = q.order_by(
+        relevance.asc(), StandardizedTest.is_common.desc(), StandardizedTest.test_name
+    )
+    return q.limit(limit).all()
+
+
+def legacy_match(db, names):
+    """The per-name lookups batch_match_tests ran."""
+    matches = []
+    for test_name in names:
+        matched = standardized_test.get_test_by_name(db, test_name)
+        if not matched:
+            found = legacy_search(db, test_name, limit=1)
+            matched = found[0] if found else None
+        matches.append(matched)
+    return matches
+
+
+def batch_names(library, size):
+    """Library names, aliases, case variants and misses, ``size`` in all."""
+    rng = random.Random(11)
+    pool = []
+    for test in library:
+        pool.append(test["test_name"])
+        pool.append(test["test_name"].upper())
+        pool.extend(test.get("common_names") or [])
+    pool += ["Unknown Panel", "Misc Result", "Comment"]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def _measure(fn, repeat, statements):
+    """Queries per call and median latency, after one warm-up call."""
+    timings = []
+    fn()
+    statements.clear()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return len(statements) // repeat, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark standardized test search")
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    index = StandardizedTestIndex.get_instance()
+    try:
+        library = seed(db, args.tests)
+        started = time.perf_counter()
+        index.rebuild(db)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        keystrokes = [word[:n] for word in TYPED for n in range(1, len(word) + 1)]
+        names = batch_names(library, args.batch)
+
+        print(f"Database: {os.environ['DATABASE_URL']}")
+        print(f"{len(index):,} tests, index built in {build_ms:.1f} ms")
+        print(f"{'benchmark':<26} {'mode':<7} {'queries':>8} {'median ms':>10}")
+        for label, legacy, indexed, per in (
+            (
+                "autocomplete (per key)",
+                lambda: [legacy_search(db, q, limit=50) for q in keystrokes],
+                lambda: [index.search(db, q, limit=50) for q in keystrokes],
+                len(keystrokes),
+            ),
+            (
+                f"batch match ({args.batch} names)",
+                lambda: legacy_match(db, names),
+                lambda: index.match(db, names),
+                1,
+            ),
+        ):
+            for mode, fn in (("legacy", legacy), ("index", indexed)):
+                queries, median_ms = _measure(fn, args.repeat, statements)
+                print(
+                    f"{label:<26} {mode:<7} {queries // per:>8} "
+                    f"{median_ms / per:>10.3f}"
+                )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
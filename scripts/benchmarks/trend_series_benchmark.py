@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Trend Series Benchmark for Medical Records System
+
+Microbenchmarks the trend chart pipeline's per-point work on synthetic
+CGM-like series (a glucose reading every 5 minutes), comparing the plain
+Python list implementations it replaced with the array-backed TrendSeries:
+
+    statistics  - count/latest/average/min/max and trend direction
+    monthly     - monthly-mean downsampling above MAX_RAW_DATA_POINTS
+    plotted     - points the chart draws: every reading up to
+                  MAX_PLOTTED_POINTS, LTTB-thinned up to MAX_RAW_DATA_POINTS
+                  (previously all of them), monthly means above that
+    chart       - rendering the PNG with the current chart generator
+
+Usage:
+    python scripts/benchmarks/trend_series_benchmark.py
+    python scripts/benchmarks/trend_series_benchmark.py --sizes 1000 50000 --runs 5
+
+Options:
+    --sizes: Series lengths to benchmark (default: 1000 10000 50000 200000)
+    --runs: Timed runs per measurement; the median is reported (default: 5)
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before any app module is imported
+_db_dir = tempfile.mkdtemp(prefix="trend-benchmark-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add the project root to the Python path
+project_root = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, project_root)
+
+import numpy as np  # noqa: E402
+
+from app.services.trend_chart_generator import (  # noqa: E402
+    MAX_PLOTTED_POINTS,
+    MAX_RAW_DATA_POINTS,
+    TrendChartGenerator,
+)
+from app.utils.trend_series import TrendSeries, value_statistics  # noqa: E402
+from app.utils.trend_statistics import trend_direction_from_sums  # noqa: E402
+
+
+def build_series(size):
+    """Glucose readings every 5 minutes with a daily cycle and noise."""
+    rng = np.random.default_rng(42)
+    start = datetime(2020, 1, 1)
+    dates = [start + timedelta(minutes=5 * i) for i in range(size)]
+    minutes = np.arange(size) * 5
+    values = 110 + 25 * np.sin(2 * np.pi * minutes / 1440) + rng.normal(0, 8, size)
+    return dates, [round(float(v), 1) for v in values]
+
+
+def list_statistics(values):
+    """The per-value Python statistics TrendSeries replaced."""
+    count = len(values)
+    return {
+        "count": count,
+        "latest": round(values[-1], 2),
+        "average": round(sum(values) / count, 2),
+        "min": round(min(values), 2),
+        "max": round(max(values), 2),
+        "trend_direction": trend_direction_from_sums(
+            count,
+            sum(values),
+            sum(i * v for i, v in enumerate(values)),
+            min(values),
+            max(values),
+        ),
+    }
+
+
+def list_monthly_means(dates, values):
+    """The strftime bucketing the chart generator used to downsample with."""
+    monthly = {}
+    for d, value in zip(dates, values):
+        bucket = monthly.setdefault(d.strftime("%Y-%m"), ([], []))
+        bucket[0].append(d)
+        bucket[1].append(value)
+    return [
+        (bucket_dates[len(bucket_dates) // 2], sum(bucket_values) / len(bucket_values))
+        for bucket_dates, bucket_values in (monthly[key] for key in sorted(monthly))
+    ]
+
+
+def median_ms(func, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trend series processing")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 200000]
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    generator = TrendChartGenerator()
+    header = (
+        f"{'points':>8}  {'stats list':>10}  {'stats array':>11}  "
+        f"{'monthly list':>12}  {'monthly array':>13}  {'plotted':>7}  "
+        f"{'chart':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for size in args.sizes:
+        dates, values = build_series(size)
+        series = TrendSeries.from_lists(dates, values)
+        charted = series.monthly_means() if size > MAX_RAW_DATA_POINTS else series
+        plotted = charted.downsample(MAX_PLOTTED_POINTS)
+        chart_data = {
+            "dates": dates,
+            "values": values,
+            "display_name": "Blood Glucose",
+            "unit": "mg/dL",
+            "reference_range": (70, 100),
+        }
+
+        stats_list = median_ms(lambda: list_statistics(values), args.runs)
+        stats_array = median_ms(lambda: value_statistics(series.column()), args.runs)
+        monthly_list = median_ms(lambda: list_monthly_means(dates, values), args.runs)
+        monthly_array = median_ms(series.monthly_means, args.runs)
+        chart = median_ms(
+            lambda: generator.generate_vital_chart(chart_data, "blood_glucose"),
+            max(1, args.runs // 2),
+        )
+        print(
+            f"{size:>8}  {stats_list:>8.2f}ms  {stats_array:>9.2f}ms  "
+            f"{monthly_list:>10.2f}ms  {monthly_array:>11.2f}ms  "
+            f"{len(plotted):>7}  {chart:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Tests for Entity File API endpoints.
 """
 
+import hashlib
 import io
 import pytest
 from datetime import date
@@ -284,6 +285,38 @@ class TestEntityFileAPI:
         assert response.status_code == 200
         assert "inline" in response.headers.get("content-disposition", "")
 
+    def test_download_supports_etag_and_range(
+        self, client: TestClient, authenticated_headers, test_lab_result
+    ):
+        """Local files revalidate by checksum ETag and serve byte ranges."""
+        file_content = b"0123456789" * 100
+        files = {"file": ("ranged.txt", io.BytesIO(file_content), "text/plain")}
+
+        upload_response = client.post(
+            f"/api/v1/entity-files/lab-result/{test_lab_result.id}/files",
+            headers=authenticated_headers,
+            files=files,
+        )
+        file_id = upload_response.json()["id"]
+        url = f"/api/v1/entity-files/files/{file_id}/download"
+
+        response = client.get(url, headers=authenticated_headers)
+        etag = response.headers["etag"]
+        assert etag == f'"{hashlib.sha256(file_content).hexdigest()}"'
+
+        not_modified = client.get(
+            url, headers={**authenticated_headers, "If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        partial = client.get(
+            url, headers={**authenticated_headers, "Range": "bytes=10-19"}
+        )
+        assert partial.status_code == 206
+        assert partial.content == file_content[10:20]
+        assert partial.headers["content-range"] == f"bytes 10-19/{len(file_content)}"
+
     def test_batch_file_counts(
         self,
         client: TestClient,
@@ -0,0 +1,96 @@
+"""
+API tests for background job endpoints.
+"""
+
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+from app.services import job_engine
+from app.services.job_engine import JobEngine
+from tests.utils.user import create_random_user, create_user_token_headers
+
+
+@pytest.fixture
+def engine(db_session, tmp_path, monkeypatch):
+    instance = JobEngine(
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        artifact_dir=tmp_path / "job_artifacts",
+    )
+    monkeypatch.setattr(JobEngine, "_instance", instance)
+
+    class _Bus:
+        async def publish(self, event):
+            pass
+
+    monkeypatch.setattr(job_engine, "get_event_bus", lambda: _Bus())
+    return instance
+
+
+class TestJobEndpoints:
+    def test_submit_poll_and_download(self, authenticated_client, engine, test_patient):
+        response = authenticated_client.post(
+            "/api/v1/jobs",
+            json={"job_type": "export", "params": {"format": "csv", "scope": "all"}},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id = response.json()["id"]
+        assert response.json()["status"] == "queued"
+
+        response = authenticated_client.get(f"/api/v1/jobs/{job_id}/download")
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        assert authenticated_client.portal.call(engine.run_pending) == 1
+
+        response = authenticated_client.get(f"/api/v1/jobs/{job_id}")
+        assert response.json()["status"] == "succeeded"
+        assert response.json()["progress"] == 100
+
+        response = authenticated_client.get(f"/api/v1/jobs/{job_id}/download")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.text.startswith("\ufeff")
+
+        listing = authenticated_client.get("/api/v1/jobs").json()
+        assert listing["total"] == 1
+        assert listing["items"][0]["id"] == job_id
+
+    def test_other_users_jobs_are_hidden(
+        self, client, authenticated_client, db_session, engine
+    ):
+        job_id = authenticated_client.post(
+            "/api/v1/jobs", json={"job_type": "export", "params": {}}
+        ).json()["id"]
+        other = create_random_user(db_session)
+        headers = create_user_token_headers(other["username"])
+
+        assert (
+            client.get(f"/api/v1/jobs/{job_id}", headers=headers).status_code
+            == status.HTTP_404_NOT_FOUND
+        )
+        assert (
+            client.post(f"/api/v1/jobs/{job_id}/cancel", headers=headers).status_code
+            == status.HTTP_404_NOT_FOUND
+        )
+
+    def test_cancel_queued_job(self, authenticated_client, engine):
+        job_id = authenticated_client.post(
+            "/api/v1/jobs", json={"job_type": "export", "params": {}}
+        ).json()["id"]
+
+        response = authenticated_client.post(f"/api/v1/jobs/{job_id}/cancel")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "cancelled"
+
+    def test_invalid_and_forbidden_submissions(self, authenticated_client, engine):
+        response = authenticated_client.post(
+            "/api/v1/jobs",
+            json={"job_type": "export", "params": {"scope": "everything"}},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+        response = authenticated_client.post(
+            "/api/v1/jobs", json={"job_type": "backup", "params": {}}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -13,6 +13,7 @@ from unittest.mock import patch, MagicMock
 
 from app.crud.patient import patient as patient_crud
 from app.schemas.patient import PatientCreate
+from app.services.pdf_extraction_engine import PDFExtractionEngine
 from tests.utils.user import create_random_user, create_user_token_headers
 from tests.fixtures.pdf_fixtures import create_minimal_pdf
 
@@ -22,6 +23,14 @@ MOCK_EXTRACT_TEXT = (
 )
 
 
+@pytest.fixture(autouse=True)
+def inline_extraction_engine():
+    """Extract in a thread (so MOCK_EXTRACT_TEXT applies) and cache nothing."""
+    PDFExtractionEngine._instance = PDFExtractionEngine(workers=0, cache_max_bytes=0)
+    yield
+    PDFExtractionEngine.reset_instance()
+
+
 def _make_extraction_result(
     text, method="native", page_count=1, confidence=0.95, error=None
 ):
@@ -556,5 +556,13 @@ def cleanup_after_test():
     yield
 
     # Clear any global state
-    # Reset singletons, clear caches, etc.
-    pass
+    # Reset singletons, clear caches, etc. Row IDs are reused once the
+    # db_session teardown empties the tables, so cached access decisions must
+    # not outlive the test that made them.
+    from app.services.dashboard_summary import dashboard_summary_cache
+    from app.services.patient_access_cache import patient_access_cache
+    from app.services.standardized_test_index import StandardizedTestIndex
+
+    patient_access_cache.clear()
+    dashboard_summary_cache.clear()
+    StandardizedTestIndex.reset_instance()
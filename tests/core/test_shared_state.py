@@ -0,0 +1,285 @@
+"""Tests for the database state backend, shared by several server workers.
+
+The multi-process tests start real processes on one SQLite file, each with its
+own engine as a uvicorn worker would have, release them together with a barrier
+and check that SSO state, rate limits, scheduler leadership and invalidations
+of per-process caches hold across them.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.shared_state import (
+    DatabaseStateBackend,
+    MemoryStateBackend,
+    SharedGeneration,
+    set_state_backend,
+)
+from app.models.base import Base
+from app.models.shared_state import RateLimitWindow, SchedulerLease, SharedStateEntry
+
+WORKERS = 4
+TABLES = [
+    SharedStateEntry.__table__,
+    RateLimitWindow.__table__,
+    SchedulerLease.__table__,
+]
+
+
+def _backend(db_path) -> DatabaseStateBackend:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 30})
+    return DatabaseStateBackend(sessionmaker(bind=engine))
+
+
+def _run_workers(target, db_path, *args):
+    """Run ``target`` in WORKERS processes at once; returns their results."""
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(WORKERS)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=target, args=(index, db_path, barrier, results, *args))
+        for index in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+    return collected
+
+
+# Worker process bodies (module level, so spawned processes can import them)
+
+
+def _login_worker(index, db_path, barrier, results, states):
+    from app.auth.sso.exceptions import SSOAuthenticationError
+    from app.services.sso_service import SSOService
+
+    set_state_backend(_backend(db_path))
+    service = SSOService()
+    consumed = []
+    barrier.wait()
+    for state in states:
+        try:
+            service._validate_and_consume_state(state)
+            consumed.append(state)
+        except SSOAuthenticationError:
+            pass
+    results.put(consumed)
+
+
+def _rate_limit_worker(index, db_path, barrier, results, max_requests, attempts):
+    from app.core.utils.rate_limit import SlidingWindowRateLimiter
+
+    set_state_backend(_backend(db_path))
+    limiter = SlidingWindowRateLimiter(
+        max_requests=max_requests, window_seconds=60, scope="test"
+    )
+    barrier.wait()
+    results.put(sum(limiter.is_allowed("198.51.100.1") for _ in range(attempts)))
+
+
+def _scheduler_worker(index, db_path, barrier, results, ticks):
+    from app.services.scheduler_leadership import SchedulerLeadership
+
+    leadership = SchedulerLeadership(backend=_backend(db_path))
+    ran = []
+
+    async def run():
+        for tick in range(ticks):
+            await leadership.renew()
+            if leadership.is_leader:
+                ran.append(tick)
+
+    barrier.wait()
+    asyncio.run(run())
+    results.put((leadership.holder, ran))
+
+
+def _share_revocation_worker(index, db_path, barrier, results):
+    from app.services.patient_access_cache import patient_access_cache
+
+    set_state_backend(_backend(db_path))
+    # A request checks access (a miss), then caches the share's grant
+    patient_access_cache.get(1, 7, "view")
+    patient_access_cache.set(1, 7, "view", True)
+    cached = patient_access_cache.get(1, 7, "view")
+    barrier.wait()
+    if index == 0:
+        # The share is revoked through this worker
+        patient_access_cache.invalidate_patient(7)
+    barrier.wait()
+    results.put((cached, patient_access_cache.get(1, 7, "view")))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "shared_state.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=TABLES)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def backend(db_path):
+    return _backend(db_path)
+
+
+@pytest.fixture
+def shared_backend(backend):
+    set_state_backend(backend)
+    yield backend
+    set_state_backend(None)
+
+
+class TestAcrossWorkers:
+    def test_each_sso_state_is_consumed_exactly_once(self, shared_backend, db_path):
+        from app.services.sso_service import _store_state_entry
+
+        states = [f"state-{n}" for n in range(40)]
+        for state in states:
+            _store_state_entry(state, {"return_url": "/dashboard"})
+
+        consumed = _run_workers(_login_worker, db_path, states)
+
+        flattened = [state for worker in consumed for state in worker]
+        assert sorted(flattened) == sorted(states)
+
+    def test_rate_limit_holds_across_workers(self, db_path):
+        allowed = _run_workers(_rate_limit_worker, db_path, 25, 20)
+
+        assert sum(allowed) == 25
+
+    def test_one_worker_runs_each_scheduler_tick(self, db_path):
+        outcomes = _run_workers(_scheduler_worker, db_path, 5)
+
+        leaders = [holder for holder, ran in outcomes if ran]
+        assert len(leaders) == 1
+        assert sum(len(ran) for _, ran in outcomes) == 5
+
+    def test_share_revocation_reaches_every_worker(self, db_path):
+        outcomes = _run_workers(_share_revocation_worker, db_path)
+
+        assert outcomes == [(True, None)] * WORKERS
+
+
+class TestCacheGenerations:
+    """Per-process caches as two workers on the same database backend"""
+
+    def test_first_check_reports_change(self, shared_backend):
+        generation = SharedGeneration("test")
+
+        assert generation.changed()
+        assert not generation.changed()
+
+    def test_bump_is_seen_once_by_each_worker(self, shared_backend):
+        first, second = SharedGeneration("test"), SharedGeneration("test")
+        first.changed(), second.changed()
+
+        first.bump()
+
+        assert first.changed() and second.changed()
+        assert not second.changed()
+
+    def test_memory_backend_never_reports_change(self):
+        set_state_backend(MemoryStateBackend())
+        try:
+            generation = SharedGeneration("test")
+            generation.bump()
+            assert not generation.changed()
+        finally:
+            set_state_backend(None)
+
+    def test_dashboard_summary_invalidated_across_workers(self, shared_backend):
+        from app.services.dashboard_summary import DashboardSummaryCache
+
+        first, second = (DashboardSummaryCache(300, 10) for _ in range(2))
+        second.get_patient(7)
+        second.put_patient(7, {"counts": {}}, second.version)
+        assert second.get_patient(7) is not None
+
+        first.invalidate({7})
+
+        assert second.get_patient(7) is None
+
+    def test_standardized_test_index_reloads_after_other_worker_writes(
+        self, shared_backend, monkeypatch
+    ):
+        from app.services import standardized_test_index as index_module
+
+        loads = []
+        monkeypatch.setattr(index_module, "_signature", lambda db: ())
+        monkeypatch.setattr(
+            index_module.StandardizedTestIndex,
+            "_load",
+            lambda self, db: loads.append(self) or index_module._Snapshot(),
+        )
+        first = index_module.StandardizedTestIndex()
+        second = index_module.StandardizedTestIndex()
+        second._generation.changed()
+        second._snapshot = index_module._Snapshot()
+
+        second.search(None, "")
+        first.invalidate()
+        second.search(None, "")
+
+        assert loads == [second]
+
+
+class TestDatabaseStateBackend:
+    def test_sso_entries_round_trip(self, shared_backend):
+        from app.services.sso_service import (
+            _load_state_entry,
+            _state_storage,
+            _store_state_entry,
+        )
+
+        _store_state_entry("sso_conflict_t", {"existing_user_id": 7})
+
+        entry = _load_state_entry("sso_conflict_t")
+        assert entry["existing_user_id"] == 7
+        assert entry["expires_at"] - entry["created_at"] == timedelta(minutes=10)
+        assert "sso_conflict_t" not in _state_storage
+
+    def test_expired_lease_is_taken_over(self, backend):
+        assert backend.acquire_lease("schedulers", "a", ttl_seconds=0)
+        time.sleep(0.01)
+
+        assert backend.acquire_lease("schedulers", "b", ttl_seconds=60)
+        assert not backend.acquire_lease("schedulers", "a", ttl_seconds=60)
+
+    def test_released_lease_is_free(self, backend):
+        backend.acquire_lease("schedulers", "a", ttl_seconds=60)
+        backend.release_lease("schedulers", "a")
+
+        assert backend.acquire_lease("schedulers", "b", ttl_seconds=60)
+
+    def test_limiter_reports_shared_window(self, shared_backend):
+        from app.core.utils.rate_limit import SlidingWindowRateLimiter
+
+        limiter = SlidingWindowRateLimiter(
+            max_requests=2, window_seconds=60, scope="test"
+        )
+        assert limiter.is_allowed("k") and limiter.is_allowed("k")
+        assert not limiter.is_allowed("k")
+
+        headers = limiter.rate_limit_headers("k")
+        assert headers["X-RateLimit-Remaining"] == "0"
+        assert 1 <= int(headers["Retry-After"]) <= 60
+        assert limiter._requests == {}
+
+        limiter.reset()
+        assert limiter.get_remaining_requests("k") == 2
+
+    def test_memory_backend_always_leads(self):
+        from app.services.scheduler_leadership import SchedulerLeadership
+
+        assert SchedulerLeadership(backend=MemoryStateBackend()).is_leader
@@ -0,0 +1,202 @@
+"""
+Tests for the batched activity log writer: size and time flush thresholds,
+backpressure, failed entries, draining on stop, and the inline fallback used
+when the writer isn't running.
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import activity_logging
+from app.api.activity_logging import log_crud_activity
+from app.core.utils.datetime_utils import get_utc_now
+from app.models.activity_log import ActionType, ActivityLog, EntityType
+from app.services.activity_log_writer import ActivityLogWriter
+
+
+def _entry(n: int, **overrides):
+    entry = {
+        "action": ActionType.CREATED,
+        "entity_type": EntityType.MEDICATION,
+        "description": f"Created Medication: test {n}",
+        "timestamp": get_utc_now(),
+        "user_id": None,
+        "patient_id": None,
+        "entity_id": n,
+        "event_metadata": None,
+        "ip_address": None,
+        "user_agent": None,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def _count(db: Session) -> int:
+    db.expire_all()
+    return db.query(ActivityLog).count()
+
+
+@pytest.fixture
+def make_writer(db_session: Session):
+    writers = []
+
+    def make(session_factory=None, **options):
+        writer = ActivityLogWriter(
+            session_factory=session_factory or sessionmaker(bind=db_session.get_bind()),
+            **options,
+        )
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.stop()
+
+
+class TestActivityLogWriter:
+    def test_not_running_declines_entries(self, make_writer):
+        writer = make_writer()
+
+        assert writer.enqueue(_entry(1)) is False
+
+    def test_flushes_full_batches(self, db_session: Session, make_writer):
+        writer = make_writer(batch_size=3, flush_interval_ms=60_000)
+        writer.start()
+
+        for n in range(6):
+            assert writer.enqueue(_entry(n)) is True
+        writer.flush()
+
+        assert _count(db_session) == 6
+        stats = writer.stats()
+        assert stats["batches"] == 2
+        assert stats["written"] == 6
+        assert stats["queue_depth"] == 0
+
+    def test_flushes_partial_batch_after_interval(
+        self, db_session: Session, make_writer
+    ):
+        writer = make_writer(batch_size=100, flush_interval_ms=20)
+        writer.start()
+
+        writer.enqueue(_entry(1))
+        writer.enqueue(_entry(2))
+        deadline = time.monotonic() + 5
+        while writer.stats()["written"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert writer.stats()["batches"] == 1
+        assert _count(db_session) == 2
+
+    def test_full_queue_falls_back_to_caller(self, db_session: Session, make_writer):
+        release = threading.Event()
+        factory = sessionmaker(bind=db_session.get_bind())
+
+        def slow_session():
+            release.wait(5)
+            return factory()
+
+        writer = make_writer(
+            session_factory=slow_session,
+            batch_size=1,
+            flush_interval_ms=10,
+            max_queue=1,
+            enqueue_timeout_ms=10,
+        )
+        writer.start()
+
+        assert writer.enqueue(_entry(1)) is True
+        # Wait for the flusher to take the first entry and block on it
+        deadline = time.monotonic() + 5
+        while writer.stats()["queue_depth"] and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert writer.enqueue(_entry(2)) is True
+        assert writer.enqueue(_entry(3)) is False
+        release.set()
+        writer.flush()
+
+        stats = writer.stats()
+        assert stats["inline_fallbacks"] == 1
+        assert stats["written"] == 2
+
+    def test_bad_entry_does_not_lose_batch(self, db_session: Session, make_writer):
+        writer = make_writer(batch_size=10, flush_interval_ms=60_000)
+        writer.start()
+
+        writer.enqueue(_entry(1))
+        writer.enqueue(_entry(2, description=None))  # violates NOT NULL
+        writer.enqueue(_entry(3))
+        writer.stop()
+
+        assert _count(db_session) == 2
+        assert writer.stats()["failed"] == 1
+
+    def test_stop_drains_queue(self, db_session: Session, make_writer):
+        writer = make_writer(batch_size=100, flush_interval_ms=60_000)
+        writer.start()
+
+        for n in range(5):
+            writer.enqueue(_entry(n))
+        writer.stop()
+
+        assert _count(db_session) == 5
+        assert writer.running is False
+        assert writer.enqueue(_entry(6)) is False
+
+
+class TestLogCrudActivity:
+    def test_uses_running_writer(
+        self, db_session: Session, make_writer, monkeypatch, test_user
+    ):
+        writer = make_writer(batch_size=100, flush_interval_ms=60_000)
+        writer.start()
+        monkeypatch.setattr(ActivityLogWriter, "_instance", writer)
+
+        class _Medication:
+            id = 7
+            medication_name = "Lisinopril"
+
+        assert log_crud_activity(
+            db_session,
+            ActionType.CREATED,
+            EntityType.MEDICATION,
+            _Medication(),
+            test_user.id,
+        )
+        assert writer.stats()["enqueued"] == 1
+        writer.flush()
+
+        entry = db_session.query(ActivityLog).one()
+        assert entry.description == "Created Medication: Lisinopril"
+        assert entry.user_id == test_user.id
+
+    def test_writes_inline_without_writer(
+        self, db_session: Session, monkeypatch, test_user
+    ):
+        monkeypatch.setattr(ActivityLogWriter, "_instance", None)
+        calls = []
+        original = activity_logging.activity_log.log_activity
+
+        def recording(*args, **kwargs):
+            calls.append(kwargs["entity_id"])
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(activity_logging.activity_log, "log_activity", recording)
+
+        class _Medication:
+            id = 8
+            medication_name = "Metformin"
+
+        assert log_crud_activity(
+            db_session,
+            ActionType.CREATED,
+            EntityType.MEDICATION,
+            _Medication(),
+            test_user.id,
+        )
+
+        assert calls == [8]
+        assert db_session.query(ActivityLog).count() == 1
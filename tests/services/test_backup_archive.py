@@ -0,0 +1,146 @@
+"""
+Tests for backup archive building: streaming checksum, per-file compression,
+progress and abort, and the off-loop BackupService paths that use it.
+"""
+
+import zipfile
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import BackupRecord
+from app.services import backup_service as backup_module
+from app.services.backup_archive import (
+    ArchiveEntry,
+    build_archive,
+    collect_upload_entries,
+    file_checksum,
+)
+from app.services.backup_service import BackupService
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    root = tmp_path / "uploads"
+    (root / "lab-results").mkdir(parents=True)
+    (root / "trash").mkdir()
+    (root / "lab-results" / "report.pdf").write_bytes(b"%PDF-1.7" + bytes(4096))
+    (root / "notes.txt").write_text("blood pressure log\n" * 500)
+    (root / "trash" / "deleted.pdf").write_bytes(b"gone")
+    return root
+
+
+class TestBuildArchive:
+    def test_checksum_matches_written_file(self, tmp_path, uploads):
+        output = tmp_path / "backup.zip"
+
+        size, checksum = build_archive(output, collect_upload_entries(uploads))
+
+        assert size == output.stat().st_size
+        assert checksum == file_checksum(output)
+        with zipfile.ZipFile(output) as archive:
+            assert archive.testzip() is None
+            assert sorted(archive.namelist()) == [
+                "uploads/lab-results/report.pdf",
+                "uploads/notes.txt",
+            ]
+
+    @pytest.mark.parametrize(
+        "mode, pdf_method, text_method",
+        [
+            ("auto", zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED),
+            ("deflate", zipfile.ZIP_DEFLATED, zipfile.ZIP_DEFLATED),
+            ("store", zipfile.ZIP_STORED, zipfile.ZIP_STORED),
+        ],
+    )
+    def test_compression_modes(self, tmp_path, uploads, mode, pdf_method, text_method):
+        output = tmp_path / "backup.zip"
+
+        build_archive(output, collect_upload_entries(uploads), compression=mode)
+
+        with zipfile.ZipFile(output) as archive:
+            methods = {info.filename: info.compress_type for info in archive.infolist()}
+        assert methods["uploads/lab-results/report.pdf"] == pdf_method
+        assert methods["uploads/notes.txt"] == text_method
+
+    def test_unknown_compression_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unsupported backup compression"):
+            build_archive(tmp_path / "backup.zip", [], compression="lzma")
+
+    def test_progress_and_abort(self, tmp_path, uploads):
+        output = tmp_path / "backup.zip"
+        entries = collect_upload_entries(uploads)
+        calls = []
+
+        def progress(done, total):
+            calls.append((done, total))
+            raise RuntimeError("cancelled")
+
+        with pytest.raises(RuntimeError):
+            build_archive(output, entries, progress=progress)
+
+        total = sum(entry.source.stat().st_size for entry in entries)
+        assert calls[0][1] == total
+        assert not output.exists()
+
+
+class TestBackupServiceArchives:
+    @pytest.fixture
+    def service(self, db_session: Session, tmp_path, uploads, monkeypatch):
+        class _Bus:
+            async def publish(self, event):
+                pass
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", uploads)
+        monkeypatch.setattr(backup_module, "get_event_bus", lambda: _Bus())
+        service = BackupService(db_session)
+        service.backup_dir = tmp_path / "backups"
+        return service
+
+    @pytest.mark.asyncio
+    async def test_files_backup_records_streamed_checksum(
+        self, db_session: Session, service
+    ):
+        progress = []
+
+        result = await service.create_files_backup(
+            "nightly", progress=lambda done, total: progress.append(done)
+        )
+
+        record = db_session.get(BackupRecord, result["id"])
+        assert record.checksum == file_checksum(record.file_path)
+        assert record.size_bytes == result["size_bytes"]
+        assert len(progress) == 2
+        assert (await service.verify_backup(record.id))["verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_full_backup_appends_dump_after_uploads(self, service, monkeypatch):
+        async def fake_dump(output_path):
+            output_path.write_text("CREATE TABLE patients ();\n")
+
+        monkeypatch.setattr(service, "_create_database_dump", fake_dump)
+
+        result = await service.create_full_backup("weekly")
+
+        with zipfile.ZipFile(result["file_path"]) as archive:
+            names = archive.namelist()
+            assert archive.read("database.sql").startswith(b"CREATE TABLE")
+        assert names[-2:] == ["database.sql", "backup_manifest.json"]
+        assert "uploads/notes.txt" in names
+        assert result["checksum"] == file_checksum(result["file_path"])
+
+    @pytest.mark.asyncio
+    async def test_failed_dump_removes_partial_archive(
+        self, db_session: Session, service, monkeypatch
+    ):
+        async def failing_dump(output_path):
+            raise Exception("pg_dump not found")
+
+        monkeypatch.setattr(service, "_create_database_dump", failing_dump)
+
+        with pytest.raises(Exception, match="Full backup failed"):
+            await service.create_full_backup()
+
+        assert list(service.backup_dir.iterdir()) == []
+        assert db_session.query(BackupRecord).one().status == "failed"
@@ -0,0 +1,255 @@
+"""
+Tests for the content-addressed blob store: identical uploads share one
+blob, deleting a record only trashes the blob once nothing else references
+it, and dedupe_local_files moves pre-existing files into the store.
+"""
+
+import hashlib
+import io
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app.models.models import EntityFile, LabResult
+from app.services import generic_entity_file_service as service_module
+from app.services.blob_store import BlobStore, blob_references, dedupe_local_files
+from app.services.generic_entity_file_service import GenericEntityFileService
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 40
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+def _upload(data=CONTENT, filename="scan.pdf"):
+    return UploadFile(
+        file=io.BytesIO(data),
+        filename=filename,
+        headers={"content-type": "application/pdf"},
+    )
+
+
+def _lab_result(db: Session, patient_id: int) -> LabResult:
+    lab = LabResult(
+        patient_id=patient_id,
+        test_name="CBC",
+        status="completed",
+        completed_date=date(2024, 3, 2),
+    )
+    db.add(lab)
+    db.commit()
+    return lab
+
+
+@pytest.fixture
+def service(tmp_path: Path):
+    service = GenericEntityFileService()
+    service.uploads_dir = tmp_path / "uploads"
+    service.file_management_service.trash_dir = tmp_path / "trash"
+    return service
+
+
+def _trashed(tmp_path: Path):
+    return [
+        path
+        for path in (tmp_path / "trash").rglob("*")
+        if path.is_file() and path.suffix != ".meta"
+    ]
+
+
+class TestSharedBlobs:
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_blob(
+        self, db_session: Session, test_patient, service
+    ):
+        first_lab = _lab_result(db_session, test_patient.id)
+        second_lab = _lab_result(db_session, test_patient.id)
+
+        first = await service.upload_file(
+            db_session, "lab-result", first_lab.id, _upload()
+        )
+        second = await service.upload_file(
+            db_session, "lab-result", second_lab.id, _upload(filename="copy.pdf")
+        )
+
+        blob = service.blob_store.path_for(SHA256)
+        assert first.file_path == second.file_path == str(blob)
+        assert blob.read_bytes() == CONTENT
+        assert [p for p in service.uploads_dir.rglob("*") if p.is_file()] == [blob]
+        assert blob_references(db_session, SHA256) == 2
+
+    @pytest.mark.asyncio
+    async def test_blob_trashed_with_last_reference(
+        self, db_session: Session, test_patient, service, tmp_path: Path
+    ):
+        lab = _lab_result(db_session, test_patient.id)
+        first = await service.upload_file(db_session, "lab-result", lab.id, _upload())
+        second = await service.upload_file(db_session, "lab-result", lab.id, _upload())
+        blob = service.blob_store.path_for(SHA256)
+
+        await service.delete_file(db_session, first.id)
+
+        assert blob.exists()
+        assert _trashed(tmp_path) == []
+
+        await service.delete_file(db_session, second.id)
+
+        assert not blob.exists()
+        assert [path.read_bytes() for path in _trashed(tmp_path)] == [CONTENT]
+
+    @pytest.mark.asyncio
+    async def test_entity_cleanup_keeps_blobs_shared_elsewhere(
+        self, db_session: Session, test_patient, service, tmp_path: Path
+    ):
+        deleted_lab = _lab_result(db_session, test_patient.id)
+        kept_lab = _lab_result(db_session, test_patient.id)
+        for lab_id in (deleted_lab.id, deleted_lab.id, kept_lab.id):
+            await service.upload_file(db_session, "lab-result", lab_id, _upload())
+        await service.upload_file(
+            db_session, "lab-result", deleted_lab.id, _upload(b"only here")
+        )
+
+        stats = service.cleanup_entity_files_on_deletion(
+            db_session, "lab-result", deleted_lab.id
+        )
+
+        assert stats["files_deleted"] == 1
+        assert service.blob_store.path_for(SHA256).exists()
+        assert [path.read_bytes() for path in _trashed(tmp_path)] == [b"only here"]
+
+
+class TestConcurrentUploadAndDelete:
+    """An upload sharing a blob while its last other record is deleted"""
+
+    @pytest.mark.asyncio
+    async def test_blob_trashed_before_upload_commits_is_restored(
+        self, db_session: Session, test_patient, service, monkeypatch
+    ):
+        lab = _lab_result(db_session, test_patient.id)
+        existing = await service.upload_file(
+            db_session, "lab-result", lab.id, _upload()
+        )
+        store = BlobStore.store
+
+        async def store_then_delete(self, upload):
+            result = await store(self, upload)
+            if existing.id is not None:
+                # The delete runs after the upload found the blob, before
+                # its record is committed
+                await service.delete_file(db_session, existing.id)
+                existing.id = None
+            return result
+
+        monkeypatch.setattr(BlobStore, "store", store_then_delete)
+
+        uploaded = await service.upload_file(
+            db_session, "lab-result", lab.id, _upload()
+        )
+
+        assert Path(uploaded.file_path).read_bytes() == CONTENT
+        assert blob_references(db_session, SHA256) == 1
+
+    @pytest.mark.asyncio
+    async def test_upload_committed_during_delete_keeps_blob(
+        self, db_session: Session, test_patient, service, tmp_path: Path, monkeypatch
+    ):
+        lab = _lab_result(db_session, test_patient.id)
+        existing = await service.upload_file(
+            db_session, "lab-result", lab.id, _upload()
+        )
+        blob = service.blob_store.path_for(SHA256)
+        count = blob_references
+        counted = []
+
+        def count_then_upload(db, content_hash, exclude_ids=()):
+            references = count(db, content_hash, exclude_ids)
+            if not counted:
+                # An upload of the same content commits its record between
+                # the reference count and the move to trash
+                db.add(
+                    EntityFile(
+                        entity_type="lab-result",
+                        entity_id=lab.id,
+                        file_name="copy.pdf",
+                        file_path=str(blob),
+                        file_type="application/pdf",
+                        file_size=len(CONTENT),
+                        storage_backend="local",
+                        uploaded_at=datetime(2024, 3, 2),
+                        content_hash=SHA256,
+                    )
+                )
+                db.commit()
+            counted.append(references)
+            return references
+
+        monkeypatch.setattr(service_module, "blob_references", count_then_upload)
+
+        await service.delete_file(db_session, existing.id)
+
+        assert counted == [0, 1]
+        assert blob.read_bytes() == CONTENT
+        assert _trashed(tmp_path) == []
+
+
+def _legacy_file(db: Session, uploads_dir: Path, lab_id: int, name: str, data: bytes):
+    """A record stored before the blob store, with a file of its own."""
+    path = uploads_dir / "files" / "lab-results" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    record = EntityFile(
+        entity_type="lab-result",
+        entity_id=lab_id,
+        file_name=name,
+        file_path=str(path),
+        file_type="application/pdf",
+        file_size=len(data),
+        storage_backend="local",
+        uploaded_at=datetime(2024, 3, 2),
+    )
+    db.add(record)
+    db.commit()
+    return record
+
+
+class TestDedupeLocalFiles:
+    def test_moves_files_into_blobs_and_reclaims_duplicates(
+        self, db_session: Session, test_patient, tmp_path: Path
+    ):
+        lab = _lab_result(db_session, test_patient.id)
+        records = [
+            _legacy_file(db_session, tmp_path, lab.id, "a.pdf", CONTENT),
+            _legacy_file(db_session, tmp_path, lab.id, "b.pdf", CONTENT),
+            _legacy_file(db_session, tmp_path, lab.id, "c.pdf", b"other"),
+        ]
+        store = BlobStore(tmp_path)
+
+        stats = dedupe_local_files(db_session, store)
+
+        assert stats["files_scanned"] == 3
+        assert stats["blobs_created"] == 2
+        assert stats["duplicates_removed"] == 1
+        assert stats["bytes_reclaimed"] == len(CONTENT)
+        assert records[0].file_path == records[1].file_path
+        assert records[0].file_path == str(store.path_for(SHA256))
+        assert records[1].content_hash == SHA256
+        assert Path(records[2].file_path).read_bytes() == b"other"
+        assert not list((tmp_path / "files" / "lab-results").iterdir())
+
+    def test_dry_run_changes_nothing(
+        self, db_session: Session, test_patient, tmp_path: Path
+    ):
+        lab = _lab_result(db_session, test_patient.id)
+        records = [
+            _legacy_file(db_session, tmp_path, lab.id, name, CONTENT)
+            for name in ("a.pdf", "b.pdf")
+        ]
+
+        stats = dedupe_local_files(db_session, BlobStore(tmp_path), dry_run=True)
+
+        assert stats["duplicates_removed"] == 1
+        assert stats["bytes_reclaimed"] == len(CONTENT)
+        assert all(record.content_hash is None for record in records)
+        assert all(Path(record.file_path).exists() for record in records)
+        assert not (tmp_path / "files" / "blobs").exists()
@@ -0,0 +1,203 @@
+"""
+Tests for report trend chart rendering: the batched lab trend fetch, the
+chart render pool and its PNG cache, and the report service using them.
+"""
+
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.models import LabResult, LabTestComponent, Vitals
+from app.schemas.trend_charts import (
+    LabTestChartRequest,
+    TrendChartSelection,
+    VitalChartRequest,
+)
+from app.services import chart_render_pool
+from app.services.chart_render_pool import (
+    ChartJob,
+    ChartRenderPool,
+    chart_cache_key,
+)
+from app.services.custom_report_service import CustomReportService
+from app.services.trend_data_fetcher import TrendDataFetcher
+
+PNG_SIGNATURE = b"\x89PNG"
+
+
+def _lab_job(values, title="Glucose"):
+    return ChartJob(
+        "lab_test",
+        {
+            "dates": [datetime(2024, month, 1) for month in range(1, len(values) + 1)],
+            "values": values,
+            "statuses": ["normal"] * len(values),
+            "display_name": title,
+            "chart_title": title,
+            "unit": "mg/dL",
+            "statistics": {"count": len(values)},
+        },
+    )
+
+
+@pytest.fixture
+def add_lab(db_session: Session, test_patient):
+    def add(test_name, value, unit="mg/dL", completed=None):
+        lab = LabResult(
+            patient_id=test_patient.id,
+            test_name="Panel",
+            status="completed",
+            completed_date=completed,
+        )
+        db_session.add(lab)
+        db_session.flush()
+        db_session.add(
+            LabTestComponent(
+                lab_result_id=lab.id, test_name=test_name, value=value, unit=unit
+            )
+        )
+        db_session.commit()
+
+    return add
+
+
+class TestBatchedLabTrends:
+    def test_matches_per_series_fetch(self, db_session: Session, test_patient, add_lab):
+        for month, value in enumerate([90, 95, 101], start=1):
+            add_lab("Glucose", value, completed=date(2024, month, 1))
+        add_lab("Glucose", 5.6, unit="mmol/L", completed=date(2024, 4, 1))
+        add_lab("Sodium", 140, unit="mmol/L", completed=date(2024, 2, 1))
+        requests = [
+            ("Glucose", None, None, None),
+            ("glucose", date(2024, 2, 1), None, "mg/dL"),
+            ("Sodium", None, None, "mmol/L"),
+            ("Potassium", None, None, "mmol/L"),
+        ]
+        fetcher = TrendDataFetcher(db_session)
+
+        batched = fetcher.fetch_lab_test_trends(test_patient.id, requests)
+
+        assert batched == [
+            fetcher.fetch_lab_test_trend(test_patient.id, name, start, end, unit=unit)
+            for name, start, end, unit in requests
+        ]
+        assert batched[1]["values"] == [95, 101]
+        assert batched[3]["values"] == []
+
+
+class TestChartRenderPool:
+    @pytest.mark.asyncio
+    async def test_unchanged_chart_is_served_from_cache(self):
+        pool = ChartRenderPool(workers=0)
+
+        first = await pool.render(_lab_job([90, 95, 101]))
+        second = await pool.render(_lab_job([90, 95, 101]))
+
+        assert first.png_bytes.startswith(PNG_SIGNATURE)
+        assert not first.cached and first.render_ms > 0
+        assert second.cached and second.png_bytes == first.png_bytes
+
+    def test_cache_key_covers_series_and_language(self):
+        job = _lab_job([90, 95, 101])
+        restated = _lab_job([90, 95, 101])
+        restated.data["statistics"] = {"count": 99}
+
+        assert chart_cache_key(job, "en") == chart_cache_key(restated, "en")
+        assert chart_cache_key(job, "en") != chart_cache_key(job, "fr")
+        assert chart_cache_key(job, "en") != chart_cache_key(
+            _lab_job([90, 95, 102]), "en"
+        )
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self):
+        older, newer = _lab_job([1, 2, 3]), _lab_job([4, 5, 6])
+        sizes = [
+            len((await ChartRenderPool(workers=0).render(job)).png_bytes)
+            for job in (older, newer)
+        ]
+        pool = ChartRenderPool(workers=0, cache_max_bytes=max(sizes))
+
+        await pool.render(older)
+        await pool.render(newer)
+
+        assert (await pool.render(newer)).cached
+        assert not (await pool.render(older)).cached
+
+    @pytest.mark.asyncio
+    async def test_renders_in_worker_processes(self):
+        pool = ChartRenderPool(workers=2)
+        try:
+            renders = await pool.render_all(
+                [_lab_job([90, 95, 101]), _lab_job([], title="Empty")]
+            )
+        finally:
+            pool.shutdown()
+
+        assert renders[0].png_bytes.startswith(PNG_SIGNATURE)
+        assert renders[1].png_bytes is None
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_fails_chart_without_rendering_in_process(
+        self, monkeypatch
+    ):
+        class _BrokenPool(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(BrokenProcessPool("worker died"))
+                return future
+
+        def fake_render(job):
+            raise AssertionError("rendered in the server process")
+
+        monkeypatch.setattr(chart_render_pool, "render_chart", fake_render)
+        pool = ChartRenderPool(workers=1)
+        pool._executor = _BrokenPool()
+
+        renders = await pool.render_all([_lab_job([90, 95, 101])])
+
+        assert isinstance(renders[0], BrokenProcessPool)
+        assert pool._executor is None
+
+
+class TestReportTrendCharts:
+    @pytest.fixture(autouse=True)
+    def thread_pool(self):
+        ChartRenderPool._instance = ChartRenderPool(workers=0)
+        yield
+        ChartRenderPool.reset_instance()
+
+    @pytest.mark.asyncio
+    async def test_charts_rendered_and_reused(
+        self, db_session: Session, test_patient, add_lab
+    ):
+        for day in range(1, 4):
+            db_session.add(
+                Vitals(
+                    patient_id=test_patient.id,
+                    recorded_date=datetime(2024, 1, day, 8),
+                    heart_rate=60 + day,
+                )
+            )
+            add_lab("Glucose", 90 + day, completed=date(2024, 1, day))
+        db_session.commit()
+        selection = TrendChartSelection(
+            vital_charts=[VitalChartRequest(vital_type="heart_rate")],
+            lab_test_charts=[
+                LabTestChartRequest(test_name="Glucose", unit="mg/dL"),
+                LabTestChartRequest(test_name="Missing"),
+            ],
+        )
+        service = CustomReportService(db_session)
+
+        charts = await service._generate_trend_charts(test_patient.id, selection)
+        again = await service._generate_trend_charts(test_patient.id, selection)
+
+        assert [chart["chart_type"] for chart in charts] == ["vital", "lab_test"]
+        assert all(chart["png_bytes"].startswith(PNG_SIGNATURE) for chart in charts)
+        assert [chart["png_bytes"] for chart in again] == [
+            chart["png_bytes"] for chart in charts
+        ]
+        assert len(ChartRenderPool.get_instance()._cache) == 2
@@ -0,0 +1,158 @@
+"""
+Tests for the dashboard summaries: one statement per summary, cached, and
+invalidated when a counted record is written.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.models.models import (
+    Condition,
+    MedicalSpecialty,
+    Medication,
+    Patient,
+    Practitioner,
+)
+from app.services import dashboard_summary
+from app.services.dashboard_summary import (
+    dashboard_summary_cache,
+    get_global_summary,
+    get_patient_summary,
+)
+
+
+@pytest.fixture
+def statements(db_session):
+    executed = []
+    engine = db_session.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def patient_id(db_session, test_patient):
+    """A patient with a physician, two medications and a condition."""
+    specialty = MedicalSpecialty(name="General Practice", is_active=True)
+    db_session.add(specialty)
+    db_session.flush()
+    practitioner = Practitioner(name="Dr. Who", specialty_id=specialty.id)
+    db_session.add(practitioner)
+    db_session.flush()
+    test_patient.physician_id = practitioner.id
+    db_session.add_all(
+        [
+            Medication(
+                patient_id=test_patient.id,
+                medication_name="Lisinopril",
+                status="active",
+                practitioner_id=practitioner.id,
+            ),
+            Medication(patient_id=test_patient.id, medication_name="Metformin"),
+            Condition(
+                patient_id=test_patient.id, diagnosis="Hypertension", status="active"
+            ),
+        ]
+    )
+    db_session.commit()
+    return test_patient.id
+
+
+class TestPatientSummary:
+    def test_counts_in_one_statement(self, db_session, patient_id, statements):
+        summary = get_patient_summary(db_session, patient_id)
+
+        assert len(statements) == 1
+        assert list(summary["counts"]) == list(dashboard_summary.PATIENT_COUNT_MODELS)
+        assert summary["counts"]["medications"] == 2
+        assert summary["counts"]["conditions"] == 1
+        assert summary["counts"]["lab_results"] == 0
+        # Same physician on the patient and a medication counts once
+        assert summary["counts"]["practitioners"] == 1
+        assert summary["counts"]["pharmacies"] == 0
+
+    def test_missing_patient(self, db_session):
+        assert get_patient_summary(db_session, 999999) is None
+
+    def test_served_from_cache(self, db_session, patient_id, statements):
+        get_patient_summary(db_session, patient_id)
+        statements.clear()
+
+        summary = get_patient_summary(db_session, patient_id)
+
+        assert statements == []
+        assert summary["counts"]["medications"] == 2
+
+    def test_committed_write_invalidates(self, db_session, patient_id):
+        get_patient_summary(db_session, patient_id)
+
+        db_session.add(
+            Condition(patient_id=patient_id, diagnosis="Asthma", status="active")
+        )
+        db_session.commit()
+
+        summary = get_patient_summary(db_session, patient_id)
+        assert summary["counts"]["conditions"] == 2
+
+    def test_rolled_back_write_keeps_cache(self, db_session, patient_id, statements):
+        get_patient_summary(db_session, patient_id)
+        db_session.add(
+            Condition(patient_id=patient_id, diagnosis="Asthma", status="active")
+        )
+        db_session.flush()
+        db_session.rollback()
+        statements.clear()
+
+        summary = get_patient_summary(db_session, patient_id)
+
+        assert statements == []
+        assert summary["counts"]["conditions"] == 1
+
+    def test_stale_read_is_not_cached(self, db_session, patient_id):
+        version = dashboard_summary_cache.version
+        dashboard_summary_cache.invalidate({patient_id})
+
+        dashboard_summary_cache.put_patient(
+            patient_id, {"patient_id": 1, "counts": {}}, version
+        )
+
+        assert dashboard_summary_cache.get_patient(patient_id) is None
+
+
+class TestGlobalSummary:
+    def test_totals_in_one_statement(self, db_session, patient_id, statements):
+        summary = get_global_summary(db_session)
+
+        assert len(statements) == 1
+        assert summary["users"] == 1
+        assert summary["patients"] == 1
+        assert summary["medications"] == 2
+        assert summary["active_medications"] == 1
+        assert summary["recent_registrations"] == 1
+
+    def test_write_to_any_patient_invalidates(self, db_session, patient_id):
+        get_global_summary(db_session)
+
+        db_session.add(Medication(patient_id=patient_id, medication_name="Aspirin"))
+        db_session.commit()
+
+        assert get_global_summary(db_session)["medications"] == 3
+
+
+class TestDashboardStatsEndpoint:
+    def test_dashboard_stats_use_summary(self, client, patient_id, user_token_headers):
+        response = client.get(
+            "/api/v1/patients/me/dashboard-stats", headers=user_token_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["patient_id"] == patient_id
+        assert data["active_medications"] == 2
+        assert data["total_conditions"] == 1
@@ -0,0 +1,252 @@
+"""
+Tests for Paperless/Papra document sync checking: bulk existence lookups,
+bounded concurrency fallback, recently-synced skipping, and the Papra sync
+check that uses them.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.files import EntityFile
+from app.models.models import LabResult, UserPreferences
+from app.services import papra_client as papra_module
+from app.services.document_sync import (
+    check_paperless_documents,
+    check_papra_documents,
+    is_recently_synced,
+)
+from app.services.generic_entity_file_service import GenericEntityFileService
+from app.services.paperless_service import (
+    PaperlessAuthenticationError,
+    PaperlessError,
+)
+
+
+class _FakePaperless:
+    def __init__(self, existing, bulk_error=None):
+        self.existing = set(existing)
+        self.bulk_error = bulk_error
+        self.bulk_calls = []
+        self.single_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_existing_document_ids(self, document_ids):
+        self.bulk_calls.append(list(document_ids))
+        if self.bulk_error:
+            raise self.bulk_error
+        return self.existing & set(document_ids)
+
+    async def check_document_exists(self, document_id):
+        self.single_calls.append(document_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if document_id == "13":
+            raise PaperlessError("connection reset")
+        return document_id.isdigit() and int(document_id) in self.existing
+
+
+class TestCheckPaperlessDocuments:
+    @pytest.mark.asyncio
+    async def test_pages_ids_through_bulk_listing(self):
+        service = _FakePaperless(existing={1, 2, 4})
+        task_uuid = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+        results = await check_paperless_documents(
+            service, ["1", "2", "3", "4", "5", task_uuid], page_size=2
+        )
+
+        assert service.bulk_calls == [[1, 2], [3, 4], [5]]
+        assert service.single_calls == [task_uuid]
+        assert results == {
+            "1": True,
+            "2": True,
+            "3": False,
+            "4": True,
+            "5": False,
+            task_uuid: False,
+        }
+
+    @pytest.mark.asyncio
+    async def test_results_keyed_by_ids_as_stored(self):
+        service = _FakePaperless(existing={7})
+
+        results = await check_paperless_documents(service, ["007", " 7", "08"])
+
+        assert service.bulk_calls == [[7, 8]]
+        assert results == {"007": True, "7": True, "08": False}
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_bounded_single_checks(self):
+        service = _FakePaperless(existing={1, 2}, bulk_error=PaperlessError("HTTP 400"))
+        ids = [str(n) for n in range(1, 21)]
+
+        results = await check_paperless_documents(
+            service, ids, concurrency=3, page_size=5
+        )
+
+        # The rejected listing isn't retried for later pages
+        assert len(service.bulk_calls) == 1
+        assert sorted(service.single_calls, key=int) == ids
+        assert service.max_in_flight <= 3
+        assert results["1"] is True and results["3"] is False
+        assert isinstance(results["13"], PaperlessError)
+
+    @pytest.mark.asyncio
+    async def test_authentication_error_stops_check(self):
+        service = _FakePaperless(
+            existing=set(), bulk_error=PaperlessAuthenticationError("401")
+        )
+
+        with pytest.raises(PaperlessAuthenticationError):
+            await check_paperless_documents(service, ["1"])
+
+
+class TestRecentlySynced:
+    def _record(self, status, checked_ago):
+        record = EntityFile(sync_status=status)
+        if checked_ago is not None:
+            # Stored naive, as SQLite returns it
+            record.last_sync_at = datetime.utcnow() - checked_ago
+        return record
+
+    @pytest.mark.parametrize(
+        "status, checked_ago, expected",
+        [
+            ("synced", timedelta(minutes=1), True),
+            ("synced", timedelta(hours=2), False),
+            ("synced", None, False),
+            ("missing", timedelta(minutes=1), False),
+            ("error", timedelta(minutes=1), False),
+        ],
+    )
+    def test_only_fresh_synced_records_skip(self, status, checked_ago, expected):
+        now = datetime.now(timezone.utc)
+
+        record = self._record(status, checked_ago)
+
+        assert is_recently_synced(record, now, ttl_seconds=900) is expected
+
+    def test_zero_ttl_always_checks(self):
+        record = self._record("synced", timedelta(seconds=1))
+
+        assert not is_recently_synced(record, datetime.now(timezone.utc), 0)
+
+
+class _FakePapra:
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.requested = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_document_info(self, document_id):
+        self.requested.append(document_id)
+        return {"id": document_id} if document_id in self.existing else None
+
+
+class TestCheckPapraDocuments:
+    @pytest.mark.asyncio
+    async def test_missing_documents_and_errors(self):
+        class _Client(_FakePapra):
+            async def get_document_info(self, document_id):
+                if document_id == "broken":
+                    raise ConnectionError("timed out")
+                return await super().get_document_info(document_id)
+
+        results = await check_papra_documents(
+            _Client(existing={"a"}), ["a", "b", "broken", "a"], concurrency=2
+        )
+
+        assert results["a"] is True
+        assert results["b"] is False
+        assert isinstance(results["broken"], ConnectionError)
+
+
+class TestPapraSyncStatus:
+    @pytest.fixture
+    def papra_files(self, db_session: Session, test_user, test_patient):
+        db_session.add(
+            UserPreferences(
+                user_id=test_user.id,
+                papra_enabled=True,
+                papra_url="https://papra.example.com",
+                papra_api_token_encrypted="encrypted",
+            )
+        )
+        lab = LabResult(
+            patient_id=test_patient.id,
+            test_name="CBC",
+            status="completed",
+            completed_date=date(2024, 3, 2),
+        )
+        db_session.add(lab)
+        db_session.flush()
+
+        files = {}
+        for doc_id, status, checked_ago in [
+            ("fresh", "synced", timedelta(minutes=1)),
+            ("stale", "synced", timedelta(days=1)),
+            ("gone", "synced", timedelta(days=1)),
+            ("back", "missing", timedelta(minutes=1)),
+        ]:
+            files[doc_id] = EntityFile(
+                entity_type="lab-result",
+                entity_id=lab.id,
+                file_name=f"{doc_id}.pdf",
+                file_path="",
+                file_type="application/pdf",
+                uploaded_at=datetime.utcnow(),
+                storage_backend="papra",
+                papra_document_id=doc_id,
+                sync_status=status,
+                last_sync_at=datetime.utcnow() - checked_ago,
+            )
+            db_session.add(files[doc_id])
+        db_session.commit()
+        return files
+
+    @pytest.fixture
+    def papra(self, monkeypatch):
+        client = _FakePapra(existing={"fresh", "stale", "back"})
+        monkeypatch.setattr(
+            papra_module, "create_papra_client", lambda **kwargs: client
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_skips_recently_synced_documents(
+        self, db_session: Session, test_user, papra_files, papra
+    ):
+        result = await GenericEntityFileService().check_papra_sync_status(
+            db_session, test_user.id
+        )
+
+        assert sorted(papra.requested) == ["back", "gone", "stale"]
+        assert result == {
+            papra_files["fresh"].id: True,
+            papra_files["stale"].id: True,
+            papra_files["gone"].id: False,
+            papra_files["back"].id: True,
+        }
+        assert papra_files["gone"].sync_status == "missing"
+        assert papra_files["back"].sync_status == "synced"
+
+    @pytest.mark.asyncio
+    async def test_force_rechecks_everything(
+        self, db_session: Session, test_user, papra_files, papra
+    ):
+        await GenericEntityFileService().check_papra_sync_status(
+            db_session, test_user.id, force=True
+        )
+
+        assert sorted(papra.requested) == ["back", "fresh", "gone", "stale"]
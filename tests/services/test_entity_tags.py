@@ -0,0 +1,269 @@
+"""
+Tests for the normalized entity_tags index: maintenance on writes, tag filters
+and tag statistics built on it, and the consistency check.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud.condition import condition as condition_crud
+from app.crud.medication import medication as medication_crud
+from app.crud.patient import patient as patient_crud
+from app.models.models import EntityTag, Medication, UserTag
+from app.models.search import SearchIndexEntry
+from app.schemas.condition import ConditionCreate
+from app.schemas.medication import MedicationCreate, MedicationUpdate
+from app.schemas.patient import PatientCreate
+from app.services import entity_tags
+from app.services.tag_service import tag_service
+
+
+def _rows(db: Session, entity_type: str, entity_id: int):
+    return sorted(
+        (row.tag, row.patient_id)
+        for row in db.query(EntityTag).filter(
+            EntityTag.entity_type == entity_type, EntityTag.entity_id == entity_id
+        )
+    )
+
+
+def _create_medication(db: Session, patient_id: int, name: str, tags) -> Medication:
+    return medication_crud.create(
+        db,
+        obj_in=MedicationCreate(
+            patient_id=patient_id,
+            medication_name=name,
+            status="active",
+            effective_period_start=date(2024, 1, 1),
+            tags=tags,
+        ),
+    )
+
+
+def _create_condition(db: Session, patient_id: int, name: str, tags):
+    return condition_crud.create(
+        db,
+        obj_in=ConditionCreate(
+            patient_id=patient_id,
+            condition_name=name,
+            diagnosis=name,
+            status="active",
+            tags=tags,
+        ),
+    )
+
+
+@pytest.fixture
+def other_patient(db_session: Session, test_admin_user):
+    return patient_crud.create_for_user(
+        db_session,
+        user_id=test_admin_user.id,
+        patient_data=PatientCreate(
+            first_name="Other",
+            last_name="Patient",
+            birth_date=date(1980, 1, 1),
+        ),
+    )
+
+
+class TestIndexMaintenance:
+    """entity_tags rows follow CRUD writes on tagged records"""
+
+    def test_create_update_delete(self, db_session: Session, test_patient):
+        med = _create_medication(db_session, test_patient.id, "Aspirin", ["a", "b"])
+        assert _rows(db_session, "medication", med.id) == [
+            ("a", test_patient.id),
+            ("b", test_patient.id),
+        ]
+
+        medication_crud.update(
+            db_session, db_obj=med, obj_in=MedicationUpdate(tags=["b", "c"])
+        )
+        assert [tag for tag, _ in _rows(db_session, "medication", med.id)] == [
+            "b",
+            "c",
+        ]
+
+        medication_crud.delete(db_session, id=med.id)
+        assert _rows(db_session, "medication", med.id) == []
+
+    def test_update_without_tag_change_keeps_rows(
+        self, db_session: Session, test_patient
+    ):
+        med = _create_medication(db_session, test_patient.id, "Aspirin", ["a"])
+        row_id = db_session.query(EntityTag.id).filter_by(entity_id=med.id).scalar()
+
+        medication_crud.update(
+            db_session, db_obj=med, obj_in=MedicationUpdate(dosage="81mg")
+        )
+
+        assert (
+            db_session.query(EntityTag.id).filter_by(entity_id=med.id).scalar()
+            == row_id
+        )
+
+    def test_rebuild(self, db_session: Session, test_patient):
+        med = _create_medication(db_session, test_patient.id, "Aspirin", ["a", "b"])
+        db_session.query(EntityTag).delete()
+        db_session.commit()
+
+        counts = entity_tags.rebuild(db_session)
+
+        assert counts["medication"] == 2
+        assert len(_rows(db_session, "medication", med.id)) == 2
+
+
+class TestTagFilters:
+    """TagFilterMixin answers from entity_tags"""
+
+    @pytest.fixture
+    def medications(self, db_session: Session, test_patient):
+        return {
+            name: _create_medication(db_session, test_patient.id, name, tags)
+            for name, tags in (
+                ("Both", ["diabetes", "chronic"]),
+                ("Diabetes", ["diabetes"]),
+                ("Similar", ["pre-diabetes"]),
+                ("Untagged", []),
+            )
+        }
+
+    def test_any_and_all(self, db_session: Session, medications):
+        any_match = medication_crud.get_by_tags(
+            db_session, tags=["diabetes", "chronic"]
+        )
+        all_match = medication_crud.get_by_tags(
+            db_session, tags=["diabetes", "chronic"], tag_match_all=True
+        )
+
+        assert {med.medication_name for med in any_match} == {"Both", "Diabetes"}
+        assert [med.medication_name for med in all_match] == ["Both"]
+
+    def test_combined_with_field_filters(
+        self, db_session: Session, test_patient, other_patient, medications
+    ):
+        _create_medication(db_session, other_patient.id, "Elsewhere", ["diabetes"])
+
+        results = medication_crud.get_multi_with_tag_filters(
+            db_session, tags=["diabetes"], patient_id=test_patient.id
+        )
+
+        assert {med.medication_name for med in results} == {"Both", "Diabetes"}
+
+
+class TestTagService:
+    """Tag statistics, search and renames run on entity_tags"""
+
+    def test_popular_tags_counts_and_types(
+        self, db_session: Session, test_user, test_patient, other_patient
+    ):
+        _create_medication(db_session, test_patient.id, "Metformin", ["diabetes"])
+        _create_condition(db_session, test_patient.id, "Diabetes", ["diabetes"])
+        _create_medication(db_session, test_patient.id, "Aspirin", ["heart"])
+        # Another user's records don't count towards this user's usage
+        _create_medication(db_session, other_patient.id, "Insulin", ["diabetes"])
+
+        assert tag_service.sync_tags_from_records(db_session, user_id=test_user.id) == 2
+        popular = tag_service.get_popular_tags_across_entities(
+            db_session, user_id=test_user.id
+        )
+
+        assert [(tag["tag"], tag["usage_count"]) for tag in popular] == [
+            ("diabetes", 2),
+            ("heart", 1),
+        ]
+        assert popular[0]["entity_types"] == ["condition", "medication"]
+
+    def test_sync_registers_new_tags_once(
+        self, db_session: Session, test_user, test_patient
+    ):
+        _create_medication(db_session, test_patient.id, "Aspirin", ["heart"])
+
+        assert tag_service.sync_tags_from_records(db_session, user_id=test_user.id) == 1
+        assert tag_service.sync_tags_from_records(db_session, user_id=test_user.id) == 0
+        assert db_session.query(UserTag).filter_by(user_id=test_user.id).count() == 1
+
+    def test_search_across_entities(
+        self, db_session: Session, test_patient, other_patient
+    ):
+        _create_medication(db_session, test_patient.id, "Metformin", ["diabetes"])
+        _create_condition(
+            db_session, test_patient.id, "Diabetes", ["diabetes", "chronic"]
+        )
+        _create_medication(db_session, other_patient.id, "Insulin", ["diabetes"])
+
+        results = tag_service.search_across_entities_by_tags(
+            db_session,
+            tags=["diabetes", "chronic"],
+            match_mode="all",
+            patient_id=test_patient.id,
+        )
+
+        assert results["medication"] == []
+        assert [row["condition_name"] for row in results["condition"]] == ["Diabetes"]
+
+    def test_rename_updates_index_and_search(
+        self, db_session: Session, test_user, test_patient
+    ):
+        med = _create_medication(db_session, test_patient.id, "Aspirin", ["old"])
+
+        updated = tag_service.rename_tag_across_entities(
+            db_session, old_tag="old", new_tag="new", user_id=test_user.id
+        )
+
+        assert updated == 1
+        assert _rows(db_session, "medication", med.id) == [("new", test_patient.id)]
+        search_row = (
+            db_session.query(SearchIndexEntry)
+            .filter_by(record_type="medications", record_id=med.id)
+            .one()
+        )
+        assert search_row.tags == "new"
+
+
+class TestConsistency:
+    def test_check_reports_and_repairs_drift(self, db_session: Session, test_patient):
+        med = _create_medication(db_session, test_patient.id, "Aspirin", ["a", "b"])
+        # Writes that bypass the ORM, as from bulk SQL edits
+        db_session.execute(
+            text("DELETE FROM entity_tags WHERE tag = 'b'"),
+        )
+        db_session.add(
+            EntityTag(
+                entity_type="condition",
+                entity_id=999,
+                patient_id=test_patient.id,
+                tag="stale",
+            )
+        )
+        db_session.commit()
+
+        report = entity_tags.check(db_session)
+        assert report["medication"] == {"missing": 1, "extra": 0}
+        assert report["condition"] == {"missing": 0, "extra": 1}
+
+        entity_tags.check(db_session, repair=True)
+
+        assert not any(
+            any(counts.values()) for counts in entity_tags.check(db_session).values()
+        )
+        assert [tag for tag, _ in _rows(db_session, "medication", med.id)] == [
+            "a",
+            "b",
+        ]
+
+    def test_one_time_build_runs_once(self, db_session: Session, test_patient):
+        _create_medication(db_session, test_patient.id, "Aspirin", ["a"])
+        db_session.query(EntityTag).delete()
+        db_session.commit()
+
+        first = entity_tags.run_one_time_build(db_session)
+        second = entity_tags.run_one_time_build(db_session)
+
+        assert first["skipped"] is False
+        assert first["repaired"] == 1
+        assert second == {"skipped": True, "reason": "already_built"}
+        assert db_session.query(EntityTag).count() == 1
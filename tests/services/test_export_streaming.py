@@ -0,0 +1,153 @@
+"""
+Tests for the streaming export path: output parity with the in-memory export,
+JSON Lines shape, and the endpoint switching to a streamed response.
+"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.models import Allergy, LabResult, Vitals
+from app.services import export_service as export_module
+from app.services.export_service import ExportService
+
+
+@pytest.fixture
+def seeded_patient(db_session: Session, test_patient):
+    for day in range(1, 6):
+        db_session.add(
+            Vitals(
+                patient_id=test_patient.id,
+                recorded_date=datetime(2024, 3, day, 8, 0),
+                systolic_bp=118 + day,
+                diastolic_bp=78,
+                weight=180.0 - day,
+                notes="morning" if day % 2 else None,
+            )
+        )
+    db_session.add(
+        Allergy(
+            patient_id=test_patient.id,
+            allergen="Penicillin",
+            reaction="Hives",
+            severity="severe",
+            status="active",
+        )
+    )
+    db_session.add(
+        LabResult(
+            patient_id=test_patient.id,
+            test_name="CBC",
+            status="completed",
+            completed_date=date(2024, 3, 2),
+        )
+    )
+    db_session.commit()
+    return test_patient
+
+
+def _stream(db: Session, user_id: int, format: str, scope: str, **kwargs) -> str:
+    return "".join(
+        ExportService(db).stream_patient_data(
+            user_id=user_id, format=format, scope=scope, **kwargs
+        )
+    )
+
+
+class TestStreamParity:
+    """Streamed output carries the same data as the in-memory export"""
+
+    @pytest.mark.parametrize("scope", ["all", "vitals", "allergies"])
+    @pytest.mark.parametrize("unit_system", ["imperial", "metric"])
+    @pytest.mark.asyncio
+    async def test_json_matches_export_patient_data(
+        self, db_session: Session, test_user, seeded_patient, scope, unit_system
+    ):
+        expected = await ExportService(db_session).export_patient_data(
+            user_id=test_user.id, format="json", scope=scope, unit_system=unit_system
+        )
+
+        streamed = json.loads(
+            _stream(db_session, test_user.id, "json", scope, unit_system=unit_system)
+        )
+
+        for document in (expected, streamed):
+            document["export_metadata"].pop("generated_at")
+        assert streamed == json.loads(json.dumps(expected, default=str))
+
+    @pytest.mark.parametrize("scope", ["all", "vitals", "insurance"])
+    @pytest.mark.asyncio
+    async def test_csv_matches_convert_to_csv(
+        self, db_session: Session, test_user, seeded_patient, scope
+    ):
+        service = ExportService(db_session)
+        export_data = await service.export_patient_data(
+            user_id=test_user.id, format="csv", scope=scope
+        )
+
+        streamed = _stream(db_session, test_user.id, "csv", scope)
+
+        assert streamed == "\ufeff" + service.convert_to_csv(export_data, scope)
+
+    def test_jsonl_has_one_record_per_line(
+        self, db_session: Session, test_user, seeded_patient
+    ):
+        lines = _stream(db_session, test_user.id, "jsonl", "vitals").splitlines()
+
+        objects = [json.loads(line) for line in lines]
+        assert [obj["type"] for obj in objects] == [
+            "export_metadata",
+            "patient_info",
+        ] + ["vitals"] * 5
+        assert objects[2]["data"]["recorded_date"] == "2024-03-01T08:00:00"
+
+    def test_vitals_are_read_in_batches(
+        self, db_session: Session, test_user, seeded_patient, monkeypatch
+    ):
+        monkeypatch.setattr(export_module, "EXPORT_BATCH_SIZE", 2)
+        monkeypatch.setattr(export_module, "STREAM_CHUNK_SIZE", 1)
+        chunks = list(
+            ExportService(db_session).stream_patient_data(
+                user_id=test_user.id,
+                format="jsonl",
+                scope="vitals",
+                include_patient_info=False,
+            )
+        )
+        assert len(chunks) == 6
+
+    def test_errors_raised_before_streaming(self, db_session: Session, test_user):
+        with pytest.raises(ValueError, match="No active patient"):
+            ExportService(db_session).stream_patient_data(
+                user_id=test_user.id, format="json", scope="all"
+            )
+
+
+class TestStreamingEndpoint:
+    def test_large_scope_is_streamed(self, authenticated_client, seeded_patient):
+        response = authenticated_client.get(
+            "/api/v1/export/data", params={"format": "jsonl", "scope": "all"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "content-length" not in response.headers
+        types = [json.loads(line)["type"] for line in response.text.splitlines()]
+        assert types.count("vitals") == 5
+        assert types.count("allergies") == 1
+
+    def test_small_scope_is_not_streamed(self, authenticated_client, seeded_patient):
+        response = authenticated_client.get(
+            "/api/v1/export/data", params={"format": "json", "scope": "allergies"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(response.content))
+
+    def test_no_active_patient_is_client_error(self, authenticated_client):
+        response = authenticated_client.get(
+            "/api/v1/export/data", params={"format": "csv", "scope": "vitals"}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,266 @@
+"""
+Tests for file delivery: remote documents relayed chunk by chunk and kept in
+the size-bounded on-disk cache, which serves later requests and evicts the
+least recently used entries first.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import EntityFile, LabResult, UserPreferences
+from app.services import papra_client as papra_module
+from app.services.file_delivery import (
+    RemoteDocumentCache,
+    etag_matches,
+    stream_remote_document,
+)
+from app.services.generic_entity_file_service import GenericEntityFileService
+
+CHUNKS = [b"%PDF-1.4\n", b"a" * 1000, b"b" * 1000]
+
+
+async def _chunks(chunks=CHUNKS, fail_after=None):
+    for index, chunk in enumerate(chunks):
+        if index == fail_after:
+            raise ConnectionError("backend went away")
+        yield chunk
+
+
+async def _read(download):
+    return b"".join([chunk async for chunk in download.stream])
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path: Path, monkeypatch):
+    # Deleting a record moves its file to trash; keep both out of the tree
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(settings, "TRASH_DIR", tmp_path / "uploads" / "trash")
+    return tmp_path / "uploads"
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    RemoteDocumentCache._instance = RemoteDocumentCache(
+        tmp_path / "cache", max_bytes=5000
+    )
+    yield RemoteDocumentCache._instance
+    RemoteDocumentCache.reset_instance()
+
+
+class TestRemoteDocumentCache:
+    @pytest.mark.asyncio
+    async def test_relayed_document_is_cached(self, cache):
+        download = await stream_remote_document(
+            _chunks(), "scan.pdf", "application/pdf", cache_key="doc-1"
+        )
+
+        assert download.head == b"%PDF-1.4"
+        assert await _read(download) == b"".join(CHUNKS)
+        assert cache.get("doc-1").read_bytes() == b"".join(CHUNKS)
+
+    @pytest.mark.asyncio
+    async def test_interrupted_document_is_not_cached(self, cache):
+        download = await stream_remote_document(
+            _chunks(fail_after=2), "scan.pdf", "application/pdf", cache_key="doc-1"
+        )
+
+        with pytest.raises(ConnectionError):
+            await _read(download)
+
+        assert cache.get("doc-1") is None
+        assert list(cache.directory.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, cache):
+        cache.max_bytes = 4000
+
+        async def add(key):
+            download = await stream_remote_document(
+                _chunks([key.encode() * 500]), "f", "text/plain", cache_key=key
+            )
+            await _read(download)
+
+        await add("old")
+        await add("used")
+        # Distinct mtimes without sleeping; "old" is then viewed again
+        os.utime(cache.directory / "old", (1, 1))
+        os.utime(cache.directory / "used", (2, 2))
+        assert cache.get("old") is not None
+
+        await add("new")
+
+        assert cache.get("used") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+
+    def test_key_depends_on_user_and_credentials(self):
+        key = RemoteDocumentCache.key("papra", "https://p", "doc_1", 1, ["token"])
+
+        assert key != RemoteDocumentCache.key(
+            "papra", "https://p", "doc_1", 2, ["token"]
+        )
+        assert key != RemoteDocumentCache.key("papra", "https://p", "doc_1", 1, ["new"])
+        assert key != RemoteDocumentCache.key("papra", "https://p", "doc_1", 1, [None])
+
+    @pytest.mark.asyncio
+    async def test_discard_removes_every_users_copy(self, cache):
+        cache.max_bytes = 10000
+        keys = [
+            RemoteDocumentCache.key("papra", "https://p", "doc_1", user_id, ["t"])
+            for user_id in (1, 2)
+        ]
+        other = RemoteDocumentCache.key("papra", "https://p", "doc_2", 1, ["t"])
+        for key in keys + [other]:
+            await _read(await stream_remote_document(_chunks(), "f", "text/plain", key))
+
+        assert cache.discard("papra", "doc_1") == 2
+
+        assert all(cache.get(key) is None for key in keys)
+        assert cache.get(other) is not None
+
+    @pytest.mark.asyncio
+    async def test_documents_larger_than_cache_are_relayed_only(self, cache):
+        big = [b"x" * 3000, b"y" * 3000]
+        download = await stream_remote_document(
+            _chunks(big), "big.pdf", "application/pdf", cache_key="big"
+        )
+
+        assert await _read(download) == b"".join(big)
+        assert list(cache.directory.iterdir()) == []
+
+
+def test_etag_matches():
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"abc"', None)
+
+
+def _papra_preferences(user_id, token="encrypted"):
+    return UserPreferences(
+        user_id=user_id,
+        papra_enabled=True,
+        papra_url="https://papra.example.com",
+        papra_api_token_encrypted=token,
+        papra_organization_id="org_1",
+    )
+
+
+class TestRemoteDownloads:
+    @pytest.fixture
+    def papra_record(self, db_session: Session, test_user, test_patient):
+        db_session.add(_papra_preferences(test_user.id))
+        lab = LabResult(
+            patient_id=test_patient.id,
+            test_name="CBC",
+            status="completed",
+            completed_date=date(2024, 3, 2),
+        )
+        db_session.add(lab)
+        db_session.commit()
+        record = EntityFile(
+            entity_type="lab-result",
+            entity_id=lab.id,
+            file_name="scan.pdf",
+            file_path="papra://document/doc_1",
+            file_type="application/pdf",
+            file_size=2009,
+            storage_backend="papra",
+            papra_document_id="doc_1",
+            uploaded_at=date(2024, 3, 2),
+        )
+        db_session.add(record)
+        db_session.commit()
+        return record
+
+    @pytest.fixture
+    def papra_requests(self, monkeypatch):
+        requests = []
+
+        class FakePapra:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def stream_document(self, document_id):
+                requests.append(document_id)
+                async for chunk in _chunks():
+                    yield chunk
+
+        monkeypatch.setattr(
+            papra_module, "create_papra_client", lambda **kwargs: FakePapra()
+        )
+        return requests
+
+    @pytest.mark.asyncio
+    async def test_papra_download_streams_then_serves_from_cache(
+        self, db_session: Session, test_user, papra_record, papra_requests, cache
+    ):
+        service = GenericEntityFileService()
+
+        first = await service.get_file_download_info(
+            db_session, papra_record.id, test_user.id
+        )
+        assert first.path is None
+        assert await _read(first) == b"".join(CHUNKS)
+
+        second = await service.get_file_view_info(
+            db_session, papra_record.id, test_user.id
+        )
+        assert Path(second.path).read_bytes() == b"".join(CHUNKS)
+        assert second.remote and second.head == b"%PDF-1.4"
+        assert papra_requests == ["doc_1"]
+
+    @pytest.mark.asyncio
+    async def test_cached_copy_is_not_served_to_other_users(
+        self,
+        db_session: Session,
+        test_user,
+        test_admin_user,
+        papra_record,
+        papra_requests,
+        cache,
+    ):
+        service = GenericEntityFileService()
+        await _read(
+            await service.get_file_download_info(
+                db_session, papra_record.id, test_user.id
+            )
+        )
+        db_session.add(_papra_preferences(test_admin_user.id, token="other"))
+        db_session.commit()
+
+        download = await service.get_file_download_info(
+            db_session, papra_record.id, test_admin_user.id
+        )
+
+        assert download.path is None
+        assert await _read(download) == b"".join(CHUNKS)
+        assert papra_requests == ["doc_1", "doc_1"]
+
+    @pytest.mark.asyncio
+    async def test_unlinking_evicts_cached_copy(
+        self, db_session: Session, test_user, papra_record, papra_requests, cache
+    ):
+        service = GenericEntityFileService()
+        await _read(
+            await service.get_file_download_info(
+                db_session, papra_record.id, test_user.id
+            )
+        )
+        assert len(list(cache.directory.iterdir())) == 1
+
+        await service.delete_file(db_session, papra_record.id, test_user.id)
+
+        assert list(cache.directory.iterdir()) == []
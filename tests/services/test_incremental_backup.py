@@ -0,0 +1,227 @@
+"""
+Tests for incremental, content-addressed file backups: blob reuse across
+snapshots, point-in-time restore, and reference-aware garbage collection.
+"""
+
+import json
+import os
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import BackupRecord
+from app.services import backup_service as backup_module
+from app.services import incremental_backup
+from app.services.backup_service import BackupService
+from app.services.incremental_backup import SnapshotStore
+from app.services.restore_service import RestoreService
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    root = tmp_path / "uploads"
+    (root / "lab-results").mkdir(parents=True)
+    (root / "trash").mkdir()
+    (root / "lab-results" / "report.pdf").write_bytes(b"%PDF-1.7" + bytes(4096))
+    (root / "notes.txt").write_text("blood pressure log\n")
+    (root / "copy-of-notes.txt").write_text("blood pressure log\n")
+    (root / "trash" / "deleted.pdf").write_bytes(b"gone")
+    return root
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "incremental")
+
+
+def _age_blobs(store, seconds=2 * incremental_backup.GC_GRACE_SECONDS):
+    old = time.time() - seconds
+    for blob in store.blob_dir.glob("*/*"):
+        os.utime(blob, (old, old))
+
+
+class TestSnapshotStore:
+    def test_identical_content_stored_once(self, store, uploads):
+        stats = store.create_snapshot(uploads, "first.json")
+
+        assert stats["files"] == 3
+        assert stats["new_blobs"] == 2
+        manifest = json.loads(stats["manifest_path"].read_text())
+        assert "trash/deleted.pdf" not in manifest["files"]
+        assert manifest["parent"] is None
+
+    def test_unchanged_files_are_not_rehashed(self, store, uploads):
+        first = store.create_snapshot(uploads, "first.json")
+
+        second = store.create_snapshot(uploads, "second.json", first["manifest_path"])
+
+        assert second["hashed_files"] == 0
+        assert second["new_blobs"] == 0
+        assert second["stored_bytes"] == 0
+        assert second["total_bytes"] == first["total_bytes"]
+
+    def test_changed_file_gets_new_blob(self, store, uploads):
+        first = store.create_snapshot(uploads, "first.json")
+        (uploads / "notes.txt").write_text("blood pressure log\nheart rate 72\n")
+
+        second = store.create_snapshot(uploads, "second.json", first["manifest_path"])
+
+        assert second["hashed_files"] == 1
+        assert second["new_blobs"] == 1
+
+    def test_restores_older_snapshot(self, store, uploads, tmp_path):
+        first = store.create_snapshot(uploads, "first.json")
+        (uploads / "notes.txt").write_text("rewritten\n")
+        (uploads / "lab-results" / "report.pdf").unlink()
+        store.create_snapshot(uploads, "second.json", first["manifest_path"])
+
+        target = tmp_path / "restored"
+        files, size = store.restore_snapshot(first["manifest_path"], target)
+
+        assert files == 3
+        assert size == first["total_bytes"]
+        assert (target / "notes.txt").read_text() == "blood pressure log\n"
+        assert (target / "lab-results" / "report.pdf").exists()
+
+    def test_restore_rejects_paths_outside_target(self, store, uploads, tmp_path):
+        stats = store.create_snapshot(uploads, "first.json")
+        manifest = json.loads(stats["manifest_path"].read_text())
+        manifest["files"]["../escaped.txt"] = manifest["files"]["notes.txt"]
+        stats["manifest_path"].write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError, match="Unsafe path"):
+            store.restore_snapshot(stats["manifest_path"], tmp_path / "restored")
+        assert not (tmp_path / "escaped.txt").exists()
+
+    def test_missing_blob_blocks_restore(self, store, uploads, tmp_path):
+        stats = store.create_snapshot(uploads, "first.json")
+        next(store.blob_dir.glob("*/*")).unlink()
+
+        assert len(store.missing_blobs(stats["manifest_path"])) == 1
+        with pytest.raises(ValueError, match="incomplete"):
+            store.restore_snapshot(stats["manifest_path"], tmp_path / "restored")
+
+    def test_garbage_collection_keeps_shared_blobs(self, store, uploads):
+        first = store.create_snapshot(uploads, "first.json")
+        (uploads / "notes.txt").write_text("rewritten\n")
+        (uploads / "copy-of-notes.txt").unlink()
+        second = store.create_snapshot(uploads, "second.json", first["manifest_path"])
+        _age_blobs(store)
+
+        # Dropping the first snapshot frees only the old notes content
+        first["manifest_path"].unlink()
+        result = store.collect_garbage([second["manifest_path"]])
+
+        assert result == {
+            "blobs_removed": 1,
+            "bytes_freed": len("blood pressure log\n"),
+        }
+        assert store.missing_blobs(second["manifest_path"]) == []
+
+    def test_garbage_collection_spares_recent_blobs(self, store, uploads):
+        store.create_snapshot(uploads, "first.json")
+
+        result = store.collect_garbage([])
+
+        assert result["blobs_removed"] == 0
+
+    def test_reused_blobs_survive_concurrent_collection(self, store, uploads):
+        # Content from a pruned snapshot is reused by a new one whose manifest
+        # isn't written yet when garbage collection runs
+        first = store.create_snapshot(uploads, "first.json")
+        _age_blobs(store)
+        first["manifest_path"].unlink()
+
+        second = store.create_snapshot(uploads, "second.json")
+        second["manifest_path"].unlink()
+        result = store.collect_garbage([])
+
+        assert second["new_blobs"] == 0
+        assert result["blobs_removed"] == 0
+
+
+class TestIncrementalBackupService:
+    @pytest.fixture
+    def service(self, db_session: Session, tmp_path, uploads, monkeypatch):
+        class _Bus:
+            async def publish(self, event):
+                pass
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", uploads)
+        monkeypatch.setattr(backup_module, "get_event_bus", lambda: _Bus())
+        service = BackupService(db_session)
+        service.backup_dir = tmp_path / "backups"
+        return service
+
+    @pytest.mark.asyncio
+    async def test_second_backup_chains_from_first(self, db_session: Session, service):
+        first = await service.create_incremental_backup("nightly")
+        second = await service.create_incremental_backup("nightly")
+
+        assert first["new_blobs"] == 2
+        assert second["new_blobs"] == 0
+        assert second["size_bytes"] < first["size_bytes"]
+        manifest = json.loads(open(second["file_path"]).read())
+        assert manifest["parent"] == first["filename"]
+        record = db_session.get(BackupRecord, second["id"])
+        assert record.backup_type == "incremental"
+        assert (await service.verify_backup(record.id))["verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_verify_detects_missing_blob(self, service):
+        result = await service.create_incremental_backup()
+        next(service.snapshot_store.blob_dir.glob("*/*")).unlink()
+
+        verification = await service.verify_backup(result["id"])
+
+        assert verification["verified"] is False
+        assert verification["missing_blobs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_collects_only_unreferenced_blobs(self, service, uploads):
+        first = await service.create_incremental_backup()
+        (uploads / "notes.txt").write_text("rewritten\n")
+        (uploads / "copy-of-notes.txt").unlink()
+        second = await service.create_incremental_backup()
+        _age_blobs(service.snapshot_store)
+
+        result = await service.delete_backup(first["id"])
+
+        assert result["blobs_removed"] == 1
+        assert (await service.verify_backup(second["id"]))["verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_restore_service_restores_snapshot(
+        self, db_session: Session, service, uploads
+    ):
+        first = await service.create_incremental_backup()
+        (uploads / "notes.txt").write_text("rewritten\n")
+        await service.create_incremental_backup()
+
+        restore = RestoreService(db_session)
+        restore.upload_dir = uploads
+        result = await restore._restore_files(
+            service.snapshot_store.snapshot_dir / first["filename"]
+        )
+
+        assert result["restored_files"] == 3
+        assert (uploads / "notes.txt").read_text() == "blood pressure log\n"
+
+    @pytest.mark.asyncio
+    async def test_restore_with_missing_blobs_leaves_uploads_alone(
+        self, db_session: Session, service, uploads
+    ):
+        result = await service.create_incremental_backup()
+        next(service.snapshot_store.blob_dir.glob("*/*")).unlink()
+
+        restore = RestoreService(db_session)
+        restore.upload_dir = uploads
+        with pytest.raises(Exception, match="incomplete"):
+            await restore._restore_files(
+                service.snapshot_store.snapshot_dir / result["filename"]
+            )
+
+        assert (uploads / "notes.txt").read_text() == "blood pressure log\n"
+        assert not list(uploads.parent.glob("uploads_backup_*"))
@@ -0,0 +1,226 @@
+"""
+Tests for the background job engine: running built-in jobs to an artifact,
+failure and cancellation, claim order, submit limits and retention.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.events.job_events import JobCompletedEvent, JobFailedEvent
+from app.models.jobs import BackgroundJob
+from app.models.models import Vitals
+from app.services import job_engine
+from app.services.job_engine import (
+    JOB_FAILED_MESSAGE,
+    JOB_TYPES,
+    JobEngine,
+    JobQueueFull,
+    JobResult,
+    JobType,
+)
+
+
+class _RecordingBus:
+    def __init__(self):
+        self.events = []
+
+    async def publish(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    recording = _RecordingBus()
+    monkeypatch.setattr(job_engine, "get_event_bus", lambda: recording)
+    return recording
+
+
+@pytest.fixture
+def engine(db_session: Session, tmp_path, bus):
+    return JobEngine(
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        worker_count=1,
+        artifact_dir=tmp_path / "job_artifacts",
+    )
+
+
+def _reload(db: Session, job: BackgroundJob) -> BackgroundJob:
+    db.expire_all()
+    return db.get(BackgroundJob, job.id)
+
+
+class TestRunJobs:
+    @pytest.mark.asyncio
+    async def test_export_job_writes_artifact(
+        self, db_session: Session, engine, bus, test_user, test_patient
+    ):
+        db_session.add(
+            Vitals(
+                patient_id=test_patient.id,
+                recorded_date=datetime(2024, 3, 1, 8),
+                systolic_bp=120,
+                diastolic_bp=80,
+            )
+        )
+        db_session.commit()
+
+        job = engine.submit(
+            db_session, test_user, "export", {"format": "json", "scope": "vitals"}
+        )
+        assert job.status == "queued"
+        assert await engine.run_pending() == 1
+
+        job = _reload(db_session, job)
+        assert (job.status, job.progress, job.error) == ("succeeded", 100, None)
+        assert job.artifact_filename.endswith(".json")
+        with open(job.artifact_path, encoding="utf-8") as artifact:
+            exported = json.load(artifact)
+        assert len(exported["vitals"]) == 1
+        assert job.artifact_size > 0
+        assert job.expires_at > job.finished_at
+
+        (event,) = bus.events
+        assert isinstance(event, JobCompletedEvent)
+        assert (event.user_id, event.job_id, event.artifact_filename) == (
+            test_user.id,
+            job.id,
+            job.artifact_filename,
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(
+        self, db_session: Session, engine, bus, test_user
+    ):
+        # No active patient: the export raises inside the worker
+        job = engine.submit(db_session, test_user, "export", {"format": "csv"})
+        await engine.run_pending()
+
+        job = _reload(db_session, job)
+        assert job.status == "failed"
+        # The exception text stays in the logs
+        assert job.error == JOB_FAILED_MESSAGE
+        assert bus.events[0].error == JOB_FAILED_MESSAGE
+        assert job.artifact_path is None
+        assert isinstance(bus.events[0], JobFailedEvent)
+        assert bus.events[0].job_id == job.id
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_claimed_first(
+        self, db_session: Session, engine, test_user, monkeypatch
+    ):
+        order = []
+
+        def handler(context):
+            order.append(context.params["name"])
+            return JobResult()
+
+        monkeypatch.setitem(JOB_TYPES, "low", JobType(handler=handler, priority=0))
+        monkeypatch.setitem(JOB_TYPES, "high", JobType(handler=handler, priority=5))
+        engine.submit(db_session, test_user, "low", {"name": "low-1"})
+        engine.submit(db_session, test_user, "high", {"name": "high"})
+        engine.submit(db_session, test_user, "low", {"name": "low-2"})
+
+        await engine.run_pending()
+
+        assert order == ["high", "low-1", "low-2"]
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(
+        self, db_session: Session, engine, bus, test_user, monkeypatch
+    ):
+        monkeypatch.setattr(job_engine, "HEARTBEAT_SECONDS", 0.02)
+        started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def handler(context):
+            context.artifact_path("partial.txt").write_text("partial")
+            loop.call_soon_threadsafe(started.set)
+            for step in range(500):
+                context.report_progress(step // 5)
+                asyncio.run(asyncio.sleep(0.01))
+            return JobResult(filename="partial.txt")
+
+        monkeypatch.setitem(JOB_TYPES, "slow", JobType(handler=handler))
+        job = engine.submit(db_session, test_user, "slow", {})
+        run = asyncio.create_task(engine.run_next())
+        await started.wait()
+
+        engine.cancel(db_session, _reload(db_session, job))
+        await run
+
+        job = _reload(db_session, job)
+        assert job.status == "cancelled"
+        assert job.artifact_path is None
+        assert not (engine.artifact_dir / str(job.id)).exists()
+        assert bus.events == []
+
+    def test_cancel_queued_job(self, db_session: Session, engine, test_user):
+        job = engine.submit(db_session, test_user, "export", {})
+
+        job = engine.cancel(db_session, job)
+
+        assert job.status == "cancelled"
+        assert job.finished_at is not None
+
+
+class TestSubmit:
+    def test_rejects_unknown_type_and_bad_params(
+        self, db_session: Session, engine, test_user
+    ):
+        with pytest.raises(ValueError, match="Unsupported job type"):
+            engine.submit(db_session, test_user, "reindex", {})
+        with pytest.raises(ValueError, match="Unsupported export format"):
+            engine.submit(db_session, test_user, "export", {"format": "xml"})
+
+    def test_backup_is_admin_only(self, db_session: Session, engine, test_user):
+        with pytest.raises(PermissionError):
+            engine.submit(db_session, test_user, "backup", {})
+
+    def test_active_job_limit(
+        self, db_session: Session, engine, test_user, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "JOB_MAX_ACTIVE_PER_USER", 2)
+        engine.submit(db_session, test_user, "export", {})
+        engine.submit(db_session, test_user, "export", {})
+
+        with pytest.raises(JobQueueFull):
+            engine.submit(db_session, test_user, "export", {})
+
+
+class TestMaintenance:
+    def test_purge_expired_removes_row_and_artifact(
+        self, db_session: Session, engine, test_user
+    ):
+        job = engine.submit(db_session, test_user, "export", {})
+        job.status = "succeeded"
+        job.expires_at = datetime.utcnow() - timedelta(hours=1)
+        db_session.commit()
+        job_dir = engine.artifact_dir / str(job.id)
+        job_dir.mkdir(parents=True)
+        (job_dir / "export.json").write_text("{}")
+        orphan_dir = engine.artifact_dir / "999999"
+        orphan_dir.mkdir()
+
+        assert engine.purge_expired() == 1
+
+        db_session.expire_all()
+        assert db_session.query(BackgroundJob).count() == 0
+        assert not job_dir.exists()
+        assert not orphan_dir.exists()
+
+    def test_fail_stale_running_job(self, db_session: Session, engine, test_user):
+        job = engine.submit(db_session, test_user, "export", {})
+        job.status = "running"
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db_session.commit()
+
+        assert engine.fail_stale() == 1
+
+        job = _reload(db_session, job)
+        assert job.status == "failed"
+        assert job.finished_at is not None
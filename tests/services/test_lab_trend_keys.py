@@ -0,0 +1,147 @@
+"""
+Tests for the stored lab trend lookup columns (trend_key, effective_date,
+patient_id): maintenance on write, the trend lookup and the aggregated
+component catalog built on them.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.lab_test_component import lab_test_component
+from app.models.models import LabResult, LabTestComponent
+from app.services.lab_trend_keys import make_trend_key, refresh_trend_keys
+from app.utils.trend_statistics import compute_trend_direction
+
+
+@pytest.fixture
+def add_reading(db_session: Session, test_patient):
+    def add(test_name, value=None, unit="mg/dL", completed=None, **fields):
+        lab = LabResult(
+            patient_id=test_patient.id,
+            test_name="Panel",
+            status="completed",
+            completed_date=completed,
+        )
+        db_session.add(lab)
+        db_session.flush()
+        component = LabTestComponent(
+            lab_result_id=lab.id, test_name=test_name, value=value, unit=unit, **fields
+        )
+        db_session.add(component)
+        db_session.commit()
+        return component
+
+    return add
+
+
+class TestTrendKeyMaintenance:
+    def test_insert_sets_trend_fields(self, add_reading, test_patient):
+        component = add_reading(
+            "Glucose, ", 95, unit=" MG/dL ", completed=date(2024, 3, 1)
+        )
+
+        assert component.trend_key == make_trend_key("glucose", "mg/dl")
+        assert component.patient_id == test_patient.id
+        assert component.effective_date == date(2024, 3, 1)
+
+    def test_effective_date_falls_back_to_created_day(self, add_reading):
+        component = add_reading("Glucose", 95)
+
+        assert component.effective_date == component.created_at.date()
+
+    def test_canonical_name_and_unit_edits_update_key(
+        self, db_session: Session, add_reading
+    ):
+        component = add_reading("GLU", 95)
+
+        component.canonical_test_name = "Glucose"
+        component.unit = "mmol/L"
+        db_session.commit()
+
+        assert component.trend_key == make_trend_key("glucose", "mmol/L")
+
+    def test_lab_result_date_change_reaches_components(
+        self, db_session: Session, add_reading
+    ):
+        component = add_reading("Glucose", 95, completed=date(2024, 3, 1))
+        lab = db_session.get(LabResult, component.lab_result_id)
+
+        lab.completed_date = date(2024, 5, 9)
+        db_session.commit()
+        db_session.expire_all()
+
+        assert component.effective_date == date(2024, 5, 9)
+
+    def test_refresh_after_core_update(self, db_session: Session, add_reading):
+        component = add_reading("GLU", 95)
+        db_session.query(LabTestComponent).filter(
+            LabTestComponent.id == component.id
+        ).update({"canonical_test_name": "Glucose"}, synchronize_session=False)
+
+        changed = refresh_trend_keys(db_session, LabTestComponent.id == component.id)
+        db_session.commit()
+        db_session.refresh(component)
+
+        assert changed == 1
+        assert component.trend_key == make_trend_key("glucose", "mg/dL")
+
+
+class TestTrendLookups:
+    def test_series_by_name_and_unit(self, db_session: Session, add_reading):
+        add_reading("Glucose", 90, completed=date(2024, 1, 1))
+        add_reading("glucose:", 100, completed=date(2024, 2, 1))
+        add_reading("Glucose", 5.5, unit="mmol/L", completed=date(2024, 3, 1))
+        add_reading(
+            "GLU", 80, canonical_test_name="Glucose", completed=date(2024, 4, 1)
+        )
+        add_reading("Glucose Tolerance", 140, completed=date(2024, 5, 1))
+        patient_id = add_reading("Sodium", 140).patient_id
+
+        all_units = lab_test_component.get_by_patient_and_test_name(
+            db_session, patient_id=patient_id, test_name="Glucose"
+        )
+        mg_dl = lab_test_component.get_by_patient_and_test_name(
+            db_session,
+            patient_id=patient_id,
+            test_name=" glucose ",
+            unit="MG/DL",
+            date_from=date(2024, 1, 15),
+        )
+
+        assert [c.value for c in all_units] == [80, 5.5, 100, 90]
+        assert [c.value for c in mg_dl] == [80, 100]
+
+    def test_catalog_aggregates_match_python_trend(
+        self, db_session: Session, add_reading
+    ):
+        values = [100, 104, 109, None, 115]
+        for month, value in enumerate(values, start=1):
+            add_reading("Glucose", value, completed=date(2024, month, 1))
+        for month, status in enumerate(
+            ["normal", "normal", "normal", "high", "high"], start=1
+        ):
+            patient_id = add_reading(
+                "Culture",
+                unit=None,
+                result_type="qualitative",
+                status=status,
+                completed=date(2024, month, 2),
+            ).patient_id
+
+        catalog = lab_test_component.get_component_catalog(
+            db_session, patient_id=patient_id
+        )
+        entries = {entry.test_name: entry for entry in catalog["items"]}
+
+        assert catalog["total"] == 2
+        glucose = entries["Glucose"]
+        assert glucose.reading_count == 5
+        assert glucose.latest_value == 115
+        assert glucose.latest_date == "2024-05-01"
+        assert glucose.trend_direction == compute_trend_direction(
+            [v for v in values if v is not None]
+        )
+        assert entries["Culture"].reading_count == 5
+        assert entries["Culture"].trend_direction == "worsening"
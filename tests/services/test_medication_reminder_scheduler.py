@@ -17,8 +17,9 @@ from sqlalchemy.orm import Session
 
 from app.crud.patient import patient as patient_crud
 from app.models.clinical import Medication
-from app.models.notifications import NotificationHistory
+from app.models.notifications import MedicationReminderFire
 from app.schemas.patient import PatientCreate
+from app.services.medication_reminder_index import MedicationReminderIndex
 from app.services.medication_reminder_scheduler import (
     MedicationReminderSchedulerService,
 )
@@ -26,7 +27,7 @@ from app.services.medication_reminder_scheduler import (
 
 @pytest.fixture(autouse=True)
 def reset_scheduler():
-    """Reset the scheduler singleton between tests."""
+    """Reset the scheduler singleton (and its reminder index) between tests."""
     MedicationReminderSchedulerService.reset_instance()
     yield
     MedicationReminderSchedulerService.reset_instance()
@@ -79,19 +80,12 @@ def _make_med(db, patient_id, **overrides):
     return med
 
 
-def _make_history(db, *, medication_id, scheduled_local_date, scheduled_time_local):
-    """Insert a NotificationHistory row that should suppress a duplicate."""
-    row = NotificationHistory(
-        event_type="medication_reminder_due",
-        title="prior",
-        message_preview="prior",
-        status="sent",
-        attempt_count=1,
-        event_data={
-            "medication_id": medication_id,
-            "scheduled_local_date": scheduled_local_date,
-            "scheduled_time_local": scheduled_time_local,
-        },
+def _make_fire(db, *, medication_id, scheduled_date, scheduled_time):
+    """Insert a MedicationReminderFire claim that should suppress a duplicate."""
+    row = MedicationReminderFire(
+        medication_id=medication_id,
+        scheduled_date=scheduled_date,
+        scheduled_time=scheduled_time,
     )
     db.add(row)
     db.commit()
@@ -202,18 +196,18 @@ class TestEffectivePeriod:
 
 
 class TestIdempotency:
-    """A NotificationHistory entry for the same minute suppresses duplicate sends."""
+    """A reminder claim for the same minute suppresses duplicate sends."""
 
     @pytest.mark.asyncio
     async def test_dedup_suppresses_duplicate(
         self, db_session, patient_with_owner, mock_bus
     ):
         med = _make_med(db_session, patient_with_owner.id)
-        _make_history(
+        _make_fire(
             db_session,
             medication_id=med.id,
-            scheduled_local_date="2026-06-09",
-            scheduled_time_local="08:00",
+            scheduled_date=date(2026, 6, 9),
+            scheduled_time="08:00",
         )
 
         _, due, skipped, published = await _run_tick(db_session, "08:00")
@@ -228,12 +222,12 @@ class TestIdempotency:
         self, db_session, patient_with_owner, mock_bus
     ):
         med = _make_med(db_session, patient_with_owner.id)
-        # Prior history is for 08:00 — should NOT suppress the 20:00 send
-        _make_history(
+        # Prior claim is for 08:00 — should NOT suppress the 20:00 send
+        _make_fire(
             db_session,
             medication_id=med.id,
-            scheduled_local_date="2026-06-09",
-            scheduled_time_local="08:00",
+            scheduled_date=date(2026, 6, 9),
+            scheduled_time="08:00",
         )
 
         _, _, skipped, published = await _run_tick(db_session, "20:00")
@@ -241,6 +235,39 @@ class TestIdempotency:
         assert published == 1
         assert skipped == 0
 
+    @pytest.mark.asyncio
+    async def test_second_tick_same_minute_is_claimed_once(
+        self, db_session, patient_with_owner, mock_bus
+    ):
+        _make_med(db_session, patient_with_owner.id)
+
+        first = await _run_tick(db_session, "08:00")
+        second = await _run_tick(db_session, "08:00")
+
+        assert first[3] == 1
+        assert second[2:] == (1, 0)
+        assert db_session.query(MedicationReminderFire).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_publish_releases_claim(
+        self, db_session, patient_with_owner, mock_bus
+    ):
+        _make_med(db_session, patient_with_owner.id)
+        _make_med(db_session, patient_with_owner.id, medication_name="Metformin")
+        mock_bus.publish.side_effect = [ConnectionError("bus down"), None]
+
+        _, due, _, published = await _run_tick(db_session, "08:00")
+
+        assert (due, published) == (2, 1)
+        assert db_session.query(MedicationReminderFire).count() == 1
+
+        # A rerun of the minute sends the reminder that failed, only
+        mock_bus.publish.side_effect = None
+        _, _, skipped, published = await _run_tick(db_session, "08:00")
+
+        assert (skipped, published) == (1, 1)
+        assert db_session.query(MedicationReminderFire).count() == 2
+
 
 class TestMultipleMedications:
     """Multiple due medications at the same minute publish multiple events."""
@@ -255,3 +282,55 @@ class TestMultipleMedications:
         assert due == 2
         assert published == 2
         assert mock_bus.publish.await_count == 2
+
+
+class TestReminderIndex:
+    """The minute index follows medication writes and weekday selections."""
+
+    @pytest.mark.asyncio
+    async def test_index_follows_medication_updates(
+        self, db_session, patient_with_owner, mock_bus
+    ):
+        med = _make_med(db_session, patient_with_owner.id)
+        await _run_tick(db_session, "07:00")  # builds the index
+        index = MedicationReminderIndex.get_instance()
+
+        med.reminder_times = ["09:30"]
+        db_session.commit()
+
+        assert index.due(8 * 60, 1) == (0, [])
+        assert index.due(9 * 60 + 30, 1) == (1, [med.id])
+
+        _, _, _, published = await _run_tick(db_session, "09:30")
+        assert published == 1
+
+        med.status = "stopped"
+        db_session.commit()
+        assert len(index) == 0
+
+    @pytest.mark.asyncio
+    async def test_deleted_medication_leaves_index(
+        self, db_session, patient_with_owner, mock_bus
+    ):
+        med = _make_med(db_session, patient_with_owner.id)
+        await _run_tick(db_session, "07:00")
+
+        db_session.delete(med)
+        db_session.commit()
+
+        assert len(MedicationReminderIndex.get_instance()) == 0
+
+    @pytest.mark.asyncio
+    async def test_reminder_days_select_weekdays(
+        self, db_session, patient_with_owner, mock_bus
+    ):
+        # 2026-06-09 is a Tuesday (weekday 1)
+        _make_med(db_session, patient_with_owner.id, reminder_days=[0, 2])
+
+        seen, due, _, published = await _run_tick(db_session, "08:00")
+        assert (seen, due, published) == (1, 0, 0)
+
+        _, _, _, published = await _run_tick(
+            db_session, "08:00", tick_date=date(2026, 6, 10)
+        )
+        assert published == 1
@@ -17,6 +17,7 @@ from app.services.notification_templates import (
     get_template,
     get_supported_events,
 )
+from app.services.notification_transport import NotificationTransportPool
 
 
 class TestNotificationTemplates:
@@ -818,3 +819,100 @@ class TestBroadcastNotifications:
         # Verify correct number of recipients
         assert len(results) == 2
         assert mock_send.call_count == 2
+
+
+class FakeApprise:
+    """Stands in for apprise.Apprise, recording what it was asked to do."""
+
+    instances = []
+
+    def __init__(self):
+        self.urls = []
+        self.sent = []
+        FakeApprise.instances.append(self)
+
+    def add(self, url):
+        self.urls.append(url)
+        return True
+
+    def notify(self, title, body):
+        self.sent.append((title, body))
+        return True
+
+
+@pytest.fixture
+def fake_apprise():
+    NotificationTransportPool.reset_instance()
+    FakeApprise.instances = []
+    with patch("apprise.Apprise", FakeApprise):
+        yield FakeApprise
+    NotificationTransportPool.reset_instance()
+
+
+@pytest.mark.asyncio
+class TestChannelTransports:
+    """Transports are reused across sends and rebuilt when a channel changes."""
+
+    def _subscribe(self, db_session, service, count):
+        from app.models.models import User
+
+        channels = []
+        for i in range(count):
+            user = User(
+                username=f"transport_user{i}",
+                email=f"transport{i}@example.com",
+                password_hash="hashedpw",
+                role="user",
+                full_name=f"Transport User {i}",
+            )
+            db_session.add(user)
+            db_session.commit()
+            channel = service.create_channel(
+                user_id=user.id,
+                name="Backups",
+                channel_type="discord",
+                config={"webhook_url": f"https://discord.com/api/webhooks/{i}/abc"},
+            )
+            service.set_preference(user.id, channel.id, "backup_completed", True)
+            channels.append(channel)
+        return channels
+
+    async def _broadcast(self, service):
+        return await service.send_broadcast_notification(
+            event_type="backup_completed", title="Backup", message="Done"
+        )
+
+    async def test_broadcasts_reuse_transports_and_commit_once(
+        self, db_session, fake_apprise
+    ):
+        service = NotificationService(db_session)
+        channels = self._subscribe(db_session, service, 3)
+
+        await self._broadcast(service)
+        with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+            results = await self._broadcast(service)
+
+        assert len(fake_apprise.instances) == 3
+        assert all(len(apprise.sent) == 2 for apprise in fake_apprise.instances)
+        assert {r.status for r in results} == {"sent"}
+        # Pending records, then every channel's outcome in one batch
+        assert commit.call_count == 2
+        db_session.expire_all()
+        assert all(c.total_notifications_sent == 2 for c in channels)
+
+    async def test_updated_channel_gets_new_transport(self, db_session, fake_apprise):
+        service = NotificationService(db_session)
+        (channel,) = self._subscribe(db_session, service, 1)
+        await self._broadcast(service)
+
+        service.update_channel(
+            channel.user_id,
+            channel.id,
+            config={"webhook_url": "https://discord.com/api/webhooks/9/xyz"},
+        )
+        await self._broadcast(service)
+
+        assert [apprise.urls for apprise in fake_apprise.instances] == [
+            ["discord://0/abc"],
+            ["discord://9/xyz"],
+        ]
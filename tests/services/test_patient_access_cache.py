@@ -0,0 +1,164 @@
+"""
+Tests for the patient access decision cache and its use by PatientAccessService.
+"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.utils.datetime_utils import get_utc_now
+from app.models.models import PatientShare
+from app.services.patient_access import PatientAccessService
+from app.services.patient_access_cache import PatientAccessCache, patient_access_cache
+from app.services.patient_sharing import PatientSharingService
+
+
+@pytest.fixture
+def count_queries(db_session):
+    """Count SELECTs issued on the test session's engine while the block runs."""
+    engine = db_session.get_bind()
+    statements = []
+
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _before_execute)
+
+
+class TestPatientAccessCache:
+    """Unit tests for the cache structure itself"""
+
+    def test_hit_and_miss_counters(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=10)
+
+        assert cache.get(1, 2, "view") is None
+        cache.set(1, 2, "view", True)
+        assert cache.get(1, 2, "view") is True
+        assert cache.get(1, 2, "edit") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["entries"] == 1
+
+    def test_negative_decisions_are_cached(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=10)
+        cache.set(1, 2, "view", False)
+        assert cache.get(1, 2, "view") is False
+
+    def test_invalidate_patient_only_drops_that_patient(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=10)
+        cache.set(1, 2, "view", True)
+        cache.set(1, 3, "view", True)
+
+        cache.invalidate_patient(2)
+
+        assert cache.get(1, 2, "view") is None
+        assert cache.get(1, 3, "view") is True
+
+    def test_invalidate_user_only_drops_that_user(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=10)
+        cache.set(1, 2, "view", True)
+        cache.set(5, 2, "view", True)
+
+        cache.invalidate_user(1)
+
+        assert cache.get(1, 2, "view") is None
+        assert cache.get(5, 2, "view") is True
+
+    def test_share_expiry_caps_entry_lifetime(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=10)
+        cache.set(1, 2, "view", True, expires_at=get_utc_now() - timedelta(seconds=1))
+        assert cache.get(1, 2, "view") is None
+
+    def test_evicts_oldest_when_full(self):
+        cache = PatientAccessCache(ttl_seconds=60, max_entries=2)
+        cache.set(1, 1, "view", True)
+        cache.set(1, 2, "view", True)
+        cache.set(1, 3, "view", True)
+
+        assert cache.get(1, 1, "view") is None
+        assert cache.get(1, 3, "view") is True
+        assert cache.stats()["evictions"] == 1
+
+    def test_zero_ttl_disables_cache(self):
+        cache = PatientAccessCache(ttl_seconds=0, max_entries=10)
+        cache.set(1, 2, "view", True)
+        assert cache.get(1, 2, "view") is None
+        assert cache.stats()["enabled"] is False
+
+
+class TestPatientAccessServiceCaching:
+    """Integration of the cache with PatientAccessService and its invalidation hooks"""
+
+    def test_owner_check_by_id_hits_cache_without_queries(
+        self, db_session, test_user, test_patient, count_queries
+    ):
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_user, test_patient.id) is True
+
+        count_queries.clear()
+        assert service.check_patient_access(test_user, test_patient.id) is True
+        assert count_queries == []
+
+    def test_missing_patient_returns_none(self, db_session, test_user):
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_user, 999999) is None
+
+    def test_revoking_share_invalidates_cached_grant(
+        self, db_session, test_user, test_recipient, test_patient, test_share
+    ):
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_recipient, test_patient.id) is True
+
+        PatientSharingService(db_session).remove_user_access(
+            test_recipient, test_patient.id
+        )
+
+        assert service.check_patient_access(test_recipient, test_patient.id) is False
+
+    def test_new_share_invalidates_cached_denial(
+        self, db_session, test_user, test_recipient, test_patient
+    ):
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_recipient, test_patient.id) is False
+
+        PatientSharingService(db_session).share_patient(
+            owner=test_user,
+            patient_id=test_patient.id,
+            shared_with_user_id=test_recipient.id,
+            permission_level="view",
+        )
+
+        assert service.check_patient_access(test_recipient, test_patient.id) is True
+
+    def test_permission_levels_are_cached_independently(
+        self, db_session, test_user, test_recipient, test_patient, test_share
+    ):
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_recipient, test_patient.id, "view")
+        assert not service.check_patient_access(
+            test_recipient, test_patient.id, "edit"
+        )
+
+    def test_expired_share_is_not_cached_as_grant(
+        self, db_session, test_user, test_recipient, test_patient
+    ):
+        share = PatientShare(
+            patient_id=test_patient.id,
+            shared_by_user_id=test_user.id,
+            shared_with_user_id=test_recipient.id,
+            permission_level="view",
+            is_active=True,
+            expires_at=get_utc_now() - timedelta(days=1),
+        )
+        db_session.add(share)
+        db_session.commit()
+
+        service = PatientAccessService(db_session)
+        assert service.check_patient_access(test_recipient, test_patient.id) is False
+        assert patient_access_cache.get(test_recipient.id, test_patient.id, "view") is False
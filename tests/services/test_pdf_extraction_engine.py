@@ -0,0 +1,185 @@
+"""
+Tests for PDF extraction off the event loop: results cached by PDF hash,
+one pdfplumber handle per document, and OCR a page at a time within the
+memory limit.
+"""
+
+import io
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pdfplumber
+import pytest
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from app.services import pdf_extraction_engine
+from app.services.pdf_extraction_engine import PDFExtractionEngine
+from app.services.pdf_text_extraction_service import (
+    PDFTextExtractionService,
+    _PDFDocument,
+)
+from tests.fixtures.pdf_fixtures import create_minimal_pdf
+
+PDF_BYTES = create_minimal_pdf().getvalue()
+
+
+def _text_pdf(pages=2) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        pdf.drawString(72, 720, f"WBC 7.{page} x10E3/uL 3.4-10.8")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _result(text="WBC: 7.5", method="native"):
+    return {
+        "text": text,
+        "method": method,
+        "confidence": 0.95,
+        "page_count": 1,
+        "char_count": len(text),
+        "error": None if method != "failed" else "broken",
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return PDFExtractionEngine(
+        workers=0, cache_dir=tmp_path / "extractions", cache_max_bytes=10_000
+    )
+
+
+class TestPDFExtractionEngine:
+    @pytest.mark.asyncio
+    async def test_same_pdf_is_served_from_cache(self, engine, monkeypatch):
+        calls = []
+
+        def fake_extract(pdf_bytes, filename):
+            calls.append(filename)
+            return _result()
+
+        monkeypatch.setattr(pdf_extraction_engine, "extract_pdf", fake_extract)
+
+        first = await engine.extract(PDF_BYTES, "a.pdf")
+        second = await engine.extract(PDF_BYTES, "renamed.pdf")
+
+        assert calls == ["a.pdf"]
+        assert first["cached"] is False and second["cached"] is True
+        assert second["text"] == first["text"]
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_is_not_cached(self, engine, monkeypatch):
+        calls = []
+
+        def fake_extract(pdf_bytes, filename):
+            calls.append(filename)
+            return _result(text="", method="failed")
+
+        monkeypatch.setattr(pdf_extraction_engine, "extract_pdf", fake_extract)
+
+        await engine.extract(PDF_BYTES, "a.pdf")
+        await engine.extract(PDF_BYTES, "a.pdf")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_fails_without_extracting_in_process(
+        self, engine, monkeypatch
+    ):
+        class _BrokenPool(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(BrokenProcessPool("worker died"))
+                return future
+
+        def fake_extract(pdf_bytes, filename):
+            raise AssertionError("extracted in the server process")
+
+        monkeypatch.setattr(pdf_extraction_engine, "extract_pdf", fake_extract)
+        engine.workers = 1
+        engine._executor = _BrokenPool()
+
+        result = await engine.extract(PDF_BYTES, "bomb.pdf")
+
+        assert result["method"] == "failed"
+        assert result["cached"] is False
+        assert engine._executor is None
+
+    def test_cache_evicts_least_recently_used(self, engine):
+        cache = engine.cache
+        cache.max_bytes = 1500
+        cache.put("old", _result("x" * 500))
+        cache.put("used", _result("y" * 500))
+        # Distinct mtimes without sleeping; "old" is then read again
+        os.utime(cache.directory / "old.json", (1, 1))
+        os.utime(cache.directory / "used.json", (2, 2))
+        assert cache.get("old") is not None
+
+        cache.put("new", _result("z" * 500))
+
+        assert cache.get("used") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+
+
+class TestPDFTextExtraction:
+    def test_text_passes_share_one_pdfplumber_handle(self):
+        service = PDFTextExtractionService()
+        document = _PDFDocument(_text_pdf(pages=2))
+
+        with patch(
+            "app.services.pdf_text_extraction_service.pdfplumber.open",
+            wraps=pdfplumber.open,
+        ) as opened:
+            native = service._extract_native_text(document)
+            layout = service._extract_layout_text(document)
+            document.close()
+
+        assert opened.call_count == 1
+        assert native["page_count"] == 2
+        assert "WBC 7.1" in native["text"]
+        assert "WBC 7.1" in layout
+
+    def test_ocr_rasterizes_one_page_at_a_time_within_memory_limit(self):
+        service = PDFTextExtractionService()
+        service.ocr_available = True
+        service.settings.OCR_PAGE_WORKERS = 8
+        service.settings.OCR_MEMORY_LIMIT_MB = 48  # two pages' worth
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+        requested = []
+
+        def fake_convert(path, first_page, last_page, **kwargs):
+            with lock:
+                requested.append((first_page, last_page))
+                in_flight.append(first_page)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            return [Image.new("L", (10, 10))]
+
+        def fake_ocr(image, config):
+            with lock:
+                in_flight.pop()
+            return "page"
+
+        with patch(
+            "app.services.pdf_text_extraction_service.convert_from_path",
+            side_effect=fake_convert,
+        ), patch(
+            "app.services.pdf_text_extraction_service.pytesseract.image_to_string",
+            side_effect=fake_ocr,
+        ):
+            result = service._extract_ocr_text(PDF_BYTES, page_count=6)
+
+        assert sorted(requested) == [(n, n) for n in range(1, 7)]
+        assert max(peak) <= 2
+        assert result["page_count"] == 6
+        assert result["text"] == "\n".join(["page"] * 6)
@@ -0,0 +1,92 @@
+"""
+Tests for the shared PDF rendering context: one-time font registration,
+cached stylesheets and translators, and report generators using them.
+"""
+
+import threading
+
+import pytest
+
+from app.services import pdf_rendering_context as rendering_module
+from app.services.custom_report_pdf_generator import CustomReportPDFGenerator
+from app.services.pdf_rendering_context import FontSet, PDFRenderingContext
+
+FONTS = FontSet(
+    normal="Helvetica",
+    bold="Helvetica-Bold",
+    cjk_normal="Times-Roman",
+    cjk_bold="Times-Bold",
+    has_cjk=True,
+)
+
+
+@pytest.fixture
+def registrations(monkeypatch):
+    calls = []
+
+    def register():
+        calls.append(1)
+        return FONTS
+
+    monkeypatch.setattr(rendering_module, "register_fonts", register)
+    return calls
+
+
+class TestPDFRenderingContext:
+    def test_fonts_registered_once_across_threads(self, registrations):
+        context = PDFRenderingContext()
+
+        threads = [threading.Thread(target=lambda: context.fonts) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(registrations) == 1
+        assert context.fonts is FONTS
+
+    def test_styles_cached_per_font_pair(self, registrations):
+        context = PDFRenderingContext()
+
+        english = context.styles_for_language("en")
+        chinese = context.styles_for_language("zh")
+
+        assert context.styles_for_language("fr") is english
+        assert chinese is not english
+        assert english["CustomBody"].fontName == "Helvetica"
+        assert chinese["CustomTitle"].fontName == "Times-Bold"
+
+    def test_translators_cached_by_resolved_codes(self):
+        context = PDFRenderingContext()
+
+        french = context.translator("fr", "dmy")
+
+        assert context.translator("fr", "dmy") is french
+        assert context.translator("xx", "bogus") is context.translator("en", "mdy")
+        assert ("xx", "bogus") not in context._translators
+
+    def test_generators_share_resources(self, registrations):
+        context = PDFRenderingContext()
+        context.warmup()
+
+        first = CustomReportPDFGenerator(rendering=context)
+        second = CustomReportPDFGenerator(rendering=context)
+
+        assert len(registrations) == 1
+        assert first.styles is second.styles
+        assert first.translator is second.translator
+        assert first.font_cjk_normal == "Times-Roman"
+
+
+@pytest.mark.asyncio
+async def test_generate_pdf_selects_language_resources(registrations):
+    context = PDFRenderingContext()
+    generator = CustomReportPDFGenerator(rendering=context)
+
+    pdf = await generator.generate_pdf(
+        {"report_title": "Summary", "language": "zh", "date_format": "ymd"}
+    )
+
+    assert pdf.startswith(b"%PDF")
+    assert generator.styles is context.styles_for_language("zh")
+    assert generator.translator is context.translator("zh", "ymd")
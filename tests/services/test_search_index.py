@@ -0,0 +1,234 @@
+"""
+Tests for the patient search index: maintenance on writes, ranking and paging.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.condition import condition as condition_crud
+from app.crud.medication import medication as medication_crud
+from app.crud.patient import patient as patient_crud
+from app.crud.vitals import vitals as vitals_crud
+from app.models.models import Medication
+from app.models.search import SearchIndexEntry
+from app.schemas.condition import ConditionCreate
+from app.schemas.medication import MedicationCreate, MedicationUpdate
+from app.schemas.patient import PatientCreate
+from app.services import search_index
+from app.services.vitals_parsers.base_parser import VitalsReading
+
+ALL_TYPES = list(search_index.SEARCH_RECORD_TYPES)
+
+
+def _index_rows(db: Session, record_type: str, record_id: int):
+    return (
+        db.query(SearchIndexEntry)
+        .filter(
+            SearchIndexEntry.record_type == record_type,
+            SearchIndexEntry.record_id == record_id,
+        )
+        .all()
+    )
+
+
+def _create_medication(db: Session, patient_id: int, **fields) -> Medication:
+    data = {
+        "patient_id": patient_id,
+        "medication_name": "Aspirin",
+        "status": "active",
+        "effective_period_start": date(2024, 1, 1),
+    }
+    data.update(fields)
+    return medication_crud.create(db, obj_in=MedicationCreate(**data))
+
+
+class TestIndexMaintenance:
+    """Index rows follow CRUD writes on the source records"""
+
+    def test_create_update_delete(self, db_session: Session, test_patient):
+        med = _create_medication(db_session, test_patient.id, dosage="81mg")
+
+        rows = _index_rows(db_session, "medications", med.id)
+        assert len(rows) == 1
+        assert rows[0].patient_id == test_patient.id
+        assert rows[0].payload["medication_name"] == "Aspirin"
+
+        medication_crud.update(
+            db_session, db_obj=med, obj_in=MedicationUpdate(medication_name="Ibuprofen")
+        )
+        db_session.expire_all()
+        rows = _index_rows(db_session, "medications", med.id)
+        assert rows[0].title == "Ibuprofen"
+
+        medication_crud.delete(db_session, id=med.id)
+        assert _index_rows(db_session, "medications", med.id) == []
+
+    def test_vitals_bulk_create_and_delete_by_import(
+        self, db_session: Session, test_patient
+    ):
+        readings = [
+            VitalsReading(
+                recorded_date=datetime(2024, 3, 5, hour, 0),
+                blood_glucose=100.0 + hour,
+                import_source="dexcom_clarity",
+                notes="cgm import",
+            )
+            for hour in range(3)
+        ]
+        inserted = vitals_crud.bulk_create(
+            db_session, readings=readings, patient_id=test_patient.id
+        )
+        assert inserted == 3
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query="cgm",
+            record_types=["vitals"],
+        )
+        assert groups["vitals"].count == 3
+
+        vitals_crud.bulk_delete_by_import(
+            db_session,
+            patient_id=test_patient.id,
+            import_source="dexcom_clarity",
+            date_str="2024-03-05",
+        )
+        assert (
+            db_session.query(SearchIndexEntry)
+            .filter(SearchIndexEntry.record_type == "vitals")
+            .count()
+            == 0
+        )
+
+    def test_rebuild_and_one_time_build(self, db_session: Session, test_patient):
+        med = _create_medication(db_session, test_patient.id)
+        db_session.query(SearchIndexEntry).delete()
+        db_session.commit()
+
+        counts = search_index.rebuild(db_session, patient_id=test_patient.id)
+        assert counts["medications"] == 1
+        assert len(_index_rows(db_session, "medications", med.id)) == 1
+
+        first = search_index.run_one_time_build(db_session)
+        assert first["skipped"] is False
+        second = search_index.run_one_time_build(db_session)
+        assert second["skipped"] is True
+
+
+class TestSearch:
+    """Ranking, filtering and paging of search()"""
+
+    def test_relevance_prefers_title_matches(self, db_session: Session, test_patient):
+        in_notes = _create_medication(
+            db_session,
+            test_patient.id,
+            medication_name="Metformin",
+            indication="taken with lisinopril",
+        )
+        in_title = _create_medication(
+            db_session, test_patient.id, medication_name="Lisinopril"
+        )
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query="lisinopril",
+            record_types=["medications"],
+        )
+
+        items = groups["medications"].items
+        assert [item["id"] for item in items] == [in_title.id, in_notes.id]
+        assert items[0]["score"] > items[1]["score"]
+
+    def test_short_query_uses_substring_fallback(
+        self, db_session: Session, test_patient
+    ):
+        _create_medication(db_session, test_patient.id, medication_name="Zyrtec")
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query="zy",
+            record_types=["medications"],
+        )
+        assert groups["medications"].count == 1
+
+    def test_count_survives_page_past_end(self, db_session: Session, test_patient):
+        for n in range(3):
+            _create_medication(db_session, test_patient.id, medication_name=f"Med {n}")
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query="med",
+            record_types=["medications"],
+            skip=10,
+            limit=5,
+        )
+        assert groups["medications"].count == 3
+        assert groups["medications"].items == []
+
+    def test_date_to_includes_whole_day(self, db_session: Session, test_patient):
+        vitals_crud.bulk_create(
+            db_session,
+            readings=[
+                VitalsReading(
+                    recorded_date=datetime(2024, 6, 30, 18, 45), heart_rate=70
+                )
+            ],
+            patient_id=test_patient.id,
+        )
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query=None,
+            record_types=["vitals"],
+            date_to=date(2024, 6, 30),
+        )
+        assert groups["vitals"].count == 1
+
+    def test_results_are_patient_scoped(
+        self, db_session: Session, test_patient, test_admin_user
+    ):
+        other = patient_crud.create_for_user(
+            db_session,
+            user_id=test_admin_user.id,
+            patient_data=PatientCreate(
+                first_name="Other",
+                last_name="Patient",
+                birth_date=date(1980, 1, 1),
+            ),
+        )
+        condition_crud.create(
+            db_session,
+            obj_in=ConditionCreate(
+                patient_id=other.id,
+                condition_name="Asthma",
+                diagnosis="Asthma",
+                status="active",
+            ),
+        )
+
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query="asthma",
+            record_types=ALL_TYPES,
+        )
+        assert all(group.count == 0 for group in groups.values())
+
+    @pytest.mark.parametrize("query", ['"quoted', "a*b OR c", "test\x00null"])
+    def test_operator_characters_are_literal(
+        self, db_session: Session, test_patient, query
+    ):
+        groups = search_index.search(
+            db_session,
+            patient_id=test_patient.id,
+            query=query,
+            record_types=ALL_TYPES,
+        )
+        assert all(group.count == 0 for group in groups.values())
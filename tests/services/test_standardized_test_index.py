@@ -0,0 +1,238 @@
+"""
+Tests for the in-memory standardized test index: ranking, batch matching
+without per-name queries, and staying current as the catalogue changes.
+"""
+
+import pytest
+from sqlalchemy import event, text
+
+from app.crud import standardized_test
+from app.services import standardized_test_index
+from app.services.standardized_test_index import StandardizedTestIndex
+
+CATALOGUE = [
+    {
+        "loinc_code": "2345-7",
+        "test_name": "Glucose",
+        "short_name": "GLU",
+        "common_names": ["Blood Sugar", "Glucose"],
+        "category": "chemistry",
+        "is_common": True,
+        "display_order": 2,
+    },
+    {
+        "loinc_code": "4548-4",
+        "test_name": "Hemoglobin A1c",
+        "short_name": "HbA1c",
+        "common_names": ["A1C", "Glycated Hemoglobin"],
+        "category": "endocrinology",
+        "is_common": True,
+        "display_order": 3,
+    },
+    {
+        "loinc_code": "718-7",
+        "test_name": "Hemoglobin",
+        "short_name": "Hgb",
+        "common_names": ["Hb"],
+        "category": "hematology",
+        "is_common": True,
+        "display_order": 1,
+    },
+    {
+        "loinc_code": "6690-2",
+        "test_name": "White Blood Cell Count",
+        "short_name": "WBC",
+        "common_names": ["Leukocytes"],
+        "category": "hematology",
+        "is_common": False,
+        "display_order": 4,
+    },
+    {
+        "loinc_code": "2339-0",
+        "test_name": "Glucose [Mass/volume] in Blood",
+        "short_name": None,
+        "common_names": None,
+        "category": "chemistry",
+        "is_common": False,
+        "display_order": 5,
+    },
+]
+
+
+@pytest.fixture
+def catalogue(db_session):
+    standardized_test.bulk_create_tests(db_session, CATALOGUE)
+
+
+@pytest.fixture
+def statements(db_session):
+    executed = []
+    engine = db_session.get_bind()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _names(tests):
+    return [test.test_name for test in tests]
+
+
+class TestRanking:
+    def test_exact_name_before_prefix_and_contains(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "hemoglobin")
+
+        assert _names(results) == ["Hemoglobin", "Hemoglobin A1c"]
+
+    def test_common_name_and_word_prefix(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "blood")
+
+        # "Blood Sugar" starts with the query; the others only contain it
+        assert _names(results) == [
+            "Glucose",
+            "White Blood Cell Count",
+            "Glucose [Mass/volume] in Blood",
+        ]
+
+    def test_common_tests_rank_first_within_a_tier(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "gluc")
+
+        assert _names(results) == ["Glucose", "Glucose [Mass/volume] in Blood"]
+
+    def test_all_words_in_any_order(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "count white")
+
+        assert _names(results) == ["White Blood Cell Count"]
+
+    def test_short_query_matches_substrings(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "c")
+
+        assert "Hemoglobin A1c" in _names(results)
+
+    def test_loinc_code(self, db_session, catalogue):
+        results = standardized_test.search_tests(db_session, "718-7")
+
+        assert _names(results) == ["Hemoglobin"]
+
+    def test_empty_query_lists_common_tests_in_display_order(
+        self, db_session, catalogue
+    ):
+        results = standardized_test.search_tests(db_session, "  ")
+
+        assert _names(results) == ["Hemoglobin", "Glucose", "Hemoglobin A1c"]
+
+    def test_searches_are_served_from_memory(self, db_session, catalogue, statements):
+        standardized_test.search_tests(db_session, "glu")
+        statements.clear()
+
+        standardized_test.search_tests(db_session, "hem")
+        standardized_test.get_autocomplete_options(db_session, "wbc")
+
+        assert statements == []
+
+
+class TestBatchMatch:
+    def test_exact_then_best_match(self, db_session, catalogue):
+        matches = standardized_test.match_tests(
+            db_session, ["GLUCOSE", "a1c", "Blood Sugar", "Ferritin"]
+        )
+
+        assert [match and match.test_name for match in matches] == [
+            "Glucose",
+            "Hemoglobin A1c",
+            "Glucose",
+            None,
+        ]
+
+    def test_endpoint_issues_no_query_per_name(
+        self, authenticated_client, db_session, catalogue, statements
+    ):
+        names = ["Glucose", "Hgb", "wbc", "Ferritin"] * 50
+        # Load the index and authenticate once, outside the measured call
+        authenticated_client.post(
+            "/api/v1/standardized-tests/batch-match", json={"test_names": names[:1]}
+        )
+        statements.clear()
+
+        response = authenticated_client.post(
+            "/api/v1/standardized-tests/batch-match", json={"test_names": names}
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 200
+        assert results[1]["matched_test"]["loinc_code"] == "718-7"
+        assert results[3]["matched_test"] is None
+        # Only the per-request authentication lookups remain
+        assert len(statements) < 5
+
+
+class TestFreshness:
+    def test_committed_create_is_searchable(self, db_session, catalogue):
+        standardized_test.search_tests(db_session, "glu")
+
+        standardized_test.create_test(
+            db_session,
+            {"loinc_code": "2276-4", "test_name": "Ferritin", "is_common": False},
+        )
+
+        assert _names(standardized_test.search_tests(db_session, "ferr")) == [
+            "Ferritin"
+        ]
+
+    def test_update_and_delete_are_reflected(self, db_session, catalogue):
+        glucose = standardized_test.get_test_by_loinc(db_session, "2345-7")
+        standardized_test.search_tests(db_session, "glu")
+
+        standardized_test.update_test(
+            db_session, glucose.id, {"test_name": "Fasting Glucose"}
+        )
+        assert _names(standardized_test.search_tests(db_session, "fasting")) == [
+            "Fasting Glucose"
+        ]
+
+        standardized_test.delete_test(db_session, glucose.id)
+        assert standardized_test.search_tests(db_session, "fasting") == []
+
+    def test_clear_all_tests_empties_the_index(self, db_session, catalogue):
+        standardized_test.search_tests(db_session, "glu")
+
+        standardized_test.clear_all_tests(db_session)
+
+        assert standardized_test.search_tests(db_session, "glu") == []
+
+    def test_writes_from_another_worker_are_picked_up(
+        self, db_session, catalogue, monkeypatch
+    ):
+        standardized_test.search_tests(db_session, "glu")
+        # A write the mapper events can't see, as from another process
+        db_session.execute(
+            text(
+                "INSERT INTO standardized_tests "
+                "(loinc_code, test_name, is_common, created_at, updated_at) "
+                "VALUES ('2276-4', 'Ferritin', 0, CURRENT_TIMESTAMP, "
+                "CURRENT_TIMESTAMP)"
+            )
+        )
+        db_session.commit()
+        assert standardized_test.search_tests(db_session, "ferr") == []
+
+        monkeypatch.setattr(standardized_test_index, "STALE_CHECK_SECONDS", 0)
+
+        assert _names(standardized_test.search_tests(db_session, "ferr")) == [
+            "Ferritin"
+        ]
+
+    def test_rollback_keeps_the_index(self, db_session, catalogue):
+        index = StandardizedTestIndex.get_instance()
+        standardized_test.search_tests(db_session, "glu")
+
+        glucose = standardized_test.get_test_by_loinc(db_session, "2345-7")
+        glucose.test_name = "Renamed"
+        db_session.flush()
+        db_session.rollback()
+
+        assert index.loaded
@@ -2,7 +2,6 @@
 Tests for TagService - verifying exact tag matching behavior.
 """
 
-import os
 import pytest
 from datetime import date
 from sqlalchemy.orm import Session
@@ -14,11 +13,6 @@ from app.models.models import Medication
 from app.schemas.medication import MedicationCreate
 from app.schemas.patient import PatientCreate
 
-pytestmark = pytest.mark.skipif(
-    "sqlite" in os.environ.get("DATABASE_URL", "sqlite"),
-    reason="Tag service requires PostgreSQL JSON functions",
-)
-
 
 class TestTagServiceExactMatching:
     """Test TagService operations with focus on exact tag matching."""
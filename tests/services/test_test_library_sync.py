@@ -11,7 +11,7 @@ from app.crud.lab_test_component import lab_test_component as lab_test_component
 from app.crud.lab_result import lab_result as lab_result_crud
 from app.crud.patient import patient as patient_crud
 from app.crud.system_setting import system_setting
-from app.models.models import SystemSetting
+from app.models.models import LabTestComponent, Patient, SystemSetting
 from app.schemas.lab_test_component import LabTestComponentCreate
 from app.schemas.lab_result import LabResultCreate
 from app.schemas.patient import PatientCreate
@@ -78,7 +78,7 @@ class TestTestLibrarySyncService:
         """Test that the service initializes correctly."""
         assert sync_service is not None
         assert sync_service.MIGRATION_KEY == "canonical_test_migration_completed"
-        assert sync_service.BATCH_SIZE == 100
+        assert sync_service.BATCH_SIZE == 1000
 
     def test_singleton_instance(self):
         """Test that test_library_sync is a singleton instance."""
@@ -500,3 +500,109 @@ class TestTestLibrarySyncService:
         # Refresh and verify canonical name was set
         db_session.refresh(created)
         assert created.canonical_test_name == "Total Cholesterol"
+
+    # Test sync_components
+    def _add_components(self, db_session, lab_result_id, names, **fields):
+        components = [
+            LabTestComponent(lab_result_id=lab_result_id, test_name=name, **fields)
+            for name in names
+        ]
+        db_session.add_all(components)
+        db_session.commit()
+        return components
+
+    def test_sync_components_matches_each_distinct_name_once(
+        self, sync_service, db_session, test_lab_result, monkeypatch
+    ):
+        """Test that repeated names are resolved once and written in chunks."""
+        components = self._add_components(
+            db_session,
+            test_lab_result.id,
+            ["WBC", "wbc ", " Wbc", "HGB", "hgb", "Unknown Test XYZ"] * 3,
+        )
+        resolved = []
+        original = sync_service._resolve_name
+
+        def counting(name):
+            resolved.append(name)
+            return original(name)
+
+        monkeypatch.setattr(sync_service, "_resolve_name", counting)
+        monkeypatch.setattr(sync_service, "BATCH_SIZE", 4)
+        progress = []
+
+        result = sync_service.sync_components(
+            db_session, progress=lambda done, total: progress.append((done, total))
+        )
+
+        assert sorted(resolved) == ["hgb", "unknown test xyz", "wbc"]
+        assert result["distinct_names"] == 3
+        assert result["processed"] == 18
+        assert result["linked"] == 15
+        assert result["unlinked"] == 3
+        assert result["canonical_updated"] == 15
+        assert progress == [(4, 18), (8, 18), (12, 18), (16, 18), (18, 18)]
+        names = {c.test_name: c.canonical_test_name for c in components}
+        assert names[" Wbc"] == "White Blood Cell Count"
+        assert names["hgb"] == "Hemoglobin"
+        # Unmatched components are marked processed
+        assert names["Unknown Test XYZ"] == ""
+
+    def test_sync_components_force_all_only_counts_changes(
+        self, sync_service, db_session, test_lab_result
+    ):
+        """Test that a forced re-sync rewrites stale values and skips current ones."""
+        current, stale = self._add_components(
+            db_session,
+            test_lab_result.id,
+            ["WBC", "HGB"],
+            canonical_test_name="White Blood Cell Count",
+        )
+        sync_service.sync_components(db_session, force_all=True)
+        current_category = current.category
+
+        stale.canonical_test_name = "Outdated Name"
+        stale.category = "other"
+        db_session.commit()
+
+        result = sync_service.sync_components(db_session, force_all=True)
+
+        assert result["processed"] == 2
+        assert result["canonical_updated"] == 1
+        assert result["category_updated"] == 1
+        assert stale.canonical_test_name == "Hemoglobin"
+        assert stale.category == current_category
+        assert current.canonical_test_name == "White Blood Cell Count"
+
+    def test_sync_components_patient_scope(
+        self, sync_service, db_session, test_user, test_lab_result
+    ):
+        """Test that a patient-scoped sync leaves other patients' components."""
+        other_patient = Patient(
+            user_id=test_user.id,
+            owner_user_id=test_user.id,
+            first_name="Jane",
+            last_name="Doe",
+            birth_date=date(1992, 2, 2),
+        )
+        db_session.add(other_patient)
+        db_session.commit()
+        other_result = lab_result_crud.create(
+            db_session,
+            obj_in=LabResultCreate(
+                patient_id=other_patient.id,
+                test_name="Complete Blood Count",
+                status="completed",
+                completed_date=date(2024, 1, 16),
+            ),
+        )
+        (mine,) = self._add_components(db_session, test_lab_result.id, ["WBC"])
+        (theirs,) = self._add_components(db_session, other_result.id, ["WBC"])
+
+        result = sync_service.sync_components(
+            db_session, patient_id=test_lab_result.patient_id
+        )
+
+        assert result["processed"] == 1
+        assert mine.canonical_test_name == "White Blood Cell Count"
+        assert theirs.canonical_test_name is None
@@ -4,17 +4,22 @@ used by the custom-reports feature. Ensures the same analyte recorded in
 different units (e.g. Calcium mg/L vs mmol/L) is never merged into one series.
 """
 
-from datetime import date
+from datetime import date, datetime
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.crud.lab_result import lab_result as lab_result_crud
 from app.crud.lab_test_component import lab_test_component as lab_test_component_crud
 from app.crud.patient import patient as patient_crud
+from app.crud.vitals import VITAL_TYPE_COLUMNS as VITAL_FILTER_COLUMNS
+from app.models.clinical import VITAL_TYPE_COLUMNS
+from app.models.models import Vitals
 from app.schemas.lab_result import LabResultCreate
 from app.schemas.lab_test_component import LabTestComponentCreate
 from app.schemas.patient import PatientCreate
+from app.schemas.trend_charts import SUPPORTED_VITAL_TYPES
 from app.services.trend_data_fetcher import TrendDataFetcher
 
 
@@ -190,3 +195,119 @@ class TestCountLabTestRecords:
             )
             == 4
         )
+
+
+@pytest.fixture
+def seeded_vitals(db_session: Session, test_patient):
+    """Glucose readings across three days (one late evening) plus one BP reading."""
+    for recorded, glucose in [
+        (datetime(2026, 3, 1, 8, 0), 95.0),
+        (datetime(2026, 3, 2, 23, 55), 140.0),
+        (datetime(2026, 3, 3, 7, 30), 110.0),
+    ]:
+        db_session.add(
+            Vitals(
+                patient_id=test_patient.id,
+                recorded_date=recorded,
+                blood_glucose=glucose,
+            )
+        )
+    db_session.add(
+        Vitals(
+            patient_id=test_patient.id,
+            recorded_date=datetime(2026, 3, 2, 9, 0),
+            systolic_bp=120,
+            diastolic_bp=80,
+            heart_rate=70,
+        )
+    )
+    db_session.commit()
+    return test_patient
+
+
+class TestFetchVitalTrends:
+    def test_date_to_includes_whole_last_day(
+        self, db_session: Session, seeded_vitals
+    ):
+        fetcher = TrendDataFetcher(db_session)
+        data = fetcher.fetch_vital_trend(
+            seeded_vitals.id, "blood_glucose", date(2026, 3, 2), date(2026, 3, 2)
+        )
+        assert data["values"] == [140.0]
+
+    def test_multi_series_matches_single_fetches(
+        self, db_session: Session, seeded_vitals
+    ):
+        fetcher = TrendDataFetcher(db_session)
+        requests = [
+            ("blood_glucose", date(2026, 3, 1), date(2026, 3, 2)),
+            ("blood_pressure", None, None),
+            ("heart_rate", date(2026, 3, 3), None),
+            ("blood_glucose", None, None),
+        ]
+
+        batched = fetcher.fetch_vital_trends(seeded_vitals.id, requests)
+
+        assert batched == [
+            fetcher.fetch_vital_trend(seeded_vitals.id, *request)
+            for request in requests
+        ]
+        assert batched[0]["values"] == [95.0, 140.0]
+        assert batched[1]["systolic_values"] == [120.0]
+        assert batched[2]["values"] == []
+        assert len(batched[3]["values"]) == 3
+
+    def test_multi_series_reads_raw_rows_once(
+        self, db_session: Session, seeded_vitals
+    ):
+        fetcher = TrendDataFetcher(db_session)
+        patient_id = seeded_vitals.id
+        engine = db_session.get_bind()
+        selects = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            fetcher.fetch_vital_trends(
+                patient_id,
+                [("blood_glucose", None, None), ("blood_pressure", None, None)],
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+        # One read of the day rollups, one pass over the raw readings
+        assert len(selects) == 2
+        assert sum("FROM vitals " in statement for statement in selects) == 1
+
+    def test_unsupported_type_rejected(self, db_session: Session, seeded_vitals):
+        fetcher = TrendDataFetcher(db_session)
+        with pytest.raises(ValueError):
+            fetcher.fetch_vital_trends(seeded_vitals.id, [("height", None, None)])
+
+    def test_available_vital_types_and_counts(
+        self, db_session: Session, seeded_vitals
+    ):
+        fetcher = TrendDataFetcher(db_session)
+        available = {
+            item["vital_type"]: item["count"]
+            for item in fetcher.get_available_vital_types(seeded_vitals.id)
+        }
+        assert available == {"blood_pressure": 1, "heart_rate": 1, "blood_glucose": 3}
+        assert (
+            fetcher.count_vital_records(
+                seeded_vitals.id, "blood_glucose", date(2026, 3, 2), date(2026, 3, 3)
+            )
+            == 2
+        )
+
+    def test_every_vital_type_has_a_matching_partial_index(self):
+        indexes = {index.name: index for index in Vitals.__table__.indexes}
+        for vital_type in SUPPORTED_VITAL_TYPES:
+            index = indexes[f"idx_vitals_{vital_type}_series"]
+            value_columns = [column.name for column in index.columns][2:]
+            assert tuple(value_columns) == VITAL_TYPE_COLUMNS[vital_type]
+        for vital_type, columns in VITAL_FILTER_COLUMNS.items():
+            assert tuple(c.name for c in columns) == VITAL_TYPE_COLUMNS[vital_type]
@@ -0,0 +1,185 @@
+"""
+Tests for streaming uploads: chunked spooling with the size limit and hash
+computed on the way, atomic moves into place, and the entity file service
+storing local and Papra uploads from the spooled file.
+"""
+
+import hashlib
+import io
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.models.models import LabResult, UserPreferences
+from app.services import papra_client as papra_module
+from app.services.generic_entity_file_service import GenericEntityFileService
+from app.services.upload_stream import (
+    TEMP_SUFFIX,
+    UploadTooLargeError,
+    payload_size,
+    spool_upload,
+)
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+class _CountingFile(io.BytesIO):
+    """In-memory upload that records the size of every read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def _upload(data=CONTENT, filename="scan.pdf"):
+    return UploadFile(
+        file=_CountingFile(data),
+        filename=filename,
+        headers={"content-type": "application/pdf"},
+    )
+
+
+class TestSpoolUpload:
+    @pytest.mark.asyncio
+    async def test_streams_in_chunks_and_hashes(self, tmp_path: Path):
+        file = _upload()
+
+        upload = await spool_upload(file, len(CONTENT), tmp_path, chunk_size=1000)
+
+        assert upload.size == len(CONTENT)
+        assert upload.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert upload.path.read_bytes() == CONTENT
+        assert set(file.file.reads) == {1000}
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_upload_and_cleans_up(self, tmp_path: Path):
+        file = _upload()
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(file, 2500, tmp_path, chunk_size=1000)
+
+        assert list(tmp_path.iterdir()) == []
+        # Stopped reading once the limit was passed
+        assert len(file.file.reads) == 3
+
+    @pytest.mark.asyncio
+    async def test_commit_moves_file_into_place(self, tmp_path: Path):
+        upload = await spool_upload(_upload(), len(CONTENT), tmp_path)
+        destination = tmp_path / "scan.pdf"
+
+        await upload.commit(destination)
+        await upload.discard()
+
+        assert destination.read_bytes() == CONTENT
+        assert [path.name for path in tmp_path.iterdir()] == ["scan.pdf"]
+
+    def test_payload_size_of_bytes_and_files(self):
+        stream = io.BytesIO(CONTENT)
+        stream.seek(9)
+
+        assert payload_size(CONTENT) == len(CONTENT)
+        assert payload_size(stream) == len(CONTENT) - 9
+        assert stream.tell() == 9
+
+
+@pytest.fixture
+def lab_result(db_session: Session, test_patient):
+    lab = LabResult(
+        patient_id=test_patient.id,
+        test_name="CBC",
+        status="completed",
+        completed_date=date(2024, 3, 2),
+    )
+    db_session.add(lab)
+    db_session.commit()
+    return lab
+
+
+@pytest.fixture
+def service(tmp_path: Path):
+    service = GenericEntityFileService()
+    service.uploads_dir = tmp_path
+    return service
+
+
+class TestEntityFileUploads:
+    @pytest.mark.asyncio
+    async def test_local_upload_moves_spooled_file(
+        self, db_session: Session, lab_result, service, tmp_path: Path
+    ):
+        result = await service.upload_file(
+            db_session, "lab-result", lab_result.id, _upload()
+        )
+
+        stored = Path(result.file_path)
+        assert stored.read_bytes() == CONTENT
+        assert result.file_size == len(CONTENT)
+        assert not list(tmp_path.rglob(f"*{TEMP_SUFFIX}"))
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_rejected(
+        self, db_session: Session, lab_result, service, monkeypatch
+    ):
+        monkeypatch.setattr(
+            "app.services.generic_entity_file_service.MAX_UPLOAD_SIZE", 1000
+        )
+
+        with pytest.raises(HTTPException) as raised:
+            await service.upload_file(
+                db_session, "lab-result", lab_result.id, _upload()
+            )
+
+        assert raised.value.status_code == 413
+        assert not list(service.uploads_dir.rglob(f"*{TEMP_SUFFIX}"))
+
+    @pytest.mark.asyncio
+    async def test_papra_upload_streams_from_spooled_file(
+        self, db_session: Session, test_user, lab_result, service, monkeypatch
+    ):
+        db_session.add(
+            UserPreferences(
+                user_id=test_user.id,
+                papra_enabled=True,
+                papra_url="https://papra.example.com",
+                papra_api_token_encrypted="encrypted",
+                papra_organization_id="org_1",
+            )
+        )
+        db_session.commit()
+        received = {}
+
+        class FakePapra:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def upload_document(self, file_data, filename, **kwargs):
+                received["streamed"] = not isinstance(file_data, bytes)
+                received["content"] = file_data.read()
+                return {"document_id": "doc_1"}
+
+        monkeypatch.setattr(
+            papra_module, "create_papra_client", lambda **kwargs: FakePapra()
+        )
+
+        result = await service.upload_file(
+            db_session,
+            "lab-result",
+            lab_result.id,
+            _upload(),
+            storage_backend="papra",
+            current_user_id=test_user.id,
+        )
+
+        assert received == {"streamed": True, "content": CONTENT}
+        assert result.papra_document_id == "doc_1"
+        assert result.file_size == len(CONTENT)
@@ -0,0 +1,238 @@
+"""
+Tests for the vitals rollups: maintenance on writes, stats parity, rebuild and
+check, and the rollup-backed long-range trend path.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.vitals import vitals as vitals_crud
+from app.models.models import Vitals
+from app.models.vitals_rollup import VitalsRollup
+from app.schemas.vitals import VitalsCreate, VitalsUpdate
+from app.services import trend_data_fetcher, vitals_rollup
+from app.services.trend_data_fetcher import TrendDataFetcher
+from app.services.vitals_parsers.base_parser import VitalsReading
+
+
+def _rollup(db: Session, patient_id: int, series: str, granularity: str, period):
+    return (
+        db.query(VitalsRollup)
+        .filter(
+            VitalsRollup.patient_id == patient_id,
+            VitalsRollup.series == series,
+            VitalsRollup.granularity == granularity,
+            VitalsRollup.period_start == datetime.combine(period, datetime.min.time()),
+        )
+        .one_or_none()
+    )
+
+
+def _add_glucose(db: Session, patient_id: int, recorded: datetime, value: float):
+    return vitals_crud.create(
+        db,
+        obj_in=VitalsCreate(
+            patient_id=patient_id, recorded_date=recorded, blood_glucose=value
+        ),
+    )
+
+
+class TestRollupMaintenance:
+    """Rollup rows follow writes on the raw readings"""
+
+    def test_create_update_delete(self, db_session: Session, test_patient):
+        first = _add_glucose(db_session, test_patient.id, datetime(2024, 5, 1, 8), 90)
+        _add_glucose(db_session, test_patient.id, datetime(2024, 5, 1, 20), 130)
+
+        day = _rollup(
+            db_session, test_patient.id, "blood_glucose", "day", date(2024, 5, 1)
+        )
+        assert (day.count, day.value_sum, day.min_value, day.max_value) == (
+            2,
+            220,
+            90,
+            130,
+        )
+        assert (day.first_value, day.last_value) == (90, 130)
+        month = _rollup(
+            db_session, test_patient.id, "blood_glucose", "month", date(2024, 5, 1)
+        )
+        assert month.count == 2
+
+        vitals_crud.update(
+            db_session, db_obj=first, obj_in=VitalsUpdate(blood_glucose=110)
+        )
+        db_session.expire_all()
+        day = _rollup(
+            db_session, test_patient.id, "blood_glucose", "day", date(2024, 5, 1)
+        )
+        assert (day.value_sum, day.min_value) == (240, 110)
+
+        vitals_crud.delete(db_session, id=first.id)
+        db_session.expire_all()
+        day = _rollup(
+            db_session, test_patient.id, "blood_glucose", "day", date(2024, 5, 1)
+        )
+        assert (day.count, day.value_sum) == (1, 130)
+
+    def test_reading_moved_to_another_day(self, db_session: Session, test_patient):
+        reading = _add_glucose(db_session, test_patient.id, datetime(2024, 5, 1, 8), 90)
+
+        vitals_crud.update(
+            db_session,
+            db_obj=reading,
+            obj_in=VitalsUpdate(recorded_date=datetime(2024, 6, 2, 8)),
+        )
+
+        db_session.expire_all()
+        assert (
+            _rollup(
+                db_session, test_patient.id, "blood_glucose", "day", date(2024, 5, 1)
+            )
+            is None
+        )
+        assert (
+            _rollup(
+                db_session, test_patient.id, "blood_glucose", "month", date(2024, 5, 1)
+            )
+            is None
+        )
+        moved = _rollup(
+            db_session, test_patient.id, "blood_glucose", "month", date(2024, 6, 1)
+        )
+        assert moved.count == 1
+
+    def test_bulk_create_and_delete_by_import(self, db_session: Session, test_patient):
+        readings = [
+            VitalsReading(
+                recorded_date=datetime(2024, 3, 5, hour, 0),
+                blood_glucose=100.0 + hour,
+                import_source="dexcom_clarity",
+            )
+            for hour in range(4)
+        ]
+        vitals_crud.bulk_create(
+            db_session, readings=readings, patient_id=test_patient.id
+        )
+
+        day = _rollup(
+            db_session, test_patient.id, "blood_glucose", "day", date(2024, 3, 5)
+        )
+        assert (day.count, day.last_value) == (4, 103.0)
+
+        vitals_crud.bulk_delete_by_import(
+            db_session,
+            patient_id=test_patient.id,
+            import_source="dexcom_clarity",
+            date_str="2024-03-05",
+        )
+        db_session.expire_all()
+        assert db_session.query(VitalsRollup).count() == 0
+
+
+class TestStats:
+    def test_stats_match_raw_readings(self, db_session: Session, test_patient):
+        for recorded, weight, glucose, systolic in [
+            (datetime(2024, 1, 10, 8), 180.0, 95.0, 118),
+            (datetime(2024, 2, 10, 8), 178.0, None, 121),
+            (datetime(2024, 3, 10, 8), 175.5, 120.0, 121),
+        ]:
+            vitals_crud.create(
+                db_session,
+                obj_in=VitalsCreate(
+                    patient_id=test_patient.id,
+                    recorded_date=recorded,
+                    weight=weight,
+                    blood_glucose=glucose,
+                    systolic_bp=systolic,
+                    diastolic_bp=80,
+                ),
+            )
+
+        stats = vitals_crud.get_vitals_stats(db_session, patient_id=test_patient.id)
+
+        assert stats["total_readings"] == 3
+        assert stats["current_weight"] == 175.5
+        assert stats["weight_change"] == pytest.approx(-4.5)
+        assert stats["current_blood_glucose"] == 120.0
+        assert stats["avg_diastolic_bp"] == 80
+        assert stats["avg_systolic_bp"] == 120
+
+
+class TestRebuildAndCheck:
+    def test_check_finds_and_rebuild_repairs(self, db_session: Session, test_patient):
+        _add_glucose(db_session, test_patient.id, datetime(2024, 5, 1, 8), 90)
+        assert vitals_rollup.check(db_session, patient_id=test_patient.id) == []
+
+        # Simulate drift from a write that bypassed the ORM
+        db_session.query(VitalsRollup).filter(VitalsRollup.granularity == "day").update(
+            {"count": 5}
+        )
+        db_session.commit()
+        problems = vitals_rollup.check(db_session, patient_id=test_patient.id)
+        assert [problem["problem"] for problem in problems] == ["stale"]
+
+        result = vitals_rollup.rebuild(db_session, patient_id=test_patient.id)
+        assert result == {"patients": 1, "rollups": 2}
+        assert vitals_rollup.check(db_session, patient_id=test_patient.id) == []
+
+    def test_one_time_build_runs_once(self, db_session: Session, test_patient):
+        first = vitals_rollup.run_one_time_build(db_session)
+        assert first["skipped"] is False
+        second = vitals_rollup.run_one_time_build(db_session)
+        assert second["skipped"] is True
+
+
+class TestRollupTrends:
+    """Series above the raw-point cap are charted from monthly rollups"""
+
+    @pytest.fixture
+    def long_series(self, db_session: Session, test_patient):
+        for month, day, systolic, glucose in [
+            (1, 5, 120, 90.0),
+            (1, 20, 130, 110.0),
+            (2, 5, 140, 130.0),
+            (3, 5, 110, 150.0),
+        ]:
+            db_session.add(
+                Vitals(
+                    patient_id=test_patient.id,
+                    recorded_date=datetime(2024, month, day, 8),
+                    systolic_bp=systolic,
+                    diastolic_bp=80,
+                    blood_glucose=glucose,
+                )
+            )
+        db_session.commit()
+        return test_patient
+
+    def test_over_cap_uses_monthly_means(
+        self, db_session: Session, long_series, monkeypatch
+    ):
+        monkeypatch.setattr(trend_data_fetcher, "MAX_RAW_VITAL_POINTS", 3)
+        fetcher = TrendDataFetcher(db_session)
+
+        glucose, pressure = fetcher.fetch_vital_trends(
+            long_series.id,
+            [("blood_glucose", None, None), ("blood_pressure", None, None)],
+        )
+
+        assert glucose["values"] == [100.0, 130.0, 150.0]
+        assert glucose["statistics"]["count"] == 4
+        assert glucose["statistics"]["average"] == 120.0
+        assert glucose["statistics"]["min"] == 90.0
+        assert glucose["statistics"]["latest"] == 150.0
+        assert pressure["systolic_values"] == [125.0, 140.0, 110.0]
+        assert pressure["diastolic_values"] == [80.0, 80.0, 80.0]
+        assert pressure["statistics"]["systolic"]["count"] == 4
+
+    def test_under_cap_reads_raw(self, db_session: Session, long_series):
+        fetcher = TrendDataFetcher(db_session)
+
+        (glucose,) = fetcher.fetch_vital_trends(
+            long_series.id, [("blood_glucose", date(2024, 1, 1), date(2024, 1, 31))]
+        )
+
+        assert glucose["values"] == [90.0, 110.0]
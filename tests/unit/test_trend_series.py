@@ -0,0 +1,171 @@
+"""
+Unit tests for the array-backed trend series.
+
+Monthly averaging, statistics and trend direction are checked against the
+plain-list implementations they replace; LTTB downsampling against the
+properties the charts rely on (endpoints, peaks, point budget).
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.utils.trend_series import TrendSeries, lttb_indices, value_statistics
+from app.utils.trend_statistics import (
+    compute_trend_direction,
+    trend_direction_from_sums,
+)
+
+
+def _reference_monthly_means(dates, values, statuses):
+    """The list-based monthly downsampling the chart generator used to do."""
+    monthly = {}
+    for d, value, status in zip(dates, values, statuses):
+        dt = d if isinstance(d, datetime) else datetime.combine(d, datetime.min.time())
+        bucket = monthly.setdefault(dt.strftime("%Y-%m"), ([], [], []))
+        bucket[0].append(dt)
+        bucket[1].append(value)
+        bucket[2].append(status)
+    return [
+        (
+            bucket_dates[len(bucket_dates) // 2],
+            sum(bucket_values) / len(bucket_values),
+            bucket_statuses[-1],
+        )
+        for bucket_dates, bucket_values, bucket_statuses in (
+            monthly[key] for key in sorted(monthly)
+        )
+    ]
+
+
+def _reference_trend_direction(values):
+    return trend_direction_from_sums(
+        len(values),
+        sum(values),
+        sum(i * v for i, v in enumerate(values)),
+        min(values, default=0.0),
+        max(values, default=0.0),
+    )
+
+
+@pytest.fixture
+def readings():
+    """Irregular, unsorted readings over two years, with mixed date types."""
+    rng = np.random.default_rng(7)
+    start = datetime(2023, 1, 1)
+    dates = [
+        start + timedelta(minutes=int(minutes))
+        for minutes in rng.integers(0, 2 * 365 * 24 * 60, size=3000)
+    ]
+    dates[::50] = [d.date() for d in dates[::50]]
+    values = [round(float(v), 1) for v in rng.normal(100, 15, size=len(dates))]
+    statuses = [str(s) for s in rng.choice(["normal", "high", "low"], len(dates))]
+    return dates, values, statuses
+
+
+class TestMonthlyMeans:
+    def test_matches_list_implementation(self, readings):
+        dates, values, statuses = readings
+
+        monthly = TrendSeries.from_lists(
+            dates, values, statuses=statuses
+        ).monthly_means()
+
+        expected = _reference_monthly_means(dates, values, statuses)
+        assert monthly.date_list() == [when for when, _, _ in expected]
+        assert monthly.value_list() == pytest.approx([mean for _, mean, _ in expected])
+        assert list(monthly.statuses) == [status for _, _, status in expected]
+
+    def test_columns_share_buckets(self):
+        dates = [datetime(2024, 1, 5), datetime(2024, 1, 20), datetime(2024, 2, 1)]
+
+        monthly = TrendSeries.from_lists(
+            dates, [120, 130, 140], [80, 90, 70]
+        ).monthly_means()
+
+        assert monthly.date_list() == [datetime(2024, 1, 20), datetime(2024, 2, 1)]
+        assert monthly.value_list(0) == [125.0, 140.0]
+        assert monthly.value_list(1) == [85.0, 70.0]
+
+
+class TestStatistics:
+    def test_value_statistics_match_list_implementation(self, readings):
+        _, values, _ = readings
+
+        stats = value_statistics(np.array(values))
+
+        assert stats == {
+            "count": len(values),
+            "latest": round(values[-1], 2),
+            "average": round(sum(values) / len(values), 2),
+            "min": round(min(values), 2),
+            "max": round(max(values), 2),
+            "trend_direction": _reference_trend_direction(values),
+        }
+        assert all(type(stats[key]) is float for key in ("latest", "average"))
+
+    def test_value_statistics_empty(self):
+        assert value_statistics(np.array([])) == {}
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            [],
+            [5.0],
+            [1.0, 2.0],
+            [1.0, 2.0, 3.0, 4.0],
+            [4.0, 3.0, 2.0, 1.0],
+            [10.0, 10.1, 9.9, 10.0],
+            [0.0, 0.0, 0.0],
+        ],
+    )
+    def test_trend_direction_unchanged(self, values):
+        assert compute_trend_direction(values) == _reference_trend_direction(values)
+        assert compute_trend_direction(np.array(values)) == compute_trend_direction(
+            values
+        )
+
+
+class TestDownsample:
+    def test_keeps_endpoints_and_peaks(self):
+        x = np.arange(10000)
+        y = np.sin(x / 500.0)
+        y[4321] = 50.0
+        y[7777] = -50.0
+
+        kept = lttb_indices(x, y, 200)
+
+        assert kept.size == 200
+        assert kept[0] == 0 and kept[-1] == x.size - 1
+        assert np.all(np.diff(kept) > 0)
+        assert {4321, 7777} <= set(kept.tolist())
+
+    def test_short_series_unchanged(self):
+        series = TrendSeries.from_lists(
+            [date(2024, 1, day) for day in range(1, 6)], [1, 2, 3, 4, 5]
+        )
+
+        assert series.downsample(10) is series
+
+    def test_blood_pressure_columns_stay_paired(self):
+        dates = [datetime(2024, 1, 1) + timedelta(hours=h) for h in range(5000)]
+        systolic = [120 + (h % 17) for h in range(5000)]
+        diastolic = [s - 40 for s in systolic]
+
+        plotted = TrendSeries.from_lists(dates, systolic, diastolic).downsample(500)
+
+        assert len(plotted) == 500
+        assert np.array_equal(plotted.column(1), plotted.column(0) - 40)
+
+    def test_complete_drops_missing_readings(self):
+        series = TrendSeries.from_lists(
+            [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)],
+            [1, None, 3],
+            statuses=["normal", "high", "low"],
+        )
+
+        complete = series.complete()
+
+        assert complete.value_list() == [1.0, 3.0]
+        assert list(complete.statuses) == ["normal", "low"]